@@ -0,0 +1,199 @@
+"""Compile aggregate selects into SQL for the SQLite and PostgreSQL query builders.
+
+Aggregates use PostgREST's select syntax, so ``.select("platform, count()")``
+or ``.select("total:likes.sum(), likes.avg()")`` run as ``GROUP BY`` queries
+instead of pulling every row into Python. Plain columns next to an aggregate
+become group keys. Two builder extensions cover what PostgREST can't express:
+``bucket()`` groups on a truncated timestamp and ``unnest()`` expands a JSON
+array column into one row per element.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+from db.projection import _unquote, split_top_level
+
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+_AGGREGATE_RE = re.compile(
+    r'^(?:(?P<alias>"[^"]+"|[^:"(]+):(?!:))?'
+    r'(?:(?P<column>"[^"]+"|[^.()"]+)\.)?'
+    r"(?P<function>" + "|".join(AGGREGATE_FUNCTIONS) + r")\(\)"
+    r"(?:::\w+)?$"
+)
+
+# Output format is the same on both engines: ISO-8601 without timezone
+_SQLITE_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%dT%H:%M:00",
+    "hour": "%Y-%m-%dT%H:00:00",
+    "day": "%Y-%m-%dT00:00:00",
+    "month": "%Y-%m-01T00:00:00",
+}
+BUCKET_UNITS = tuple(_SQLITE_BUCKET_FORMATS)
+
+
+@dataclass(frozen=True)
+class SelectItem:
+    """One entry of an aggregate select list.
+
+    ``function`` is ``None`` for group keys. ``column`` is ``None`` for a
+    bare ``count()``.
+    """
+
+    alias: str
+    column: str | None = None
+    function: str | None = None
+
+
+@dataclass(frozen=True)
+class Bucket:
+    column: str
+    unit: str
+    alias: str
+
+
+@dataclass(frozen=True)
+class Unnest:
+    column: str
+    alias: str
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def parse_aggregate_select(columns: str | None) -> list[SelectItem] | None:
+    """Parse ``columns`` if it contains at least one aggregate, else ``None``."""
+    if not columns or "()" not in columns:
+        return None
+    items: list[SelectItem] = []
+    has_aggregate = False
+    for token in split_top_level(columns):
+        match = _AGGREGATE_RE.match(token)
+        if match:
+            has_aggregate = True
+            function = match.group("function")
+            column = _unquote(match.group("column")) if match.group("column") else None
+            alias = _unquote(match.group("alias")) if match.group("alias") else function
+            items.append(SelectItem(alias=alias, column=column, function=function))
+            continue
+        if token == "*" or "(" in token:
+            # Embedded resources and * have no meaning in a grouped select
+            continue
+        alias = None
+        if ":" in token.replace("::", ""):
+            alias_part, _, token = token.partition(":")
+            alias = _unquote(alias_part)
+        column = _unquote(token.split("::", 1)[0])
+        if column:
+            items.append(SelectItem(alias=alias or column, column=column))
+    return items if has_aggregate else None
+
+
+def check_bucket_unit(unit: str) -> str:
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Unsupported bucket unit {unit!r}; expected one of {BUCKET_UNITS}")
+    return unit
+
+
+def bucket_expression(expr: str, unit: str, dialect: str) -> str:
+    """SQL that truncates the timestamp ``expr`` to ``unit``."""
+    if dialect == "postgres":
+        return (
+            f"to_char(date_trunc('{unit}', ({expr})::timestamp),"
+            " 'YYYY-MM-DD\"T\"HH24:MI:SS')"
+        )
+    return f"strftime('{_SQLITE_BUCKET_FORMATS[unit]}', {expr})"
+
+
+def from_clause(
+    table: str, unnest: Unnest | None, known_columns: set[str], dialect: str
+) -> str:
+    """``FROM`` target for a select, expanding ``unnest`` when set.
+
+    The expanded rows are wrapped in a subquery named after the table so
+    filters built for the plain table still apply.
+    """
+    qtable = _quote(table)
+    if unnest is None:
+        return qtable
+    if unnest.column not in known_columns:
+        source = "'[]'"
+    else:
+        source = f"{qtable}.{_quote(unnest.column)}"
+    if dialect == "postgres":
+        elements = (
+            "CROSS JOIN LATERAL json_array_elements_text("
+            f"CASE WHEN left(ltrim({source}), 1) = '[' THEN ({source})::json"
+            " ELSE '[]'::json END) AS _unnest(value)"
+        )
+    else:
+        elements = (
+            f", json_each(COALESCE(CASE WHEN json_valid({source}) THEN"
+            f" CASE WHEN json_type({source}) = 'array' THEN {source} END END, '[]'))"
+            " AS _unnest"
+        )
+    return (
+        f"(SELECT {qtable}.*, _unnest.value AS {_quote(unnest.alias)}"
+        f" FROM {qtable} {elements}) AS {qtable}"
+    )
+
+
+def latest_per_clause(table: str, column: str, order_column: str) -> str:
+    """Filter keeping only the newest row (by ``order_column``, then id) per ``column``."""
+    qtable = _quote(table)
+    col, order = _quote(column), _quote(order_column)
+    return (
+        f"NOT EXISTS (SELECT 1 FROM {qtable} AS _newer"
+        f" WHERE _newer.{col} = {qtable}.{col}"
+        f" AND (_newer.{order} > {qtable}.{order}"
+        f" OR (_newer.{order} = {qtable}.{order} AND _newer.\"id\" > {qtable}.\"id\")))"
+    )
+
+
+def compile_aggregate(
+    items: list[SelectItem],
+    buckets: list[Bucket],
+    known_columns: set[str],
+    dialect: str,
+) -> tuple[str, str]:
+    """Return ``(select_list, group_by)`` SQL for an aggregate query.
+
+    Columns missing from ``known_columns`` compile to ``NULL``, matching how
+    projections drop unknown columns instead of failing the query.
+    """
+    parts: list[str] = []
+    group_positions: list[str] = []
+
+    def column_expr(column: str) -> str:
+        return _quote(column) if column in known_columns else "NULL"
+
+    for bucket in buckets:
+        expr = "NULL"
+        if bucket.column in known_columns:
+            expr = bucket_expression(_quote(bucket.column), bucket.unit, dialect)
+        parts.append(f"{expr} AS {_quote(bucket.alias)}")
+        group_positions.append(str(len(parts)))
+    for item in items:
+        if item.function is None:
+            expr = column_expr(item.column)
+            group_positions.append(str(len(parts) + 1))
+        elif item.column is None:
+            expr = "COUNT(*)"
+        else:
+            expr = f"{item.function.upper()}({column_expr(item.column)})"
+        parts.append(f"{expr} AS {_quote(item.alias)}")
+    group_by = ", ".join(group_positions)
+    return ", ".join(parts), group_by
+
+
+def normalize_aggregate_row(row: dict[str, Any]) -> dict[str, Any]:
+    """Convert PostgreSQL ``numeric`` results (Decimal) to int/float."""
+    for key, value in row.items():
+        if isinstance(value, Decimal):
+            row[key] = int(value) if value == value.to_integral_value() else float(value)
+    return row
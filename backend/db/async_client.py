@@ -0,0 +1,97 @@
+"""Awaitable wrapper around the synchronous database clients.
+
+Both adapters do blocking I/O (psycopg2 / sqlite3), so calling ``execute()``
+from an ``async def`` route or worker stalls the event loop for the whole
+round trip. ``AsyncClient`` keeps the same fluent API but runs ``execute()``
+on a dedicated thread pool::
+
+    db = get_supabase_admin(asynchronous=True)
+    rows = await db.table("review_queue").select("*").eq("decision", None).execute()
+
+Filters and modifiers are still applied synchronously (they only build SQL);
+only the final round trip is offloaded. The pool is sized to the Postgres
+connection pool so queued queries wait in the executor rather than holding
+threads blocked on a pool checkout.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+DEFAULT_SQLITE_WORKERS = 4
+
+
+def _default_workers(sync_client: Any) -> int:
+    if os.getenv("DB_ASYNC_WORKERS"):
+        return int(os.environ["DB_ASYNC_WORKERS"])
+    pool = getattr(sync_client, "pool", None)
+    return getattr(pool, "max_size", None) or DEFAULT_SQLITE_WORKERS
+
+
+class _AsyncNotFilter:
+    def __init__(self, qb: AsyncQueryBuilder):
+        self._qb = qb
+
+    def is_(self, column: str, value: str) -> AsyncQueryBuilder:
+        self._qb._builder.not_.is_(column, value)
+        return self._qb
+
+
+class AsyncQueryBuilder:
+    """Proxies a sync query builder; ``execute()`` is a coroutine."""
+
+    def __init__(self, builder: Any, client: AsyncClient):
+        self._builder = builder
+        self._client = client
+
+    @property
+    def not_(self) -> _AsyncNotFilter:
+        return _AsyncNotFilter(self)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            return self if result is self._builder else result
+
+        return chained
+
+    async def execute(self):
+        return await self._client.run(self._builder.execute)
+
+
+class AsyncClient:
+    """Awaitable counterpart of ``SQLiteClient`` / ``PostgresClient``."""
+
+    def __init__(self, sync_client: Any, max_workers: int | None = None):
+        self.sync = sync_client
+        self.max_workers = max_workers or _default_workers(sync_client)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="db-async"
+        )
+
+    def table(self, table_name: str) -> AsyncQueryBuilder:
+        return AsyncQueryBuilder(self.sync.table(table_name), self)
+
+    async def run(self, fn, *args: Any) -> Any:
+        """Run a blocking callable against the database on the DB thread pool."""
+        loop = asyncio.get_running_loop()
+        # Carry context variables (e.g. the request being instrumented) into the thread
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+        return await loop.run_in_executor(self._executor, call)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def as_async(client: Any) -> AsyncClient:
+    """Wrap ``client`` unless it is already an ``AsyncClient``."""
+    return client if isinstance(client, AsyncClient) else AsyncClient(client)
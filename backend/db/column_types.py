@@ -0,0 +1,159 @@
+"""Per-table registry of JSON-encoded text columns and lazy row decoding.
+
+Both adapters store dicts and lists as JSON text (``hashtags``, ``value``,
+``details``...). Rather than guessing from the data — which used to run
+``json.loads`` on any tweet or description that happened to start with
+``{`` or ``[`` — the JSON columns are derived from the schema: a column is
+JSON if its declared default is ``'[]'`` or ``'{}'``, or it is listed in
+``EXTRA_JSON_COLUMNS`` (JSON columns that default to NULL).
+
+Selected rows come back as ``LazyRow``: JSON values stay encoded until a
+caller reads that key, are decoded once, and then cached in place, so
+pulling wide rows (or embeddings) for a couple of fields doesn't pay to
+parse the rest.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterable
+
+# JSON columns whose default is NULL, so they can't be read off the schema
+EXTRA_JSON_COLUMNS: dict[str, frozenset[str]] = {
+    "neoclaw_tasks": frozenset({"result"}),
+    "brand_voice_embeddings": frozenset({"embedding", "metadata"}),
+    "comment_embeddings": frozenset({"embedding"}),
+}
+
+# SQLite reports defaults as written ('[]'); Postgres adds a cast ('[]'::text)
+_JSON_DEFAULT_RE = re.compile(r"^'(\[\]|\{\})'(::[\w ]+)?$")
+
+
+def is_json_default(default: str | None) -> bool:
+    return bool(default) and _JSON_DEFAULT_RE.match(default.strip()) is not None
+
+
+def json_columns(table: str, defaults: Iterable[tuple[str, str | None]]) -> frozenset[str]:
+    """JSON columns of ``table`` given its ``(column, default)`` pairs."""
+    found = {name for name, default in defaults if is_json_default(default)}
+    return frozenset(found) | EXTRA_JSON_COLUMNS.get(table, frozenset())
+
+
+def json_keys(parsed_select: list[tuple[str, str | None]] | None, columns: frozenset[str]) -> frozenset[str]:
+    """Result keys that hold JSON, following ``alias:column`` renames."""
+    if parsed_select is None:
+        return columns
+    return frozenset(alias or col for col, alias in parsed_select if col in columns)
+
+
+def _decode(value: Any) -> Any:
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        # Legacy rows may hold plain text in a JSON column
+        return value
+
+
+class LazyRow(dict):
+    """A row dict whose JSON columns are decoded on first access.
+
+    Keyed access (``row[k]``, ``get``, ``pop``, ``setdefault``) decodes just
+    that value. Anything that walks the whole row (``items()``, ``values()``,
+    equality, ``repr``, copying, ``json.dumps``) decodes every pending value
+    first, so callers never see the encoded text.
+    """
+
+    __slots__ = ("_pending",)
+
+    def __init__(self, data: dict, pending: Iterable[str]):
+        super().__init__(data)
+        self._pending = set(pending)
+
+    def _resolve(self, key: Any) -> None:
+        if key in self._pending:
+            self._pending.discard(key)
+            super().__setitem__(key, _decode(super().__getitem__(key)))
+
+    def _resolve_all(self) -> None:
+        for key in list(self._pending):
+            self._resolve(key)
+
+    def __getitem__(self, key: Any) -> Any:
+        self._resolve(key)
+        return super().__getitem__(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        self._resolve(key)
+        return super().get(key, default)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        self._resolve(key)
+        return super().pop(key, *default)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._resolve(key)
+        return super().setdefault(key, default)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._pending.discard(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self._pending.discard(key)
+        super().__delitem__(key)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    # Overriding __iter__ makes dict(row) and {**row} go through __getitem__
+    def __iter__(self):
+        return super().__iter__()
+
+    def items(self):
+        self._resolve_all()
+        return super().items()
+
+    def values(self):
+        self._resolve_all()
+        return super().values()
+
+    def popitem(self):
+        self._resolve_all()
+        return super().popitem()
+
+    def copy(self) -> dict:
+        self._resolve_all()
+        return dict(super().items())
+
+    def __or__(self, other: Any) -> dict:
+        return self.copy() | other
+
+    def __ror__(self, other: Any) -> dict:
+        return other | self.copy()
+
+    def __eq__(self, other: Any) -> bool:
+        self._resolve_all()
+        if isinstance(other, LazyRow):
+            other._resolve_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other: Any) -> bool:
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        self._resolve_all()
+        return super().__repr__()
+
+    def __reduce__(self):
+        return dict, (self.copy(),)
+
+
+def decode_row(row: dict, keys: frozenset[str]) -> dict:
+    """Wrap ``row`` so its JSON ``keys`` decode lazily; plain dict if none apply."""
+    pending = [k for k in keys if isinstance(row.get(k), str)]
+    return LazyRow(row, pending) if pending else row
@@ -0,0 +1,97 @@
+"""Process-local read-through cache for the config tables.
+
+``system_config``, ``risk_config`` and ``voice_config`` are read on every
+worker cycle, risk-routing call and task-queue poll but change a few times a
+day. The query builders route selects on these tables through
+``read_through()``, keyed by the compiled query, and call ``invalidate()``
+after any insert/update/upsert/delete on them, so writes made through this
+process are visible immediately.
+
+Writes from other processes (another API replica, a manual SQL fix) are only
+picked up when the entry expires. Entries live for ``CONFIG_CACHE_TTL``
+seconds, except reads that can return the kill switch, which expire after
+``KILL_SWITCH_MAX_STALENESS`` seconds — that is the upper bound on how long a
+flip made elsewhere can go unnoticed.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+CACHED_TABLES = frozenset({"system_config", "risk_config", "voice_config"})
+
+CONFIG_CACHE_TTL = float(os.getenv("CONFIG_CACHE_TTL", "60"))
+KILL_SWITCH_MAX_STALENESS = float(os.getenv("KILL_SWITCH_MAX_STALENESS", "5"))
+
+_lock = threading.Lock()
+_entries: dict[tuple[str, Hashable], tuple[float, Any]] = {}
+# Bumped on every invalidation so a load that raced a write isn't stored
+_generations: dict[str, int] = {}
+_counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+_clock: Callable[[], float] = time.monotonic
+
+
+def is_cached_table(table: str) -> bool:
+    return table in CACHED_TABLES and CONFIG_CACHE_TTL > 0
+
+
+def _ttl_for(table: str, params: list) -> float:
+    # Unfiltered or kill-switch reads may carry the kill switch
+    if table == "system_config" and (not params or "kill_switch" in params):
+        return min(CONFIG_CACHE_TTL, KILL_SWITCH_MAX_STALENESS)
+    return CONFIG_CACHE_TTL
+
+
+def read_through(table: str, key: Hashable, params: list, loader: Callable[[], Any]) -> Any:
+    """Return the cached result for ``key`` or call ``loader()`` and cache it.
+
+    Callers get a copy, so mutating a returned row never leaks into the cache.
+    """
+    now = _clock()
+    with _lock:
+        entry = _entries.get((table, key))
+        if entry is not None and entry[0] > now:
+            _counters["hits"] += 1
+            return copy.deepcopy(entry[1])
+        _counters["misses"] += 1
+        generation = _generations.get(table, 0)
+
+    result = loader()
+
+    with _lock:
+        if _generations.get(table, 0) == generation:
+            _entries[(table, key)] = (now + _ttl_for(table, params), copy.deepcopy(result))
+    return result
+
+
+def invalidate(table: str | None = None) -> None:
+    """Drop cached reads for ``table`` (every config table if ``None``)."""
+    tables = CACHED_TABLES if table is None else {table}
+    with _lock:
+        for name in tables:
+            _generations[name] = _generations.get(name, 0) + 1
+        for cache_key in [k for k in _entries if k[0] in tables]:
+            del _entries[cache_key]
+        _counters["invalidations"] += 1
+
+
+def get_cache_stats() -> dict[str, Any]:
+    with _lock:
+        stats = dict(_counters)
+        stats["entries"] = len(_entries)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    stats["ttl_seconds"] = CONFIG_CACHE_TTL
+    stats["kill_switch_max_staleness_seconds"] = KILL_SWITCH_MAX_STALENESS
+    return stats
+
+
+def reset_cache_stats() -> None:
+    with _lock:
+        for name in _counters:
+            _counters[name] = 0
@@ -11,6 +11,7 @@ logger = logging.getLogger(__name__)
 
 _client = None
 _admin = None
+_async_admin = None
 _initialized = False
 _using_postgres = False
 
@@ -27,9 +28,10 @@ def init_clients() -> None:
         logger.info(f"🐘 Using PostgreSQL database (persistent)")
         try:
             from db.postgres_store import PostgresClient, init_postgres_db
-            init_postgres_db(database_url)
+            # One pooled client serves both roles so they share connections
             _client = PostgresClient(database_url)
-            _admin = PostgresClient(database_url)
+            init_postgres_db(database_url, client=_client)
+            _admin = _client
             _using_postgres = True
             logger.info("✅ PostgreSQL connected successfully")
         except Exception as e:
@@ -60,10 +62,21 @@ def get_supabase_client():
     return _client
 
 
-def get_supabase_admin():
+def get_supabase_admin(asynchronous: bool = False):
+    """Admin client; ``asynchronous=True`` returns the awaitable wrapper.
+
+    The async wrapper shares the sync client's connections and is created
+    once per client, so its thread pool is reused across requests.
+    """
+    global _async_admin
     if not _initialized:
         init_clients()
-    return _admin
+    if not asynchronous:
+        return _admin
+    if _async_admin is None or _async_admin.sync is not _admin:
+        from db.async_client import AsyncClient
+        _async_admin = AsyncClient(_admin)
+    return _async_admin
 
 
 def is_postgres_mode() -> bool:
@@ -77,5 +90,6 @@ def get_db_info() -> dict:
         "using_postgres": _using_postgres,
         "database_type": "PostgreSQL" if _using_postgres else "SQLite",
         "persistent": _using_postgres,
-        "warning": None if _using_postgres else "SQLite is ephemeral - add PostgreSQL for persistence"
+        "warning": None if _using_postgres else "SQLite is ephemeral - add PostgreSQL for persistence",
+        "pool": _admin.pool_stats() if _using_postgres else None,
     }
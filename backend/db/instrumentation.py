@@ -0,0 +1,217 @@
+"""Query instrumentation for the SQLite and Postgres query builders.
+
+Every database round trip the builders make (config-cache hits don't count)
+produces a ``QueryEvent`` with the table, operation, SQL shape (the query
+with values replaced by placeholders), duration, row count and the route
+that issued it. Events are fed to:
+
+* per-shape counters (``get_query_stats()``), served by the debug router;
+* a slow-query log: events slower than ``SLOW_QUERY_MS`` are logged at
+  WARNING and kept in a ring buffer;
+* a per-request N+1 detector: when one request issues the same shape
+  ``N_PLUS_ONE_THRESHOLD`` times or more, it is logged and kept as well;
+* any hooks registered with ``add_query_hook()``.
+
+Requests are tracked by ``middleware.query_tracking.QueryTrackingMiddleware``
+through a context variable, which ``AsyncClient`` carries into its threads.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+_RECENT_LIMIT = 100
+
+
+@dataclass
+class QueryEvent:
+    table: str
+    operation: str
+    shape: str
+    route: str | None = None
+    duration_ms: float = 0.0
+    rows: int = 0
+    error: str | None = None
+
+
+@dataclass
+class RequestQueries:
+    """Queries issued while serving one request."""
+
+    method: str
+    path: str
+    # The ASGI scope; routing adds the matched route to it once resolved
+    scope: dict | None = None
+    shapes: Counter = field(default_factory=Counter)
+    total_ms: float = 0.0
+
+    @property
+    def route(self) -> str:
+        route = (self.scope or {}).get("route")
+        return f"{self.method} {getattr(route, 'path', self.path)}"
+
+    @property
+    def count(self) -> int:
+        return sum(self.shapes.values())
+
+
+_current_request: ContextVar[RequestQueries | None] = ContextVar("current_request", default=None)
+
+_lock = threading.Lock()
+_hooks: list[Callable[[QueryEvent], None]] = []
+_shape_stats: dict[tuple[str, str], dict[str, Any]] = {}
+_slow_queries: deque[dict] = deque(maxlen=_RECENT_LIMIT)
+_n_plus_one: deque[dict] = deque(maxlen=_RECENT_LIMIT)
+
+
+def query_shape(
+    operation: str,
+    table: str,
+    columns: str | None = None,
+    wheres: list[str] | None = None,
+    orders: list[tuple[str, bool]] | None = None,
+    limited: bool = False,
+) -> str:
+    """Value-free description of a query; identical shapes differ only in parameters."""
+    shape = f"{operation.upper()} {table}"
+    if operation == "select":
+        shape += f" [{columns or '*'}]"
+    if wheres:
+        shape += " WHERE " + " AND ".join(wheres)
+    if orders:
+        shape += " ORDER BY " + ", ".join(f"{c}{' DESC' if d else ''}" for c, d in orders)
+    if limited:
+        shape += " LIMIT ?"
+    return shape
+
+
+def count_rows(data: Any) -> int:
+    if data is None:
+        return 0
+    return len(data) if isinstance(data, list) else 1
+
+
+def add_query_hook(hook: Callable[[QueryEvent], None]) -> None:
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_query_hook(hook: Callable[[QueryEvent], None]) -> None:
+    with _lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+@contextmanager
+def track_query(table: str, operation: str, shape: str) -> Iterator[QueryEvent]:
+    """Time one round trip; the caller sets ``event.rows`` before leaving the block."""
+    request = _current_request.get()
+    event = QueryEvent(table, operation, shape, route=request.route if request else None)
+    started = time.perf_counter()
+    try:
+        yield event
+    except Exception as e:
+        event.error = type(e).__name__
+        raise
+    finally:
+        event.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        _record(event, request)
+
+
+def _record(event: QueryEvent, request: RequestQueries | None) -> None:
+    key = (event.table, event.shape)
+    with _lock:
+        stats = _shape_stats.get(key)
+        if stats is None:
+            stats = _shape_stats[key] = {"queries": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0}
+        stats["queries"] += 1
+        stats["rows"] += event.rows
+        stats["total_ms"] += event.duration_ms
+        stats["max_ms"] = max(stats["max_ms"], event.duration_ms)
+        if event.error:
+            stats["errors"] += 1
+        if request is not None:
+            request.shapes[key] += 1
+            request.total_ms += event.duration_ms
+        slow = event.duration_ms >= SLOW_QUERY_MS
+        if slow:
+            _slow_queries.append(asdict(event))
+        hooks = list(_hooks)
+
+    if slow:
+        logger.warning(
+            "Slow query (%.1f ms) on %s from %s: %s",
+            event.duration_ms, event.table, event.route or "-", event.shape,
+            extra={"query": asdict(event)},
+        )
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            logger.exception("Query hook %r failed", hook)
+
+
+@contextmanager
+def track_request(method: str, path: str, scope: dict | None = None) -> Iterator[RequestQueries]:
+    """Collect the queries issued inside the block and flag N+1 patterns at the end."""
+    request = RequestQueries(method, path, scope)
+    token = _current_request.set(request)
+    try:
+        yield request
+    finally:
+        _current_request.reset(token)
+        _check_n_plus_one(request)
+
+
+def _check_n_plus_one(request: RequestQueries) -> None:
+    for (table, shape), times in request.shapes.items():
+        if times < N_PLUS_ONE_THRESHOLD:
+            continue
+        report = {"route": request.route, "table": table, "shape": shape, "times": times}
+        with _lock:
+            _n_plus_one.append(report)
+        logger.warning(
+            "Possible N+1 in %s: %d x %s", request.route, times, shape,
+            extra={"n_plus_one": report},
+        )
+
+
+def get_query_stats() -> dict[str, Any]:
+    """Per-shape totals (slowest total first) plus recent slow queries and N+1 reports."""
+    with _lock:
+        shapes = [
+            {"table": table, "shape": shape, **stats}
+            for (table, shape), stats in _shape_stats.items()
+        ]
+        slow = list(_slow_queries)
+        n_plus_one = list(_n_plus_one)
+    for item in shapes:
+        item["total_ms"] = round(item["total_ms"], 3)
+        item["avg_ms"] = round(item["total_ms"] / item["queries"], 3)
+    shapes.sort(key=lambda x: x["total_ms"], reverse=True)
+    return {
+        "slow_query_ms": SLOW_QUERY_MS,
+        "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        "shapes": shapes,
+        "slow_queries": slow,
+        "n_plus_one": n_plus_one,
+    }
+
+
+def reset_query_stats() -> None:
+    with _lock:
+        _shape_stats.clear()
+        _slow_queries.clear()
+        _n_plus_one.clear()
@@ -0,0 +1,56 @@
+"""Per-query row/byte accounting for the query builders.
+
+Every select records how many rows and roughly how many bytes it pulled,
+grouped by table and select list, so the effect of column projection on hot
+endpoints (hub stats, feedback stats, dashboards) is visible at runtime.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Iterable
+
+_lock = threading.Lock()
+_stats: dict[tuple[str, str], dict[str, int]] = {}
+
+
+def estimate_bytes(values: Iterable[Any]) -> int:
+    """Approximate wire size of a row's values."""
+    total = 0
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, (str, bytes, bytearray, memoryview)):
+            total += len(v)
+        else:
+            total += 8
+    return total
+
+
+def record_select(table: str, projection: str, rows: int, nbytes: int) -> None:
+    key = (table, projection)
+    with _lock:
+        entry = _stats.get(key)
+        if entry is None:
+            entry = _stats[key] = {"queries": 0, "rows": 0, "bytes": 0}
+        entry["queries"] += 1
+        entry["rows"] += rows
+        entry["bytes"] += nbytes
+
+
+def get_io_stats() -> list[dict[str, Any]]:
+    """Return accumulated stats, heaviest (by bytes) first."""
+    with _lock:
+        items = [
+            {"table": table, "columns": projection, **counts}
+            for (table, projection), counts in _stats.items()
+        ]
+    for item in items:
+        item["bytes_per_row"] = round(item["bytes"] / item["rows"], 1) if item["rows"] else 0
+    items.sort(key=lambda x: x["bytes"], reverse=True)
+    return items
+
+
+def reset_io_stats() -> None:
+    with _lock:
+        _stats.clear()
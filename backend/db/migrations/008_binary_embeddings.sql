@@ -0,0 +1,17 @@
+-- 008_binary_embeddings.sql
+-- Store embeddings as bytea (see services/ai/vector_codec.py) instead of pgvector.
+--
+-- Similarity search runs in-process on the vector store, so the vector
+-- columns and their ivfflat indexes are only paying for parsing. Existing
+-- values are kept as their text form ('[0.1, ...]'), which the codec still
+-- reads; run `python -m scripts.migrate_binary_embeddings` afterwards to
+-- rewrite them as float32 (or int8) blobs.
+
+DROP INDEX IF EXISTS idx_brand_voice_embeddings_cosine;
+DROP INDEX IF EXISTS idx_comment_embeddings_cosine;
+
+ALTER TABLE brand_voice_embeddings
+    ALTER COLUMN embedding TYPE bytea USING convert_to(embedding::text, 'UTF8');
+
+ALTER TABLE comment_embeddings
+    ALTER COLUMN embedding TYPE bytea USING convert_to(embedding::text, 'UTF8');
@@ -0,0 +1,86 @@
+"""Keyset (cursor) pagination on top of the query builders.
+
+``paginate()`` orders by a sort column plus ``id`` as a tie-breaker and
+resumes after the last row of the previous page with ``after()``, so every
+page is an index range scan instead of an ``OFFSET`` that re-reads all the
+rows before it. Cursors handed to API clients are opaque base64 tokens.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor token we didn't issue."""
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if not isinstance(values, dict):
+        raise InvalidCursor("Malformed cursor")
+    return values
+
+
+def _page_query(query, column: str, limit: int, cursor: str | None, desc: bool, tie_column: str):
+    if cursor:
+        values = decode_cursor(cursor)
+        if column not in values or tie_column not in values:
+            raise InvalidCursor("Cursor does not match this listing")
+        query = query.after(column, values[column], desc=desc,
+                            tie_column=tie_column, tie_value=values[tie_column])
+    # Fetch one extra row to learn whether another page exists
+    return query.order(column, desc=desc).order(tie_column, desc=desc).limit(limit + 1)
+
+
+def _split_page(result, column: str, limit: int, tie_column: str) -> tuple[list[dict], str | None]:
+    rows = result.data or []
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor({column: last.get(column), tie_column: last.get(tie_column)})
+
+
+def paginate(
+    query,
+    column: str,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    desc: bool = False,
+    tie_column: str = "id",
+) -> tuple[list[dict], str | None]:
+    """Fetch one page of ``query`` ordered by ``(column, tie_column)``.
+
+    Returns the rows and the cursor for the next page (``None`` on the last
+    page). ``column`` should be non-null for every row being paged.
+    """
+    result = _page_query(query, column, limit, cursor, desc, tie_column).execute()
+    return _split_page(result, column, limit, tie_column)
+
+
+async def paginate_async(
+    query,
+    column: str,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    desc: bool = False,
+    tie_column: str = "id",
+) -> tuple[list[dict], str | None]:
+    """``paginate()`` for queries built on ``AsyncClient``."""
+    result = await _page_query(query, column, limit, cursor, desc, tie_column).execute()
+    return _split_page(result, column, limit, tie_column)
@@ -4,15 +4,249 @@ Provides persistent storage for Railway deployment.
 """
 
 import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor, execute_values
 from urllib.parse import urlparse
 
+from db.aggregation import (
+    Bucket,
+    Unnest,
+    check_bucket_unit,
+    compile_aggregate,
+    from_clause,
+    latest_per_clause,
+    normalize_aggregate_row,
+    parse_aggregate_select,
+)
+from db.column_types import decode_row, json_columns, json_keys
+from db.config_cache import CACHED_TABLES, invalidate, is_cached_table, read_through
+from db.instrumentation import count_rows, query_shape, track_query
+from db.io_stats import estimate_bytes, record_select
+from db.projection import compile_projection, parse_select
+from db.relations import compile_embeds, parse_embeds
+from db.schema_migrations import apply_migrations
+
+logger = logging.getLogger(__name__)
+
+# Pool sizing — overridable per deployment via env
+DEFAULT_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DEFAULT_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DEFAULT_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Idle connections older than this (seconds) are pinged before reuse
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+
+class PoolTimeout(Exception):
+    """No pooled connection became free within the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of psycopg2 connections.
+
+    Keeps at most ``max_size`` connections open (``min_size`` opened eagerly).
+    Callers block while every connection is checked out. Connections idle for
+    longer than ``health_check_interval`` are pinged with ``SELECT 1`` on
+    checkout and transparently replaced if the ping fails.
+    """
+
+    def __init__(
+        self,
+        conn_params: dict,
+        min_size: int = DEFAULT_POOL_MIN_SIZE,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        timeout: float = DEFAULT_POOL_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+        self.conn_params = conn_params
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()  # (conn, idle_since) pairs, LIFO
+        self._size = 0
+        self._closed = False
+
+        # Metrics
+        self._waiters = 0
+        self._max_waiters = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._failed_health_checks = 0
+        self._checkout_time_total = 0.0
+        self._checkout_time_max = 0.0
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.conn_params)
+        self._created += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            self._failed_health_checks += 1
+            return False
+
+    def _discard(self, conn) -> None:
+        self._discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        """Check out a healthy connection, blocking up to ``timeout`` seconds."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot now, connect outside the lock
+                    self._size += 1
+                    conn, idle_since = None, 0.0
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No connection available after {self.timeout:.1f}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._waiters += 1
+                self._max_waiters = max(self._max_waiters, self._waiters)
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, idle_since):
+                logger.info("Replacing unhealthy pooled PostgreSQL connection")
+                self._discard(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._checkout_time_total += elapsed
+            self._checkout_time_max = max(self._checkout_time_max, elapsed)
+        return conn
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Return a connection to the pool, rolling back any open transaction."""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Check a connection out for the duration of a ``with`` block."""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.InterfaceError, psycopg2.OperationalError):
+            # Connection-level failure: don't hand this one out again
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._size -= 1
+                self._discard(conn)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            avg_ms = (
+                self._checkout_time_total / self._checkouts * 1000
+                if self._checkouts else 0.0
+            )
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "waiters": self._waiters,
+                "max_waiters": self._max_waiters,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "failed_health_checks": self._failed_health_checks,
+                "avg_checkout_ms": round(avg_ms, 3),
+                "max_checkout_ms": round(self._checkout_time_max * 1000, 3),
+            }
+
 
 class PostgresClient:
     """PostgreSQL client with Supabase-like API."""
 
-    def __init__(self, database_url: str):
+    def __init__(
+        self,
+        database_url: str,
+        pool_min_size: int = DEFAULT_POOL_MIN_SIZE,
+        pool_max_size: int = DEFAULT_POOL_MAX_SIZE,
+        pool_timeout: float = DEFAULT_POOL_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+    ):
         parsed = urlparse(database_url)
         self.conn_params = {
             'dbname': parsed.path[1:],
@@ -22,18 +256,62 @@ class PostgresClient:
             'port': parsed.port or 5432,
             'cursor_factory': RealDictCursor
         }
+        try:
+            self.pool = ConnectionPool(
+                self.conn_params,
+                min_size=pool_min_size,
+                max_size=pool_max_size,
+                timeout=pool_timeout,
+                health_check_interval=health_check_interval,
+            )
+        except Exception as e:
+            raise Exception(f"PostgreSQL connection failed: {e}")
+        self._table_columns: dict[str, set[str]] = {}
+        self._json_columns: dict[str, frozenset[str]] = {}
         self._test_connection()
 
     def _test_connection(self):
         try:
-            conn = psycopg2.connect(**self.conn_params)
-            conn.close()
+            with self.pool.connection():
+                pass
         except Exception as e:
             raise Exception(f"PostgreSQL connection failed: {e}")
 
     def _get_conn(self):
+        """Open a dedicated, unpooled connection. The caller must close it."""
         return psycopg2.connect(**self.conn_params)
 
+    def connection(self):
+        """Borrow a pooled connection: ``with client.connection() as conn:``."""
+        return self.pool.connection()
+
+    def get_table_columns(self, cursor, table: str, refresh: bool = False) -> set[str]:
+        """Column names of ``table``, cached per client."""
+        if refresh or table not in self._table_columns:
+            cursor.execute(
+                "SELECT column_name, column_default FROM information_schema.columns"
+                " WHERE table_schema = current_schema() AND table_name = %s",
+                (table,),
+            )
+            rows = cursor.fetchall()
+            self._table_columns[table] = {row["column_name"] for row in rows}
+            self._json_columns[table] = json_columns(
+                table, ((row["column_name"], row["column_default"]) for row in rows)
+            )
+        return self._table_columns[table]
+
+    def get_json_columns(self, cursor, table: str) -> frozenset[str]:
+        """JSON-encoded text columns of ``table``, read off the schema with its column names."""
+        if table not in self._json_columns:
+            self.get_table_columns(cursor, table, refresh=True)
+        return self._json_columns[table]
+
+    def pool_stats(self) -> dict:
+        return self.pool.stats()
+
+    def close(self) -> None:
+        self.pool.closeall()
+
     def table(self, table_name: str):
         return QueryBuilder(self, table_name)
 
@@ -56,8 +334,7 @@ class QueryBuilder:
         self._select_cols = "*"
         self._wheres = []
         self._params = []
-        self._order_col = None
-        self._order_desc = False
+        self._orders = []
         self._limit_val = None
         self._offset_val = None
         self._range_start = None
@@ -67,7 +344,11 @@ class QueryBuilder:
         self._insert_data = None
         self._update_data = None
         self._upsert_data = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
         self._delete_flag = False
+        self._buckets = []
+        self._unnest = None
 
     @property
     def not_(self):
@@ -88,6 +369,11 @@ class QueryBuilder:
         self._params.append(value)
         return self
 
+    def gt(self, column: str, value):
+        self._wheres.append(f'"{column}" > %s')
+        self._params.append(value)
+        return self
+
     def gte(self, column: str, value):
         self._wheres.append(f'"{column}" >= %s')
         self._params.append(value)
@@ -116,9 +402,41 @@ class QueryBuilder:
             self._wheres.append(f'"{column}" IS NOT NULL')
         return self
 
+    def after(
+        self,
+        column: str,
+        value,
+        desc: bool = False,
+        tie_column: str | None = None,
+        tie_value=None,
+    ):
+        """Keyset filter: rows past ``value`` in ``column`` order (``tie_column`` breaks ties)."""
+        op = "<" if desc else ">"
+        if tie_column is None:
+            self._wheres.append(f'"{column}" {op} %s')
+            self._params.append(value)
+        else:
+            self._wheres.append(f'("{column}", "{tie_column}") {op} (%s, %s)')
+            self._params.extend([value, tie_value])
+        return self
+
+    def latest_per(self, column: str, order_column: str):
+        """Keep only the newest row per ``column``, ordered by ``order_column``."""
+        self._wheres.append(latest_per_clause(self._table, column, order_column))
+        return self
+
+    def bucket(self, column: str, unit: str, alias: str = "bucket"):
+        """Group an aggregate select by ``column`` truncated to ``unit``."""
+        self._buckets.append(Bucket(column, check_bucket_unit(unit), alias))
+        return self
+
+    def unnest(self, column: str, alias: str):
+        """Expand the JSON array ``column`` into one row per element, as ``alias``."""
+        self._unnest = Unnest(column, alias)
+        return self
+
     def order(self, column: str, desc: bool = False):
-        self._order_col = column
-        self._order_desc = desc
+        self._orders.append((column, desc))
         return self
 
     def limit(self, n: int):
@@ -147,8 +465,10 @@ class QueryBuilder:
         self._update_data = data
         return self
 
-    def upsert(self, data: dict):
+    def upsert(self, data, on_conflict: str | None = None, ignore_duplicates: bool = False):
         self._upsert_data = data
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
         return self
 
     def delete(self):
@@ -156,32 +476,135 @@ class QueryBuilder:
         return self
 
     def execute(self):
-        conn = self.client._get_conn()
-        cursor = conn.cursor()
+        is_write = (
+            self._insert_data is not None
+            or self._update_data is not None
+            or self._upsert_data is not None
+            or self._delete_flag
+        )
+        if not is_write and is_cached_table(self._table):
+            # Checked before borrowing a pooled connection, so hits cost none
+            return read_through(self._table, self._cache_key(), self._params, self._execute)
+        result = self._execute()
+        if is_write and self._table in CACHED_TABLES:
+            invalidate(self._table)
+        return result
+
+    def _execute(self):
+        with track_query(self._table, self._operation(), self._shape()) as event:
+            result = self._dispatch()
+            event.rows = count_rows(result.data)
+            return result
+
+    def _operation(self) -> str:
+        if self._insert_data is not None:
+            return "insert"
+        if self._update_data is not None:
+            return "update"
+        if self._upsert_data is not None:
+            return "upsert"
+        return "delete" if self._delete_flag else "select"
+
+    def _shape(self) -> str:
+        limited = self._limit_val is not None or self._range_start is not None
+        return query_shape(
+            self._operation(), self._table, self._select_cols, self._wheres, self._orders, limited
+        )
 
-        try:
-            if self._insert_data is not None:
-                return self._do_insert(cursor, conn)
-            elif self._update_data is not None:
-                return self._do_update(cursor, conn)
-            elif self._upsert_data is not None:
-                return self._do_upsert(cursor, conn)
-            elif self._delete_flag:
-                return self._do_delete(cursor, conn)
-            else:
-                return self._do_select(cursor)
-        finally:
-            cursor.close()
-            conn.close()
+    def _dispatch(self):
+        with self.client.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if self._insert_data is not None:
+                    return self._do_insert(cursor, conn)
+                elif self._update_data is not None:
+                    return self._do_update(cursor, conn)
+                elif self._upsert_data is not None:
+                    return self._do_upsert(cursor, conn)
+                elif self._delete_flag:
+                    return self._do_delete(cursor, conn)
+                else:
+                    return self._do_select(cursor)
+            finally:
+                cursor.close()
+
+    def _cache_key(self) -> str:
+        return repr((
+            self._select_cols, self._wheres, self._params, self._orders,
+            self._limit_val, self._offset_val, self._range_start, self._range_end,
+            self._is_single, self._count_mode, self._buckets, self._unnest,
+        ))
+
+    def _known_columns(self, cursor, wanted: set) -> set:
+        known = self.client.get_table_columns(cursor, self._table)
+        if self._unnest is not None:
+            wanted = (wanted - {self._unnest.alias}) | {self._unnest.column}
+        if not wanted <= known:
+            # Schema may have changed since we cached it
+            known = self.client.get_table_columns(cursor, self._table, refresh=True)
+        if self._unnest is not None:
+            known = known | {self._unnest.alias}
+        return known
+
+    def _is_aggregate(self) -> bool:
+        return bool(self._buckets) or parse_aggregate_select(self._select_cols) is not None
+
+    def _projection(self, cursor) -> tuple:
+        """Return ``(select_list, group_by)``; ``group_by`` is empty for plain selects."""
+        if self._is_aggregate():
+            aggregates = parse_aggregate_select(self._select_cols) or []
+            wanted = {i.column for i in aggregates if i.column} | {b.column for b in self._buckets}
+            known = self._known_columns(cursor, wanted)
+            return compile_aggregate(aggregates, self._buckets, known, "postgres")
+        parsed = parse_select(self._select_cols)
+        if parsed is None:
+            return "*", ""
+        known = self._known_columns(cursor, {col for col, _ in parsed})
+        return compile_projection(self._select_cols, known, self._table), ""
+
+    def _embeds(self, cursor, aggregate: bool):
+        embeds = parse_embeds(self._table, self._select_cols)
+        if not embeds:
+            return None
+        if aggregate or self._unnest is not None:
+            raise ValueError("Embedded resources can't be combined with aggregates or unnest")
+        return compile_embeds(
+            self._table,
+            embeds,
+            lambda table: self.client.get_table_columns(cursor, table),
+            "postgres",
+        )
+
+    def _decode_embedded(self, cursor, embed, values: dict) -> dict:
+        columns = self.client.get_json_columns(cursor, embed.relation)
+        return decode_row(values, json_keys(list(embed.columns) if embed.columns else None, columns))
 
     def _do_select(self, cursor):
-        sql = f'SELECT * FROM "{self._table}"'
-        where_clause = " AND ".join(self._wheres) if self._wheres else ""
-        if where_clause:
-            sql += f" WHERE {where_clause}"
-        if self._order_col:
-            direction = "DESC" if self._order_desc else "ASC"
-            sql += f' ORDER BY "{self._order_col}" {direction}'
+        aggregate = self._is_aggregate()
+        projection, group_by = self._projection(cursor)
+        embeds = self._embeds(cursor, aggregate)
+        source = from_clause(
+            self._table,
+            self._unnest,
+            self.client.get_table_columns(cursor, self._table),
+            "postgres",
+        )
+        body = f"FROM {source}"
+        wheres = self._wheres
+        if embeds is not None:
+            body += embeds.joins
+            wheres = [embeds.rewrite(w) for w in wheres] + embeds.wheres
+        if wheres:
+            body += f' WHERE {" AND ".join(wheres)}'
+        if group_by:
+            body += f" GROUP BY {group_by}"
+        select_list = projection if embeds is None else embeds.projection(self._table, projection)
+        sql = f"SELECT {select_list} {body}"
+        if self._orders:
+            order_sql = ", ".join(
+                f'"{col}" {"DESC" if desc else "ASC"}' for col, desc in self._orders
+            )
+            sql += " ORDER BY " + (order_sql if embeds is None else embeds.rewrite(order_sql))
         if self._range_start is not None and self._range_end is not None:
             sql += f" LIMIT {self._range_end - self._range_start + 1} OFFSET {self._range_start}"
         elif self._limit_val is not None:
@@ -191,12 +614,33 @@ class QueryBuilder:
 
         cursor.execute(sql, self._params)
         rows = [dict(row) for row in cursor.fetchall()]
+        record_select(
+            self._table, projection, len(rows), sum(estimate_bytes(r.values()) for r in rows)
+        )
+        if aggregate:
+            rows = [normalize_aggregate_row(row) for row in rows]
+        else:
+            keys = json_keys(
+                None if projection == "*" else parse_select(self._select_cols),
+                self.client.get_json_columns(cursor, self._table),
+            )
+            if embeds is None:
+                rows = [decode_row(row, keys) for row in rows]
+            else:
+                decoded = []
+                for row in rows:
+                    base, nested = embeds.nest(row, lambda e, v: self._decode_embedded(cursor, e, v))
+                    row = decode_row(base, keys)
+                    row.update(nested)
+                    decoded.append(row)
+                rows = decoded
 
         count = None
         if self._count_mode == "exact":
-            count_sql = f'SELECT COUNT(*) FROM "{self._table}"'
-            if where_clause:
-                count_sql += f" WHERE {where_clause}"
+            if aggregate:
+                count_sql = f"SELECT COUNT(*) AS count FROM (SELECT {projection} {body}) AS _groups"
+            else:
+                count_sql = f"SELECT COUNT(*) AS count {body}"
             cursor.execute(count_sql, self._params)
             count = cursor.fetchone()["count"]
 
@@ -206,19 +650,27 @@ class QueryBuilder:
 
     def _do_insert(self, cursor, conn):
         items = self._insert_data if isinstance(self._insert_data, list) else [self._insert_data]
-        results = []
-        for item in items:
-            item = _serialize_json_fields(item)
-            cols = list(item.keys())
-            vals = list(item.values())
-            placeholders = ", ".join(["%s"] * len(cols))
-            col_names = ", ".join(f'"{c}"' for c in cols)
-            sql = f'INSERT INTO "{self._table}" ({col_names}) VALUES ({placeholders}) RETURNING *'
-            cursor.execute(sql, vals)
+        rows = [_serialize_json_fields(item) for item in items]
+        # One statement per key set; put the returned rows back in input
+        # order so callers can zip them with what they inserted
+        positions: dict = {}
+        for index, row in enumerate(rows):
+            positions.setdefault(tuple(row.keys()), []).append(index)
+        results: list = [None] * len(rows)
+        try:
+            for cols, group in _group_by_columns(rows):
+                col_names = ", ".join(f'"{c}"' for c in cols)
+                sql = f'INSERT INTO "{self._table}" ({col_names}) VALUES %s RETURNING *'
+                returned = execute_values(
+                    cursor, sql, [[row[c] for c in cols] for row in group],
+                    page_size=max(len(group), 1), fetch=True,
+                )
+                for index, r in zip(positions[tuple(cols)], returned):
+                    results[index] = dict(r)
             conn.commit()
-            row = cursor.fetchone()
-            if row:
-                results.append(dict(row))
+        except Exception:
+            conn.rollback()
+            raise
         return Result(data=results)
 
     def _do_update(self, cursor, conn):
@@ -236,22 +688,50 @@ class QueryBuilder:
         return Result(data=[dict(r) for r in rows] if rows else [data])
 
     def _do_upsert(self, cursor, conn):
-        data = _serialize_json_fields(self._upsert_data)
-        cols = list(data.keys())
-        vals = list(data.values())
-        placeholders = ", ".join(["%s"] * len(cols))
-        col_names = ", ".join(f'"{c}"' for c in cols)
-        update_parts = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in cols if c != "id")
-        conflict_col = "key" if self._table == "system_config" else "id"
-        sql = (
-            f'INSERT INTO "{self._table}" ({col_names}) VALUES ({placeholders})'
-            f' ON CONFLICT ("{conflict_col}") DO UPDATE SET {update_parts}'
-            f' RETURNING *'
-        )
-        cursor.execute(sql, vals)
-        conn.commit()
-        row = cursor.fetchone()
-        return Result(data=[dict(row)] if row else [data])
+        items = self._upsert_data if isinstance(self._upsert_data, list) else [self._upsert_data]
+        conflict_cols = _conflict_columns(self._table, self._on_conflict)
+        # Postgres rejects one statement touching the same conflict key twice,
+        # so keep only the last row per key (same end state as sequential upserts)
+        deduped: dict = {}
+        for index, item in enumerate(items):
+            row = _serialize_json_fields(item)
+            key = tuple(row.get(c) for c in conflict_cols)
+            if None in key:
+                key = ("__row__", index)
+            deduped.pop(key, None)
+            deduped[key] = row
+        rows = list(deduped.values())
+
+        conflict_target = ", ".join(f'"{c}"' for c in conflict_cols)
+        results = []
+        try:
+            for cols, group in _group_by_columns(rows):
+                col_names = ", ".join(f'"{c}"' for c in cols)
+                update_parts = ", ".join(
+                    f'"{c}" = EXCLUDED."{c}"' for c in cols if c != "id" and c not in conflict_cols
+                )
+                if self._ignore_duplicates or not update_parts:
+                    action = "DO NOTHING"
+                else:
+                    action = f"DO UPDATE SET {update_parts}"
+                sql = (
+                    f'INSERT INTO "{self._table}" ({col_names}) VALUES %s'
+                    f' ON CONFLICT ({conflict_target}) {action}'
+                    f' RETURNING *'
+                )
+                returned = execute_values(
+                    cursor, sql, [[row[c] for c in cols] for row in group],
+                    page_size=max(len(group), 1), fetch=True,
+                )
+                results.extend(dict(r) for r in returned)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if self._ignore_duplicates:
+            # RETURNING yields only the rows inserted; skipped duplicates aren't stored
+            return Result(data=results)
+        return Result(data=results or rows)
 
     def _do_delete(self, cursor, conn):
         sql = f'DELETE FROM "{self._table}"'
@@ -269,6 +749,23 @@ class Result:
         self.count = count
 
 
+# Conflict targets used when upsert() is called without on_conflict
+DEFAULT_CONFLICT_TARGETS = {"system_config": "key"}
+
+
+def _conflict_columns(table: str, on_conflict: str | None) -> list:
+    target = on_conflict or DEFAULT_CONFLICT_TARGETS.get(table, "id")
+    return [c.strip().strip('"') for c in target.split(",") if c.strip()]
+
+
+def _group_by_columns(rows: list) -> list:
+    """Group rows sharing the same key set so each group is one statement."""
+    groups: dict = {}
+    for row in rows:
+        groups.setdefault(tuple(row.keys()), []).append(row)
+    return [(list(cols), group) for cols, group in groups.items()]
+
+
 def _serialize_json_fields(data: dict) -> dict:
     out = {}
     for k, v in data.items():
@@ -279,10 +776,15 @@ def _serialize_json_fields(data: dict) -> dict:
     return out
 
 
-def init_postgres_db(database_url: str):
+def init_postgres_db(database_url: str, client: PostgresClient | None = None):
     """Initialize PostgreSQL database with all required tables."""
-    client = PostgresClient(database_url)
-    conn = client._get_conn()
+    client = client or PostgresClient(database_url, pool_min_size=0, pool_max_size=1)
+    with client.connection() as conn:
+        _create_tables(conn)
+    invalidate()
+
+
+def _create_tables(conn):
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -502,4 +1004,6 @@ def init_postgres_db(database_url: str):
 
     conn.commit()
     cursor.close()
-    conn.close()
+
+    # Indexes and constraints are versioned separately from the base tables
+    apply_migrations(conn, placeholder="%s")
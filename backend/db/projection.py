@@ -0,0 +1,93 @@
+"""Compile Supabase/PostgREST-style select strings into SQL column lists.
+
+Shared by the SQLite and PostgreSQL query builders so ``.select("id")`` or
+``.select('"likes", replies')`` only reads the requested columns instead of
+``SELECT *``.
+"""
+
+from __future__ import annotations
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def split_top_level(text: str, sep: str = ",") -> list[str]:
+    """Split on ``sep`` while ignoring separators nested in parentheses or quotes."""
+    parts: list[str] = []
+    depth = 0
+    in_quotes = False
+    current: list[str] = []
+    for ch in text:
+        if ch == '"':
+            in_quotes = not in_quotes
+        elif not in_quotes and ch == "(":
+            depth += 1
+        elif not in_quotes and ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0 and not in_quotes:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(name: str) -> str:
+    name = name.strip()
+    if len(name) >= 2 and name[0] == '"' and name[-1] == '"':
+        return name[1:-1].replace('""', '"')
+    return name
+
+
+def parse_select(columns: str | None) -> list[tuple[str, str | None]] | None:
+    """Parse a select string into ``(column, alias)`` pairs.
+
+    Returns ``None`` when every column is wanted (``*``). Supports quoted
+    identifiers, ``alias:column`` renames and ``column::type`` casts (the
+    cast is dropped). Embedded resources such as ``rel(col)`` are skipped.
+    """
+    if not columns or not columns.strip():
+        return None
+    parsed: list[tuple[str, str | None]] = []
+    for token in split_top_level(columns):
+        if token == "*":
+            return None
+        if "(" in token:
+            # Embedded resource — not a column of this table
+            continue
+        alias = None
+        if ":" in token.replace("::", ""):
+            alias_part, _, token = token.partition(":")
+            alias = _unquote(alias_part)
+        column = _unquote(token.split("::", 1)[0])
+        if column:
+            parsed.append((column, alias))
+    return parsed or None
+
+
+def compile_projection(
+    columns: str | None,
+    known_columns: set[str] | None = None,
+    table: str | None = None,
+) -> str:
+    """Return the SQL select list for ``columns``.
+
+    Columns that don't exist on the table (per ``known_columns``) are dropped
+    rather than failing the whole query, matching how the builders behaved
+    when they always issued ``SELECT *``.
+    """
+    parsed = parse_select(columns)
+    if parsed is None:
+        return "*"
+    parts: list[str] = []
+    for column, alias in parsed:
+        if known_columns is not None and column not in known_columns:
+            logger.debug("Ignoring unknown column %r on %s", column, table)
+            continue
+        quoted = '"' + column.replace('"', '""') + '"'
+        if alias and alias != column:
+            quoted += ' AS "' + alias.replace('"', '""') + '"'
+        parts.append(quoted)
+    return ", ".join(parts) if parts else "*"
@@ -0,0 +1,201 @@
+"""Compile PostgREST embedded resources into joins for both query builders.
+
+``.select("*, discovered_videos!inner(platform, video_url)")`` on
+``review_queue`` returns each queue row with its video nested under
+``"discovered_videos"``, fetched in the same query instead of one lookup
+per row:
+
+* many-to-one embeds (the row points at its parent) become a ``LEFT JOIN``
+  (``INNER JOIN`` with ``!inner``) and come back as a dict, or ``None``
+  when there is no parent;
+* one-to-many embeds (children pointing at the row) become a correlated
+  JSON-array subquery and come back as a list; ``!inner`` keeps only rows
+  with at least one child.
+
+Filters and orders can name embedded columns as ``"relation.column"``
+(``.eq("discovered_videos.platform", "x")``). They are applied in SQL and,
+unlike PostgREST, always filter the parent rows, as if the embed were
+``!inner``.
+
+Relationships are declared in ``RELATIONS`` rather than read from foreign
+keys, since some links (``review_queue.video_id``) have no constraint.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from db.aggregation import AGGREGATE_FUNCTIONS
+from db.projection import _unquote, parse_select, split_top_level
+
+# (table, parent table) -> (column on table, key column on parent)
+RELATIONS: dict[tuple[str, str], tuple[str, str]] = {
+    ("review_queue", "discovered_videos"): ("video_id", "id"),
+    ("engagements", "discovered_videos"): ("video_id", "id"),
+    ("engagements", "generated_comments"): ("comment_id", "id"),
+    ("generated_comments", "discovered_videos"): ("video_id", "id"),
+    ("risk_scores", "generated_comments"): ("comment_id", "id"),
+    ("engagement_metrics", "engagements"): ("engagement_id", "id"),
+    ("saved_comments", "engagements"): ("engagement_id", "id"),
+    ("neoclaw_heartbeats", "neoclaw_tasks"): ("current_task_id", "id"),
+}
+
+_EMBED_RE = re.compile(
+    r"^(?:(?P<alias>\w+):)?(?P<relation>\w+)(?:!(?P<hint>\w+))?\((?P<columns>.*)\)$", re.S
+)
+
+
+@dataclass(frozen=True)
+class Embed:
+    relation: str
+    alias: str
+    columns: tuple[tuple[str, str | None], ...] | None  # None means every column
+    inner: bool
+    local_column: str
+    remote_column: str
+    to_many: bool
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def parse_embeds(table: str, columns: str | None) -> list[Embed]:
+    """Embedded resources in a select string; raises ``ValueError`` for unknown relations."""
+    if not columns or "(" not in columns:
+        return []
+    embeds = []
+    for token in split_top_level(columns):
+        match = _EMBED_RE.match(token)
+        if not match or match["relation"] in AGGREGATE_FUNCTIONS:
+            continue
+        relation = match["relation"]
+        inner_cols = match["columns"]
+        if any("(" in part for part in split_top_level(inner_cols)):
+            raise ValueError(f"Nested embedded resources are not supported: {token}")
+        if (table, relation) in RELATIONS:
+            local, remote = RELATIONS[(table, relation)]
+            to_many = False
+        elif (relation, table) in RELATIONS:
+            remote, local = RELATIONS[(relation, table)]
+            to_many = True
+        else:
+            raise ValueError(f"No relationship between {table} and {relation}")
+        parsed = parse_select(inner_cols)
+        embeds.append(Embed(
+            relation=relation,
+            alias=_unquote(match["alias"] or relation),
+            columns=tuple(parsed) if parsed is not None else None,
+            inner=match["hint"] == "inner",
+            local_column=local,
+            remote_column=remote,
+            to_many=to_many,
+        ))
+    return embeds
+
+
+@dataclass
+class CompiledEmbeds:
+    """SQL fragments for a select's embeds plus the row post-processing."""
+
+    select_list: list[str]
+    joins: str
+    wheres: list[str]
+    # (embed, {result key: prefixed SQL column}, marker column or None)
+    layouts: list[tuple[Embed, dict[str, str], str | None]]
+    renames: dict[str, str]
+
+    def projection(self, table: str, base: str) -> str:
+        """Select list for the base table's ``base`` projection plus the embeds."""
+        if base == "*":
+            base = f"{_quote(table)}.*"
+        return ", ".join([base, *self.select_list])
+
+    def rewrite(self, sql: str) -> str:
+        """Point ``"relation.column"`` references at the joined columns."""
+        for ref, target in self.renames.items():
+            sql = sql.replace(ref, target)
+        return sql
+
+    def nest(self, row: dict, decode: Callable[[Embed, dict], dict]) -> tuple[dict, dict[str, Any]]:
+        """Split the flat joined row into ``(base_row, {alias: embedded value})``.
+
+        ``decode(embed, values)`` decodes the JSON columns of one embedded row.
+        """
+        nested: dict[str, Any] = {}
+        for embed, keys, marker in self.layouts:
+            if embed.to_many:
+                children = row.pop(keys[embed.alias])
+                if isinstance(children, str):
+                    children = json.loads(children)
+                nested[embed.alias] = [decode(embed, c) for c in children or []]
+                continue
+            values = {key: row.pop(col) for key, col in keys.items()}
+            present = row.pop(marker) is not None
+            nested[embed.alias] = decode(embed, values) if present else None
+        return row, nested
+
+
+def compile_embeds(
+    table: str,
+    embeds: list[Embed],
+    known_columns: Callable[[str], set[str]],
+    dialect: str,
+) -> CompiledEmbeds:
+    """Compile ``embeds`` of ``table``. ``known_columns(t)`` lists a table's columns."""
+    qtable = _quote(table)
+    select_list: list[str] = []
+    joins: list[str] = []
+    wheres: list[str] = []
+    layouts = []
+    renames: dict[str, str] = {}
+    for i, embed in enumerate(embeds):
+        join_alias = f"_e{i}"
+        target = _quote(embed.relation)
+        available = known_columns(embed.relation)
+        if embed.columns is None:
+            wanted = [(c, c) for c in sorted(available)]
+        else:
+            wanted = [(c, alias or c) for c, alias in embed.columns if c in available]
+
+        if embed.to_many:
+            child = f"{target} AS {_quote(join_alias)}"
+            link = f'{_quote(join_alias)}.{_quote(embed.remote_column)} = {qtable}.{_quote(embed.local_column)}'
+            pairs = ", ".join(
+                "'" + key.replace("'", "''") + f"', {_quote(join_alias)}.{_quote(col)}" for col, key in wanted
+            )
+            if dialect == "postgres":
+                array = f"COALESCE((SELECT json_agg(json_build_object({pairs})) FROM {child} WHERE {link}), '[]'::json)"
+            else:
+                array = f"(SELECT json_group_array(json_object({pairs})) FROM {child} WHERE {link})"
+            column = f"{join_alias}__rows"
+            select_list.append(f"{array} AS {_quote(column)}")
+            if embed.inner:
+                wheres.append(f"EXISTS (SELECT 1 FROM {child} WHERE {link})")
+            layouts.append((embed, {embed.alias: column}, None))
+            continue
+
+        # Expose the parent's columns under prefixed names so unqualified
+        # filters on the base table stay unambiguous
+        prefixed = {c: f"{join_alias}__{c}" for c in available}
+        inner = ", ".join(f"{_quote(c)} AS {_quote(p)}" for c, p in sorted(prefixed.items()))
+        kind = "INNER JOIN" if embed.inner else "LEFT JOIN"
+        key = prefixed.get(embed.remote_column, f"{join_alias}__{embed.remote_column}")
+        joins.append(
+            f" {kind} (SELECT {inner} FROM {target}) AS {_quote(join_alias)}"
+            f" ON {_quote(join_alias)}.{_quote(key)} = {qtable}.{_quote(embed.local_column)}"
+        )
+        marker = f"{join_alias}__key"
+        select_list.append(f"{_quote(join_alias)}.{_quote(key)} AS {_quote(marker)}")
+        keys = {}
+        for col, result_key in wanted:
+            out = f"{join_alias}__out__{result_key}"
+            select_list.append(f"{_quote(join_alias)}.{_quote(prefixed[col])} AS {_quote(out)}")
+            keys[result_key] = out
+        layouts.append((embed, keys, marker))
+        for col, p in prefixed.items():
+            renames[_quote(f"{embed.alias}.{col}")] = f"{_quote(join_alias)}.{_quote(p)}"
+    return CompiledEmbeds(select_list, "".join(joins), wheres, layouts, renames)
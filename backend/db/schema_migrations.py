@@ -0,0 +1,199 @@
+"""Versioned schema migrations shared by the SQLite and PostgreSQL adapters.
+
+``init_sqlite_db()`` and ``init_postgres_db()`` create the base tables, then
+call ``apply_migrations()``, which runs every migration newer than the
+version recorded in ``schema_migrations``. Statements are written in the
+SQL subset both engines understand.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: tuple[str, ...]
+    # Runs with the migration's cursor before its statements (e.g. to log
+    # the rows a data fix is about to change)
+    prepare: Callable[[Any], None] | None = None
+
+
+# Keep duplicate discovered_videos rows from blocking the unique index:
+# re-point children at the oldest row per URL, then drop the rest.
+_DUPLICATE_VIDEO_IDS = """
+    SELECT d.id FROM discovered_videos d
+    WHERE d.video_url IS NOT NULL
+      AND d.id > (SELECT MIN(k.id) FROM discovered_videos k WHERE k.video_url = d.video_url)
+"""
+
+
+def _repoint_video_children(table: str) -> str:
+    return f"""
+        UPDATE {table} SET video_id = (
+            SELECT MIN(keep.id) FROM discovered_videos dup
+            JOIN discovered_videos keep ON keep.video_url = dup.video_url
+            WHERE dup.id = {table}.video_id
+        )
+        WHERE video_id IN ({_DUPLICATE_VIDEO_IDS})
+    """
+
+
+_VIDEO_CHILD_TABLES = ("generated_comments", "engagements", "review_queue")
+
+
+def _log_duplicate_videos(cursor) -> None:
+    """Log, before migration 002 changes them, the duplicate rows it drops and re-points."""
+    cursor.execute(f"""
+        SELECT d.id AS id, (
+            SELECT MIN(k.id) FROM discovered_videos k WHERE k.video_url = d.video_url
+        ) AS keep_id
+        FROM discovered_videos d WHERE d.id IN ({_DUPLICATE_VIDEO_IDS})
+        ORDER BY d.id
+    """)
+    dropped: dict[int, list[int]] = {}
+    for row in cursor.fetchall():
+        dropped.setdefault(row["keep_id"], []).append(row["id"])
+    if not dropped:
+        return
+    children = {}
+    for table in _VIDEO_CHILD_TABLES:
+        cursor.execute(
+            f"SELECT COUNT(*) AS count FROM {table} WHERE video_id IN ({_DUPLICATE_VIDEO_IDS})"
+        )
+        children[table] = cursor.fetchone()["count"]
+    logger.warning(
+        "Schema migration 002: deleting %d duplicate discovered_videos rows"
+        " (kept id: dropped ids %s); re-pointing child rows at the kept ids %s",
+        sum(len(ids) for ids in dropped.values()), dropped, children,
+    )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(
+        version=1,
+        name="hot_filter_indexes",
+        statements=(
+            "CREATE INDEX IF NOT EXISTS idx_engagement_metrics_engagement_checked"
+            " ON engagement_metrics (engagement_id, checked_at)",
+            "CREATE INDEX IF NOT EXISTS idx_discovered_videos_platform"
+            " ON discovered_videos (platform)",
+            "CREATE INDEX IF NOT EXISTS idx_discovered_videos_status"
+            " ON discovered_videos (status)",
+            "CREATE INDEX IF NOT EXISTS idx_engagements_platform"
+            " ON engagements (platform)",
+            "CREATE INDEX IF NOT EXISTS idx_engagements_posted_at"
+            " ON engagements (posted_at)",
+            "CREATE INDEX IF NOT EXISTS idx_review_queue_decision"
+            " ON review_queue (decision)",
+            "CREATE INDEX IF NOT EXISTS idx_neoclaw_tasks_status_priority_created"
+            " ON neoclaw_tasks (status, priority, created_at)",
+            "CREATE INDEX IF NOT EXISTS idx_comment_feedback_decision_decided"
+            " ON comment_feedback (decision, decided_at)",
+            "CREATE INDEX IF NOT EXISTS idx_comment_feedback_decided_at"
+            " ON comment_feedback (decided_at)",
+            "CREATE INDEX IF NOT EXISTS idx_risk_scores_scored_at"
+            " ON risk_scores (scored_at)",
+        ),
+    ),
+    Migration(
+        version=2,
+        name="unique_discovered_video_url",
+        statements=(
+            *(_repoint_video_children(table) for table in _VIDEO_CHILD_TABLES),
+            f"DELETE FROM discovered_videos WHERE id IN ({_DUPLICATE_VIDEO_IDS})",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_discovered_videos_video_url"
+            " ON discovered_videos (video_url)",
+        ),
+        prepare=_log_duplicate_videos,
+    ),
+    Migration(
+        version=3,
+        name="aggregate_covering_indexes",
+        statements=(
+            # Dashboard chart buckets and risk analytics read only these
+            # columns; the wider indexes replace the single-column ones
+            "CREATE INDEX IF NOT EXISTS idx_engagements_posted_at_platform"
+            " ON engagements (posted_at, platform)",
+            "DROP INDEX IF EXISTS idx_engagements_posted_at",
+            "CREATE INDEX IF NOT EXISTS idx_risk_scores_scored_routing_total"
+            " ON risk_scores (scored_at, routing_decision, total_score)",
+            "DROP INDEX IF EXISTS idx_risk_scores_scored_at",
+        ),
+    ),
+    Migration(
+        version=4,
+        name="keyset_pagination_indexes",
+        statements=(
+            # (sort column, id) matches paginate()'s ORDER BY and after() filter
+            "CREATE INDEX IF NOT EXISTS idx_review_queue_decided_at_id"
+            " ON review_queue (decided_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_review_posts_created_at_id"
+            " ON review_posts (created_at, id)",
+            "CREATE INDEX IF NOT EXISTS idx_review_posts_status_created_at_id"
+            " ON review_posts (status, created_at, id)",
+        ),
+    ),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+_CREATE_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL
+    )
+"""
+
+
+def get_schema_version(conn) -> int:
+    """Highest applied migration version (0 if none)."""
+    cursor = conn.cursor()
+    cursor.execute(_CREATE_VERSION_TABLE)
+    cursor.execute("SELECT MAX(version) AS version FROM schema_migrations")
+    row = cursor.fetchone()
+    cursor.close()
+    return (row["version"] if row else None) or 0
+
+
+def apply_migrations(conn, placeholder: str = "?") -> list[int]:
+    """Apply pending migrations in order; returns the versions applied.
+
+    ``conn`` is a sqlite3 or psycopg2 connection whose rows support key
+    access; ``placeholder`` is the driver's parameter marker.
+    """
+    current = get_schema_version(conn)
+    conn.commit()
+    applied: list[int] = []
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        cursor = conn.cursor()
+        try:
+            if migration.prepare is not None:
+                migration.prepare(cursor)
+            for statement in migration.statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at)"
+                f" VALUES ({placeholder}, {placeholder}, {placeholder})",
+                (migration.version, migration.name, datetime.now(timezone.utc).isoformat()),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("Schema migration %03d_%s failed", migration.version, migration.name)
+            raise
+        finally:
+            cursor.close()
+        logger.info("Applied schema migration %03d_%s", migration.version, migration.name)
+        applied.append(migration.version)
+    return applied
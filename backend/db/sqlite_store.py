@@ -14,6 +14,23 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+from db.aggregation import (
+    Bucket,
+    Unnest,
+    check_bucket_unit,
+    compile_aggregate,
+    from_clause,
+    latest_per_clause,
+    parse_aggregate_select,
+)
+from db.column_types import decode_row, json_columns, json_keys
+from db.config_cache import CACHED_TABLES, invalidate, is_cached_table, read_through
+from db.instrumentation import count_rows, query_shape, track_query
+from db.io_stats import estimate_bytes, record_select
+from db.projection import compile_projection, parse_select
+from db.relations import CompiledEmbeds, Embed, compile_embeds, parse_embeds
+from db.schema_migrations import apply_migrations
+
 DB_PATH = Path(__file__).resolve().parent / "local.db"
 
 _local = threading.local()
@@ -28,6 +45,26 @@ def _get_conn() -> sqlite3.Connection:
     return _local.conn
 
 
+_table_columns: dict[str, set[str]] = {}
+_json_columns: dict[str, frozenset[str]] = {}
+
+
+def _get_table_columns(conn: sqlite3.Connection, table: str, refresh: bool = False) -> set[str]:
+    """Column names of ``table``, cached per process."""
+    if refresh or table not in _table_columns:
+        rows = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        _table_columns[table] = {r[1] for r in rows}
+        _json_columns[table] = json_columns(table, ((r[1], r[4]) for r in rows))
+    return _table_columns[table]
+
+
+def _get_json_columns(conn: sqlite3.Connection, table: str) -> frozenset[str]:
+    """JSON-encoded columns of ``table``, read off the schema with its column names."""
+    if table not in _json_columns:
+        _get_table_columns(conn, table, refresh=True)
+    return _json_columns[table]
+
+
 @dataclass
 class _Result:
     data: list[dict] | None = None
@@ -49,8 +86,7 @@ class _QueryBuilder:
     _columns: str = "*"
     _wheres: list[str] = field(default_factory=list)
     _params: list[Any] = field(default_factory=list)
-    _order_col: str | None = None
-    _order_desc: bool = False
+    _orders: list[tuple[str, bool]] = field(default_factory=list)
     _limit_val: int | None = None
     _offset_val: int | None = None
     _range_start: int | None = None
@@ -59,8 +95,12 @@ class _QueryBuilder:
     _count_mode: str | None = None
     _insert_data: dict | list | None = None
     _update_data: dict | None = None
-    _upsert_data: dict | None = None
+    _upsert_data: dict | list | None = None
+    _on_conflict: str | None = None
+    _ignore_duplicates: bool = False
     _delete: bool = False
+    _buckets: list[Bucket] = field(default_factory=list)
+    _unnest: Unnest | None = None
 
     @property
     def not_(self) -> _NotFilter:
@@ -81,6 +121,11 @@ class _QueryBuilder:
         self._params.append(value)
         return self
 
+    def gt(self, column: str, value: Any) -> _QueryBuilder:
+        self._wheres.append(f'"{column}" > ?')
+        self._params.append(value)
+        return self
+
     def gte(self, column: str, value: Any) -> _QueryBuilder:
         self._wheres.append(f'"{column}" >= ?')
         self._params.append(value)
@@ -109,9 +154,41 @@ class _QueryBuilder:
             self._wheres.append(f'"{column}" IS NOT NULL')
         return self
 
+    def after(
+        self,
+        column: str,
+        value: Any,
+        desc: bool = False,
+        tie_column: str | None = None,
+        tie_value: Any = None,
+    ) -> _QueryBuilder:
+        """Keyset filter: rows past ``value`` in ``column`` order (``tie_column`` breaks ties)."""
+        op = "<" if desc else ">"
+        if tie_column is None:
+            self._wheres.append(f'"{column}" {op} ?')
+            self._params.append(value)
+        else:
+            self._wheres.append(f'("{column}", "{tie_column}") {op} (?, ?)')
+            self._params.extend([value, tie_value])
+        return self
+
+    def latest_per(self, column: str, order_column: str) -> _QueryBuilder:
+        """Keep only the newest row per ``column``, ordered by ``order_column``."""
+        self._wheres.append(latest_per_clause(self._table, column, order_column))
+        return self
+
+    def bucket(self, column: str, unit: str, alias: str = "bucket") -> _QueryBuilder:
+        """Group an aggregate select by ``column`` truncated to ``unit``."""
+        self._buckets.append(Bucket(column, check_bucket_unit(unit), alias))
+        return self
+
+    def unnest(self, column: str, alias: str) -> _QueryBuilder:
+        """Expand the JSON array ``column`` into one row per element, as ``alias``."""
+        self._unnest = Unnest(column, alias)
+        return self
+
     def order(self, column: str, desc: bool = False) -> _QueryBuilder:
-        self._order_col = column
-        self._order_desc = desc
+        self._orders.append((column, desc))
         return self
 
     def limit(self, n: int) -> _QueryBuilder:
@@ -140,8 +217,15 @@ class _QueryBuilder:
         self._update_data = data
         return self
 
-    def upsert(self, data: dict) -> _QueryBuilder:
+    def upsert(
+        self,
+        data: dict | list,
+        on_conflict: str | None = None,
+        ignore_duplicates: bool = False,
+    ) -> _QueryBuilder:
         self._upsert_data = data
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
         return self
 
     def delete(self) -> _QueryBuilder:
@@ -149,6 +233,41 @@ class _QueryBuilder:
         return self
 
     def execute(self) -> _Result:
+        is_write = (
+            self._insert_data is not None
+            or self._update_data is not None
+            or self._upsert_data is not None
+            or self._delete
+        )
+        if not is_write and is_cached_table(self._table):
+            return read_through(self._table, self._cache_key(), self._params, self._execute)
+        result = self._execute()
+        if is_write and self._table in CACHED_TABLES:
+            invalidate(self._table)
+        return result
+
+    def _execute(self) -> _Result:
+        with track_query(self._table, self._operation(), self._shape()) as event:
+            result = self._dispatch()
+            event.rows = count_rows(result.data)
+            return result
+
+    def _operation(self) -> str:
+        if self._insert_data is not None:
+            return "insert"
+        if self._update_data is not None:
+            return "update"
+        if self._upsert_data is not None:
+            return "upsert"
+        return "delete" if self._delete else "select"
+
+    def _shape(self) -> str:
+        limited = self._limit_val is not None or self._range_start is not None
+        return query_shape(
+            self._operation(), self._table, self._columns, self._wheres, self._orders, limited
+        )
+
+    def _dispatch(self) -> _Result:
         conn = _get_conn()
 
         if self._insert_data is not None:
@@ -161,14 +280,83 @@ class _QueryBuilder:
             return self._do_delete(conn)
         return self._do_select(conn)
 
+    def _cache_key(self) -> str:
+        return repr((
+            self._columns, self._wheres, self._params, self._orders,
+            self._limit_val, self._offset_val, self._range_start, self._range_end,
+            self._is_single, self._count_mode, self._buckets, self._unnest,
+        ))
+
+    def _known_columns(self, conn: sqlite3.Connection, wanted: set[str]) -> set[str]:
+        known = _get_table_columns(conn, self._table)
+        if self._unnest is not None:
+            wanted = (wanted - {self._unnest.alias}) | {self._unnest.column}
+        if not wanted <= known:
+            # Schema may have changed since we cached it
+            known = _get_table_columns(conn, self._table, refresh=True)
+        if self._unnest is not None:
+            known = known | {self._unnest.alias}
+        return known
+
+    def _is_aggregate(self) -> bool:
+        return bool(self._buckets) or parse_aggregate_select(self._columns) is not None
+
+    def _projection(self, conn: sqlite3.Connection) -> tuple[str, str]:
+        """Return ``(select_list, group_by)``; ``group_by`` is empty for plain selects."""
+        if self._is_aggregate():
+            aggregates = parse_aggregate_select(self._columns) or []
+            wanted = {i.column for i in aggregates if i.column} | {b.column for b in self._buckets}
+            known = self._known_columns(conn, wanted)
+            return compile_aggregate(aggregates, self._buckets, known, "sqlite")
+        parsed = parse_select(self._columns)
+        if parsed is None:
+            return "*", ""
+        known = self._known_columns(conn, {col for col, _ in parsed})
+        return compile_projection(self._columns, known, self._table), ""
+
+    def _json_keys(self, conn: sqlite3.Connection, projection: str, aggregate: bool) -> frozenset[str]:
+        if aggregate:
+            return frozenset()
+        columns = _get_json_columns(conn, self._table)
+        return json_keys(None if projection == "*" else parse_select(self._columns), columns)
+
+    def _embeds(self, conn: sqlite3.Connection, aggregate: bool) -> CompiledEmbeds | None:
+        embeds = parse_embeds(self._table, self._columns)
+        if not embeds:
+            return None
+        if aggregate or self._unnest is not None:
+            raise ValueError("Embedded resources can't be combined with aggregates or unnest")
+        return compile_embeds(
+            self._table, embeds, lambda table: _get_table_columns(conn, table), "sqlite"
+        )
+
+    def _decode_embedded(self, conn: sqlite3.Connection, embed: Embed, values: dict) -> dict:
+        columns = _get_json_columns(conn, embed.relation)
+        return decode_row(values, json_keys(list(embed.columns) if embed.columns else None, columns))
+
     def _do_select(self, conn: sqlite3.Connection) -> _Result:
-        sql = f'SELECT * FROM "{self._table}"'
-        where_clause = " AND ".join(self._wheres) if self._wheres else ""
-        if where_clause:
-            sql += f" WHERE {where_clause}"
-        if self._order_col:
-            direction = "DESC" if self._order_desc else "ASC"
-            sql += f' ORDER BY "{self._order_col}" {direction}'
+        aggregate = self._is_aggregate()
+        projection, group_by = self._projection(conn)
+        embeds = self._embeds(conn, aggregate)
+        source = from_clause(
+            self._table, self._unnest, _get_table_columns(conn, self._table), "sqlite"
+        )
+        body = f"FROM {source}"
+        wheres = self._wheres
+        if embeds is not None:
+            body += embeds.joins
+            wheres = [embeds.rewrite(w) for w in wheres] + embeds.wheres
+        if wheres:
+            body += f' WHERE {" AND ".join(wheres)}'
+        if group_by:
+            body += f" GROUP BY {group_by}"
+        select_list = projection if embeds is None else embeds.projection(self._table, projection)
+        sql = f"SELECT {select_list} {body}"
+        if self._orders:
+            order_sql = ", ".join(
+                f'"{col}" {"DESC" if desc else "ASC"}' for col, desc in self._orders
+            )
+            sql += " ORDER BY " + (order_sql if embeds is None else embeds.rewrite(order_sql))
         if self._range_start is not None and self._range_end is not None:
             sql += f" LIMIT {self._range_end - self._range_start + 1} OFFSET {self._range_start}"
         elif self._limit_val is not None:
@@ -177,13 +365,27 @@ class _QueryBuilder:
                 sql += f" OFFSET {self._offset_val}"
 
         cursor = conn.execute(sql, self._params)
-        rows = [_row_to_dict(r) for r in cursor.fetchall()]
+        raw_rows = cursor.fetchall()
+        record_select(
+            self._table, projection, len(raw_rows), sum(estimate_bytes(r) for r in raw_rows)
+        )
+        keys = self._json_keys(conn, projection, aggregate)
+        if embeds is None:
+            rows = [decode_row(dict(r), keys) for r in raw_rows]
+        else:
+            rows = []
+            for r in raw_rows:
+                base, nested = embeds.nest(dict(r), lambda e, v: self._decode_embedded(conn, e, v))
+                row = decode_row(base, keys)
+                row.update(nested)
+                rows.append(row)
 
         count = None
         if self._count_mode == "exact":
-            count_sql = f'SELECT COUNT(*) FROM "{self._table}"'
-            if where_clause:
-                count_sql += f" WHERE {where_clause}"
+            if aggregate:
+                count_sql = f"SELECT COUNT(*) FROM (SELECT {projection} {body})"
+            else:
+                count_sql = f"SELECT COUNT(*) {body}"
             count = conn.execute(count_sql, self._params).fetchone()[0]
 
         if self._is_single:
@@ -192,18 +394,28 @@ class _QueryBuilder:
 
     def _do_insert(self, conn: sqlite3.Connection) -> _Result:
         items = self._insert_data if isinstance(self._insert_data, list) else [self._insert_data]
-        results = []
-        for item in items:
-            item = _serialize_json_fields(item)
-            cols = list(item.keys())
-            vals = list(item.values())
-            placeholders = ",".join("?" for _ in cols)
-            col_names = ",".join(f'"{c}"' for c in cols)
-            sql = f'INSERT INTO "{self._table}" ({col_names}) VALUES ({placeholders})'
-            cursor = conn.execute(sql, vals)
+        results = [_serialize_json_fields(item) for item in items]
+        try:
+            for cols, group in _group_by_columns(results):
+                col_names = ",".join(f'"{c}"' for c in cols)
+                placeholders = ",".join("?" for _ in cols)
+                sql = f'INSERT INTO "{self._table}" ({col_names}) VALUES ({placeholders})'
+                if len(group) == 1:
+                    cursor = conn.execute(sql, [group[0][c] for c in cols])
+                    if "id" not in group[0]:
+                        group[0]["id"] = cursor.lastrowid
+                    continue
+                conn.executemany(sql, [[row[c] for c in cols] for row in group])
+                if "id" not in cols:
+                    # Rows inserted within one transaction get consecutive rowids
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    first_id = last_id - len(group) + 1
+                    for offset, row in enumerate(group):
+                        row["id"] = first_id + offset
             conn.commit()
-            item["id"] = cursor.lastrowid
-            results.append(item)
+        except Exception:
+            conn.rollback()
+            raise
         return _Result(data=results)
 
     def _do_update(self, conn: sqlite3.Connection) -> _Result:
@@ -219,21 +431,40 @@ class _QueryBuilder:
         return _Result(data=[data])
 
     def _do_upsert(self, conn: sqlite3.Connection) -> _Result:
-        data = _serialize_json_fields(self._upsert_data)
-        cols = list(data.keys())
-        vals = list(data.values())
-        placeholders = ",".join("?" for _ in cols)
-        col_names = ",".join(f'"{c}"' for c in cols)
-        update_parts = ",".join(f'"{c}" = excluded."{c}"' for c in cols if c != "id")
-        # Determine conflict column — use 'key' for system_config, 'id' for others
-        conflict_col = "key" if self._table == "system_config" else "id"
-        sql = (
-            f'INSERT INTO "{self._table}" ({col_names}) VALUES ({placeholders})'
-            f' ON CONFLICT("{conflict_col}") DO UPDATE SET {update_parts}'
-        )
-        conn.execute(sql, vals)
-        conn.commit()
-        return _Result(data=[data])
+        items = self._upsert_data if isinstance(self._upsert_data, list) else [self._upsert_data]
+        results = [_serialize_json_fields(item) for item in items]
+        conflict_cols = _conflict_columns(self._table, self._on_conflict)
+        conflict_target = ",".join(f'"{c}"' for c in conflict_cols)
+        inserted: list[dict] = []
+        try:
+            for cols, group in _group_by_columns(results):
+                col_names = ",".join(f'"{c}"' for c in cols)
+                placeholders = ",".join("?" for _ in cols)
+                update_parts = ",".join(
+                    f'"{c}" = excluded."{c}"' for c in cols if c != "id" and c not in conflict_cols
+                )
+                if self._ignore_duplicates or not update_parts:
+                    action = "DO NOTHING"
+                else:
+                    action = f"DO UPDATE SET {update_parts}"
+                sql = (
+                    f'INSERT INTO "{self._table}" ({col_names}) VALUES ({placeholders})'
+                    f" ON CONFLICT({conflict_target}) {action}"
+                )
+                if not self._ignore_duplicates:
+                    conn.executemany(sql, [[row[c] for c in cols] for row in group])
+                    continue
+                # Report only the rows actually inserted, as Postgres' RETURNING does
+                for row in group:
+                    cursor = conn.execute(sql, [row[c] for c in cols])
+                    if cursor.rowcount:
+                        row.setdefault("id", cursor.lastrowid)
+                        inserted.append(row)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return _Result(data=inserted if self._ignore_duplicates else results)
 
     def _do_delete(self, conn: sqlite3.Connection) -> _Result:
         sql = f'DELETE FROM "{self._table}"'
@@ -251,15 +482,21 @@ class SQLiteClient:
         return _QueryBuilder(_table=name)
 
 
-def _row_to_dict(row: sqlite3.Row) -> dict:
-    d = dict(row)
-    for k, v in d.items():
-        if isinstance(v, str) and v.startswith(("{", "[")):
-            try:
-                d[k] = json.loads(v)
-            except (json.JSONDecodeError, ValueError):
-                pass
-    return d
+# Conflict targets used when upsert() is called without on_conflict
+DEFAULT_CONFLICT_TARGETS: dict[str, str] = {"system_config": "key"}
+
+
+def _conflict_columns(table: str, on_conflict: str | None) -> list[str]:
+    target = on_conflict or DEFAULT_CONFLICT_TARGETS.get(table, "id")
+    return [c.strip().strip('"') for c in target.split(",") if c.strip()]
+
+
+def _group_by_columns(rows: list[dict]) -> list[tuple[list[str], list[dict]]]:
+    """Group rows sharing the same key set so each group is one statement."""
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row.keys()), []).append(row)
+    return [(list(cols), group) for cols, group in groups.items()]
 
 
 def _serialize_json_fields(data: dict) -> dict:
@@ -477,10 +714,15 @@ def init_sqlite_db() -> None:
         );
     """)
 
+    # Indexes and constraints are versioned separately from the base tables
+    apply_migrations(conn)
+
     # Seed demo data if tables are empty
     count = conn.execute("SELECT COUNT(*) FROM platforms").fetchone()[0]
     if count == 0:
         _seed_demo_data(conn)
+    # Seeding bypasses the builders; drop anything read from a previous DB
+    invalidate()
 
 
 def _seed_demo_data(conn: sqlite3.Connection) -> None:
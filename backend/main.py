@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from db.connection import init_clients
 from middleware.cors import get_cors_config
+from middleware.query_tracking import QueryTrackingMiddleware
 from routers import (
     agent_smart,
     comments,
@@ -57,6 +58,7 @@ app = FastAPI(
 )
 
 app.add_middleware(CORSMiddleware, **get_cors_config())
+app.add_middleware(QueryTrackingMiddleware)
 
 app.include_router(dashboard.router)
 app.include_router(comments.router)
@@ -0,0 +1,17 @@
+"""ASGI middleware that attributes database queries to the request issuing them."""
+
+from db.instrumentation import track_request
+
+
+class QueryTrackingMiddleware:
+    """Wraps each HTTP request in ``track_request`` for N+1 detection."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_request(scope["method"], scope["path"], scope):
+            await self.app(scope, receive, send)
@@ -42,6 +42,13 @@ def _timeframe_start(tf: Timeframe) -> str:
     return start.isoformat()
 
 
+def _chart_slot(hour_bucket: str, now: datetime) -> int:
+    """3-hour chart slot (0 = newest, 7 = oldest) for an hourly bucket."""
+    start = datetime.fromisoformat(hour_bucket).replace(tzinfo=timezone.utc)
+    hours_ago = (now - start - timedelta(minutes=30)).total_seconds() / 3600
+    return min(max(int(hours_ago / 3), 0), 7)
+
+
 @router.get("/api/v1/dashboard/overview")
 async def dashboard_overview(
     timeframe: Timeframe = Query(Timeframe.day),
@@ -59,60 +66,53 @@ async def dashboard_overview(
     - Platform connection detection (check discovered_videos table)
     - Chart data structure (Likes/Comments/Shares from discovered_videos)
     """
-    db = get_supabase_admin()
+    db = get_supabase_admin(asynchronous=True)
     since = _timeframe_start(timeframe)
 
-    # Get OUR posted comments (engagements)
+    # Count OUR posted comments (engagements) per platform
     try:
-        posted = (
+        per_platform = await (
             db.table("engagements")
-            .select("*")
+            .select("platform, count()")
             .execute()
         )
-        our_comments = posted.data or []
+        comments_by_platform = {
+            row["platform"] or "unknown": row["count"] for row in per_platform.data or []
+        }
     except Exception as e:
         print(f"Error fetching engagements: {e}")
-        our_comments = []
+        comments_by_platform = {}
 
-    # Get metrics for our comments
+    # Likes/replies from the latest metrics snapshot of each comment
     total_likes = 0
     total_replies = 0
-    for comment in our_comments:
-        try:
-            metrics = (
-                db.table("engagement_metrics")
-                .select("likes, replies")
-                .eq("engagement_id", comment["id"])
-                .order("checked_at", desc=True)
-                .limit(1)
-                .execute()
-            )
-            if metrics.data:
-                total_likes += metrics.data[0].get("likes", 0)
-                total_replies += metrics.data[0].get("replies", 0)
-        except Exception:
-            pass
-
-    comments_posted = len(our_comments)
-    
+    try:
+        metrics = await (
+            db.table("engagement_metrics")
+            .select("likes:likes.sum(), replies:replies.sum()")
+            .latest_per("engagement_id", "checked_at")
+            .execute()
+        )
+        if metrics.data:
+            total_likes = metrics.data[0]["likes"] or 0
+            total_replies = metrics.data[0]["replies"] or 0
+    except Exception:
+        pass
+
+    comments_posted = sum(comments_by_platform.values())
+
     # Count active platforms
-    active_platforms_set = set()
-    for comment in our_comments:
-        platform = comment.get("platform")
-        if platform:
-            active_platforms_set.add(platform)
+    active_platforms_set = {p for p in comments_by_platform if p != "unknown"}
     active = len(active_platforms_set)
-        
+
     # Review queue count
     try:
-        review_resp = db.table("review_queue").select("id").is_("decision", "null").execute()
-        pending_reviews = len(review_resp.data or [])
+        review_resp = await db.table("review_queue").select("count()").is_("decision", "null").execute()
+        pending_reviews = review_resp.data[0]["count"] if review_resp.data else 0
     except Exception:
         pending_reviews = 0
 
     # Stats cards - Show our comment engagement
-    total_comments_tracked = len(our_comments)
-    
     stats = [
         {
             "title": "Comments Posted",
@@ -154,12 +154,6 @@ async def dashboard_overview(
 
     # Platform health cards
     platform_health = []
-    
-    # Group our comments by platform
-    comments_by_platform = {}
-    for comment in our_comments:
-        platform = comment.get("platform", "unknown")
-        comments_by_platform[platform] = comments_by_platform.get(platform, 0) + 1
 
     for key in ("tiktok", "instagram", "x"):
         meta = _PLATFORM_META[key]
@@ -171,51 +165,44 @@ async def dashboard_overview(
         # Calculate sentiment from our comments on this platform
         sentiment = "N/A"
         if connected and platform_comment_count > 0:
-            platform_comments = [c for c in our_comments if c.get("platform") == key]
-            if platform_comments:
-                sentiment = f"{min(int(platform_comment_count * 10), 100)}%"
+            sentiment = f"{min(int(platform_comment_count * 10), 100)}%"
 
         platform_health.append(
             {
                 **meta,
                 "statusColor": "bg-emerald-500" if connected else "bg-gray-500",
                 "stat1Lbl": "Comments",
-                "stat1Val": str(len([c for c in our_comments if c.get("platform") == key])),
+                "stat1Val": str(platform_comment_count),
                 "stat2Lbl": "Sentiment",
                 "stat2Val": sentiment,
             }
         )
 
-    # Chart data - our engagement activity over time
-    chart = []
-    for i in range(8):
-        hours_label = f"{(7-i) * 3}h ago"
-        x_count = 0
-        ig_count = 0
-        tt_count = 0
-        for comment in our_comments:
-            posted_at = comment.get("posted_at")
-            if posted_at:
-                try:
-                    dt = datetime.fromisoformat(posted_at.replace('Z', '+00:00'))
-                    hours_ago = (datetime.now(timezone.utc) - dt).total_seconds() / 3600
-                    bucket_idx = min(int(hours_ago / 3), 7)
-                    if bucket_idx == (7 - i):
-                        platform = comment.get("platform", "")
-                        if platform == "x":
-                            x_count += 1
-                        elif platform == "instagram":
-                            ig_count += 1
-                        elif platform == "tiktok":
-                            tt_count += 1
-                except Exception:
-                    pass
-        chart.append({
-            "time": hours_label,
-            "tiktok": tt_count,
-            "instagram": ig_count,
-            "x": x_count,
-        })
+    # Chart data - our engagement activity over time, in 3-hour slots.
+    # Only the last 21h is bucketed; slot 7 gets everything older, which is
+    # the per-platform total minus the recent rows.
+    now = datetime.now(timezone.utc)
+    slots = [{"tiktok": 0, "instagram": 0, "x": 0} for _ in range(8)]
+    recent_by_platform: dict[str, int] = {}
+    try:
+        recent = await (
+            db.table("engagements")
+            .select("platform, count()")
+            .bucket("posted_at", "hour")
+            .gte("posted_at", (now - timedelta(hours=21)).isoformat())
+            .execute()
+        )
+        for row in recent.data or []:
+            platform = row["platform"]
+            if row["bucket"] and platform in slots[0]:
+                slots[_chart_slot(row["bucket"], now)][platform] += row["count"]
+            recent_by_platform[platform] = recent_by_platform.get(platform, 0) + row["count"]
+    except Exception:
+        pass
+    for platform in slots[7]:
+        slots[7][platform] += comments_by_platform.get(platform, 0) - recent_by_platform.get(platform, 0)
+
+    chart = [{"time": f"{(7-i) * 3}h ago", **slots[7 - i]} for i in range(8)]
 
     return {
         "stats": stats,
@@ -224,7 +211,7 @@ async def dashboard_overview(
         "total_comments_posted": comments_posted,
         "total_likes_received": total_likes,
         "total_replies_received": total_replies,
-        "posts_tracked": len(our_comments),
+        "posts_tracked": comments_posted,
         "active_platforms": active,
         "pending_reviews": pending_reviews,
     }
@@ -42,6 +42,13 @@ def _timeframe_start(tf: Timeframe) -> str:
     return start.isoformat()
 
 
+def _chart_slot(hour_bucket: str, now: datetime) -> int:
+    """3-hour chart slot (0 = newest, 7 = oldest) for an hourly bucket."""
+    start = datetime.fromisoformat(hour_bucket).replace(tzinfo=timezone.utc)
+    hours_ago = (now - start - timedelta(minutes=30)).total_seconds() / 3600
+    return min(max(int(hours_ago / 3), 0), 7)
+
+
 @router.get("/api/v1/dashboard/overview")
 async def dashboard_overview(
     timeframe: Timeframe = Query(Timeframe.day),
@@ -62,41 +69,42 @@ async def dashboard_overview(
     db = get_supabase_admin()
     since = _timeframe_start(timeframe)
 
-    # Get discovered posts (content we're tracking)
+    # Per-platform totals over discovered posts (content we're tracking)
     try:
         discovered = (
             db.table("discovered_videos")
-            .select("*")
+            .select(
+                "platform, count(), likes:likes.sum(),"
+                " comments:comments.sum(), shares:shares.sum()"
+            )
             .execute()
         )
-        tracked_posts = discovered.data or []
+        tracked_by_platform = {
+            row["platform"] or "unknown": row for row in discovered.data or []
+        }
     except Exception as e:
         print(f"Error fetching discovered posts: {e}")
-        tracked_posts = []
-    
+        tracked_by_platform = {}
+
     # Calculate engagement metrics from discovered posts
-    total_likes = sum(post.get("likes", 0) for post in tracked_posts)
-    total_comments = sum(post.get("comments", 0) for post in tracked_posts)
-    total_shares = sum(post.get("shares", 0) for post in tracked_posts)
-    
+    groups = tracked_by_platform.values()
+    total_likes = sum(g["likes"] or 0 for g in groups)
+    total_comments = sum(g["comments"] or 0 for g in groups)
+    total_shares = sum(g["shares"] or 0 for g in groups)
+    posts_tracked = sum(g["count"] for g in groups)
+
     # Count active platforms (has data in discovered_videos)
-    active_platforms_set = set()
-    for post in tracked_posts:
-        platform = post.get("platform")
-        if platform:
-            active_platforms_set.add(platform)
+    active_platforms_set = {p for p in tracked_by_platform if p != "unknown"}
     active = len(active_platforms_set)
-        
+
     # Review queue count
     try:
-        review_resp = db.table("review_queue").select("id").is_("decision", "null").execute()
-        pending_reviews = len(review_resp.data or [])
+        review_resp = db.table("review_queue").select("count()").is_("decision", "null").execute()
+        pending_reviews = review_resp.data[0]["count"] if review_resp.data else 0
     except Exception:
         pending_reviews = 0
 
     # Stats cards - Show discovered content engagement
-    total_comments_tracked = len(tracked_posts)
-    
     stats = [
         {
             "title": "Comments Posted",
@@ -139,27 +147,20 @@ async def dashboard_overview(
     # Platform health cards
     platform_health = []
     
-    # Group tracked posts by platform
-    tracked_by_platform = {}
-    for post in tracked_posts:
-        platform = post.get("platform", "unknown")
-        tracked_by_platform[platform] = tracked_by_platform.get(platform, 0) + 1
-    
     for key in ("tiktok", "instagram", "x"):
         meta = _PLATFORM_META[key]
         
         # Platform is connected if we have data for it
         connected = key in active_platforms_set
-        tracked_count = tracked_by_platform.get(key, 0)
+        group = tracked_by_platform.get(key)
+        tracked_count = group["count"] if group else 0
         
         # Calculate sentiment (average of positive engagement)
         sentiment = "N/A"
         if connected and tracked_count > 0:
             # Simple sentiment: percentage of posts with high engagement
-            platform_posts = [p for p in tracked_posts if p.get("platform") == key]
-            if platform_posts:
-                avg_engagement = sum(p.get("likes", 0) + p.get("comments", 0) for p in platform_posts) / len(platform_posts)
-                sentiment = f"{min(int(avg_engagement / 10), 100)}%"
+            avg_engagement = ((group["likes"] or 0) + (group["comments"] or 0)) / tracked_count
+            sentiment = f"{min(int(avg_engagement / 10), 100)}%"
         
         platform_health.append(
             {
@@ -173,27 +174,39 @@ async def dashboard_overview(
         )
 
     # Chart data - engagement over time (from discovered_videos)
-    # Group posts by 3-hour buckets
-    chart = []
+    # Sum posts into 3-hour slots (slot 7 also holds everything older than 21h)
+    now = datetime.now(timezone.utc)
+    window_start = (now - timedelta(hours=21)).isoformat()
     likes_buckets = [0] * 8
     comments_buckets = [0] * 8
     shares_buckets = [0] * 8
-    
-    for post in tracked_posts:
-        created_at = post.get("created_at")
-        if created_at:
-            try:
-                dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                hours_ago = (datetime.now(timezone.utc) - dt).total_seconds() / 3600
-                bucket_idx = min(int(hours_ago / 3), 7)
-                
-                likes_buckets[bucket_idx] += post.get("likes", 0)
-                comments_buckets[bucket_idx] += post.get("comments", 0)
-                shares_buckets[bucket_idx] += post.get("shares", 0)
-            except Exception as e:
-                print(f"Error parsing date {created_at}: {e}")
-    
+
+    sums = "likes:likes.sum(), comments:comments.sum(), shares:shares.sum()"
+    try:
+        recent = (
+            db.table("discovered_videos")
+            .select(sums)
+            .bucket("created_at", "hour")
+            .gte("created_at", window_start)
+            .execute()
+        )
+        older = (
+            db.table("discovered_videos")
+            .select(sums)
+            .lt("created_at", window_start)
+            .execute()
+        )
+        slotted = [(_chart_slot(r["bucket"], now), r) for r in recent.data or [] if r["bucket"]]
+        slotted += [(7, r) for r in older.data or []]
+        for bucket_idx, row in slotted:
+            likes_buckets[bucket_idx] += row["likes"] or 0
+            comments_buckets[bucket_idx] += row["comments"] or 0
+            shares_buckets[bucket_idx] += row["shares"] or 0
+    except Exception:
+        pass
+
     # Build chart in chronological order (oldest to newest)
+    chart = []
     for i in range(8):
         chart.append({
             "time": f"{(7-i) * 3}h ago",
@@ -209,7 +222,7 @@ async def dashboard_overview(
         "total_comments_posted": 10,  # Demo data
         "total_likes_received": total_likes,
         "total_replies_received": total_comments,
-        "posts_tracked": len(tracked_posts),
+        "posts_tracked": posts_tracked,
         "active_platforms": active,
         "pending_reviews": pending_reviews,
     }
@@ -7,7 +7,6 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Query
 from db.connection import get_supabase_admin
 from schemas.dashboard import Timeframe
-import json
 
 router = APIRouter(tags=["dashboard"])
 
@@ -42,6 +41,13 @@ def _timeframe_start(tf: Timeframe) -> str:
     return start.isoformat()
 
 
+def _chart_slot(hour_bucket: str, now: datetime) -> int:
+    """3-hour chart slot (0 = newest, 7 = oldest) for an hourly bucket."""
+    start = datetime.fromisoformat(hour_bucket).replace(tzinfo=timezone.utc)
+    hours_ago = (now - start - timedelta(minutes=30)).total_seconds() / 3600
+    return min(max(int(hours_ago / 3), 0), 7)
+
+
 @router.get("/api/v1/dashboard/overview")
 async def dashboard_overview(
     timeframe: Timeframe = Query(Timeframe.day),
@@ -57,41 +63,43 @@ async def dashboard_overview(
     """
     db = get_supabase_admin()
 
-    # Get discovered posts (real Twitter data) - NO timeframe filter for now
+    # Totals over discovered posts (real Twitter data) - NO timeframe filter for now
+    totals = {}
     try:
         discovered = (
             db.table("discovered_videos")
-            .select("id, platform, likes, comments, shares, views, hashtags, created_at")
+            .select(
+                "posts:count(), likes:likes.sum(), comments:comments.sum(),"
+                " shares:shares.sum(), views:views.sum()"
+            )
             .eq("platform", "x")
             .execute()
         )
-        posts = discovered.data or []
+        totals = discovered.data[0] if discovered.data else {}
     except Exception as e:
         print(f"Error fetching discovered posts: {e}")
-        posts = []
-    
+
     # Calculate Twitter engagement metrics
-    total_posts = len(posts)
-    total_likes = sum(p.get("likes", 0) for p in posts)
-    total_comments = sum(p.get("comments", 0) for p in posts)  # Twitter replies
-    total_shares = sum(p.get("shares", 0) for p in posts)      # Twitter retweets
-    total_views = sum(p.get("views", 0) for p in posts)        # Views (if available)
-    
-    # Extract hashtags
-    all_hashtags = []
-    for p in posts:
-        hashtags_str = p.get("hashtags", "[]")
-        try:
-            if isinstance(hashtags_str, str):
-                hashtags = json.loads(hashtags_str)
-            else:
-                hashtags = hashtags_str
-            all_hashtags.extend(hashtags)
-        except:
-            pass
-    
-    unique_hashtags = len(set(all_hashtags))
-    
+    total_posts = totals.get("posts") or 0
+    total_likes = totals.get("likes") or 0
+    total_comments = totals.get("comments") or 0  # Twitter replies
+    total_shares = totals.get("shares") or 0      # Twitter retweets
+    total_views = totals.get("views") or 0        # Views (if available)
+
+    # Distinct hashtags: the exact count of tag groups, without fetching them
+    try:
+        tags = (
+            db.table("discovered_videos")
+            .select("tag, count()", count="exact")
+            .unnest("hashtags", "tag")
+            .eq("platform", "x")
+            .limit(1)
+            .execute()
+        )
+        unique_hashtags = tags.count or 0
+    except Exception:
+        unique_hashtags = 0
+
     # Count active/connected platforms
     try:
         platforms_resp = db.table("platforms").select("name, status").execute()
@@ -102,8 +110,8 @@ async def dashboard_overview(
         
     # Review queue count
     try:
-        review_resp = db.table("review_queue").select("id").is_("decision", "null").execute()
-        pending_reviews = len(review_resp.data or [])
+        review_resp = db.table("review_queue").select("count()").is_("decision", "null").execute()
+        pending_reviews = review_resp.data[0]["count"] if review_resp.data else 0
     except Exception:
         pending_reviews = 0
 
@@ -179,34 +187,38 @@ async def dashboard_overview(
                 }
             )
 
-    # Chart data - show engagement over time
-    chart = []
-    if posts:
-        # Group by 3-hour buckets
-        buckets = [{"likes": 0, "comments": 0, "shares": 0} for _ in range(8)]
-        for post in posts:
-            created_at = post.get("created_at")
-            if created_at:
-                try:
-                    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    hours_ago = (datetime.now(timezone.utc) - dt).total_seconds() / 3600
-                    bucket_idx = min(int(hours_ago / 3), 7)
-                    buckets[bucket_idx]["likes"] += post.get("likes", 0)
-                    buckets[bucket_idx]["comments"] += post.get("comments", 0)
-                    buckets[bucket_idx]["shares"] += post.get("shares", 0)
-                except:
-                    pass
-        
-        for i in range(8):
-            chart.append({
-                "time": f"{(7-i) * 3}h ago",
-                "likes": buckets[7-i]["likes"],
-                "comments": buckets[7-i]["comments"],
-                "shares": buckets[7-i]["shares"],
-            })
-    else:
-        for i in range(8):
-            chart.append({"time": f"{(7-i) * 3}h ago", "likes": 0, "comments": 0, "shares": 0})
+    # Chart data - show engagement over time, in 3-hour slots
+    # (slot 7 also holds everything older than 21h)
+    now = datetime.now(timezone.utc)
+    window_start = (now - timedelta(hours=21)).isoformat()
+    buckets = [{"likes": 0, "comments": 0, "shares": 0} for _ in range(8)]
+    if total_posts:
+        sums = "likes:likes.sum(), comments:comments.sum(), shares:shares.sum()"
+        try:
+            recent = (
+                db.table("discovered_videos")
+                .select(sums)
+                .bucket("created_at", "hour")
+                .eq("platform", "x")
+                .gte("created_at", window_start)
+                .execute()
+            )
+            older = (
+                db.table("discovered_videos")
+                .select(sums)
+                .eq("platform", "x")
+                .lt("created_at", window_start)
+                .execute()
+            )
+            slotted = [(_chart_slot(r["bucket"], now), r) for r in recent.data or [] if r["bucket"]]
+            slotted += [(7, r) for r in older.data or []]
+            for idx, row in slotted:
+                for key in buckets[idx]:
+                    buckets[idx][key] += row[key] or 0
+        except Exception:
+            pass
+
+    chart = [{"time": f"{(7-i) * 3}h ago", **buckets[7 - i]} for i in range(8)]
 
     return {
         "stats": stats,
@@ -7,7 +7,6 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Query
 from db.connection import get_supabase_admin
 from schemas.dashboard import Timeframe
-import json
 
 router = APIRouter(tags=["dashboard"])
 
@@ -42,6 +41,13 @@ def _timeframe_start(tf: Timeframe) -> str:
     return start.isoformat()
 
 
+def _chart_slot(hour_bucket: str, now: datetime) -> int:
+    """3-hour chart slot (0 = newest, 7 = oldest) for an hourly bucket."""
+    start = datetime.fromisoformat(hour_bucket).replace(tzinfo=timezone.utc)
+    hours_ago = (now - start - timedelta(minutes=30)).total_seconds() / 3600
+    return min(max(int(hours_ago / 3), 0), 7)
+
+
 @router.get("/api/v1/dashboard/overview")
 async def dashboard_overview(
     timeframe: Timeframe = Query(Timeframe.day),
@@ -50,25 +56,25 @@ async def dashboard_overview(
     db = get_supabase_admin()
     since = _timeframe_start(timeframe)
 
-    # Get discovered posts (real Twitter data)
+    # Discovered posts (real Twitter data) in the timeframe
+    totals = {}
     try:
         discovered = (
             db.table("discovered_videos")
-            .select("id, platform, likes, hashtags, created_at")
+            .select("posts:count(), likes:likes.sum()")
             .eq("platform", "x")
             .gte("created_at", since)
             .execute()
         )
-        posts = discovered.data or []
+        totals = discovered.data[0] if discovered.data else {}
     except Exception as e:
         print(f"Error fetching discovered posts: {e}")
-        posts = []
-    
-    # Get engagements (our responses)
+
+    # Engagements (our responses) per platform
     try:
         engagements = (
             db.table("engagements")
-            .select("id, platform, risk_score, approval_path, posted_at")
+            .select("platform, approval_path, count(), risk:risk_score.sum()")
             .gte("posted_at", since)
             .execute()
         )
@@ -76,30 +82,30 @@ async def dashboard_overview(
     except Exception as e:
         print(f"Error fetching engagements: {e}")
         rows = []
-    
+
     # Calculate real Twitter metrics
-    total_posts = len(posts)
-    total_likes = sum(p.get("likes", 0) for p in posts)
+    total_posts = totals.get("posts") or 0
+    total_likes = totals.get("likes") or 0
     avg_likes = round(total_likes / total_posts) if total_posts > 0 else 0
-    
-    # Extract hashtags
-    all_hashtags = []
-    for p in posts:
-        hashtags_str = p.get("hashtags", "[]")
-        try:
-            if isinstance(hashtags_str, str):
-                hashtags = json.loads(hashtags_str)
-            else:
-                hashtags = hashtags_str
-            all_hashtags.extend(hashtags)
-        except:
-            pass
-    
-    unique_hashtags = len(set(all_hashtags))
-    
+
+    # Distinct hashtags: the exact count of tag groups, without fetching them
+    try:
+        tags = (
+            db.table("discovered_videos")
+            .select("tag, count()", count="exact")
+            .unnest("hashtags", "tag")
+            .eq("platform", "x")
+            .gte("created_at", since)
+            .limit(1)
+            .execute()
+        )
+        unique_hashtags = tags.count or 0
+    except Exception:
+        unique_hashtags = 0
+
     # Engagement stats
-    total_engagements = len(rows)
-    auto_count = sum(1 for r in rows if r.get("approval_path") == "auto")
+    total_engagements = sum(r["count"] for r in rows)
+    auto_count = sum(r["count"] for r in rows if r.get("approval_path") == "auto")
     approval_rate = (auto_count / total_engagements * 100) if total_engagements > 0 else 0.0
 
     # Check platforms - handle if table doesn't exist
@@ -110,15 +116,17 @@ async def dashboard_overview(
         # Default to X active if we have discovered posts
         active = 1 if total_posts > 0 else 0
         
-    # Build per-platform counts
-    platform_map: dict[str, list] = {}
+    # Build per-platform comment counts and risk totals
+    platform_map: dict[str, dict] = {}
     for r in rows:
-        platform_map.setdefault(r.get("platform", "unknown"), []).append(r)
+        entry = platform_map.setdefault(r.get("platform", "unknown"), {"count": 0, "risk": 0})
+        entry["count"] += r["count"]
+        entry["risk"] += r["risk"] or 0
 
     # Review queue count
     try:
-        review_resp = db.table("review_queue").select("id").is_("decision", "null").execute()
-        pending_reviews = len(review_resp.data or [])
+        review_resp = db.table("review_queue").select("count()").is_("decision", "null").execute()
+        pending_reviews = review_resp.data[0]["count"] if review_resp.data else 0
     except Exception:
         pending_reviews = 0
 
@@ -166,7 +174,7 @@ async def dashboard_overview(
     platform_health = []
     for key in ("tiktok", "instagram", "x"):
         meta = _PLATFORM_META[key]
-        items = platform_map.get(key, [])
+        items = platform_map.get(key, {"count": 0, "risk": 0})
         
         # X is connected if we have discovered posts
         connected = key == "x" and total_posts > 0
@@ -189,42 +197,50 @@ async def dashboard_overview(
                     **meta,
                     "statusColor": "bg-[#10B981]" if connected else "bg-gray-500",
                     "stat1Lbl": "Comments",
-                    "stat1Val": str(len(items)),
+                    "stat1Val": str(items["count"]),
                     "stat2Lbl": "Avg Risk",
                     "stat2Val": (
-                        f"{sum(r.get('risk_score', 0) for r in items) / len(items):.0f}%"
-                        if items
+                        f"{items['risk'] / items['count']:.0f}%"
+                        if items["count"]
                         else "0%"
                     ),
                 }
             )
 
-    # Chart data - show discovered posts over time
-    chart = []
-    if posts:
-        # Group by 3-hour buckets
-        buckets = [0] * 8
-        for post in posts:
-            created_at = post.get("created_at")
-            if created_at:
-                try:
-                    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    hours_ago = (datetime.now(timezone.utc) - dt).total_seconds() / 3600
-                    bucket_idx = min(int(hours_ago / 3), 7)
-                    buckets[bucket_idx] += 1
-                except:
-                    pass
-        
-        for i in range(8):
-            chart.append({
-                "time": f"{(7-i) * 3}h ago",
-                "tiktok": 0,
-                "instagram": 0,
-                "x": buckets[7-i],
-            })
-    else:
-        for i in range(8):
-            chart.append({"time": f"{(7-i) * 3}h ago", "tiktok": 0, "instagram": 0, "x": 0})
+    # Chart data - show discovered posts over time, in 3-hour slots
+    # (slot 7 also holds everything older than 21h)
+    now = datetime.now(timezone.utc)
+    window_start = (now - timedelta(hours=21)).isoformat()
+    buckets = [0] * 8
+    if total_posts:
+        try:
+            recent = (
+                db.table("discovered_videos")
+                .select("count()")
+                .bucket("created_at", "hour")
+                .eq("platform", "x")
+                .gte("created_at", max(since, window_start))
+                .execute()
+            )
+            older = (
+                db.table("discovered_videos")
+                .select("count()")
+                .eq("platform", "x")
+                .gte("created_at", since)
+                .lt("created_at", window_start)
+                .execute()
+            )
+            for row in recent.data or []:
+                if row["bucket"]:
+                    buckets[_chart_slot(row["bucket"], now)] += row["count"]
+            buckets[7] += sum(row["count"] for row in older.data or [])
+        except Exception:
+            pass
+
+    chart = [
+        {"time": f"{(7-i) * 3}h ago", "tiktok": 0, "instagram": 0, "x": buckets[7 - i]}
+        for i in range(8)
+    ]
 
     return {
         "stats": stats,
@@ -62,6 +62,17 @@ async def initialize_twitter_data():
     
     video_ids = []
     for video in sample_videos:
+        # video_url is unique, so re-running the seed reuses existing rows
+        existing = (
+            db.table("discovered_videos")
+            .select("id")
+            .eq("video_url", video["video_url"])
+            .limit(1)
+            .execute()
+        )
+        if existing.data:
+            video_ids.append(existing.data[0]["id"])
+            continue
         result = db.table("discovered_videos").insert(video).execute()
         if result.data:
             video_ids.append(result.data[0]["id"])
@@ -4,6 +4,10 @@ Diagnostic endpoint to debug Overview data issues.
 
 from fastapi import APIRouter
 from db.connection import get_supabase_admin
+from db.config_cache import get_cache_stats, reset_cache_stats
+from db.instrumentation import get_query_stats, reset_query_stats
+from db.io_stats import get_io_stats, reset_io_stats
+from services.ai.embedding_cache import get_embedding_cache
 import json
 
 router = APIRouter(prefix="/api/v1/debug", tags=["debug"])
@@ -63,3 +67,40 @@ async def test_overview_query():
             "success": False,
             "error": str(e)
         }
+
+
+@router.get("/query-io")
+async def query_io(reset: bool = False):
+    """Rows and bytes read per table/select list since startup (or last reset)."""
+    stats = get_io_stats()
+    if reset:
+        reset_io_stats()
+    return {"queries": stats}
+
+
+@router.get("/config-cache")
+async def config_cache_stats(reset: bool = False):
+    """Hit/miss counters for the system/risk/voice config cache."""
+    stats = get_cache_stats()
+    if reset:
+        reset_cache_stats()
+    return stats
+
+
+@router.get("/queries")
+async def query_stats(reset: bool = False):
+    """Per-shape query timings, recent slow queries and N+1 reports."""
+    stats = get_query_stats()
+    if reset:
+        reset_query_stats()
+    return stats
+
+
+@router.get("/embedding-cache")
+async def embedding_cache_stats(reset: bool = False):
+    """Hit rate, size and evictions of the embedding cache."""
+    cache = get_embedding_cache()
+    stats = cache.stats()
+    if reset:
+        cache.reset_stats()
+    return stats
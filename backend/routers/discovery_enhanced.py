@@ -2,7 +2,7 @@
 Enhanced discovery router with real Twitter integration and comment generation.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timezone
@@ -10,6 +10,7 @@ import os
 
 from services.twitter_discovery import TwitterDiscoveryService
 from db.connection import get_supabase_admin
+from db.pagination import InvalidCursor, paginate
 
 router = APIRouter(prefix="/api/v1/discovery", tags=["discovery"])
 
@@ -66,17 +67,20 @@ async def search_twitter(request: TwitterSearchRequest):
 
 @router.get("/twitter/posts")
 async def get_discovered_posts(
+    response: Response,
     status: str = "discovered",
     limit: int = 50,
-    min_score: Optional[int] = None
+    min_score: Optional[int] = None,
+    cursor: Optional[str] = None,
 ):
     """
-    Get discovered Twitter posts.
+    Get discovered Twitter posts, newest first.
     
     Query params:
         status: Filter by status (discovered, scored, reviewed, posted)
         limit: Max number of posts to return
         min_score: Filter by minimum engagement score
+        cursor: X-Next-Cursor header value from the previous page
     """
     db = get_supabase_admin()
     
@@ -85,8 +89,14 @@ async def get_discovered_posts(
     if status:
         query = query.eq("status", status)
     
-    result = query.order("discovered_at", desc=True).limit(limit).execute()
-    posts = result.data or []
+    try:
+        posts, next_cursor = paginate(
+            query, "discovered_at", limit=max(1, min(limit, 500)), cursor=cursor, desc=True
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     # Calculate engagement scores if requested
     if min_score is not None:
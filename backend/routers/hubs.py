@@ -1,3 +1,4 @@
+import json
 import logging
 
 from fastapi import APIRouter, HTTPException
@@ -14,77 +15,74 @@ async def hub_stats(platform: str, user: CurrentUser):
     if platform not in ("tiktok", "instagram", "x"):
         raise HTTPException(status_code=400, detail="Invalid platform")
 
-    db = get_supabase_admin()
+    db = get_supabase_admin(asynchronous=True)
 
     # Count reply engagements for this platform
-    engagements_resp = (
+    engagements_resp = await (
         db.table("engagements")
-        .select("id")
+        .select("count()")
         .eq("platform", platform)
         .execute()
     )
-    replies_count = len(engagements_resp.data or [])
+    replies_count = engagements_resp.data[0]["count"] if engagements_resp.data else 0
 
-    # Build keywords from discovered_videos hashtags
-    videos_resp = (
+    # Build keywords from discovered_videos hashtags, aggregated per tag
+    tags_resp = await (
         db.table("discovered_videos")
-        .select("hashtags, description, likes")
+        .select("term, volume:likes.sum(), first_id:id.min()")
+        .unnest("hashtags", "term")
         .eq("platform", platform)
+        .order("first_id")
+        .order("term")
         .execute()
     )
-    videos = videos_resp.data or []
-
-    tag_map: dict[str, dict] = {}
-    for v in videos:
-        tags = v.get("hashtags") or []
-        if isinstance(tags, str):
-            import json
-            try:
-                tags = json.loads(tags)
-            except (json.JSONDecodeError, ValueError):
-                tags = []
-        for tag in tags:
-            if tag not in tag_map:
-                tag_map[tag] = {
-                    "term": tag,
-                    "action": "monitor",
-                    "match": v.get("description", "")[:80],
-                    "volume": v.get("likes", 0),
-                }
-            else:
-                tag_map[tag]["volume"] += v.get("likes", 0)
-
-    keywords = list(tag_map.values())
+    tag_rows = tags_resp.data or []
+
+    # Each keyword quotes the first video that used the tag
+    first_ids = sorted({row["first_id"] for row in tag_rows})
+    descriptions: dict[int, str] = {}
+    if first_ids:
+        desc_resp = await (
+            db.table("discovered_videos")
+            .select("id, description")
+            .in_("id", first_ids)
+            .execute()
+        )
+        descriptions = {r["id"]: r.get("description") or "" for r in desc_resp.data or []}
+
+    keywords = [
+        {
+            "term": row["term"],
+            "action": "monitor",
+            "match": descriptions.get(row["first_id"], "")[:80],
+            "volume": row["volume"] or 0,
+        }
+        for row in tag_rows
+    ]
 
     # Build drafts from review_queue (pending items where decision IS NULL)
-    review_resp = (
+    review_resp = await (
         db.table("review_queue")
-        .select("id, video_id, proposed_text, risk_score")
+        .select(
+            "id, video_id, proposed_text, risk_score,"
+            " discovered_videos(creator, description, platform, video_url)"
+        )
         .is_("decision", "null")
         .execute()
     )
     drafts = []
     for item in review_resp.data or []:
-        video_id = item.get("video_id")
         user_name = "unknown"
         original_msg = ""
         tweet_url = ""
-        if video_id:
-            vid_resp = (
-                db.table("discovered_videos")
-                .select("creator, description, platform, video_url")
-                .eq("id", video_id)
-                .execute()
-            )
-            vid_rows = vid_resp.data or []
-            if vid_rows:
-                vid = vid_rows[0]
-                # Only include drafts matching this platform
-                if vid.get("platform") != platform:
-                    continue
-                user_name = vid.get("creator", "unknown")
-                original_msg = vid.get("description", "")
-                tweet_url = vid.get("video_url", "")
+        vid = item.get("discovered_videos")
+        if vid:
+            # Only include drafts matching this platform
+            if vid.get("platform") != platform:
+                continue
+            user_name = vid.get("creator", "unknown")
+            original_msg = vid.get("description", "")
+            tweet_url = vid.get("video_url", "")
 
         drafts.append({
             "id": item.get("id"),
@@ -98,12 +96,17 @@ async def hub_stats(platform: str, user: CurrentUser):
     # For Instagram, also return discovered videos directly
     reels = []
     if platform == "instagram":
-        for v in videos:
+        videos_resp = await (
+            db.table("discovered_videos")
+            .select("hashtags, description, likes, creator")
+            .eq("platform", platform)
+            .execute()
+        )
+        for v in videos_resp.data or []:
             tags = v.get("hashtags") or []
             if isinstance(tags, str):
-                import json as _json
                 try:
-                    tags = _json.loads(tags)
+                    tags = json.loads(tags)
                 except (json.JSONDecodeError, ValueError):
                     tags = []
             reels.append({
@@ -80,8 +80,19 @@ async def _process_video_ingest(
         "classification": body.classification,
         "status": "new",
     }
-    insert_result = db.table("discovered_videos").insert(row).execute()
-    video_id: int = insert_result.data[0]["id"]
+    existing = (
+        db.table("discovered_videos")
+        .select("id")
+        .eq("video_url", body.video_url)
+        .limit(1)
+        .execute()
+    )
+    if existing.data:
+        # video_url is unique; re-ingesting a video reuses its row
+        video_id: int = existing.data[0]["id"]
+    else:
+        insert_result = db.table("discovered_videos").insert(row).execute()
+        video_id = insert_result.data[0]["id"]
 
     # 2. Attempt comment generation + risk scoring pipeline
     candidates: list[dict[str, Any]] = []
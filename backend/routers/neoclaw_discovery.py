@@ -8,10 +8,11 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from db.connection import get_supabase_admin
+from db.pagination import InvalidCursor, paginate
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["discovery", "neoclaw"])
@@ -238,28 +239,32 @@ async def receive_neoclaw_results(results: DiscoveryResults):
 
 
 @router.get("/api/v1/discovery/queue")
-async def get_pending_queries():
+async def get_pending_queries(
+    limit: int = Query(5, ge=1, le=100),
+    cursor: Optional[str] = None,
+):
     """
-    Get pending queries from the queue.
-    Used by NeoClaw to poll for work.
+    Get pending queries from the queue, oldest first.
+    Used by NeoClaw to poll for work; pass next_cursor back as cursor to
+    page past the first batch.
     """
     
     db = get_supabase_admin()
     
     try:
-        # Get queued items (oldest first)
-        pending = db.table("discovery_queue")\
+        query = db.table("discovery_queue")\
             .select("*")\
-            .in_("status", ["queued", "processing"])\
-            .order("created_at")\
-            .limit(5)\
-            .execute()
+            .in_("status", ["queued", "processing"])
+        queries, next_cursor = paginate(query, "created_at", limit=limit, cursor=cursor)
         
         return {
-            "pending_count": len(pending.data),
-            "queries": pending.data
+            "pending_count": len(queries),
+            "queries": queries,
+            "next_cursor": next_cursor,
         }
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Failed to fetch queue: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch queue: {str(e)}")
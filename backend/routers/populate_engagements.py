@@ -25,40 +25,38 @@ async def populate_engagements():
     if not videos.data:
         return {"success": False, "message": "No discovered_videos found. Run /populate/now first."}
     
-    stored_count = 0
-    
-    # Create engagement records for each video
-    for i, video in enumerate(videos.data):
-        video_id = video.get("id")
-        
-        # Create a posted engagement
-        engagement = {
+    # Create a posted engagement for each video
+    engagements = [
+        {
             "platform": "x",
-            "video_id": video_id,
+            "video_id": video.get("id"),
             "comment_text": f"Great insights! This is exactly what people need to hear about personal finance. 💰",
             "risk_score": random.randint(10, 30),
             "approval_path": "manual",
             "posted_at": (datetime.now(timezone.utc) - timedelta(hours=random.randint(1, 48))).isoformat(),
             "status": "posted"
         }
-        
-        try:
-            result = db.table("engagements").insert(engagement).execute()
-            if result.data:
-                engagement_id = result.data[0]["id"]
-                
-                # Add engagement metrics
-                metrics = {
-                    "engagement_id": engagement_id,
-                    "likes": random.randint(50, 500),
-                    "replies": random.randint(5, 50),
-                    "impressions": random.randint(1000, 10000)
-                }
-                db.table("engagement_metrics").insert(metrics).execute()
-                
-                stored_count += 1
-        except Exception as e:
-            print(f"Error creating engagement: {e}")
+        for video in videos.data
+    ]
+    
+    stored_count = 0
+    try:
+        # One transaction per table instead of a commit per row
+        result = db.table("engagements").insert(engagements).execute()
+        metrics = [
+            {
+                "engagement_id": row["id"],
+                "likes": random.randint(50, 500),
+                "replies": random.randint(5, 50),
+                "impressions": random.randint(1000, 10000)
+            }
+            for row in (result.data or [])
+        ]
+        if metrics:
+            db.table("engagement_metrics").insert(metrics).execute()
+        stored_count = len(metrics)
+    except Exception as e:
+        print(f"Error creating engagements: {e}")
     
     return {
         "success": True,
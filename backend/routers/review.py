@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Query
 
 from db.connection import get_supabase_admin
+from db.pagination import InvalidCursor, paginate_async
 from middleware.auth import CurrentUser
 from schemas.review import (
     ReviewDecision,
@@ -20,11 +21,11 @@ router = APIRouter(tags=["review"])
 
 @router.get("/api/v1/review/queue", response_model=ReviewQueueResponse)
 async def review_queue(user: CurrentUser):
-    db = get_supabase_admin()
+    db = get_supabase_admin(asynchronous=True)
 
-    result = (
+    result = await (
         db.table("review_queue")
-        .select("*")
+        .select("*, discovered_videos(video_url, creator, description, classification)")
         .is_("decision", "null")
         .order("queued_at")
         .execute()
@@ -34,22 +35,14 @@ async def review_queue(user: CurrentUser):
     items = []
     for r in rows:
         video_context = None
-        if r.get("video_id"):
-            vid = (
-                db.table("discovered_videos")
-                .select("video_url, creator, description, classification")
-                .eq("id", r["video_id"])
-                .limit(1)
-                .execute()
+        v = r.get("discovered_videos")
+        if v:
+            video_context = VideoContext(
+                video_url=v.get("video_url"),
+                creator=v.get("creator"),
+                description=v.get("description"),
+                classification=v.get("classification"),
             )
-            if vid.data:
-                v = vid.data[0]
-                video_context = VideoContext(
-                    video_url=v.get("video_url"),
-                    creator=v.get("creator"),
-                    description=v.get("description"),
-                    classification=v.get("classification"),
-                )
 
         items.append(
             ReviewItem(
@@ -111,7 +104,7 @@ async def review_decide(
 
             review_row = (
                 db.table("review_queue")
-                .select("proposed_text, video_id")
+                .select("proposed_text, video_id, discovered_videos(video_url, platform)")
                 .eq("id", review_id)
                 .single()
                 .execute()
@@ -120,17 +113,10 @@ async def review_decide(
                 row = review_row.data
                 video_url = ""
                 platform = ""
-                if row.get("video_id"):
-                    vid = (
-                        db.table("discovered_videos")
-                        .select("video_url, platform")
-                        .eq("id", row["video_id"])
-                        .single()
-                        .execute()
-                    )
-                    if vid.data:
-                        video_url = vid.data.get("video_url", "")
-                        platform = vid.data.get("platform", "")
+                vid = row.get("discovered_videos")
+                if vid:
+                    video_url = vid.get("video_url", "")
+                    platform = vid.get("platform", "")
                 queue = TaskQueue(db)
                 queue.on_comment_approved(
                     review_id=review_id,
@@ -148,8 +134,10 @@ async def review_decide(
 async def review_history(
     user: CurrentUser,
     date: str | None = Query(None, description="ISO date YYYY-MM-DD"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
 ):
-    db = get_supabase_admin()
+    db = get_supabase_admin(asynchronous=True)
 
     query = (
         db.table("review_queue")
@@ -159,8 +147,10 @@ async def review_history(
     if date:
         query = query.gte("decided_at", f"{date}T00:00:00").lt("decided_at", f"{date}T23:59:59")
 
-    result = query.order("decided_at", desc=True).limit(100).execute()
-    rows = result.data or []
+    try:
+        rows, next_cursor = await paginate_async(query, "decided_at", limit=limit, cursor=cursor, desc=True)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     items = [
         ReviewHistoryItem(
@@ -194,4 +184,5 @@ async def review_history(
             rejected=rejected,
             avg_time_seconds=round(avg_time, 1),
         ),
+        next_cursor=next_cursor,
     )
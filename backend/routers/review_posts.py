@@ -6,9 +6,10 @@ import logging
 from typing import Optional, List
 from datetime import datetime, timezone
 from pydantic import BaseModel
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 
 from db.connection import get_supabase_admin
+from db.pagination import InvalidCursor, paginate
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["jen"])
@@ -97,25 +98,32 @@ async def add_to_review_queue(post: ReviewPostCreate):
 
 
 @router.get("/api/v1/jen/review-posts")
-async def get_review_posts(status: str = "all"):
+async def get_review_posts(
+    status: str = "all",
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
     """
-    Get posts from review queue.
+    Get posts from review queue, newest first.
     
-    Filter by status: all, pending, draft, approved
+    Filter by status: all, pending, draft, approved. Pass the returned
+    next_cursor back as cursor to fetch the following page.
     """
     
     db = get_supabase_admin()
     
     try:
-        query = db.table("review_posts").select("*").order("created_at", desc=True)
+        query = db.table("review_posts").select("*")
         
         if status != "all":
             query = query.eq("status", status)
         
-        result = query.execute()
+        posts, next_cursor = paginate(query, "created_at", limit=limit, cursor=cursor, desc=True)
         
-        return {"posts": result.data}
+        return {"posts": posts, "next_cursor": next_cursor}
     
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get review posts: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -82,6 +82,8 @@ async def update_voice_config(body: VoiceConfigUpdateRequest, user: dict = requi
     else:
         db.table("voice_config").insert(update_data).execute()
 
+    from services.ai.brand_voice import invalidate_voice_config
+    invalidate_voice_config()
     return await get_voice_config(user)
 
 
@@ -60,3 +60,4 @@ class ReviewHistoryStats(BaseModel):
 class ReviewHistoryResponse(BaseModel):
     items: list[ReviewHistoryItem] = []
     stats: ReviewHistoryStats = ReviewHistoryStats()
+    next_cursor: str | None = None
@@ -0,0 +1,76 @@
+"""Measure recall@k and latency of the IVF index against brute-force search.
+
+Builds a synthetic corpus of normalised vectors drawn around ``--clusters``
+topics (real chunk embeddings cluster by topic, uniform noise does not),
+trains the index, and for each ``nprobe`` reports recall@k against an exact
+scan over the same matrix, plus mean query latency for both.
+
+Usage:
+    python -m scripts.bench_ann_recall --sizes 10000 100000 --dims 1536 --nprobe 1 4 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from services.ai.ann_index import IVFIndex, _top
+from services.ai.vector_store import _normalize
+
+
+def _corpus(n: int, dims: int, clusters: int, spread: float, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dims)).astype(np.float32)
+    out = np.empty((n, dims), dtype=np.float32)
+    for start in range(0, n, 10000):
+        m = min(10000, n - start)
+        noise = rng.standard_normal((m, dims)).astype(np.float32)
+        out[start : start + m] = centers[rng.integers(clusters, size=m)] + spread * noise
+    return _normalize(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--spread", type=float, default=1.0,
+                        help="noise around each topic centre (higher = harder)")
+    parser.add_argument("--nlist", type=int, default=0, help="0 means sqrt(n)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32])
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        corpus = _corpus(size + args.queries, args.dims, args.clusters, args.spread, rng)
+        matrix, queries = corpus[:size], corpus[size:]
+
+        index = IVFIndex(nlist=args.nlist, min_vectors=0)
+        started = time.perf_counter()
+        centroids = index.fit(matrix)
+        index.install(centroids, index.nearest(matrix, centroids), size)
+        train_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        truth = [set(_top(matrix @ q, args.k)) for q in queries]
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        print(f"\n{size:,} vectors x {args.dims} dims, {len(centroids)} lists, "
+              f"trained in {train_s:.1f}s; exact scan {exact_ms:.2f} ms/query")
+        print(f"{'nprobe':>7}  {'recall@' + str(args.k):>10}  {'ms/query':>9}  {'speedup':>8}")
+        for nprobe in args.nprobe:
+            hits = 0
+            started = time.perf_counter()
+            for q, expected in zip(queries, truth):
+                found, _ = index.search(matrix, q, args.k, nprobe)
+                hits += len(expected & set(found.tolist()))
+            ann_ms = (time.perf_counter() - started) * 1000 / len(queries)
+            recall = hits / (args.k * len(queries))
+            print(f"{nprobe:>7}  {recall:>10.3f}  {ann_ms:>9.2f}  {exact_ms / ann_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Mixed dashboard and worker traffic against the sync and async DB clients.
+
+Replays dashboard-overview style requests interleaved with worker
+kill-switch polls on one event loop at a fixed arrival rate, first calling the blocking client
+directly from the coroutines (as the routers used to) and then awaiting the
+``AsyncClient``. Reports wall time, request latency percentiles and the worst
+event-loop stall seen by a 5 ms heartbeat.
+
+SQLite answers in microseconds, so ``--rtt-ms`` adds a simulated network
+round trip to every ``execute()``; pass ``--database-url`` to measure a real
+Postgres instead.
+
+Usage:
+    python -m scripts.bench_async_db --requests 200 --rate 200 --rtt-ms 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from db import sqlite_store
+from db.async_client import AsyncClient
+
+PLATFORMS = ("x", "tiktok", "instagram")
+
+
+def _seed(db, rows: int) -> None:
+    now = datetime.now(timezone.utc)
+    rng = random.Random(0)
+    engagements = db.table("engagements").insert([
+        {
+            "platform": PLATFORMS[i % 3],
+            "posted_at": (now - timedelta(minutes=rng.randint(0, 60 * 48))).isoformat(),
+        }
+        for i in range(rows)
+    ]).execute()
+    db.table("engagement_metrics").insert([
+        {"engagement_id": e["id"], "likes": rng.randint(0, 50), "replies": rng.randint(0, 5)}
+        for e in engagements.data
+    ]).execute()
+    db.table("review_queue").insert([
+        {"proposed_text": "draft", "risk_score": rng.randint(0, 100)} for _ in range(rows // 10)
+    ]).execute()
+    db.table("system_config").upsert(
+        {"key": "kill_switch", "value": {"active": False}}, on_conflict="key"
+    ).execute()
+
+
+class _SlowClient:
+    """Adds a fixed round-trip delay to every ``execute()``."""
+
+    def __init__(self, client, rtt: float):
+        self._client = client
+        self._rtt = rtt
+
+    def table(self, name: str):
+        builder = self._client.table(name)
+        execute = builder.execute
+
+        def slow_execute():
+            time.sleep(self._rtt)
+            return execute()
+
+        builder.execute = slow_execute
+        return builder
+
+
+def _dashboard_queries(db, since: str):
+    return [
+        db.table("engagements").select("platform, count()"),
+        db.table("engagement_metrics")
+        .select("likes:likes.sum(), replies:replies.sum()")
+        .latest_per("engagement_id", "checked_at"),
+        db.table("review_queue").select("count()").is_("decision", "null"),
+        db.table("engagements").select("platform, count()").bucket("posted_at", "hour").gte("posted_at", since),
+    ]
+
+
+def _kill_switch_query(db):
+    return db.table("system_config").select("value").eq("key", "kill_switch").single()
+
+
+async def _run_mix(db, run, requests: int, polls: int, rate: float) -> dict:
+    since = (datetime.now(timezone.utc) - timedelta(hours=21)).isoformat()
+    latencies: list[float] = []
+    stall = 0.0
+    done = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal stall
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stall = max(stall, time.perf_counter() - started - 0.005)
+
+    # Open-loop arrivals: latency is measured from when the request was due,
+    # so time spent waiting on a blocked event loop is counted
+    t0 = time.perf_counter()
+
+    async def dashboard(arrival: float):
+        await asyncio.sleep(arrival)
+        for query in _dashboard_queries(db, since):
+            await run(query)
+        latencies.append(time.perf_counter() - t0 - arrival)
+
+    async def worker_poll(arrival: float):
+        await asyncio.sleep(arrival)
+        await run(_kill_switch_query(db))
+
+    kinds = [dashboard] * requests + [worker_poll] * polls
+    random.Random(1).shuffle(kinds)
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.gather(*(job(i / rate) for i, job in enumerate(kinds)))
+    wall = time.perf_counter() - t0
+    done.set()
+    await beat
+
+    latencies.sort()
+    return {
+        "wall_s": wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_stall_ms": stall * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--polls", type=int, default=200, help="worker kill-switch polls")
+    parser.add_argument("--rate", type=float, default=200, help="arrivals per second")
+    parser.add_argument("--workers", type=int, default=10, help="async thread pool / PG pool size")
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        from db.postgres_store import PostgresClient, init_postgres_db
+
+        sync_db = PostgresClient(args.database_url, pool_max_size=args.workers)
+        init_postgres_db(args.database_url, client=sync_db)
+    else:
+        sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+        sqlite_store.init_sqlite_db()
+        sync_db = sqlite_store.SQLiteClient()
+        if args.rtt_ms:
+            sync_db = _SlowClient(sync_db, args.rtt_ms / 1000)
+    _seed(sync_db, args.rows)
+    async_db = AsyncClient(sync_db, max_workers=args.workers)
+
+    async def run_sync(query):
+        return query.execute()
+
+    async def run_async(query):
+        return await query.execute()
+
+    print(
+        f"{args.requests} dashboard requests + {args.polls} kill-switch polls, "
+        f"at {args.rate:g}/s, {args.workers} workers, rtt {args.rtt_ms} ms"
+    )
+    print(f"{'client':>8}  {'wall':>9}  {'p50':>10}  {'p95':>10}  {'max stall':>10}")
+    for name, db, run in (("sync", sync_db, run_sync), ("async", async_db, run_async)):
+        stats = asyncio.run(_run_mix(db, run, args.requests, args.polls, args.rate))
+        print(
+            f"{name:>8}  {stats['wall_s']:>7.2f} s  {stats['p50_ms']:>7.1f} ms"
+            f"  {stats['p95_ms']:>7.1f} ms  {stats['max_stall_ms']:>7.1f} ms"
+        )
+    async_db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Measure dashboard and stats latency as the tables grow.
+
+Seeds a scratch SQLite database with increasing numbers of discovered videos
+and engagements, then times the dashboard overview, hub stats, risk analytics
+and feedback stats handlers at each size. With aggregation pushed into SQL the
+per-request time should stay roughly flat instead of growing with row count.
+
+Usage:
+    python -m scripts.bench_dashboard_aggregates --sizes 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import db.connection as connection
+from db import sqlite_store
+
+PLATFORMS = ("x", "tiktok", "instagram")
+TAGS = [f"#tag{i}" for i in range(200)]
+
+
+def _seed(db, start: int, end: int) -> None:
+    now = datetime.now(timezone.utc)
+    rng = random.Random(start)
+    for chunk in range(start, end, 5000):
+        n = min(5000, end - chunk)
+        db.table("discovered_videos").insert([
+            {
+                "platform": PLATFORMS[i % 3],
+                "video_url": f"https://example.com/v/{chunk + i}",
+                "likes": rng.randint(0, 5000),
+                "shares": rng.randint(0, 500),
+                "hashtags": rng.sample(TAGS, 3),
+                "description": f"video {chunk + i}",
+            }
+            for i in range(n)
+        ]).execute()
+        engagements = db.table("engagements").insert([
+            {
+                "platform": PLATFORMS[i % 3],
+                "posted_at": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))).isoformat(),
+                "risk_score": rng.randint(0, 100),
+                "approval_path": "auto" if i % 2 else "review",
+            }
+            for i in range(n)
+        ]).execute()
+        db.table("engagement_metrics").insert([
+            {"engagement_id": e["id"], "likes": rng.randint(0, 50), "replies": rng.randint(0, 5)}
+            for e in engagements.data
+        ]).execute()
+        db.table("risk_scores").insert([
+            {
+                "total_score": rng.randint(0, 100),
+                "routing_decision": rng.choice(("auto", "review", "block")),
+                "scored_at": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))).isoformat(),
+            }
+            for _ in range(n)
+        ]).execute()
+        db.table("comment_feedback").insert([
+            {"comment_text": "c", "decision": rng.choice(("approved", "denied"))} for _ in range(n)
+        ]).execute()
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    connection.init_clients()
+    db = connection.get_supabase_admin()
+
+    from routers.dashboard import dashboard_overview
+    from routers.hubs import hub_stats
+    from schemas.dashboard import Timeframe
+    from services.ai.feedback_loop import FeedbackLoopService
+    from services.ai.risk_scorer import RiskScorer
+
+    scorer = RiskScorer.__new__(RiskScorer)
+    week_ago = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+    feedback = FeedbackLoopService()
+    handlers = {
+        "dashboard_overview": lambda: asyncio.run(dashboard_overview(timeframe=Timeframe.day)),
+        "hub_stats(x)": lambda: asyncio.run(hub_stats("x", None)),
+        "risk_analytics(7d)": lambda: scorer.get_risk_analytics(week_ago, "2999-01-01"),
+        "feedback_stats": feedback.get_stats,
+    }
+
+    print(f"{'rows':>8}  " + "  ".join(f"{name:>18}" for name in handlers))
+    seeded = 0
+    for size in sorted(args.sizes):
+        _seed(db, seeded, size)
+        seeded = size
+        timings = [_time(fn, args.repeat) for fn in handlers.values()]
+        print(f"{size:>8}  " + "  ".join(f"{ms:>15.1f} ms" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Compare embedding storage formats: JSON text, float32 BLOB and int8 BLOB.
+
+Seeds a scratch SQLite ``brand_voice_embeddings`` table with the same
+clustered corpus in each format, then reports:
+
+* ``bytes/vec``: average stored size of the ``embedding`` column;
+* ``load``: a cold vector store sync (fetch every row + build the matrix);
+* ``recall@k``: overlap of each format's top-k with the JSON ranking;
+* ``max err``: largest cosine similarity difference against JSON.
+
+Usage:
+    python -m scripts.bench_embedding_storage --sizes 10000 50000 --dims 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from db import sqlite_store
+from scripts.bench_ann_recall import _corpus
+from scripts.bench_vector_search import _EMBEDDINGS_DDL
+from services.ai.vector_codec import encode_vector
+from services.ai.vector_store import VectorStore
+
+FORMATS = ("json", "float32", "int8")
+
+
+def _seed(corpus: np.ndarray, fmt: str) -> int:
+    """Fill the table with ``corpus`` in ``fmt``; returns the stored embedding bytes."""
+    conn = sqlite_store._get_conn()
+    conn.execute("DROP TABLE IF EXISTS brand_voice_embeddings")
+    conn.execute(_EMBEDDINGS_DDL)
+    for start in range(0, len(corpus), 2000):
+        block = corpus[start : start + 2000]
+        conn.executemany(
+            "INSERT INTO brand_voice_embeddings (document_name, chunk_text, chunk_index, embedding)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (
+                    "voice.md",
+                    f"chunk {start + i}",
+                    start + i,
+                    json.dumps(v.tolist()) if fmt == "json" else encode_vector(v, fmt),
+                )
+                for i, v in enumerate(block)
+            ],
+        )
+    conn.commit()
+    return conn.execute("SELECT SUM(length(embedding)) FROM brand_voice_embeddings").fetchone()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=100)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    db = sqlite_store.SQLiteClient()
+    rng = np.random.default_rng(0)
+
+    for size in args.sizes:
+        corpus = _corpus(size + args.queries, args.dims, args.clusters, 1.0, rng)
+        corpus, queries = corpus[:size], corpus[size:]
+        print(f"\n{size:,} vectors x {args.dims} dims, recall@{args.k} over {args.queries} queries")
+        print(f"{'format':>8}  {'bytes/vec':>10}  {'load':>9}  {'recall':>7}  {'max err':>8}")
+        baseline: list[list[dict]] | None = None
+        for fmt in FORMATS:
+            stored = _seed(corpus, fmt)
+            store = VectorStore(sync_interval=0)
+            started = time.perf_counter()
+            store.sync(db)
+            load_ms = (time.perf_counter() - started) * 1000
+            results = [store.search(q.tolist(), args.k, -1.0, exact=True) for q in queries]
+            if baseline is None:
+                baseline = results
+            hits = err = 0.0
+            for got, want in zip(results, baseline):
+                hits += len({r["id"] for r in got} & {r["id"] for r in want})
+                want_scores = {r["id"]: r["similarity"] for r in want}
+                err = max(err, max(
+                    (abs(r["similarity"] - want_scores[r["id"]]) for r in got if r["id"] in want_scores),
+                    default=0.0,
+                ))
+            recall = hits / (args.k * len(queries))
+            print(f"{fmt:>8}  {stored / size:>10,.0f}  {load_ms:>7.0f}ms  {recall:>7.3f}  {err:>8.5f}")
+
+
+if __name__ == "__main__":
+    main()
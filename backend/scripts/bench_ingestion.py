@@ -0,0 +1,121 @@
+"""Compare serial brand voice ingestion with the pipelined ingestor.
+
+Ingests the Markdown files of the Jen and Alex corpora
+(``services/jen``, ``services/alex``) into a scratch SQLite database, with
+the embeddings API replaced by a stub that costs ``--latency-ms`` per
+request plus ``--per-text-ms`` per input (no network; vectors are fixed).
+
+* ``serial``: the previous path, one file at a time: chunk, one embed call
+  for the whole file, then ``store_embedding`` per chunk;
+* ``pipeline``: ``IngestionPipeline`` with the given batch size and
+  embed concurrency, with progress printed as it goes.
+
+Usage:
+    python -m scripts.bench_ingestion --batch-size 256 --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from db import sqlite_store
+from scripts.bench_vector_search import _EMBEDDINGS_DDL
+from services.ai.brand_voice import BrandVoiceService
+from services.ai.embedding_cache import EmbeddingCache
+from services.ai.embeddings import EMBEDDING_DIM, EmbeddingsService
+from services.ai.ingestion import IngestionPipeline, IngestProgress
+from services.ai.vector_store import reset_vector_store
+
+_SERVICES = Path(__file__).resolve().parent.parent / "services"
+CORPORA = {"jen": _SERVICES / "jen", "alex": _SERVICES / "alex"}
+
+
+def _service(latency_s: float, per_text_s: float) -> BrandVoiceService:
+    vector = [0.01] * EMBEDDING_DIM
+    embeddings = EmbeddingsService(api_key="bench", cache=EmbeddingCache(":memory:"))
+
+    async def fake_request(texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(latency_s + per_text_s * len(texts))
+        return [vector] * len(texts)
+
+    embeddings._request_embeddings = fake_request
+    return BrandVoiceService(embeddings_service=embeddings)
+
+
+def _reset_table() -> None:
+    conn = sqlite_store._get_conn()
+    conn.execute("DROP TABLE IF EXISTS brand_voice_embeddings")
+    conn.execute(_EMBEDDINGS_DDL)
+    conn.commit()
+    reset_vector_store()
+
+
+async def _serial(service: BrandVoiceService, paths: list[Path]) -> int:
+    total = 0
+    for path in paths:
+        chunks = service._chunk_file(path)
+        vectors = await service.embeddings.batch_create_embeddings([c["text"] for c in chunks])
+        for idx, (chunk, vector) in enumerate(zip(chunks, vectors)):
+            service.embeddings.store_embedding(path.name, chunk["text"], idx, vector, chunk["metadata"])
+        total += len(chunks)
+    return total
+
+
+def _print_progress(progress: IngestProgress) -> None:
+    print(
+        f"\r    {progress.files_done}/{progress.files_total} files, "
+        f"{progress.chunks_stored:,}/{progress.chunks_pending:,} chunks, "
+        f"{progress.chunks_per_second:,.0f} chunks/s",
+        end="",
+        flush=True,
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    for name, directory in CORPORA.items():
+        paths = sorted(directory.glob("*.md"))
+        size = sum(p.stat().st_size for p in paths)
+        print(f"\n{name}: {len(paths)} files, {size / 1024:,.0f} KB")
+
+        _reset_table()
+        started = time.perf_counter()
+        chunks = await _serial(_service(args.latency_ms / 1000, args.per_text_ms / 1000), paths)
+        serial_s = time.perf_counter() - started
+        print(f"  serial    {chunks:>6,} chunks in {serial_s:6.2f}s  {chunks / serial_s:>8,.0f} chunks/s")
+
+        _reset_table()
+        service = _service(args.latency_ms / 1000, args.per_text_ms / 1000)
+        pipeline = IngestionPipeline(
+            service,
+            read_workers=args.read_workers,
+            batch_size=args.batch_size,
+            embed_concurrency=args.concurrency,
+            progress=_print_progress,
+        )
+        report = await pipeline.run(paths)
+        print(
+            f"\r  pipeline  {report.chunks:>6,} chunks in {report.elapsed:6.2f}s  "
+            f"{report.chunks_per_second:>8,.0f} chunks/s  ({serial_s / report.elapsed:.1f}x)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--read-workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--per-text-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
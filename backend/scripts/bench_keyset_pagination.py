@@ -0,0 +1,84 @@
+"""Compare OFFSET paging with keyset paging on a large review_posts table.
+
+Seeds a scratch SQLite database, then times fetching page N both ways:
+``range()`` (LIMIT/OFFSET) re-reads every earlier row, while ``paginate()``
+seeks straight to the cursor through the (created_at, id) index.
+
+Usage:
+    python -m scripts.bench_keyset_pagination --rows 1000000 --page-size 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from db import sqlite_store
+from db.pagination import encode_cursor, paginate
+
+
+def _seed(db, rows: int) -> None:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for chunk in range(0, rows, 20000):
+        db.table("review_posts").insert([
+            {
+                "post_id": f"p{i}",
+                "text": "bench",
+                "status": "pending",
+                # Second resolution, so neighbouring rows share timestamps
+                "created_at": (start + timedelta(seconds=i // 3)).isoformat(),
+            }
+            for i in range(chunk, min(chunk + 20000, rows))
+        ]).execute()
+
+
+def _ms(fn, repeat: int = 5) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    db = sqlite_store.SQLiteClient()
+    _seed(db, args.rows)
+    size = args.page_size
+
+    print(f"{args.rows:,} rows, page size {size}")
+    print(f"{'page':>8}  {'offset':>10}  {'keyset':>10}")
+    last_page = args.rows // size - 1
+    for page in sorted({0, 10, 1000, last_page // 2, last_page}):
+        offset_ms = _ms(lambda: (
+            db.table("review_posts").select("*")
+            .order("created_at", desc=True).order("id", desc=True)
+            .range(page * size, page * size + size - 1).execute()
+        ))
+        cursor = None
+        if page:
+            # The cursor a client would hold after reading the previous page
+            boundary = (
+                db.table("review_posts").select("id, created_at")
+                .order("created_at", desc=True).order("id", desc=True)
+                .range(page * size - 1, page * size - 1).execute().data[0]
+            )
+            cursor = encode_cursor(boundary)
+        keyset_ms = _ms(lambda: paginate(
+            db.table("review_posts").select("*"), "created_at",
+            limit=size, cursor=cursor, desc=True,
+        ))
+        print(f"{page:>8}  {offset_ms:>7.2f} ms  {keyset_ms:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark retrieval and drift scoring end to end with the local embedding backend.
+
+No network: ``EmbeddingsService`` runs on ``HashingProvider``, and the
+brand voice table lives in a scratch SQLite database. Ingests the Markdown
+files of ``--corpus`` (default: the Jen corpus) through the ingestion
+pipeline, then times:
+
+* ``embed``: raw ``HashingProvider`` throughput;
+* ``retrieve``: ``RAGService.retrieve_context`` per query;
+* ``both``: ``get_voice_context`` plus ``retrieve_context`` for the same
+  query, separately and sharing one ``RetrievalSession``;
+* ``hybrid``: ``EmbeddingsService.search_hybrid`` per query (BM25 and
+  vectors fused), and per exact-term query (two-word phrases from the
+  corpus, answered lexically), with embedding calls counted;
+* ``drift``: ``VoiceDriftMonitor.compute_drift_score`` per comment, and
+  ``compute_drift_scores`` over every query at once.
+
+Queries and comments are sentences sampled from the corpus itself.
+
+Usage:
+    python -m scripts.bench_local_retrieval --dim 384 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from db import sqlite_store
+from scripts.bench_vector_search import _EMBEDDINGS_DDL
+from services.ai.brand_voice import BrandVoiceService
+from services.ai.embedding_cache import EmbeddingCache
+from services.ai.embedding_providers import HashingProvider
+from services.ai.embeddings import EmbeddingsService
+from services.ai.ingestion import IngestionPipeline
+from services.ai.rag import RAGService
+from services.ai.voice_drift import VoiceDriftMonitor
+
+_DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "services" / "jen"
+
+
+def _sentences(paths: list[Path], count: int, rng: random.Random) -> list[str]:
+    text = " ".join(p.read_text(encoding="utf-8") for p in paths)
+    candidates = [s.strip() for s in re.split(r"[.!?\n]", text) if 40 <= len(s.strip()) <= 200]
+    return rng.sample(candidates, min(count, len(candidates)))
+
+
+async def _per_call_ms(fn, items: list[str]) -> float:
+    started = time.perf_counter()
+    for item in items:
+        await fn(item)
+    return (time.perf_counter() - started) * 1000 / len(items)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    paths = sorted(Path(args.corpus).glob("*.md"))
+    provider = HashingProvider(dim=args.dim)
+    embeddings = EmbeddingsService(provider=provider, cache=EmbeddingCache(":memory:"))
+    brand_voice = BrandVoiceService(embeddings_service=embeddings)
+    rng = random.Random(0)
+    queries = _sentences(paths, args.queries, rng)
+
+    started = time.perf_counter()
+    await provider.embed(queries)
+    embed_rate = len(queries) / (time.perf_counter() - started)
+
+    report = await IngestionPipeline(brand_voice, progress=lambda p: None).run(paths)
+    print(f"{len(paths)} files, {report.chunks:,} chunks, dim {args.dim}")
+    print(f"  ingest    {report.elapsed:8.2f}s  ({report.chunks_per_second:,.0f} chunks/s)")
+    print(f"  embed     {embed_rate:8,.0f} texts/s")
+
+    rag = RAGService(brand_voice_service=brand_voice, embeddings_service=embeddings)
+    retrieve_ms = await _per_call_ms(lambda q: rag.retrieve_context(q, "tiktok"), queries)
+    print(f"  retrieve  {retrieve_ms:8.2f} ms/query")
+
+    async def both(query: str, shared: bool) -> None:
+        session = rag.session(query) if shared else None
+        await brand_voice.get_voice_context(query, "tiktok", session=session)
+        await rag.retrieve_context(query, "tiktok", session=session)
+
+    separate_ms = await _per_call_ms(lambda q: both(q, shared=False), queries)
+    shared_ms = await _per_call_ms(lambda q: both(q, shared=True), queries)
+    print(f"  both      {separate_ms:8.2f} ms/query separately, {shared_ms:.2f} ms/query in one session")
+
+    phrases = [" ".join(q.split()[:2]) for q in queries]
+    embedded = 0
+    create_embedding = embeddings.create_embedding
+
+    async def counting(text: str) -> list[float]:
+        nonlocal embedded
+        embedded += 1
+        return await create_embedding(text)
+
+    embeddings.create_embedding = counting
+    hybrid_ms = await _per_call_ms(lambda q: embeddings.search_hybrid(q), queries)
+    print(f"  hybrid    {hybrid_ms:8.2f} ms/query, {embedded / len(queries):.2f} embeddings/query")
+    embedded = 0
+    exact_ms = await _per_call_ms(lambda q: embeddings.search_hybrid(q), phrases)
+    print(f"  exact     {exact_ms:8.2f} ms/query, {embedded / len(phrases):.2f} embeddings/query")
+    embeddings.create_embedding = create_embedding
+
+    drift = VoiceDriftMonitor(embeddings_service=embeddings, brand_voice_service=brand_voice)
+    comments = queries[: args.comments]
+    drift_ms = await _per_call_ms(drift.compute_drift_score, comments)
+    print(f"  drift     {drift_ms:8.2f} ms/comment")
+
+    started = time.perf_counter()
+    await drift.compute_drift_scores(queries)
+    batch_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    print(f"  drift x{len(queries)} {batch_ms:6.2f} ms/comment (compute_drift_scores)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", default=str(_DEFAULT_CORPUS))
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--comments", type=int, default=20)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    conn = sqlite_store._get_conn()
+    conn.execute(_EMBEDDINGS_DDL)
+    conn.commit()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
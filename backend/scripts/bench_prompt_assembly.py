@@ -0,0 +1,79 @@
+"""Measure system prompts assembled per second, with and without the compiled prefix.
+
+Uses the real brand-voice files and a scratch SQLite database (so the
+feedback section runs its query against an empty table). Voice context
+retrieval is replaced by fixed chunks: only prompt assembly (and packing
+into the token budget) is timed.
+
+* ``uncached``: every prompt re-reads and re-parses the brand-voice files,
+  as ``assemble_system_prompt`` did before the prefix cache;
+* ``cached``: ``assemble_system_prompt`` reusing the compiled prefix (one
+  ``stat`` per source file per call to check it is still current).
+
+Platforms are cycled so every prefix is exercised.
+
+Usage:
+    python -m scripts.bench_prompt_assembly --prompts 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from db import sqlite_store
+from services.ai.brand_voice import BrandVoiceService
+from services.ai.rag import PLATFORM_CHAR_LIMITS, RAGService
+
+VIDEO_CONTEXT = {"description": "Budget tips for 2026", "classification": "finance-relevant"}
+
+
+async def _rate(rag: RAGService, prompts: int, cached: bool) -> float:
+    platforms = list(PLATFORM_CHAR_LIMITS)
+    started = time.perf_counter()
+    for i in range(prompts):
+        if not cached:
+            rag._prefixes.clear()
+        await rag.assemble_system_prompt(platforms[i % len(platforms)], VIDEO_CONTEXT)
+    return prompts / (time.perf_counter() - started)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    brand_voice = BrandVoiceService(embeddings_service=MagicMock())
+
+    async def voice_chunks(query: str, platform: str | None = None, session=None) -> list[dict]:
+        return [
+            {"chunk_text": f"Relevant brand voice context {i}.", "similarity": 0.9 - i * 0.05}
+            for i in range(8)
+        ]
+
+    brand_voice.get_voice_chunks = voice_chunks
+    rag = RAGService(brand_voice_service=brand_voice, embeddings_service=brand_voice.embeddings)
+    packed = await rag.assemble_packed_prompt("tiktok", VIDEO_CONTEXT)
+    print(
+        f"prompt: {len(packed.text):,} chars, prefix {len(rag.compiled_prefix('tiktok')):,} chars, "
+        f"~{packed.tokens:,}/{packed.budget:,} tokens, {packed.dropped_tokens:,} dropped"
+    )
+
+    uncached = await _rate(rag, args.prompts, cached=False)
+    cached = await _rate(rag, args.prompts, cached=True)
+    print(f"  uncached  {uncached:10,.0f} prompts/s")
+    print(f"  cached    {cached:10,.0f} prompts/s  ({cached / uncached:.1f}x)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=2000)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Measure SQLite ``_do_select`` throughput on wide tables.
+
+Seeds a scratch database with wide ``review_posts`` rows (free text, some of
+it starting with ``[`` or ``{``) and a ``brand_voice_embeddings`` table with
+JSON-encoded vectors, then times full-row selects where the caller touches
+only a few fields versus every field. Row decoding cost dominates these
+queries, so this is where schema-aware lazy decoding shows up.
+
+Usage:
+    python -m scripts.bench_row_decoding --rows 20000 --dims 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from db import sqlite_store
+
+_EMBEDDINGS_DDL = """
+    CREATE TABLE IF NOT EXISTS brand_voice_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_name TEXT,
+        chunk_text TEXT,
+        chunk_index INTEGER,
+        embedding TEXT,
+        metadata TEXT DEFAULT '{}'
+    )
+"""
+
+
+def _seed(db, rows: int, dims: int) -> None:
+    rng = random.Random(0)
+    for chunk in range(0, rows, 5000):
+        n = min(5000, rows - chunk)
+        db.table("review_posts").insert([
+            {
+                "post_id": f"p{chunk + i}",
+                "author": f"user{i}",
+                # Tweets that look like JSON used to get speculatively parsed
+                "text": "[thread] " * 3 + "x" * 200 if i % 3 == 0 else "plain tweet " * 20,
+                "reasoning": "{draft} " + "y" * 150,
+                "angle_summary": "z" * 120,
+                "likes": i,
+                "status": "pending",
+            }
+            for i in range(n)
+        ]).execute()
+    conn = sqlite_store._get_conn()
+    conn.execute(_EMBEDDINGS_DDL)
+    conn.commit()
+    for chunk in range(0, rows // 4, 1000):
+        n = min(1000, rows // 4 - chunk)
+        db.table("brand_voice_embeddings").insert([
+            {
+                "document_name": "voice.md",
+                "chunk_text": "chunk " * 40,
+                "chunk_index": chunk + i,
+                "embedding": [rng.random() for _ in range(dims)],
+                "metadata": {"section": "tone"},
+            }
+            for i in range(n)
+        ]).execute()
+
+
+def _rows_per_sec(fn, repeat: int) -> float:
+    fn()  # warm-up
+    started = time.perf_counter()
+    rows = 0
+    for _ in range(repeat):
+        rows += fn()
+    return rows / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    db = sqlite_store.SQLiteClient()
+    _seed(db, args.rows, args.dims)
+
+    def few_fields(table: str, keys: tuple[str, ...]):
+        def run() -> int:
+            rows = db.table(table).select("*").execute().data
+            for row in rows:
+                for key in keys:
+                    row.get(key)
+            return len(rows)
+        return run
+
+    def all_fields(table: str):
+        def run() -> int:
+            rows = db.table(table).select("*").execute().data
+            for row in rows:
+                list(row.values())
+            return len(rows)
+        return run
+
+    cases = {
+        "review_posts *, read 2 fields": few_fields("review_posts", ("id", "status")),
+        "review_posts *, read all": all_fields("review_posts"),
+        "embeddings *, read chunk_text": few_fields("brand_voice_embeddings", ("chunk_text",)),
+        "embeddings *, read embedding": few_fields("brand_voice_embeddings", ("embedding",)),
+    }
+    print(f"{args.rows:,} review_posts, {args.rows // 4:,} embeddings x {args.dims} dims")
+    for name, fn in cases.items():
+        print(f"{name:>34}  {_rows_per_sec(fn, args.repeat):>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Compare brand voice similarity search: per-row Python vs the NumPy vector store.
+
+Seeds a scratch SQLite database with ``brand_voice_embeddings`` rows of
+random Gaussian vectors at each size, then times:
+
+* ``python``: the old fallback, fetching every row and scoring it with
+  ``_cosine_similarity`` one at a time (skipped above ``--python-max``);
+* ``store load``: the vector store's first sync (fetch + build the matrix);
+* ``store warm``: a search on a loaded store, including its sync (which
+  probes the table every time with the default ``--sync-interval 0``);
+* ``store append``: a sync after inserting one new row.
+
+Usage:
+    python -m scripts.bench_vector_search --sizes 1000 10000 100000 --dims 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from db import sqlite_store
+from services.ai.embeddings import _cosine_similarity
+from services.ai.vector_store import VectorStore
+
+_EMBEDDINGS_DDL = """
+    CREATE TABLE IF NOT EXISTS brand_voice_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_name TEXT,
+        chunk_text TEXT,
+        chunk_index INTEGER,
+        embedding TEXT,
+        metadata TEXT DEFAULT '{}'
+    )
+"""
+
+
+def _vector(rng: random.Random, dims: int) -> list[float]:
+    return [round(rng.gauss(0, 1), 5) for _ in range(dims)]
+
+
+def _seed(rows: int, dims: int) -> None:
+    conn = sqlite_store._get_conn()
+    conn.execute("DROP TABLE IF EXISTS brand_voice_embeddings")
+    conn.execute(_EMBEDDINGS_DDL)
+    rng = np.random.default_rng(rows)
+    for start in range(0, rows, 2000):
+        block = rng.standard_normal((min(2000, rows - start), dims)).round(5)
+        conn.executemany(
+            "INSERT INTO brand_voice_embeddings (document_name, chunk_text, chunk_index, embedding)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                ("voice.md", f"chunk {start + i} " * 20, start + i, json.dumps(vector.tolist()))
+                for i, vector in enumerate(block)
+            ],
+        )
+    conn.commit()
+
+
+def _python_search(db, query: list[float], top_k: int, threshold: float) -> list[dict]:
+    """The fallback as it was: decode and score every row in Python."""
+    rows = (
+        db.table("brand_voice_embeddings")
+        .select("id,document_name,chunk_text,chunk_index,metadata,embedding")
+        .execute()
+        .data
+    )
+    scored = []
+    for row in rows:
+        sim = _cosine_similarity(query, row["embedding"])
+        if sim >= threshold:
+            scored.append({"id": row["id"], "similarity": sim})
+    scored.sort(key=lambda x: x["similarity"], reverse=True)
+    return scored[:top_k]
+
+
+def _ms(fn, repeat: int = 1) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dims", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--python-max", type=int, default=10000,
+                        help="skip the per-row Python path above this many chunks")
+    parser.add_argument("--sync-interval", type=float, default=0.0)
+    args = parser.parse_args()
+
+    sqlite_store.DB_PATH = Path(tempfile.mkdtemp()) / "bench.db"
+    sqlite_store.init_sqlite_db()
+    db = sqlite_store.SQLiteClient()
+    rng = random.Random(0)
+    query = _vector(rng, args.dims)
+
+    print(f"{args.dims} dims, top_k={args.top_k}")
+    print(f"{'chunks':>8}  {'python':>10}  {'store load':>10}  {'store warm':>10}  {'append':>8}  {'speedup':>8}")
+    for size in args.sizes:
+        _seed(size, args.dims)
+        store = VectorStore(sync_interval=args.sync_interval)
+        load_ms = _ms(lambda: store.sync(db))
+
+        def warm():
+            store.sync(db)
+            store.search(query, args.top_k, 0.0)
+
+        warm_ms = _ms(warm, args.queries)
+        if size <= args.python_max:
+            python_ms = _ms(lambda: _python_search(db, query, args.top_k, 0.0))
+            expected = [r["id"] for r in _python_search(db, query, args.top_k, 0.0)]
+            assert [r["id"] for r in store.search(query, args.top_k, 0.0)] == expected
+            python_col, speedup = f"{python_ms:>8.1f}ms", f"{python_ms / warm_ms:>7.0f}x"
+        else:
+            python_col, speedup = f"{'skipped':>10}", f"{'-':>8}"
+        db.table("brand_voice_embeddings").insert(
+            {"document_name": "new.md", "chunk_text": "new", "chunk_index": 0,
+             "embedding": _vector(rng, args.dims)}
+        ).execute()
+        append_ms = _ms(lambda: store.sync(db, force=True))
+        print(f"{size:>8,}  {python_col}  {load_ms:>8.1f}ms  {warm_ms:>8.2f}ms  {append_ms:>6.1f}ms  {speedup}")
+
+
+if __name__ == "__main__":
+    main()
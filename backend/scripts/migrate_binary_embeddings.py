@@ -0,0 +1,78 @@
+"""Rewrite stored embeddings from JSON text to the binary vector format.
+
+Walks ``brand_voice_embeddings`` and ``comment_embeddings`` in id order
+through the configured database client and re-encodes every row that is
+not already binary (``--format float32`` or ``int8``). Safe to re-run: rows
+already in a binary form are skipped. On PostgreSQL apply
+``db/migrations/008_binary_embeddings.sql`` first.
+
+Usage:
+    python -m scripts.migrate_binary_embeddings --format float32
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+
+from db.connection import get_supabase_admin
+from services.ai.vector_codec import decode_vector, encode_vector, is_binary
+
+logger = logging.getLogger(__name__)
+
+TABLES = ("brand_voice_embeddings", "comment_embeddings")
+PAGE_SIZE = 500
+
+
+def migrate_table(db, table: str, fmt: str, page_size: int = PAGE_SIZE) -> dict[str, int]:
+    """Re-encode ``table``'s non-binary embeddings; returns row and byte counts."""
+    counts = {"rows": 0, "converted": 0, "bytes_before": 0, "bytes_after": 0}
+    after = None
+    while True:
+        query = db.table(table).select("id,embedding")
+        if after is not None:
+            query = query.gt("id", after)
+        page = query.order("id").limit(page_size).execute().data or []
+        for row in page:
+            counts["rows"] += 1
+            value = row.get("embedding")
+            if value is None or is_binary(value):
+                continue
+            vector = decode_vector(value)
+            if vector is None:
+                logger.warning("Skipping %s %s: unreadable embedding", table, row["id"])
+                continue
+            blob = encode_vector(vector, fmt)
+            db.table(table).update({"embedding": blob}).eq("id", row["id"]).execute()
+            counts["converted"] += 1
+            # JSON columns come back decoded; re-encode to size what was stored
+            counts["bytes_before"] += len(value if isinstance(value, (str, bytes, memoryview)) else json.dumps(value))
+            counts["bytes_after"] += len(blob)
+        if len(page) < page_size:
+            return counts
+        after = page[-1]["id"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=("float32", "int8"), default="float32")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = get_supabase_admin()
+    for table in args.tables:
+        try:
+            counts = migrate_table(db, table, args.format)
+        except Exception as e:
+            print(f"{table}: skipped ({e})")
+            continue
+        print(
+            f"{table}: {counts['converted']:,} of {counts['rows']:,} rows converted, "
+            f"{counts['bytes_before']:,} -> {counts['bytes_after']:,} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
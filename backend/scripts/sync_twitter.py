@@ -190,13 +190,16 @@ def sync(data: dict) -> None:
 
         # Insert discovered_video (the tweet being replied to)
         hashtags = extract_hashtags(original_text)
-        cursor = conn.execute(
-            "INSERT INTO discovered_videos "
+        # video_url is unique, so several replies to one tweet share a row
+        conn.execute(
+            "INSERT OR IGNORE INTO discovered_videos "
             "(platform, video_url, creator, description, hashtags, status, engaged) "
             "VALUES (?, ?, ?, ?, ?, ?, ?)",
             ("x", video_url, f"@{creator_username}", original_text, json.dumps(hashtags), "engaged", 1),
         )
-        video_id = cursor.lastrowid
+        video_id = conn.execute(
+            "SELECT id FROM discovered_videos WHERE video_url = ?", (video_url,)
+        ).fetchone()[0]
 
         # Insert generated_comment (Cash Kitty's reply text)
         reply_text = reply.get("text", "")
@@ -306,15 +309,17 @@ def sync(data: dict) -> None:
     ).fetchall()
 
     now = datetime.now(timezone.utc).isoformat()
-    for i, proposal in enumerate(pending_proposals):
-        vid_id = all_videos[i % len(all_videos)]["id"] if all_videos else None
-        conn.execute(
-            "INSERT INTO review_queue "
-            "(video_id, proposed_text, risk_score, risk_reasoning, classification, queued_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (vid_id, proposal["text"], proposal["risk_score"],
-             proposal["reasoning"], proposal["classification"], now),
-        )
+    conn.executemany(
+        "INSERT INTO review_queue "
+        "(video_id, proposed_text, risk_score, risk_reasoning, classification, queued_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (all_videos[i % len(all_videos)]["id"] if all_videos else None,
+             proposal["text"], proposal["risk_score"],
+             proposal["reasoning"], proposal["classification"], now)
+            for i, proposal in enumerate(pending_proposals)
+        ],
+    )
 
     conn.commit()
 
@@ -0,0 +1,237 @@
+"""IVF-flat approximate nearest-neighbour index for the vector store.
+
+Vectors are clustered with spherical k-means into ``nlist`` lists; a query
+scores the centroids, then scans only the vectors in the ``nprobe`` closest
+lists. Raising ``nprobe`` trades latency for recall (``nprobe == nlist`` is an
+exact scan). The index stores list assignments by position in the vector
+store's matrix and never copies the vectors themselves.
+
+Training is the expensive step, so centroids and assignments (keyed by row
+id) are saved to an ``.npz`` file next to the database and reused on restart.
+New vectors are assigned to their nearest centroid as they arrive; the index
+retrains once the store has grown to ``RETRAIN_GROWTH`` times the size it was
+trained on.
+
+Configuration (environment):
+
+* ``VECTOR_INDEX``: ``ivf`` to enable, anything else keeps exact search;
+* ``VECTOR_INDEX_NLIST``: number of lists (default ``sqrt(n)``);
+* ``VECTOR_INDEX_NPROBE``: lists scanned per query (default 8);
+* ``VECTOR_INDEX_MIN_VECTORS``: below this, exact search is used (default 5000);
+* ``VECTOR_INDEX_PATH``: where to persist the index.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NPROBE = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+DEFAULT_NLIST = int(os.getenv("VECTOR_INDEX_NLIST", "0"))  # 0 means sqrt(n)
+MIN_VECTORS = int(os.getenv("VECTOR_INDEX_MIN_VECTORS", "5000"))
+RETRAIN_GROWTH = 2.0
+TRAIN_ITERATIONS = 10
+# k-means runs on at most this many vectors per list
+TRAIN_SAMPLE_PER_LIST = 64
+
+
+def default_index_path() -> Path:
+    if os.getenv("VECTOR_INDEX_PATH"):
+        return Path(os.environ["VECTOR_INDEX_PATH"])
+    from db import sqlite_store
+
+    return sqlite_store.DB_PATH.parent / "brand_voice.ivf.npz"
+
+
+def index_from_env() -> IVFIndex | None:
+    """The index configured by ``VECTOR_INDEX``, or ``None`` for exact search."""
+    if os.getenv("VECTOR_INDEX", "").lower() != "ivf":
+        return None
+    return IVFIndex(path=default_index_path())
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores, best first."""
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class IVFIndex:
+    """Inverted-file index over the rows of a normalised embedding matrix."""
+
+    def __init__(
+        self,
+        nlist: int = DEFAULT_NLIST,
+        nprobe: int = DEFAULT_NPROBE,
+        min_vectors: int = MIN_VECTORS,
+        path: Path | None = None,
+        seed: int = 0,
+    ):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_vectors = min_vectors
+        self.path = path
+        self._seed = seed
+        self.centroids: np.ndarray | None = None
+        self.trained_size = 0
+        # List number per matrix row; -1 means not indexed yet
+        self._assign = np.empty(0, dtype=np.int32)
+        self._dirty = False
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._assign >= 0))
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def needs_training(self, size: int) -> bool:
+        if size < self.min_vectors:
+            return False
+        return not self.trained or size >= RETRAIN_GROWTH * self.trained_size
+
+    def fit(self, matrix: np.ndarray) -> np.ndarray:
+        """Centroids for ``matrix`` (normalised rows) by spherical k-means; no state changes."""
+        n = len(matrix)
+        nlist = min(n, self.nlist or max(1, round(math.sqrt(n))))
+        rng = np.random.default_rng(self._seed)
+        sample_size = min(n, nlist * TRAIN_SAMPLE_PER_LIST)
+        sample = matrix[np.sort(rng.choice(n, sample_size, replace=False))]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            # Re-seed empty lists from random sample points
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.divide(sums, norms, out=np.zeros_like(sums), where=norms > 0)
+        return centroids.astype(np.float32)
+
+    def nearest(self, vectors: np.ndarray, centroids: np.ndarray | None = None) -> np.ndarray:
+        """List number for each of ``vectors``."""
+        centroids = self.centroids if centroids is None else centroids
+        labels = np.empty(len(vectors), dtype=np.int32)
+        # Chunked so the (vectors x lists) score matrix stays small
+        for start in range(0, len(vectors), 8192):
+            block = vectors[start : start + 8192]
+            labels[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return labels
+
+    def install(self, centroids: np.ndarray, assign: np.ndarray, trained_size: int) -> None:
+        """Switch to new centroids with assignments for the first ``len(assign)`` rows."""
+        self.centroids = centroids
+        self._assign = assign.astype(np.int32)
+        self.trained_size = trained_size
+        self._dirty = True
+        logger.info("Trained IVF index: %d vectors in %d lists", trained_size, len(centroids))
+
+    def add(self, vectors: np.ndarray) -> None:
+        """Index rows appended to the end of the matrix."""
+        if self.trained:
+            new = self.nearest(vectors)
+        else:
+            new = np.full(len(vectors), -1, dtype=np.int32)
+        self._assign = np.concatenate([self._assign, new])
+        self._dirty = self._dirty or self.trained
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop the assignments of rows removed from the matrix (``mask`` False)."""
+        assign = self._assign[: len(mask)][mask[: len(self._assign)]]
+        self._assign = np.concatenate([assign, self._assign[len(mask) :]])
+        self._dirty = self._dirty or self.trained
+
+    def reset(self) -> None:
+        """Forget assignments (the matrix was rebuilt); centroids are kept."""
+        self._assign = np.empty(0, dtype=np.int32)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self, matrix: np.ndarray, query: np.ndarray, k: int, nprobe: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """``(positions, scores)`` of the best ``k`` rows in the probed lists."""
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        probe = _top(self.centroids @ query, nprobe)
+        assign = self._assign[: len(matrix)]
+        candidates = np.flatnonzero(np.isin(assign, probe) | (assign < 0))
+        if len(assign) < len(matrix):
+            # Rows not seen by the index yet are always scanned
+            candidates = np.concatenate([candidates, np.arange(len(assign), len(matrix))])
+        if not len(candidates):
+            return candidates, np.empty(0, dtype=np.float32)
+        scores = matrix[candidates] @ query
+        best = _top(scores, min(k, len(scores)))
+        return candidates[best], scores[best]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, ids: np.ndarray) -> None:
+        """Write centroids and per-id assignments to ``path`` if anything changed."""
+        if self.path is None or not self.trained or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                centroids=self.centroids,
+                ids=ids[: len(self._assign)],
+                assign=self._assign,
+                trained_size=np.int64(self.trained_size),
+            )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def restore(self, matrix: np.ndarray, ids: np.ndarray) -> bool:
+        """Reuse a saved index for ``matrix`` (rows identified by ``ids``) instead of training.
+
+        Rows the file doesn't know are assigned to their nearest centroid.
+        Returns False when there is no usable file.
+        """
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with np.load(self.path) as saved:
+                centroids = saved["centroids"]
+                saved_ids, saved_assign = saved["ids"], saved["assign"]
+                trained_size = int(saved["trained_size"])
+        except Exception:
+            logger.warning("Ignoring unreadable vector index %s", self.path, exc_info=True)
+            return False
+        if centroids.shape[1] != matrix.shape[1]:
+            return False
+        self.centroids = centroids.astype(np.float32)
+        self.trained_size = trained_size
+        assign = np.empty(len(ids), dtype=np.int32)
+        known = np.zeros(len(ids), dtype=bool)
+        if len(saved_ids):
+            order = np.argsort(saved_ids)
+            sorted_ids = saved_ids[order]
+            pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+            known = sorted_ids[pos] == ids
+            assign[known] = saved_assign[order][pos[known]]
+        if (~known).any():
+            assign[~known] = self.nearest(matrix[~known])
+        self._assign = assign
+        self._dirty = bool((~known).any()) or len(saved_ids) != len(ids)
+        logger.info("Restored IVF index from %s (%d of %d rows reused)", self.path, int(known.sum()), len(ids))
+        return True
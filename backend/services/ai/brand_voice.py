@@ -7,15 +7,19 @@ stores them in pgvector for RAG retrieval.
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from db.connection import get_supabase_admin
+from services.ai.document_store import get_document_store
 from services.ai.embeddings import EmbeddingsService
+from services.ai.ingestion import IngestionPipeline, IngestProgress
+from services.ai.retrieval import RetrievalSession
 
 logger = logging.getLogger(__name__)
 
@@ -50,14 +54,19 @@ DOC_TYPES: dict[str, str] = {
 }
 
 
-def _find_file(directory: Path, suffix: str) -> Path | None:
-    """Find a file in directory whose name ends with the given suffix."""
-    if not directory.exists():
-        return None
-    for entry in directory.iterdir():
-        if entry.name.endswith(suffix):
-            return entry
-    return None
+# Bumped whenever the voice config changes outside the brand-voice files, so
+# anything derived from them (the compiled system prompt prefix) is rebuilt
+_voice_config_generation = 0
+
+
+def invalidate_voice_config() -> None:
+    """Mark everything derived from the voice config as stale."""
+    global _voice_config_generation
+    _voice_config_generation += 1
+
+
+def _chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 def _read_file(path: Path) -> str:
@@ -66,6 +75,34 @@ def _read_file(path: Path) -> str:
         return f.read()
 
 
+def _playbook_sections(content: str) -> dict[str, str]:
+    """Body of each ``## `` section of the playbooks file, by header."""
+    headers = list(re.finditer(r"^## (.*)$", content, re.MULTILINE))
+    sections: dict[str, str] = {}
+    for match, following in zip(headers, headers[1:] + [None]):
+        end = following.start() if following else len(content)
+        sections.setdefault(match.group(1), content[match.end() : end].strip())
+    return sections
+
+
+def _guideline_bans(content: str) -> list[str]:
+    """Terms from the banned-word tables of brand_guidelines.md."""
+    bans: list[str] = []
+    # Extract terms from the markdown table rows
+    for line in content.split("\n"):
+        line = line.strip()
+        if line.startswith("|") and "**" in line:
+            # Parse table cells
+            cells = [c.strip() for c in line.split("|") if c.strip()]
+            if len(cells) >= 2:
+                terms_cell = cells[1]  # Second column has the terms
+                for term in terms_cell.split(","):
+                    cleaned = term.strip()
+                    if cleaned:
+                        bans.append(cleaned)
+    return bans
+
+
 class BrandVoiceService:
     """Ingest, chunk, embed, and retrieve brand voice documents."""
 
@@ -76,6 +113,7 @@ class BrandVoiceService:
     ):
         self.embeddings = embeddings_service or EmbeddingsService()
         self.brand_voice_dir = brand_voice_dir or BRAND_VOICE_DIR
+        self.documents = get_document_store(self.brand_voice_dir)
 
     # ------------------------------------------------------------------
     # Chunking
@@ -211,67 +249,158 @@ class BrandVoiceService:
     # Ingestion
     # ------------------------------------------------------------------
 
+    def _chunk_file(self, file_path: Path) -> list[dict[str, Any]]:
+        content = _read_file(file_path)
+        if file_path.name.endswith(".json"):
+            return self.chunk_json_document(json.loads(content), file_path.name)
+        return self.chunk_markdown_document(content, file_path.name)
+
     async def ingest_document(self, file_path: Path) -> int:
         """Process a single document: read, chunk, embed, store. Returns chunk count."""
-        content = _read_file(file_path)
-        filename = file_path.name
-
-        if filename.endswith(".json"):
-            data = json.loads(content)
-            chunks = self.chunk_json_document(data, filename)
-        else:
-            chunks = self.chunk_markdown_document(content, filename)
-
-        if not chunks:
-            return 0
-
-        # Batch embed all chunks
-        texts = [c["text"] for c in chunks]
-        embeddings = await self.embeddings.batch_create_embeddings(texts)
-
-        # Store each chunk
-        for idx, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            self.embeddings.store_embedding(
-                doc_name=filename,
-                chunk_text=chunk["text"],
-                chunk_index=idx,
-                embedding=embedding,
-                metadata=chunk["metadata"],
+        summary = await self.sync_document(file_path)
+        return summary["chunks"]
+
+    async def sync_document(self, file_path: Path) -> dict[str, int]:
+        """Bring a document's stored chunks in line with the file.
+
+        Chunks are matched to stored ones by the SHA-256 of their text. Only
+        new or edited chunks are embedded and inserted; chunks no longer in
+        the file are deleted, and ones that merely moved get their index and
+        metadata updated in place. Returns the diff: ``chunks``, ``unchanged``,
+        ``updated``, ``added`` and ``removed``.
+        """
+        summary, pending, removed = self.reconcile_document(
+            file_path.name, self._chunk_file(file_path)
+        )
+        if pending:
+            embeddings = await self.embeddings.batch_create_embeddings([r["chunk_text"] for r in pending])
+            self.embeddings.store_embeddings(
+                [{**row, "embedding": emb} for row, emb in zip(pending, embeddings)]
             )
+        # Only once the replacements are stored, so a failed embedding
+        # leaves the old chunks in place
+        self.embeddings.delete_embeddings(removed)
+        return summary
+
+    def reconcile_document(
+        self, filename: str, chunks: list[dict[str, Any]]
+    ) -> tuple[dict[str, int], list[dict[str, Any]], list[int]]:
+        """Apply the in-place updates for ``chunks``; return what still needs embedding and deleting.
+
+        Returns the ``sync_document`` summary, the rows to insert once
+        embedded (``document_name``, ``chunk_text``, ``chunk_index``,
+        ``metadata``) and the ids of stored chunks no longer in the file.
+        Callers delete those after the new rows are stored.
+        """
+        stored: dict[str, list[dict[str, Any]]] = {}
+        for row in self.embeddings.get_document_chunks(filename):
+            metadata = row.get("metadata") or {}
+            # Rows ingested before hashing have no content_hash yet
+            digest = metadata.get("content_hash") or _chunk_hash(row.get("chunk_text") or "")
+            stored.setdefault(digest, []).append(row)
+
+        summary = {"chunks": len(chunks), "unchanged": 0, "updated": 0, "added": 0, "removed": 0}
+        pending: list[dict[str, Any]] = []
+        for idx, chunk in enumerate(chunks):
+            digest = _chunk_hash(chunk["text"])
+            metadata = {**chunk["metadata"], "content_hash": digest}
+            matches = stored.get(digest)
+            if not matches:
+                pending.append({
+                    "document_name": filename,
+                    "chunk_text": chunk["text"],
+                    "chunk_index": idx,
+                    "metadata": metadata,
+                })
+                continue
+            row = matches.pop(0)
+            if row.get("chunk_index") != idx or row.get("metadata") != metadata:
+                self.embeddings.update_embedding(row["id"], {"chunk_index": idx, "metadata": metadata})
+                summary["updated"] += 1
+            else:
+                summary["unchanged"] += 1
+
+        removed = [row["id"] for rows in stored.values() for row in rows]
+        summary["removed"] = len(removed)
+        summary["added"] = len(pending)
+
+        logger.info(
+            "Ingesting %s: %d chunks (%d unchanged, %d updated, %d added, %d removed)",
+            filename, summary["chunks"], summary["unchanged"], summary["updated"],
+            summary["added"], summary["removed"],
+        )
+        return summary, pending, removed
 
-        logger.info("Ingested %s: %d chunks", filename, len(chunks))
-        return len(chunks)
-
-    async def ingest_all_documents(self) -> dict[str, int]:
-        """Read all brand-voice files, chunk, embed, and store."""
-        results: dict[str, int] = {}
+    def _document_paths(self) -> dict[str, Path]:
+        paths: dict[str, Path] = {}
         for doc_key, suffix in FILE_PATTERNS.items():
-            file_path = _find_file(self.brand_voice_dir, suffix)
+            file_path = self.documents.find(suffix)
             if file_path is None:
                 logger.warning("Brand voice file not found: *%s", suffix)
-                results[doc_key] = 0
                 continue
-            count = await self.ingest_document(file_path)
-            results[doc_key] = count
-        return results
+            paths[doc_key] = file_path
+        return paths
+
+    async def ingest_all_documents(
+        self, progress: Callable[[IngestProgress], None] | None = None
+    ) -> dict[str, int]:
+        """Read all brand-voice files, chunk, embed, and store. Returns chunk counts."""
+        paths = self._document_paths()
+        report = await IngestionPipeline(self, progress=progress).run(list(paths.values()))
+        return {
+            doc_key: report.documents[paths[doc_key].name]["chunks"] if doc_key in paths else 0
+            for doc_key in FILE_PATTERNS
+        }
 
-    async def refresh_embeddings(self) -> dict[str, int]:
-        """Delete all existing embeddings and re-ingest all documents."""
-        self.embeddings.delete_all_embeddings()
-        return await self.ingest_all_documents()
+    async def refresh_embeddings(
+        self, full: bool = False, progress: Callable[[IngestProgress], None] | None = None
+    ) -> dict[str, dict[str, int]]:
+        """Re-ingest all documents, embedding only chunks that changed.
+
+        Chunks of documents whose file has gone are deleted. ``full`` deletes
+        every stored chunk first and re-embeds from scratch. Returns the
+        ``sync_document`` diff per document.
+        """
+        if full:
+            self.embeddings.delete_all_embeddings()
+        paths = self._document_paths()
+        report = await IngestionPipeline(self, progress=progress).run(list(paths.values()))
+        summaries = {doc_key: report.documents[path.name] for doc_key, path in paths.items()}
+
+        present = {path.name for path in paths.values()}
+        for doc_name in set(self.embeddings.get_document_names()) - present:
+            ids = [row["id"] for row in self.embeddings.get_document_chunks(doc_name)]
+            self.embeddings.delete_embeddings(ids)
+            summaries[doc_name] = {"chunks": 0, "unchanged": 0, "updated": 0, "added": 0, "removed": len(ids)}
+            logger.info("Removed %s: %d chunks", doc_name, len(ids))
+        return summaries
 
     # ------------------------------------------------------------------
     # Retrieval
     # ------------------------------------------------------------------
 
     async def get_voice_context(
-        self, query: str, platform: str | None = None
+        self,
+        query: str,
+        platform: str | None = None,
+        session: RetrievalSession | None = None,
     ) -> str:
-        """Retrieve relevant brand voice context for a given query/topic."""
-        query_embedding = await self.embeddings.create_embedding(query)
-        results = self.embeddings.search_similar(
-            query_embedding, top_k=8, threshold=0.5
-        )
+        """Retrieve relevant brand voice context for a given query/topic.
+
+        Pass the generation's ``session`` to reuse its embedding and search.
+        """
+        results = await self.get_voice_chunks(query, platform, session)
+        return "\n\n---\n\n".join(r.get("chunk_text", "") for r in results)
+
+    async def get_voice_chunks(
+        self,
+        query: str,
+        platform: str | None = None,
+        session: RetrievalSession | None = None,
+    ) -> list[dict[str, Any]]:
+        """The chunks ``get_voice_context`` is made of, with their similarity."""
+        session = session or RetrievalSession(self.embeddings, query)
+        results = await session.view(top_k=8, threshold=0.5)
 
         # Filter by platform if specified (platform playbook chunks)
         if platform:
@@ -286,19 +415,14 @@ class BrandVoiceService:
             general = [r for r in results if r not in platform_results]
             results = platform_results[:4] + general[:4]
 
-        context_parts = []
-        for r in results:
-            context_parts.append(r.get("chunk_text", ""))
-
-        return "\n\n---\n\n".join(context_parts)
+        return results
 
     def get_platform_playbook(self, platform: str) -> str:
         """Retrieve platform-specific rules from the playbooks file."""
-        file_path = _find_file(self.brand_voice_dir, "platform_playbooks.md")
-        if not file_path:
+        sections = self.documents.load("platform_playbooks.md", _playbook_sections)
+        if not sections:
             return ""
 
-        content = _read_file(file_path)
         # Extract the platform section
         platform_map = {
             "tiktok": "TikTok",
@@ -307,12 +431,9 @@ class BrandVoiceService:
             "x": "X (Twitter)",
         }
         platform_name = platform_map.get(platform.lower(), platform)
-
-        # Find the section for this platform
-        pattern = rf"^## {re.escape(platform_name)}$(.*?)(?=^## |\Z)"
-        match = re.search(pattern, content, re.MULTILINE | re.DOTALL)
-        if match:
-            return f"## {platform_name}\n{match.group(1).strip()}"
+        body = sections.get(platform_name)
+        if body is not None:
+            return f"## {platform_name}\n{body}"
         return ""
 
     def get_banned_words(self) -> dict[str, Any]:
@@ -321,31 +442,15 @@ class BrandVoiceService:
         contextual_bans: list[dict[str, str]] = []
 
         # From compliance_rails.json
-        rails_path = _find_file(self.brand_voice_dir, "compliance_rails.json")
-        if rails_path:
-            rails = json.loads(_read_file(rails_path))
+        rails = self.documents.load("compliance_rails.json", json.loads)
+        if rails is not None:
             absolute_bans.extend(rails.get("banned_words", {}).get("absolute", []))
             contextual_bans.extend(
                 rails.get("banned_words", {}).get("contextual", [])
             )
 
-        # From brand_guidelines.md - parse the absolute bans table
-        guidelines_path = _find_file(self.brand_voice_dir, "brand_guidelines.md")
-        if guidelines_path:
-            content = _read_file(guidelines_path)
-            # Extract terms from the markdown table rows
-            for line in content.split("\n"):
-                line = line.strip()
-                if line.startswith("|") and "**" in line:
-                    # Parse table cells
-                    cells = [c.strip() for c in line.split("|") if c.strip()]
-                    if len(cells) >= 2:
-                        terms_cell = cells[1]  # Second column has the terms
-                        terms = [t.strip() for t in terms_cell.split(",")]
-                        for term in terms:
-                            cleaned = term.strip()
-                            if cleaned and cleaned not in absolute_bans:
-                                absolute_bans.append(cleaned)
+        # From brand_guidelines.md - the absolute bans table
+        absolute_bans.extend(self.documents.load("brand_guidelines.md", _guideline_bans) or [])
 
         # Deduplicate
         absolute_bans = list(dict.fromkeys(absolute_bans))
@@ -357,11 +462,10 @@ class BrandVoiceService:
 
     def get_personality_config(self) -> dict[str, Any]:
         """Return the core personality archetype and voice pillars."""
-        config_path = _find_file(self.brand_voice_dir, "voice_config.json")
-        if not config_path:
+        config = self.documents.load("voice_config.json", json.loads)
+        if config is None:
             return {}
 
-        config = json.loads(_read_file(config_path))
         return {
             "personality": config.get("personality", {}),
             "positioning": config.get("positioning", {}),
@@ -374,24 +478,15 @@ class BrandVoiceService:
 
     def get_compliance_rails(self) -> dict[str, Any]:
         """Return the full compliance rails configuration."""
-        rails_path = _find_file(self.brand_voice_dir, "compliance_rails.json")
-        if not rails_path:
-            return {}
-        return json.loads(_read_file(rails_path))
+        return self.documents.load("compliance_rails.json", json.loads) or {}
 
     def get_cash_kitty_config(self) -> dict[str, Any]:
         """Return the Cash Kitty character configuration."""
-        config_path = _find_file(self.brand_voice_dir, "cash_kitty_config.json")
-        if not config_path:
-            return {}
-        return json.loads(_read_file(config_path))
+        return self.documents.load("cash_kitty_config.json", json.loads) or {}
 
     def get_copywriting_reference(self) -> str:
         """Return the copywriting reference document for few-shot examples."""
-        ref_path = _find_file(self.brand_voice_dir, "copywriting_reference.md")
-        if not ref_path:
-            return ""
-        return _read_file(ref_path)
+        return self.documents.load("copywriting_reference.md", str) or ""
 
     async def update_voice_guide(self, content: str) -> None:
         """Update voice guide in DB and re-embed."""
@@ -399,9 +494,20 @@ class BrandVoiceService:
         db.table("voice_config").update(
             {"voice_guide_md": content}
         ).eq("id", 1).execute()
-        # Re-ingest the voice documents to refresh embeddings
+        invalidate_voice_config()
+        # Re-ingest the voice documents; only changed chunks are re-embedded
         await self.refresh_embeddings()
 
+    def source_fingerprint(self, suffixes: tuple[str, ...]) -> tuple:
+        """Cheap change token for the files matching ``suffixes``.
+
+        Combines each file's name, mtime and size with the voice config
+        generation; it changes whenever any of them is edited, added,
+        removed, or ``update_voice_guide`` runs.
+        """
+        stats = tuple(self.documents.stamp(suffix) or (suffix, None) for suffix in suffixes)
+        return (_voice_config_generation, stats)
+
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
@@ -23,6 +23,9 @@ PLATFORM_CHAR_LIMITS: dict[str, int] = {
     "youtube": 500,
 }
 
+# Brand-voice files the rules are parsed from
+RULE_SOURCE_FILES = ("compliance_rails.json", "brand_guidelines.md")
+
 # MoneyLion product names for mention detection
 PRODUCT_NAMES = [
     "MoneyLion",
@@ -54,12 +57,18 @@ class ComplianceChecker:
     def __init__(self, brand_voice_service: BrandVoiceService | None = None):
         self.brand_voice = brand_voice_service or BrandVoiceService()
         self._rules: dict[str, Any] | None = None
+        self._rules_fingerprint: Any = None
 
     def load_rules(self) -> dict[str, Any]:
-        """Parse compliance_rails.json and brand_guidelines.md into structured rules."""
-        if self._rules is not None:
+        """Parse compliance_rails.json and brand_guidelines.md into structured rules.
+
+        Cached until either file changes.
+        """
+        fingerprint = self.brand_voice.source_fingerprint(RULE_SOURCE_FILES)
+        if self._rules is not None and fingerprint == self._rules_fingerprint:
             return self._rules
 
+        self._rules_fingerprint = fingerprint
         banned = self.brand_voice.get_banned_words()
         rails = self.brand_voice.get_compliance_rails()
 
@@ -0,0 +1,154 @@
+"""Process-wide cache of the brand-voice files and what is parsed from them.
+
+``BrandVoiceService`` accessors (banned words, compliance rails, personality
+config, playbooks, copywriting reference) used to scan the directory and
+re-read and re-parse a file on every call. A ``DocumentStore`` lists the
+directory once (again only when its mtime changes) and caches each parsed
+artifact keyed by the file's ``(path, mtime, size)`` and the parser, so a
+call costs one ``stat`` of the directory and one of the file.
+
+Parsed values are shared between callers: treat them as read-only.
+
+``subscribe(callback)`` registers a change hook: ``callback(filename)`` runs
+whenever the store notices a file was edited, added or removed, either on
+access or on an explicit ``refresh()``. Stores are shared per directory via
+``get_document_store()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# (mtime_ns, size); a change in either means the file changed
+Stamp = tuple[int, int]
+
+
+def _read_file(path: Path) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class DocumentStore:
+    """Indexed brand-voice directory with parsed artifacts cached by file stamp."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._listed = False
+        self._dir_stamp: int | None = None
+        self._names: list[str] = []
+        self._by_suffix: dict[str, str | None] = {}
+        self._stamps: dict[str, Stamp] = {}
+        self._artifacts: dict[tuple[str, Callable], tuple[Stamp, Any]] = {}
+        self._subscribers: list[Callable[[str], None]] = []
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(filename)`` whenever a file is seen to change."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def _notify(self, names: list[str]) -> None:
+        for name in names:
+            logger.info("Brand voice document changed: %s", name)
+            for callback in list(self._subscribers):
+                try:
+                    callback(name)
+                except Exception as e:
+                    logger.warning("Document change hook failed for %s: %s", name, e)
+
+    def _index(self) -> None:
+        """Re-list the directory if it changed since the last listing."""
+        try:
+            dir_stamp = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            dir_stamp = None
+        if self._listed and dir_stamp == self._dir_stamp:
+            return
+        names = [entry.name for entry in self.directory.iterdir()] if dir_stamp is not None else []
+        with self._lock:
+            changed = sorted(set(names) ^ set(self._names)) if self._listed else []
+            self._listed = True
+            self._dir_stamp, self._names, self._by_suffix = dir_stamp, names, {}
+            for name in changed:
+                self._stamps.pop(name, None)
+        self._notify(changed)
+
+    def find(self, suffix: str) -> Path | None:
+        """The file whose name ends with ``suffix``, if there is one."""
+        self._index()
+        with self._lock:
+            if suffix not in self._by_suffix:
+                self._by_suffix[suffix] = next((n for n in self._names if n.endswith(suffix)), None)
+            name = self._by_suffix[suffix]
+        return self.directory / name if name is not None else None
+
+    def stamp(self, suffix: str) -> tuple[str, int, int] | None:
+        """``(filename, mtime_ns, size)`` of the file ending with ``suffix``."""
+        path = self.find(suffix)
+        return self._stamp_path(path) if path is not None else None
+
+    def _stamp_path(self, path: Path) -> tuple[str, int, int] | None:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._dir_stamp = -1  # Removed under us; re-list next time
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            previous = self._stamps.get(path.name)
+            self._stamps[path.name] = stamp
+        if previous is not None and previous != stamp:
+            self._notify([path.name])
+        return (path.name, *stamp)
+
+    def load(self, suffix: str, parse: Callable[[str], T]) -> T | None:
+        """``parse(text)`` of the file ending with ``suffix``, cached until it changes.
+
+        Returns None when there is no such file.
+        """
+        current = self.stamp(suffix)
+        if current is None:
+            return None
+        name, stamp = current[0], current[1:]
+        key = (name, parse)
+        with self._lock:
+            cached = self._artifacts.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        value = parse(_read_file(self.directory / name))
+        with self._lock:
+            self._artifacts[key] = (stamp, value)
+        return value
+
+    def refresh(self) -> None:
+        """Stat every file now so changes are reported to subscribers."""
+        self._index()
+        for name in list(self._names):
+            self._stamp_path(self.directory / name)
+
+
+_stores: dict[Path, DocumentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_document_store(directory: Path) -> DocumentStore:
+    """The shared store for ``directory``."""
+    key = Path(directory).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = DocumentStore(key)
+        return store
+
+
+def reset_document_stores() -> None:
+    with _stores_lock:
+        _stores.clear()
@@ -0,0 +1,254 @@
+"""Content-addressed cache for embedding vectors.
+
+The same texts get embedded over and over: RAG queries built from the same
+video context, comment texts scored for drift and then tracked, brand-voice
+chunks on every re-ingestion. ``EmbeddingsService`` looks each text up here
+before calling the API, keyed by ``(model, sha256(text))``:
+
+* an in-process LRU of ``EMBEDDING_CACHE_MEMORY_ITEMS`` vectors;
+* behind it, a SQLite file (``EMBEDDING_CACHE_PATH``, next to the local DB by
+  default) shared by every process on the host and kept across restarts.
+  When its vectors exceed ``EMBEDDING_CACHE_MAX_MB``, the least recently
+  used entries are evicted.
+
+Vectors are kept as float32, the precision the embeddings API produces.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "2048"))
+MAX_BYTES = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "256")) * 1024 * 1024)
+# Evict down to this fraction of MAX_BYTES so eviction doesn't run on every put
+_EVICT_TO = 0.9
+
+_DDL = """
+    CREATE TABLE IF NOT EXISTS embedding_cache (
+        model TEXT NOT NULL,
+        text_hash TEXT NOT NULL,
+        vector BLOB NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (model, text_hash)
+    )
+"""
+_INDEX_DDL = "CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used ON embedding_cache (last_used)"
+
+
+def default_cache_path() -> str:
+    if os.getenv("EMBEDDING_CACHE_PATH"):
+        return os.environ["EMBEDDING_CACHE_PATH"]
+    from db import sqlite_store
+
+    return str(sqlite_store.DB_PATH.parent / "embedding_cache.db")
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU, then SQLite) cache of embedding vectors."""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        memory_items: int = MEMORY_ITEMS,
+        max_bytes: int = MAX_BYTES,
+    ):
+        self.path = str(path or default_cache_path())
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[tuple[str, str], np.ndarray] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._disk_bytes: int | None = None
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(_DDL)
+            self._conn.execute(_INDEX_DDL)
+            self._conn.commit()
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        return self.get_many(model, [text])[0]
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Cached vector (or None) for each text, in order."""
+        keys = [(model, text_key(t)) for t in texts]
+        found: dict[tuple[str, str], np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+            missing = list({k for k in keys if k not in found})
+            disk = self._load(missing) if missing else {}
+            for key, vector in disk.items():
+                self._remember(key, vector)
+            found.update(disk)
+            for key in keys:
+                if key in disk:
+                    self._counters["disk_hits"] += 1
+                elif key in found:
+                    self._counters["memory_hits"] += 1
+                else:
+                    self._counters["misses"] += 1
+        return [found[k].tolist() if k in found else None for k in keys]
+
+    def _load(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], np.ndarray]:
+        conn = self._db()
+        loaded: dict[tuple[str, str], np.ndarray] = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            by_model: dict[str, list[str]] = {}
+            for model, digest in chunk:
+                by_model.setdefault(model, []).append(digest)
+            for model, digests in by_model.items():
+                marks = ", ".join("?" * len(digests))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *digests],
+                ).fetchall()
+                for digest, blob in rows:
+                    loaded[(model, digest)] = np.frombuffer(blob, dtype=np.float32)
+        if loaded:
+            conn.executemany(
+                "UPDATE embedding_cache SET last_used = ? WHERE model = ? AND text_hash = ?",
+                [(time.time(), model, digest) for model, digest in loaded],
+            )
+            conn.commit()
+        return loaded
+
+    # ------------------------------------------------------------------
+    # Stores
+    # ------------------------------------------------------------------
+
+    def put(self, model: str, text: str, vector: list[float]) -> None:
+        self.put_many(model, [text], [vector])
+
+    def put_many(self, model: str, texts: Iterable[str], vectors: Iterable[list[float]]) -> None:
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model, text_key(text))
+                array = np.asarray(vector, dtype=np.float32)
+                self._remember(key, array)
+                rows.append((model, key[1], array.tobytes(), time.time()))
+            if not rows:
+                return
+            conn = self._db()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (model, text_hash, vector, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            self._counters["stores"] += len(rows)
+            if self._disk_bytes is not None:
+                self._disk_bytes += sum(len(r[2]) for r in rows)
+            self._evict()
+
+    def _remember(self, key: tuple[str, str], vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Drop least recently used disk entries once over ``max_bytes``; caller holds the lock."""
+        conn = self._db()
+        if self._disk_bytes is None:
+            self._disk_bytes = conn.execute(
+                "SELECT COALESCE(SUM(length(vector)), 0) FROM embedding_cache"
+            ).fetchone()[0]
+        if self._disk_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * _EVICT_TO
+        victims = []
+        freed = 0
+        for model, digest, size in conn.execute(
+            "SELECT model, text_hash, length(vector) FROM embedding_cache ORDER BY last_used"
+        ):
+            if self._disk_bytes - freed <= target:
+                break
+            victims.append((model, digest))
+            freed += size
+        conn.executemany("DELETE FROM embedding_cache WHERE model = ? AND text_hash = ?", victims)
+        conn.commit()
+        self._disk_bytes -= freed
+        self._counters["evictions"] += len(victims)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+            conn = self._db()
+            disk_items, disk_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length(vector)), 0) FROM embedding_cache"
+            ).fetchone()
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_items,
+            "disk_items": disk_items,
+            "disk_bytes": disk_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: EmbeddingCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache shared by every ``EmbeddingsService``."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+def reset_embedding_cache() -> None:
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
@@ -0,0 +1,153 @@
+"""Backends that turn texts into embedding vectors for ``EmbeddingsService``.
+
+* ``OpenAIProvider``: the OpenAI embeddings API over a pooled HTTP client
+  (the default);
+* ``HashingProvider``: a local, NumPy-only backend for tests, benchmarks
+  and offline development. Word unigrams and bigrams plus character
+  trigrams are feature-hashed (signed, via BLAKE2b so the result never
+  depends on the process) into ``dim`` buckets with sublinear term
+  frequency, then L2-normalised. Texts that share vocabulary score higher
+  than ones that don't, which is enough to exercise retrieval and drift
+  scoring end to end. Vectors are identical across runs and machines.
+
+``EMBEDDING_PROVIDER`` picks the default (``openai`` or ``local``);
+``EMBEDDING_LOCAL_DIM`` sets the local backend's dimension. Anything with
+``name``, ``dim``, ``embed(texts)`` and ``aclose()`` can be passed to
+``EmbeddingsService(provider=...)``. ``name`` keys the embedding cache, so
+it must change whenever the vectors would.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+from typing import Protocol
+
+import httpx
+import numpy as np
+
+OPENAI_EMBEDDINGS_URL = os.getenv("OPENAI_EMBEDDINGS_URL", "https://api.openai.com/v1/embeddings")
+HTTP_MAX_CONNECTIONS = int(os.getenv("EMBEDDING_HTTP_MAX_CONNECTIONS", "10"))
+PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai").lower()
+LOCAL_DIM = int(os.getenv("EMBEDDING_LOCAL_DIM", "1536"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class EmbeddingProvider(Protocol):
+    name: str
+    dim: int | None
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """One vector per text, in order."""
+        ...
+
+    async def aclose(self) -> None: ...
+
+
+class OpenAIProvider:
+    """OpenAI embeddings API; one pooled ``httpx.AsyncClient`` per event loop."""
+
+    def __init__(self, api_key: str | None, model: str, api_url: str = OPENAI_EMBEDDINGS_URL):
+        self.api_key = api_key
+        self.name = model
+        self.dim = None  # Whatever the model returns
+        self.api_url = api_url
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._client is None:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=60.0,
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not self.api_key:
+            raise RuntimeError(
+                "OpenAI API key not configured. Set OPENAI_API_KEY in environment."
+            )
+        resp = await self._client_for_loop().post(
+            self.api_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            json={"input": texts, "model": self.name},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        # Sort by index to maintain order
+        sorted_items = sorted(data["data"], key=lambda x: x["index"])
+        return [item["embedding"] for item in sorted_items]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._loop = self._client = None
+
+
+class HashingProvider:
+    """Deterministic feature-hashing embeddings computed locally."""
+
+    def __init__(self, dim: int = LOCAL_DIM, seed: int = 0):
+        if dim <= 0:
+            raise ValueError(f"dim must be positive, got {dim}")
+        self.dim = dim
+        self.seed = seed
+        self.name = f"local-hash-v1-{dim}-{seed}"
+        self._key = seed.to_bytes(8, "little", signed=False)
+
+    def _features(self, text: str) -> list[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        features = [f"w:{w}" for w in words]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"#{w}#"
+            features += [f"c:{padded[i : i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed_one(self, text: str) -> np.ndarray:
+        counts: dict[str, int] = {}
+        for feature in self._features(text):
+            counts[feature] = counts.get(feature, 0) + 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if not counts:
+            return vector
+        digests = [
+            hashlib.blake2b(f.encode("utf-8"), digest_size=8, key=self._key).digest() for f in counts
+        ]
+        hashes = np.frombuffer(b"".join(digests), dtype="<u8")
+        buckets = (hashes % np.uint64(self.dim)).astype(np.intp)
+        # The top bit picks the sign, so collisions cancel out on average
+        signs = np.where(hashes >> np.uint64(63), -1.0, 1.0).astype(np.float32)
+        weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        np.add.at(vector, buckets, signs * weights)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_one(t).tolist() for t in texts]
+
+    async def aclose(self) -> None:
+        pass
+
+
+def provider_from_env(
+    api_key: str | None, model: str, api_url: str = OPENAI_EMBEDDINGS_URL
+) -> EmbeddingProvider:
+    """The provider selected by ``EMBEDDING_PROVIDER``."""
+    if PROVIDER == "local":
+        return HashingProvider()
+    if PROVIDER != "openai":
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER {PROVIDER!r}; expected 'openai' or 'local'")
+    return OpenAIProvider(api_key, model, api_url)
@@ -2,21 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
+import os
 from typing import Any
 
-import httpx
-
 from config import get_settings
 from db.connection import get_supabase_admin
+from services.ai.embedding_cache import EmbeddingCache, get_embedding_cache
+from services.ai.embedding_providers import (
+    OPENAI_EMBEDDINGS_URL,
+    EmbeddingProvider,
+    OpenAIProvider,
+    provider_from_env,
+)
+from services.ai.lexical_index import reciprocal_rank_fusion, tokenize
+from services.ai.micro_batcher import MicroBatcher
+from services.ai.vector_codec import encode_vector
+from services.ai.vector_store import get_vector_store
 
 logger = logging.getLogger(__name__)
 
-OPENAI_EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
 DEFAULT_MODEL = "text-embedding-3-small"
 EMBEDDING_DIM = 1536
 
+# Concurrent create_embedding calls within BATCH_MAX_WAIT_MS are sent as one request
+BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "10"))
+# Rows per INSERT statement in store_embeddings
+INSERT_BATCH_SIZE = 500
+# search_hybrid: queries of at most this many tokens that occur verbatim in a
+# chunk are answered lexically, without embedding the query
+HYBRID_EXACT_MAX_TERMS = int(os.getenv("HYBRID_EXACT_MAX_TERMS", "3"))
+# Candidates taken from each ranking before fusion
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "50"))
+
 
 def _cosine_similarity(a: list[float], b: list[float]) -> float:
     dot = sum(x * y for x, y in zip(a, b))
@@ -28,59 +49,82 @@ def _cosine_similarity(a: list[float], b: list[float]) -> float:
 
 
 class EmbeddingsService:
-    """Create embeddings via OpenAI API and store/search in Supabase pgvector."""
+    """Create embeddings via a provider (OpenAI by default) and store/search them.
+
+    ``provider`` overrides ``EMBEDDING_PROVIDER``; see
+    ``services.ai.embedding_providers``.
+    """
 
-    def __init__(self, api_key: str | None = None, model: str = DEFAULT_MODEL):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = DEFAULT_MODEL,
+        cache: EmbeddingCache | None = None,
+        api_url: str = OPENAI_EMBEDDINGS_URL,
+        batch_max_size: int = BATCH_MAX_SIZE,
+        batch_max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        provider: EmbeddingProvider | None = None,
+    ):
         settings = get_settings()
         self.api_key = api_key or getattr(settings, "openai_api_key", None)
-        if not self.api_key:
+        self.provider = provider or provider_from_env(self.api_key, model, api_url)
+        if isinstance(self.provider, OpenAIProvider) and not self.api_key:
             logger.warning(
                 "No OpenAI API key configured. Embeddings service will fail on create_embedding calls. "
                 "Set OPENAI_API_KEY in environment."
             )
-        self.model = model
+        # Cache key: the provider's name changes whenever its vectors would
+        self.model = self.provider.name
+        self.cache = cache or get_embedding_cache()
+        self.batch_max_size = batch_max_size
+        self.batch_max_wait_ms = batch_max_wait_ms
+        # Bound to the event loop it was created on
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._batcher: MicroBatcher[str, list[float]] | None = None
 
-    async def create_embedding(self, text: str) -> list[float]:
-        """Generate an embedding vector for the given text."""
-        if not self.api_key:
-            raise RuntimeError(
-                "OpenAI API key not configured. Set OPENAI_API_KEY in environment."
+    def _batcher_for_loop(self) -> MicroBatcher[str, list[float]]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._batcher is None:
+            self._loop = loop
+            self._batcher = MicroBatcher(
+                self.batch_create_embeddings,
+                max_batch=self.batch_max_size,
+                max_wait=self.batch_max_wait_ms / 1000,
             )
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            resp = await client.post(
-                OPENAI_EMBEDDINGS_URL,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={"input": text, "model": self.model},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data["data"][0]["embedding"]
+        return self._batcher
+
+    async def aclose(self) -> None:
+        """Release the provider's connections."""
+        await self.provider.aclose()
+        self._loop = self._batcher = None
+
+    async def create_embedding(self, text: str) -> list[float]:
+        """Generate an embedding vector for the given text.
+
+        Served from cache when known; otherwise coalesced with other concurrent
+        calls into one batch request.
+        """
+        cached = self.cache.get(self.model, text)
+        if cached is not None:
+            return cached
+        return await self._batcher_for_loop().submit(text)
 
     async def batch_create_embeddings(self, texts: list[str]) -> list[list[float]]:
-        """Generate embeddings for a batch of texts in a single API call."""
-        if not self.api_key:
-            raise RuntimeError(
-                "OpenAI API key not configured. Set OPENAI_API_KEY in environment."
-            )
+        """Generate embeddings for a batch of texts; only cache misses go to the provider."""
         if not texts:
             return []
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(
-                OPENAI_EMBEDDINGS_URL,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={"input": texts, "model": self.model},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            # Sort by index to maintain order
-            sorted_items = sorted(data["data"], key=lambda x: x["index"])
-            return [item["embedding"] for item in sorted_items]
+        results = self.cache.get_many(self.model, texts)
+        # Each distinct uncached text is sent once
+        missing = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+        if missing:
+            fetched = dict(zip(missing, await self._request_embeddings(missing)))
+            self.cache.put_many(self.model, fetched.keys(), fetched.values())
+            results = [r if r is not None else fetched[t] for t, r in zip(texts, results)]
+        return results
+
+    async def _request_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """One provider call for ``texts``, results in input order."""
+        return await self.provider.embed(texts)
 
     def store_embedding(
         self,
@@ -90,17 +134,45 @@ class EmbeddingsService:
         embedding: list[float],
         metadata: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        """Store an embedding in the brand_voice_embeddings table."""
+        """Store an embedding in the brand_voice_embeddings table.
+
+        The vector is written in the ``EMBEDDING_STORAGE`` format (see
+        ``services.ai.vector_codec``).
+        """
         db = get_supabase_admin()
         row = {
             "document_name": doc_name,
             "chunk_text": chunk_text,
             "chunk_index": chunk_index,
-            "embedding": embedding,
+            "embedding": encode_vector(embedding),
             "metadata": metadata or {},
         }
         result = db.table("brand_voice_embeddings").insert(row).execute()
-        return result.data[0] if result.data else row
+        if not result.data:
+            return row
+        get_vector_store().add([{**row, "id": result.data[0]["id"]}])
+        return result.data[0]
+
+    def store_embeddings(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Bulk-insert brand voice chunks, ``INSERT_BATCH_SIZE`` rows per statement.
+
+        Each row has ``document_name``, ``chunk_text``, ``chunk_index``,
+        ``embedding`` and optionally ``metadata``.
+        """
+        if not rows:
+            return []
+        db = get_supabase_admin()
+        encoded = [
+            {**row, "embedding": encode_vector(row["embedding"]), "metadata": row.get("metadata") or {}}
+            for row in rows
+        ]
+        stored: list[dict[str, Any]] = []
+        for start in range(0, len(encoded), INSERT_BATCH_SIZE):
+            result = db.table("brand_voice_embeddings").insert(encoded[start : start + INSERT_BATCH_SIZE]).execute()
+            stored.extend(result.data or [])
+        if len(stored) == len(encoded):
+            get_vector_store().add([{**row, "id": s["id"]} for row, s in zip(encoded, stored)])
+        return stored
 
     def store_comment_embedding(
         self,
@@ -111,7 +183,7 @@ class EmbeddingsService:
         db = get_supabase_admin()
         row = {
             "comment_id": comment_id,
-            "embedding": embedding,
+            "embedding": encode_vector(embedding),
         }
         result = db.table("comment_embeddings").insert(row).execute()
         return result.data[0] if result.data else row
@@ -124,7 +196,7 @@ class EmbeddingsService:
     ) -> list[dict[str, Any]]:
         """Search for similar brand voice chunks using cosine similarity.
 
-        Tries Supabase RPC function first, falls back to Python-based similarity.
+        Tries Supabase RPC function first, falls back to the in-process vector store.
         """
         db = get_supabase_admin()
         try:
@@ -151,38 +223,75 @@ class EmbeddingsService:
         top_k: int,
         threshold: float,
     ) -> list[dict[str, Any]]:
-        """Fallback: fetch all embeddings and compute similarity in Python."""
+        """Fallback: search the in-process vector store, syncing it with the table first."""
+        store = get_vector_store()
+        store.sync(get_supabase_admin())
+        return store.search(query_embedding, top_k, threshold)
+
+    async def search_hybrid(
+        self,
+        query: str,
+        top_k: int = 5,
+        threshold: float = 0.4,
+        exact: bool = True,
+    ) -> list[dict[str, Any]]:
+        """Search brand voice chunks by BM25 and vector similarity, fused by rank.
+
+        Both rankings come from the in-process vector store (synced with the
+        table first): up to ``HYBRID_FETCH_K`` chunks by BM25 and as many
+        with cosine similarity >= ``threshold``, merged with reciprocal rank
+        fusion. Results carry ``score`` (fused), plus ``similarity`` and/or
+        ``bm25`` from the rankings they appeared in, best first.
+
+        With ``exact``, a query of at most ``HYBRID_EXACT_MAX_TERMS`` tokens
+        that appears verbatim in some chunk (a product name, ``X (Twitter)``)
+        is answered from the lexical ranking alone, without an embedding.
+        """
+        store = get_vector_store()
+        store.sync(get_supabase_admin())
+        fetch_k = max(top_k, HYBRID_FETCH_K)
+        lexical = store.search_lexical(query, fetch_k)
+        if exact and lexical and lexical[0]["phrase"] and len(tokenize(query)) <= HYBRID_EXACT_MAX_TERMS:
+            return reciprocal_rank_fusion([lexical])[:top_k]
+        query_embedding = await self.create_embedding(query)
+        vector = store.search(query_embedding, fetch_k, threshold)
+        return reciprocal_rank_fusion([vector, lexical])[:top_k]
+
+    def get_document_chunks(self, doc_name: str) -> list[dict[str, Any]]:
+        """Stored chunks of one document (without their vectors), in chunk order."""
         db = get_supabase_admin()
         result = (
             db.table("brand_voice_embeddings")
-            .select("id,document_name,chunk_text,chunk_index,metadata,embedding")
+            .select("id,chunk_index,chunk_text,metadata")
+            .eq("document_name", doc_name)
+            .order("chunk_index")
             .execute()
         )
-        if not result.data:
-            return []
+        return result.data or []
 
-        scored = []
-        for row in result.data:
-            emb = row.get("embedding")
-            if not emb:
-                continue
-            sim = _cosine_similarity(query_embedding, emb)
-            if sim >= threshold:
-                scored.append(
-                    {
-                        "id": row["id"],
-                        "document_name": row["document_name"],
-                        "chunk_text": row["chunk_text"],
-                        "chunk_index": row["chunk_index"],
-                        "metadata": row.get("metadata", {}),
-                        "similarity": sim,
-                    }
-                )
-
-        scored.sort(key=lambda x: x["similarity"], reverse=True)
-        return scored[:top_k]
+    def get_document_names(self) -> set[str]:
+        """Names of all documents with stored chunks."""
+        db = get_supabase_admin()
+        result = db.table("brand_voice_embeddings").select("document_name").execute()
+        return {r["document_name"] for r in result.data or []}
+
+    def update_embedding(self, embedding_id: int, fields: dict[str, Any]) -> None:
+        """Update a stored chunk's non-vector fields (``chunk_index``, ``metadata``)."""
+        db = get_supabase_admin()
+        db.table("brand_voice_embeddings").update(fields).eq("id", embedding_id).execute()
+        get_vector_store().update([{**fields, "id": embedding_id}])
+
+    def delete_embeddings(self, ids: list[int]) -> None:
+        """Delete specific brand voice chunks."""
+        if not ids:
+            return
+        db = get_supabase_admin()
+        for start in range(0, len(ids), 500):
+            db.table("brand_voice_embeddings").delete().in_("id", ids[start : start + 500]).execute()
+        get_vector_store().remove(ids)
 
     def delete_all_embeddings(self) -> None:
         """Delete all brand voice embeddings (for re-ingestion)."""
         db = get_supabase_admin()
         db.table("brand_voice_embeddings").delete().neq("id", 0).execute()
+        get_vector_store().clear()
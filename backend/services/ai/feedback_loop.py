@@ -30,42 +30,30 @@ class FeedbackLoopService:
     def get_stats(self) -> dict[str, Any]:
         all_rows = (
             self.db.table("comment_feedback")
-            .select("id,decision,decided_at")
+            .select("decision,count()")
             .execute()
         )
-        rows = all_rows.data or []
-        total = len(rows)
-        approved = sum(1 for r in rows if r["decision"] == "approved")
+        counts = {r["decision"]: r["count"] for r in all_rows.data or []}
+        total = sum(counts.values())
+        approved = counts.get("approved", 0)
         denied = total - approved
 
         approval_rate = round((approved / total) * 100, 1) if total else 0.0
 
         # Recent = last 7 days
         cutoff = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-        recent = [r for r in rows if (r.get("decided_at") or "") >= cutoff]
-        recent_total = len(recent)
-        recent_approved = sum(1 for r in recent if r["decision"] == "approved")
-        recent_rate = round((recent_approved / recent_total) * 100, 1) if recent_total else 0.0
-
-        improvement = round(recent_rate - approval_rate, 1) if total else 0.0
-
-        # Active example counts (latest N)
-        approved_examples = (
+        recent_rows = (
             self.db.table("comment_feedback")
-            .select("id")
-            .eq("decision", "approved")
-            .order("decided_at", desc=True)
-            .limit(5)
-            .execute()
-        )
-        denied_examples = (
-            self.db.table("comment_feedback")
-            .select("id")
-            .eq("decision", "denied")
-            .order("decided_at", desc=True)
-            .limit(3)
+            .select("decision,count()")
+            .gte("decided_at", cutoff)
             .execute()
         )
+        recent = {r["decision"]: r["count"] for r in recent_rows.data or []}
+        recent_total = sum(recent.values())
+        recent_approved = recent.get("approved", 0)
+        recent_rate = round((recent_approved / recent_total) * 100, 1) if recent_total else 0.0
+
+        improvement = round(recent_rate - approval_rate, 1) if total else 0.0
 
         return {
             "total_decisions": total,
@@ -74,8 +62,9 @@ class FeedbackLoopService:
             "approval_rate": approval_rate,
             "recent_approval_rate": recent_rate,
             "improvement": improvement,
-            "active_approved_examples": len(approved_examples.data or []),
-            "active_denied_examples": len(denied_examples.data or []),
+            # get_examples() feeds the latest 5 approved / 3 denied to the prompt
+            "active_approved_examples": min(approved, 5),
+            "active_denied_examples": min(counts.get("denied", 0), 3),
         }
 
     # ------------------------------------------------------------------
@@ -86,26 +75,24 @@ class FeedbackLoopService:
         cutoff = (datetime.now(timezone.utc) - timedelta(days=14)).isoformat()
         result = (
             self.db.table("comment_feedback")
-            .select("decision,decided_at")
+            .select("decision,count()")
+            .bucket("decided_at", "day", alias="day")
             .gte("decided_at", cutoff)
-            .order("decided_at")
             .execute()
         )
-        rows = result.data or []
 
         # Bucket by date
         buckets: dict[str, dict[str, int]] = {}
-        for r in rows:
-            dt_str = r.get("decided_at", "")
-            date_key = dt_str[:10] if dt_str else "unknown"
-            if date_key == "unknown":
+        for r in result.data or []:
+            if not r["day"]:
                 continue
+            date_key = r["day"][:10]
             if date_key not in buckets:
                 buckets[date_key] = {"approved": 0, "denied": 0}
             if r["decision"] == "approved":
-                buckets[date_key]["approved"] += 1
+                buckets[date_key]["approved"] += r["count"]
             else:
-                buckets[date_key]["denied"] += 1
+                buckets[date_key]["denied"] += r["count"]
 
         trend = []
         for date_key in sorted(buckets.keys()):
@@ -0,0 +1,171 @@
+"""Pipelined brand voice ingestion.
+
+``IngestionPipeline.run(paths)`` overlaps the three stages of ingesting a
+corpus instead of running them file by file:
+
+1. files are read and chunked on a thread pool (``INGEST_READ_WORKERS``);
+2. as each file is chunked it is reconciled with the stored chunks
+   (``BrandVoiceService.reconcile_document``), and its new chunks join a
+   queue that is cut into batches of ``INGEST_EMBED_BATCH_SIZE`` texts,
+   across file boundaries;
+3. up to ``INGEST_EMBED_CONCURRENCY`` batches are embedded at once, and
+   each batch is written with one bulk insert as soon as it comes back.
+
+A file's stale chunks are deleted only once all of its new chunks are
+stored, so an embedding failure leaves the old chunks searchable.
+
+A ``progress`` callback receives an ``IngestProgress`` after every file and
+batch; the returned ``IngestReport`` includes end-to-end chunks/sec.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from services.ai.brand_voice import BrandVoiceService
+
+logger = logging.getLogger(__name__)
+
+READ_WORKERS = int(os.getenv("INGEST_READ_WORKERS", "4"))
+EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "256"))
+EMBED_CONCURRENCY = int(os.getenv("INGEST_EMBED_CONCURRENCY", "4"))
+
+_clock = time.perf_counter
+
+
+@dataclass
+class IngestProgress:
+    files_total: int
+    files_done: int = 0
+    # Chunks that need embedding, as far as the files chunked so far go
+    chunks_pending: int = 0
+    chunks_stored: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks_stored / self.elapsed if self.elapsed else 0.0
+
+
+@dataclass
+class IngestReport:
+    documents: dict[str, dict[str, int]] = field(default_factory=dict)
+    chunks: int = 0
+    embedded: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        """Chunks processed (embedded or verified unchanged) per second."""
+        return self.chunks / self.elapsed if self.elapsed else 0.0
+
+
+def log_progress(progress: IngestProgress) -> None:
+    logger.info(
+        "Ingest: %d/%d files, %d/%d chunks stored (%.0f chunks/s)",
+        progress.files_done, progress.files_total, progress.chunks_stored,
+        progress.chunks_pending, progress.chunks_per_second,
+    )
+
+
+class IngestionPipeline:
+    """Read, embed and store a set of brand voice documents concurrently."""
+
+    def __init__(
+        self,
+        brand_voice: BrandVoiceService,
+        read_workers: int = READ_WORKERS,
+        batch_size: int = EMBED_BATCH_SIZE,
+        embed_concurrency: int = EMBED_CONCURRENCY,
+        progress: Callable[[IngestProgress], None] | None = None,
+    ):
+        self.brand_voice = brand_voice
+        self.embeddings = brand_voice.embeddings
+        self.read_workers = read_workers
+        self.batch_size = batch_size
+        self.embed_concurrency = embed_concurrency
+        self.progress = progress or log_progress
+
+    async def run(self, paths: list[Path]) -> IngestReport:
+        paths = list(dict.fromkeys(paths))
+        started = _clock()
+        report = IngestReport()
+        state = IngestProgress(files_total=len(paths))
+        semaphore = asyncio.Semaphore(self.embed_concurrency)
+        loop = asyncio.get_running_loop()
+        buffer: list[dict[str, Any]] = []
+        batches: list[asyncio.Task] = []
+        # Per document: new chunks not yet stored, and the stale ids to
+        # delete once there are none left
+        unstored: dict[str, int] = {}
+        stale: dict[str, list[int]] = {}
+
+        def release(document: str) -> None:
+            self.embeddings.delete_embeddings(stale.pop(document, []))
+
+        def notify() -> None:
+            state.elapsed = _clock() - started
+            self.progress(state)
+
+        async def embed_and_store(rows: list[dict[str, Any]]) -> None:
+            async with semaphore:
+                vectors = await self.embeddings.batch_create_embeddings([r["chunk_text"] for r in rows])
+            self.embeddings.store_embeddings([{**row, "embedding": v} for row, v in zip(rows, vectors)])
+            for row in rows:
+                document = row["document_name"]
+                unstored[document] -= 1
+                if not unstored[document]:
+                    release(document)
+            state.chunks_stored += len(rows)
+            notify()
+
+        def flush(final: bool = False) -> None:
+            nonlocal buffer
+            while len(buffer) >= self.batch_size or (final and buffer):
+                rows, buffer = buffer[: self.batch_size], buffer[self.batch_size :]
+                batches.append(asyncio.create_task(embed_and_store(rows)))
+
+        with ThreadPoolExecutor(max_workers=max(1, self.read_workers)) as pool:
+
+            async def chunk(path: Path) -> tuple[Path, list[dict[str, Any]]]:
+                return path, await loop.run_in_executor(pool, self.brand_voice._chunk_file, path)
+
+            reads = [asyncio.create_task(chunk(p)) for p in paths]
+            try:
+                for next_read in asyncio.as_completed(reads):
+                    path, chunks = await next_read
+                    summary, pending, removed = self.brand_voice.reconcile_document(path.name, chunks)
+                    unstored[path.name] = len(pending)
+                    stale[path.name] = removed
+                    if not pending:
+                        release(path.name)
+                    report.documents[path.name] = summary
+                    report.chunks += summary["chunks"]
+                    report.embedded += len(pending)
+                    buffer.extend(pending)
+                    state.files_done += 1
+                    state.chunks_pending += len(pending)
+                    flush()
+                    notify()
+                flush(final=True)
+                await asyncio.gather(*batches)
+            except BaseException:
+                for task in [*reads, *batches]:
+                    task.cancel()
+                await asyncio.gather(*reads, *batches, return_exceptions=True)
+                raise
+
+        report.elapsed = _clock() - started
+        logger.info(
+            "Ingested %d files: %d chunks, %d embedded in %.1fs (%.0f chunks/s)",
+            len(paths), report.chunks, report.embedded, report.elapsed, report.chunks_per_second,
+        )
+        return report
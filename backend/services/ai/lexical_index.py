@@ -0,0 +1,261 @@
+"""BM25 inverted index over brand voice chunk texts, and rank fusion.
+
+Vector search is good at paraphrase and poor at exact terms: a product name
+(``RoarMoney``) or a platform (``X (Twitter)``) embeds close to lots of
+loosely related chunks. ``BM25Index`` keeps term postings for every chunk in
+the vector store, so exact-term lookups are a few dictionary reads, and
+``reciprocal_rank_fusion`` merges its ranking with the vector ranking
+(``EmbeddingsService.search_hybrid``).
+
+Text is lower-cased and split on ``\\w+``; scores are Okapi BM25 with
+``k1``/``b``. Each chunk's token string is also kept, so a query can be
+matched as a contiguous phrase (``phrase_matches``).
+
+The vector store maintains the index alongside its matrix: rows are added
+as they are stored or synced, and dropped on delete or reload. ``save()``
+writes the postings and tokenised chunks to an ``.npz`` file next to the
+database (``LEXICAL_INDEX_PATH``), and ``restore()`` reuses them on restart
+for the rows that are still there, tokenising only new ones.
+``LEXICAL_INDEX=off`` disables the index (and hybrid search falls back to
+vectors only).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def default_lexical_path() -> Path:
+    if os.getenv("LEXICAL_INDEX_PATH"):
+        return Path(os.environ["LEXICAL_INDEX_PATH"])
+    from db import sqlite_store
+
+    return sqlite_store.DB_PATH.parent / "brand_voice.bm25.npz"
+
+
+def lexical_from_env() -> BM25Index | None:
+    """The index configured by ``LEXICAL_INDEX``, or ``None`` when it is off."""
+    if os.getenv("LEXICAL_INDEX", "bm25").lower() in ("off", "none", "0"):
+        return None
+    return BM25Index(path=default_lexical_path())
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class BM25Index:
+    """Term postings for chunk texts, keyed by row id."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, path: Path | None = None):
+        self.k1 = k1
+        self.b = b
+        self.path = path
+        self._postings: dict[str, dict[int, int]] = {}
+        self._lengths: dict[int, int] = {}
+        # Space-delimited token string per row, for phrase matching
+        self._docs: dict[int, str] = {}
+        self._total_length = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _index(self, row_id: int, tokens: list[str]) -> None:
+        if row_id in self._lengths:
+            self._unindex(row_id)
+        for term, tf in Counter(tokens).items():
+            self._postings.setdefault(term, {})[row_id] = tf
+        self._lengths[row_id] = len(tokens)
+        self._docs[row_id] = f" {' '.join(tokens)} "
+        self._total_length += len(tokens)
+
+    def _unindex(self, row_id: int) -> None:
+        doc = self._docs.pop(row_id)
+        for term in set(doc.split()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(row_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths.pop(row_id)
+
+    def add(self, rows: Iterable[dict[str, Any]]) -> None:
+        """Index rows (``id`` and ``chunk_text``); a known id is re-indexed."""
+        for row in rows:
+            self._index(row["id"], tokenize(row.get("chunk_text")))
+            self._dirty = True
+
+    def remove(self, ids: Iterable[int]) -> None:
+        for row_id in ids:
+            if row_id in self._lengths:
+                self._unindex(row_id)
+                self._dirty = True
+
+    def reset(self) -> None:
+        self._postings, self._lengths, self._docs = {}, {}, {}
+        self._total_length = 0
+        self._dirty = True
+
+    def ids(self) -> set[int]:
+        return set(self._lengths)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def scores(self, query: str) -> dict[int, float]:
+        """BM25 score of every row sharing a term with ``query``."""
+        n = len(self._lengths)
+        if not n:
+            return {}
+        avg_length = self._total_length / n or 1.0
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for row_id, tf in postings.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._lengths[row_id] / avg_length)
+                scores[row_id] = scores.get(row_id, 0.0) + idf * tf * (self.k1 + 1.0) / (tf + norm)
+        return scores
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float, bool]]:
+        """``(row id, score, phrase match)`` of the best ``top_k`` rows, best first.
+
+        Rows containing the whole query as a phrase rank ahead of the rest.
+        """
+        scores = self.scores(query)
+        phrase = self.phrase_matches(query) if scores else set()
+        ranked = sorted(scores.items(), key=lambda item: (item[0] not in phrase, -item[1], item[0]))
+        return [(row_id, score, row_id in phrase) for row_id, score in ranked[:top_k]]
+
+    def phrase_matches(self, query: str) -> set[int]:
+        """Rows containing every token of ``query``, in order and adjacent."""
+        tokens = tokenize(query)
+        if not tokens:
+            return set()
+        postings = [self._postings.get(t) for t in set(tokens)]
+        if not all(postings):
+            return set()
+        candidates = set.intersection(*(set(p) for p in postings))
+        phrase = f" {' '.join(tokens)} "
+        return {row_id for row_id in candidates if phrase in self._docs[row_id]}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write postings and tokenised rows to ``path`` if anything changed."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        ids = np.fromiter(self._docs, dtype=np.int64, count=len(self._docs))
+        terms = list(self._postings)
+        counts = [len(self._postings[t]) for t in terms]
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                ids=ids,
+                lengths=np.fromiter((self._lengths[i] for i in ids.tolist()), dtype=np.int64, count=len(ids)),
+                docs=_pack(self._docs[i].strip() for i in ids.tolist()),
+                terms=_pack(terms),
+                offsets=np.cumsum([0, *counts], dtype=np.int64),
+                posting_ids=np.fromiter(
+                    (i for t in terms for i in self._postings[t]), dtype=np.int64, count=sum(counts)
+                ),
+                posting_tfs=np.fromiter(
+                    (tf for t in terms for tf in self._postings[t].values()), dtype=np.int32, count=sum(counts)
+                ),
+            )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def restore(self, rows: list[dict[str, Any]]) -> bool:
+        """Index ``rows``, reusing what the saved file knows about them.
+
+        When the file covers exactly these rows its postings are loaded as
+        they are; otherwise the saved token strings of known rows are
+        re-indexed and only new rows are tokenised. Returns False (and
+        indexes nothing) when there is no usable file.
+        """
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with np.load(self.path) as saved:
+                ids = saved["ids"].tolist()
+                lengths = saved["lengths"].tolist()
+                docs = _unpack(saved["docs"], len(ids))
+                terms = _unpack(saved["terms"], len(saved["offsets"]) - 1)
+                offsets = saved["offsets"].tolist()
+                posting_ids = saved["posting_ids"].tolist()
+                posting_tfs = saved["posting_tfs"].tolist()
+        except Exception:
+            logger.warning("Ignoring unreadable lexical index %s", self.path, exc_info=True)
+            return False
+        self.reset()
+        saved_docs = dict(zip(ids, docs))
+        if saved_docs.keys() == {row["id"] for row in rows}:
+            self._postings = {
+                term: dict(zip(posting_ids[start:end], posting_tfs[start:end]))
+                for term, start, end in zip(terms, offsets, offsets[1:])
+            }
+            self._docs = {i: f" {doc} " for i, doc in saved_docs.items()}
+            self._lengths = dict(zip(ids, lengths))
+            self._total_length = sum(lengths)
+            reused = len(rows)
+        else:
+            reused = 0
+            for row in rows:
+                doc = saved_docs.get(row["id"])
+                if doc is None:
+                    self._index(row["id"], tokenize(row.get("chunk_text")))
+                else:
+                    self._index(row["id"], doc.split())
+                    reused += 1
+        self._dirty = reused != len(rows) or len(saved_docs) != len(rows)
+        logger.info("Restored lexical index from %s (%d of %d rows reused)", self.path, reused, len(rows))
+        return True
+
+
+def _pack(strings: Iterable[str]) -> np.ndarray:
+    """Newline-joined UTF-8 bytes; tokens and token strings never contain newlines."""
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack(packed: np.ndarray, count: int) -> list[str]:
+    return packed.tobytes().decode("utf-8").split("\n") if count else []
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[dict[str, Any]]], k: int = RRF_K
+) -> list[dict[str, Any]]:
+    """Merge rankings of rows (best first) by ``sum(1 / (k + rank))``.
+
+    Rows are matched by ``id``; fields from every ranking are merged, and
+    the fused score is returned as ``score``. Best first.
+    """
+    fused: dict[int, dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            entry = fused.setdefault(row["id"], {"score": 0.0})
+            entry.update({key: value for key, value in row.items() if key != "score"})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda r: -r["score"])
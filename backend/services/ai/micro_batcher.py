@@ -0,0 +1,82 @@
+"""Coalesce concurrent single-item async calls into batch calls.
+
+``EmbeddingsService.create_embedding`` is called one text at a time from
+many concurrent tasks (drift scoring, RAG queries, workers). ``MicroBatcher``
+parks each call for at most ``max_wait`` seconds; everything that arrives
+in that window (up to ``max_batch`` items) goes out as a single batch call and
+each caller gets its own result back.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Batch ``submit(item)`` calls into ``batch_fn(items)``.
+
+    ``batch_fn`` must return one result per item, in order. If it raises,
+    every caller in that batch gets the exception. A batcher belongs to the
+    event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[T]], Awaitable[list[R]]],
+        max_batch: int = 64,
+        max_wait: float = 0.01,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+        if self._pending:
+            # More than one batch arrived before the timer fired
+            self._timer = asyncio.get_running_loop().call_soon(self._flush)
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,153 @@
+"""Fit prompt sections into a token budget.
+
+Prompts are assembled from sections of very different value: the brand
+identity and banned words must always be there, retrieved chunks matter
+in proportion to their similarity, and examples or feedback are nice to
+have. ``PromptPacker`` fills a token budget in that order instead of
+concatenating everything (or slicing the result at a character count):
+
+* sections are taken by ``priority`` (0 first); a section's ``items`` by
+  ``score`` (best first), so the least similar chunks are the first to go;
+* ``priority`` 0 sections are always kept, even over budget;
+* an item that doesn't fit is dropped, or, for ``truncate`` sections, cut
+  at the last whole line that fits;
+* the output keeps the sections in the order given, so the prompt's shape
+  stays the same whatever was dropped.
+
+Tokens are estimated locally (``estimate_tokens``): a word-piece count that
+tracks BPE tokenizers closely enough for budgeting English prose, with no
+tokenizer dependency or API call. ``PackedPrompt.dropped`` reports the
+estimated tokens left out per section.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+# Long words split into several BPE tokens
+_CHARS_PER_WORD_PIECE = 8
+
+SECTION_SEPARATOR = "\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``: one per punctuation mark, one or more per word."""
+    return sum(1 + (len(piece) - 1) // _CHARS_PER_WORD_PIECE for piece in _PIECE_RE.findall(text))
+
+
+@dataclass
+class PromptSection:
+    """A titled part of a prompt, made of one or more items.
+
+    Rendered as ``# {title}`` followed by the kept items joined with
+    ``separator`` (no heading when ``title`` is None). ``scores`` rank the
+    items against each other (higher is kept first); by default earlier
+    items win.
+    """
+
+    title: str | None
+    items: list[str]
+    priority: int = 1
+    scores: list[float] | None = None
+    separator: str = "\n\n"
+    truncate: bool = False
+
+    @property
+    def heading(self) -> str:
+        return f"# {self.title}\n" if self.title else ""
+
+
+@dataclass
+class PackedPrompt:
+    text: str
+    tokens: int
+    budget: int
+    # Section title -> estimated tokens left out (dropped or truncated items)
+    dropped: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def dropped_tokens(self) -> int:
+        return sum(self.dropped.values())
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens > self.budget
+
+
+def _truncate_lines(text: str, budget: int) -> str:
+    """The longest run of whole leading lines of ``text`` within ``budget`` tokens.
+
+    When not even the first line fits, it is cut at the last whole word.
+    """
+    kept: list[str] = []
+    used = 0
+    lines = text.split("\n")
+    for line in lines:
+        cost = estimate_tokens(line)
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    if not kept and lines:
+        for word in lines[0].split(" "):
+            cost = estimate_tokens(word)
+            if used + cost > budget:
+                break
+            kept.append(word)
+            used += cost
+        return " ".join(kept).rstrip()
+    return "\n".join(kept).rstrip()
+
+
+class PromptPacker:
+    """Pack ``PromptSection``s into at most ``budget`` estimated tokens."""
+
+    def __init__(self, budget: int):
+        self.budget = budget
+
+    def pack(self, sections: list[PromptSection]) -> PackedPrompt:
+        kept: list[dict[int, str]] = [{} for _ in sections]
+        dropped: dict[str, int] = {}
+        used = 0
+
+        units = []
+        for s_idx, section in enumerate(sections):
+            scores = section.scores or [-float(i) for i in range(len(section.items))]
+            for i_idx, (item, score) in enumerate(zip(section.items, scores)):
+                if item:
+                    units.append((section.priority, -score, s_idx, i_idx, item))
+        units.sort(key=lambda u: u[:4])
+
+        for priority, _, s_idx, i_idx, item in units:
+            section = sections[s_idx]
+            # The heading and separators are charged with the first item kept
+            overhead = estimate_tokens(section.heading if not kept[s_idx] else section.separator)
+            if not kept[s_idx] and any(kept):
+                overhead += estimate_tokens(SECTION_SEPARATOR)
+            cost = estimate_tokens(item) + overhead
+            if priority == 0 or used + cost <= self.budget:
+                kept[s_idx][i_idx] = item
+                used += cost
+                continue
+            remaining = self.budget - used - overhead
+            partial = _truncate_lines(item, remaining) if section.truncate and remaining > 0 else ""
+            if partial:
+                kept[s_idx][i_idx] = partial
+                used += estimate_tokens(partial) + overhead
+            title = section.title or ""
+            dropped[title] = dropped.get(title, 0) + estimate_tokens(item) - estimate_tokens(partial)
+
+        parts = [
+            section.heading + section.separator.join(items[i] for i in sorted(items))
+            for section, items in zip(sections, kept)
+            if items
+        ]
+        text = SECTION_SEPARATOR.join(parts)
+        return PackedPrompt(text=text, tokens=estimate_tokens(text), budget=self.budget, dropped=dropped)
+
+
+def fit_text(text: str, budget: int) -> PackedPrompt:
+    """``text`` cut at the last whole line within ``budget`` tokens."""
+    return PromptPacker(budget).pack([PromptSection(None, [text], truncate=True)])
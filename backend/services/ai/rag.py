@@ -8,11 +8,20 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 from typing import Any
 
 from services.ai.brand_voice import BrandVoiceService
 from services.ai.embeddings import EmbeddingsService
 from services.ai.feedback_loop import FeedbackLoopService
+from services.ai.prompt_packer import (
+    SECTION_SEPARATOR,
+    PackedPrompt,
+    PromptPacker,
+    PromptSection,
+    estimate_tokens,
+)
+from services.ai.retrieval import RetrievalSession
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +33,20 @@ PLATFORM_CHAR_LIMITS: dict[str, int] = {
     "youtube": 500,
 }
 
+# Estimated tokens per system prompt; the compiled prefix gets up to
+# PROMPT_PREFIX_SHARE of it, the per-video sections whatever it leaves
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))
+PROMPT_PREFIX_SHARE = float(os.getenv("PROMPT_PREFIX_SHARE", "0.7"))
+
+# Brand-voice files the compiled prompt prefix is built from
+PROMPT_SOURCE_FILES = (
+    "voice_config.json",
+    "compliance_rails.json",
+    "brand_guidelines.md",
+    "platform_playbooks.md",
+    "copywriting_reference.md",
+)
+
 
 class RAGService:
     """Retrieve brand voice context and assemble system prompts for generation."""
@@ -32,20 +55,37 @@ class RAGService:
         self,
         brand_voice_service: BrandVoiceService | None = None,
         embeddings_service: EmbeddingsService | None = None,
+        token_budget: int = PROMPT_TOKEN_BUDGET,
     ):
+        self.token_budget = token_budget
         self.embeddings = embeddings_service or EmbeddingsService()
         self.brand_voice = brand_voice_service or BrandVoiceService(
             embeddings_service=self.embeddings
         )
+        # platform -> (source fingerprint, compiled prompt prefix)
+        self._prefixes: dict[str, tuple[Any, PackedPrompt]] = {}
+
+    def session(self, query: str) -> RetrievalSession:
+        """A retrieval session for ``query``: embedded and searched at most once."""
+        return RetrievalSession(self.embeddings, query)
+
+    def session_for(self, video_context: dict[str, Any]) -> RetrievalSession:
+        """The retrieval session for a video, as used by ``assemble_system_prompt``."""
+        return self.session(_build_query_from_context(video_context))
 
     async def retrieve_context(
-        self, query: str, platform: str, top_k: int = 5
+        self,
+        query: str,
+        platform: str,
+        top_k: int = 5,
+        session: RetrievalSession | None = None,
     ) -> list[dict[str, Any]]:
-        """Full RAG pipeline: embed query, search pgvector, return ranked chunks."""
-        query_embedding = await self.embeddings.create_embedding(query)
-        results = self.embeddings.search_similar(
-            query_embedding, top_k=top_k, threshold=0.4
-        )
+        """Full RAG pipeline: embed query, search pgvector, return ranked chunks.
+
+        Pass a ``session`` for ``query`` to reuse its embedding and search.
+        """
+        session = session or self.session(query)
+        results = await session.view(top_k=top_k, threshold=0.4)
 
         # Boost platform-specific results
         if platform:
@@ -116,28 +156,128 @@ class RAGService:
         return self.brand_voice.get_personality_config()
 
     async def assemble_system_prompt(
-        self, platform: str, video_context: dict[str, Any]
+        self,
+        platform: str,
+        video_context: dict[str, Any],
+        session: RetrievalSession | None = None,
     ) -> str:
         """Build complete system prompt for comment generation.
 
-        Combines:
-        - Brand personality
-        - RAG-retrieved voice guidelines
-        - Platform-specific rules
-        - Banned words / compliance rules
-        - Positive/negative examples
+        See ``assemble_packed_prompt``; this returns just the text.
+        """
+        packed = await self.assemble_packed_prompt(platform, video_context, session)
+        return packed.text
+
+    async def assemble_packed_prompt(
+        self,
+        platform: str,
+        video_context: dict[str, Any],
+        session: RetrievalSession | None = None,
+    ) -> PackedPrompt:
+        """Build the system prompt within ``token_budget`` estimated tokens.
+
+        The compiled per-platform prefix (personality, platform rules,
+        compliance, banned words, examples, instructions) is followed by the
+        sections that vary per video, packed into what the prefix leaves:
+        - RAG-retrieved voice guidelines, most similar chunks first
+        - Human feedback examples
+
+        The result reports the tokens dropped per section.
+
+        Pass ``session_for(video_context)`` as ``session`` to share the
+        video's embedding and search with other retrieval in the same
+        generation.
         """
-        parts: list[str] = []
+        prefix = self._compiled(platform)
+        sections: list[PromptSection] = []
+
+        # RAG-retrieved voice context relevant to this video
+        session = session or self.session_for(video_context)
+        chunks = await self.brand_voice.get_voice_chunks(
+            session.query, platform, session=session
+        )
+        if chunks:
+            sections.append(
+                PromptSection(
+                    "Relevant Brand Voice Context",
+                    [r.get("chunk_text", "") for r in chunks],
+                    priority=1,
+                    scores=[r.get("similarity", 0.0) for r in chunks],
+                    separator="\n\n---\n\n",
+                )
+            )
+
+        # Human feedback examples (learning loop)
+        try:
+            feedback_service = FeedbackLoopService()
+            feedback_context = feedback_service.get_feedback_context_for_prompt(
+                n_approved=5, n_denied=3
+            )
+            if feedback_context:
+                sections.append(
+                    PromptSection(
+                        "Learning from Human Feedback", [feedback_context], priority=2, truncate=True
+                    )
+                )
+        except Exception as e:
+            logger.warning("Failed to load feedback context: %s", e)
+
+        remaining = max(0, self.token_budget - prefix.tokens - estimate_tokens(SECTION_SEPARATOR))
+        suffix = PromptPacker(remaining).pack(sections)
+        text = SECTION_SEPARATOR.join(p for p in (prefix.text, suffix.text) if p)
+        packed = PackedPrompt(
+            text=text,
+            tokens=prefix.tokens + estimate_tokens(SECTION_SEPARATOR) + suffix.tokens,
+            budget=self.token_budget,
+            dropped={**prefix.dropped, **suffix.dropped},
+        )
+        if packed.dropped:
+            logger.info(
+                "System prompt for %s: %d/%d tokens, dropped %s",
+                platform, packed.tokens, packed.budget, packed.dropped,
+            )
+        return packed
+
+    def compiled_prefix(self, platform: str) -> str:
+        """The part of the system prompt that only depends on the platform.
+
+        Compiled once per platform and reused until one of the brand-voice
+        files it is built from changes (mtime or size) or the voice config
+        is updated.
+        """
+        return self._compiled(platform).text
+
+    def _compiled(self, platform: str) -> PackedPrompt:
+        key = platform.lower()
+        fingerprint = self.brand_voice.source_fingerprint(PROMPT_SOURCE_FILES)
+        cached = self._prefixes.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        prefix = self._compile_prefix(platform)
+        self._prefixes[key] = (fingerprint, prefix)
+        return prefix
+
+    def _compile_prefix(self, platform: str) -> PackedPrompt:
+        budget = int(self.token_budget * PROMPT_PREFIX_SHARE)
+        return PromptPacker(budget).pack(self._prefix_sections(platform))
+
+    def _prefix_sections(self, platform: str) -> list[PromptSection]:
+        sections: list[PromptSection] = []
 
         # 1. Brand identity and personality
         personality = self.retrieve_personality()
         if personality:
             p = personality.get("personality", {})
-            parts.append(
-                f"# Brand Identity\n"
-                f"You are MoneyLion's social media voice.\n"
-                f"Personality Archetype: {p.get('archetype', 'The Irreverent Maverick')}\n"
-                f"Core Identity: {p.get('core_identity', '')}\n"
+            sections.append(
+                PromptSection(
+                    "Brand Identity",
+                    [
+                        f"You are MoneyLion's social media voice.\n"
+                        f"Personality Archetype: {p.get('archetype', 'The Irreverent Maverick')}\n"
+                        f"Core Identity: {p.get('core_identity', '')}\n"
+                    ],
+                    priority=0,
+                )
             )
 
             # Voice pillars
@@ -151,96 +291,102 @@ class RAGService:
                         f"- **{vp.get('name', '')}** ({vp.get('tone', '')}): "
                         f"{vp.get('description', '')}. Directives: {dir_text}"
                     )
-                parts.append("# Voice Pillars\n" + "\n".join(pillar_lines))
+                sections.append(PromptSection("Voice Pillars", ["\n".join(pillar_lines)], truncate=True))
 
             # Voice features
             features = personality.get("voice_features", [])
             if features:
-                parts.append("# Voice Features\n" + "\n".join(f"- {f}" for f in features))
+                sections.append(
+                    PromptSection(
+                        "Voice Features", ["\n".join(f"- {f}" for f in features)], priority=3, truncate=True
+                    )
+                )
 
             # Tone guardrails
             guardrails = personality.get("tone_guardrails", {})
             we_are = guardrails.get("we_are", {})
             we_are_not = guardrails.get("we_are_not", {})
             if we_are or we_are_not:
-                parts.append(
-                    f"# Tone Guardrails\n"
-                    f"We ARE: {json.dumps(we_are)}\n"
-                    f"We are NOT: {json.dumps(we_are_not)}"
+                sections.append(
+                    PromptSection(
+                        "Tone Guardrails",
+                        [f"We ARE: {json.dumps(we_are)}\nWe are NOT: {json.dumps(we_are_not)}"],
+                        priority=2,
+                    )
                 )
 
-        # 2. RAG-retrieved voice context relevant to this video
-        query = _build_query_from_context(video_context)
-        voice_context = await self.brand_voice.get_voice_context(query, platform)
-        if voice_context:
-            parts.append(f"# Relevant Brand Voice Context\n{voice_context}")
-
-        # 3. Platform-specific rules
+        # 2. Platform-specific rules
         playbook = self.brand_voice.get_platform_playbook(platform)
         if playbook:
-            parts.append(f"# Platform Rules ({platform.upper()})\n{playbook}")
+            sections.append(
+                PromptSection(f"Platform Rules ({platform.upper()})", [playbook], truncate=True)
+            )
 
         # Character limit
         char_limit = PLATFORM_CHAR_LIMITS.get(platform.lower(), 300)
         platform_config = personality.get("platform_configs", {}).get(
             platform.lower(), {}
         )
-        parts.append(
-            f"# Character Limit\n"
-            f"Maximum comment length: {char_limit} characters.\n"
-            f"Formality level: {platform_config.get('formality', 5)}/10\n"
-            f"Humor level: {platform_config.get('humor', 5)}/10\n"
-            f"Emoji usage: {platform_config.get('emoji_usage', 'moderate')}\n"
-            f"Slang allowed: {platform_config.get('slang_allowed', False)}"
+        sections.append(
+            PromptSection(
+                "Character Limit",
+                [
+                    f"Maximum comment length: {char_limit} characters.\n"
+                    f"Formality level: {platform_config.get('formality', 5)}/10\n"
+                    f"Humor level: {platform_config.get('humor', 5)}/10\n"
+                    f"Emoji usage: {platform_config.get('emoji_usage', 'moderate')}\n"
+                    f"Slang allowed: {platform_config.get('slang_allowed', False)}"
+                ],
+                priority=0,
+            )
         )
 
-        # 4. Compliance rules and banned words
+        # 3. Compliance rules and banned words
         compliance = self.retrieve_compliance_context()
         if compliance:
-            parts.append(f"# Compliance Rules\n{compliance}")
+            sections.append(PromptSection("Compliance Rules", [compliance], truncate=True))
 
         banned = self.brand_voice.get_banned_words()
         absolute_bans = banned.get("absolute", [])
         if absolute_bans:
-            parts.append(
-                f"# CRITICAL: Banned Words\n"
-                f"NEVER use any of these words/phrases in your output:\n"
-                f"{', '.join(absolute_bans)}"
+            sections.append(
+                PromptSection(
+                    "CRITICAL: Banned Words",
+                    [
+                        f"NEVER use any of these words/phrases in your output:\n"
+                        f"{', '.join(absolute_bans)}"
+                    ],
+                    priority=0,
+                )
             )
 
-        # 5. Examples from copywriting reference
+        # 4. Examples from copywriting reference
         ref = self.brand_voice.get_copywriting_reference()
         if ref:
             # Extract do/don't section
             examples = _extract_examples(ref)
             if examples:
-                parts.append(f"# Examples\n{examples}")
-
-        # 5.5. Human feedback examples (learning loop)
-        try:
-            feedback_service = FeedbackLoopService()
-            feedback_context = feedback_service.get_feedback_context_for_prompt(
-                n_approved=5, n_denied=3
+                sections.append(PromptSection("Examples", [examples], priority=3, truncate=True))
+
+        # 5. Core instructions
+        sections.append(
+            PromptSection(
+                "Instructions",
+                [
+                    "- Generate comments that sound human, not corporate\n"
+                    "- Match the platform's native language and energy\n"
+                    "- Never give specific financial advice\n"
+                    "- Never promise outcomes or guarantee anything\n"
+                    "- Never disparage competitors by name\n"
+                    "- If the content is about financial hardship, be empathetic and supportive. NEVER pitch a product.\n"
+                    "- Each comment should make someone feel: enlightened, entertained, curious, or understood\n"
+                    "- Prioritize engagement potential over information density"
+                ],
+                priority=0,
             )
-            if feedback_context:
-                parts.append(f"# Learning from Human Feedback\n{feedback_context}")
-        except Exception as e:
-            logger.warning("Failed to load feedback context: %s", e)
-
-        # 6. Core instructions
-        parts.append(
-            "# Instructions\n"
-            "- Generate comments that sound human, not corporate\n"
-            "- Match the platform's native language and energy\n"
-            "- Never give specific financial advice\n"
-            "- Never promise outcomes or guarantee anything\n"
-            "- Never disparage competitors by name\n"
-            "- If the content is about financial hardship, be empathetic and supportive. NEVER pitch a product.\n"
-            "- Each comment should make someone feel: enlightened, entertained, curious, or understood\n"
-            "- Prioritize engagement potential over information density"
         )
 
-        return "\n\n".join(parts)
+        return sections
 
 
 def _build_query_from_context(video_context: dict[str, Any]) -> str:
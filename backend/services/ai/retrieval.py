@@ -0,0 +1,74 @@
+"""Retrieval sessions: one embedding and one vector scan per query.
+
+Generating a comment used to retrieve brand voice chunks for the same
+query more than once: ``BrandVoiceService.get_voice_context`` (top 8 over
+0.5) and ``RAGService.retrieve_context`` (top k over 0.4, platform boost)
+each embedded the query and scanned the vectors themselves.
+
+A ``RetrievalSession`` embeds its query once, runs one over-fetching
+search (``RETRIEVAL_FETCH_K`` chunks over ``RETRIEVAL_MIN_THRESHOLD``) on
+first use, and answers every ``view(top_k, threshold)`` from that result.
+Results come back best first, so a view is the prefix that clears its
+threshold, cut to ``top_k`` — the same chunks a dedicated search would
+return. Views asking for more than was fetched fall back to a fresh
+search with the same embedding. Rows are copied per view, so boosting one
+view's scores never leaks into another.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any
+
+from services.ai.embeddings import EmbeddingsService
+
+FETCH_K = int(os.getenv("RETRIEVAL_FETCH_K", "20"))
+MIN_THRESHOLD = float(os.getenv("RETRIEVAL_MIN_THRESHOLD", "0.4"))
+
+
+class RetrievalSession:
+    """Brand voice search results for one query, shared by every consumer."""
+
+    def __init__(
+        self,
+        embeddings: EmbeddingsService,
+        query: str,
+        fetch_k: int = FETCH_K,
+        min_threshold: float = MIN_THRESHOLD,
+    ):
+        self.embeddings = embeddings
+        self.query = query
+        self.fetch_k = fetch_k
+        self.min_threshold = min_threshold
+        self._embedding: list[float] | None = None
+        self._results: list[dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def embedding(self) -> list[float]:
+        """The query's embedding, created on first use."""
+        async with self._lock:
+            if self._embedding is None:
+                self._embedding = await self.embeddings.create_embedding(self.query)
+            return self._embedding
+
+    async def results(self) -> list[dict[str, Any]]:
+        """The over-fetched search results, best first."""
+        embedding = await self.embedding()
+        async with self._lock:
+            if self._results is None:
+                results = self.embeddings.search_similar(
+                    embedding, top_k=self.fetch_k, threshold=self.min_threshold
+                )
+                self._results = sorted(results, key=lambda r: r.get("similarity", 0), reverse=True)
+            return self._results
+
+    async def view(self, top_k: int, threshold: float) -> list[dict[str, Any]]:
+        """Top ``top_k`` results with similarity >= ``threshold``, as fresh copies."""
+        if top_k > self.fetch_k or threshold < self.min_threshold:
+            rows = self.embeddings.search_similar(
+                await self.embedding(), top_k=top_k, threshold=threshold
+            )
+        else:
+            rows = [r for r in await self.results() if r.get("similarity", 0) >= threshold]
+        return [dict(r) for r in rows[:top_k]]
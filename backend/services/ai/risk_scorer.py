@@ -239,11 +239,17 @@ class RiskScorer:
     ) -> dict[str, Any]:
         """Aggregate risk scoring stats for the dashboard."""
         db = get_supabase_admin()
+
+        def scores_in_range():
+            return (
+                db.table("risk_scores")
+                .gte("scored_at", start_date)
+                .lte("scored_at", end_date)
+            )
+
         result = (
-            db.table("risk_scores")
-            .select("total_score,routing_decision,scored_at")
-            .gte("scored_at", start_date)
-            .lte("scored_at", end_date)
+            scores_in_range()
+            .select("routing_decision, count(), total:total_score.sum()")
             .execute()
         )
 
@@ -255,25 +261,31 @@ class RiskScorer:
                 "score_distribution": {},
             }
 
-        scores = result.data
-        total = len(scores)
-        avg_score = sum(s["total_score"] for s in scores) / total
+        groups = result.data
+        total = sum(g["count"] for g in groups)
+        avg_score = sum(g["total"] or 0 for g in groups) / total
 
         routing_counts: dict[str, int] = {}
-        for s in scores:
-            decision = s.get("routing_decision", "unknown")
-            routing_counts[decision] = routing_counts.get(decision, 0) + 1
+        for g in groups:
+            decision = g.get("routing_decision") or "unknown"
+            routing_counts[decision] = routing_counts.get(decision, 0) + g["count"]
 
         # Score distribution in buckets
-        buckets = {"0-30": 0, "31-65": 0, "66-100": 0}
-        for s in scores:
-            sc = s["total_score"]
-            if sc <= 30:
-                buckets["0-30"] += 1
-            elif sc <= 65:
-                buckets["31-65"] += 1
-            else:
-                buckets["66-100"] += 1
+        low = scores_in_range().select("count()").lte("total_score", 30).execute()
+        mid = (
+            scores_in_range()
+            .select("count()")
+            .gt("total_score", 30)
+            .lte("total_score", 65)
+            .execute()
+        )
+        low_count = low.data[0]["count"] if low.data else 0
+        mid_count = mid.data[0]["count"] if mid.data else 0
+        buckets = {
+            "0-30": low_count,
+            "31-65": mid_count,
+            "66-100": total - low_count - mid_count,
+        }
 
         return {
             "total_scored": total,
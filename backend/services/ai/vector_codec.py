@@ -0,0 +1,94 @@
+"""Binary encoding for stored embedding vectors.
+
+``brand_voice_embeddings.embedding`` and ``comment_embeddings.embedding``
+used to hold JSON text: ~30KB per 1536-dim vector, parsed back into a list
+of Python floats on every load. They now hold a small header followed by
+the raw vector, which both adapters store as a BLOB (SQLite) or ``bytea``
+(PostgreSQL):
+
+* ``float32``: 4-byte header + ``dim`` little-endian float32 values (6KB);
+* ``int8``: 4-byte header + float32 scale + ``dim`` int8 values (1.5KB).
+  Each vector is scaled by its own max absolute value, so it is recovered
+  to within ``scale / 254`` per component.
+
+``EMBEDDING_STORAGE`` picks the format new rows are written in (``float32``
+by default, ``int8``, or ``json`` for the legacy text form, which a
+pgvector ``vector`` column needs). ``decode_vector`` reads all three, so
+tables can be migrated in place (``scripts.migrate_binary_embeddings``).
+float32 vectors decode with ``np.frombuffer`` and no copy.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+import numpy as np
+
+STORAGE_FORMAT = os.getenv("EMBEDDING_STORAGE", "float32").lower()
+FORMATS = ("float32", "int8", "json")
+
+_MAGIC = b"EV"
+_FLOAT32 = 1
+_INT8 = 2
+# Keeps the float32 payload 4-byte aligned for np.frombuffer
+_HEADER_SIZE = 4
+_FLOAT32_LE = np.dtype("<f4")
+
+
+def encode_vector(vector: Any, fmt: str | None = None) -> bytes | list[float]:
+    """``vector`` in the stored form for ``fmt`` (default ``EMBEDDING_STORAGE``)."""
+    fmt = (fmt or STORAGE_FORMAT).lower()
+    if fmt == "json":
+        return [float(x) for x in vector]
+    array = np.asarray(vector, dtype=_FLOAT32_LE).ravel()
+    if fmt == "float32":
+        return _MAGIC + bytes((_FLOAT32, 0)) + array.tobytes()
+    if fmt == "int8":
+        peak = float(np.max(np.abs(array))) if array.size else 0.0
+        scale = peak / 127 if peak > 0 else 1.0
+        quantized = np.clip(np.rint(array / scale), -127, 127).astype(np.int8)
+        return (
+            _MAGIC + bytes((_INT8, 0))
+            + np.asarray(scale, dtype=_FLOAT32_LE).tobytes()
+            + quantized.tobytes()
+        )
+    raise ValueError(f"Unknown embedding storage format {fmt!r}; expected one of {FORMATS}")
+
+
+def is_binary(value: Any) -> bool:
+    """True if ``value`` is already in a binary stored form."""
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:2]) == _MAGIC
+
+
+def decode_vector(value: Any) -> np.ndarray | None:
+    """A float32 array for any stored form of a vector, or None if empty/unreadable.
+
+    float32 blobs come back as read-only views over ``value``.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if not is_binary(value):
+            # A vector column converted to bytea still holds its text form
+            return decode_vector(bytes(value).decode("utf-8", "replace"))
+        kind = value[2]
+        if kind == _FLOAT32:
+            array = np.frombuffer(value, dtype=_FLOAT32_LE, offset=_HEADER_SIZE)
+        elif kind == _INT8:
+            scale = np.frombuffer(value, dtype=_FLOAT32_LE, count=1, offset=_HEADER_SIZE)[0]
+            array = np.frombuffer(value, dtype=np.int8, offset=_HEADER_SIZE + 4).astype(np.float32) * scale
+        else:
+            return None
+        return array if array.size else None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    try:
+        array = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+    return array if array.ndim == 1 and array.size else None
@@ -0,0 +1,433 @@
+"""In-process vector store for brand voice similarity search.
+
+Keeps every ``brand_voice_embeddings`` vector in one contiguous, L2-normalised
+float32 matrix, so a top-k query is a single matrix-vector product plus an
+``argpartition`` instead of decoding and scoring each row in Python. Rows
+are decoded with ``services.ai.vector_codec``, so binary vectors are read
+straight from the fetched bytes.
+
+Writers in this process keep the store current through ``add()``,
+``remove()``, ``update()`` and ``clear()``. Changes made elsewhere are
+picked up by ``sync()``, which runs a ``(row count, max id)`` probe at most
+every ``VECTOR_STORE_SYNC_SECONDS``. New rows are appended by fetching only
+the ids past the last one seen. Any other change (deletes, re-ingestion)
+triggers a full reload.
+
+With ``VECTOR_INDEX=ivf`` the store also keeps an IVF-flat index
+(``services.ai.ann_index``), which large stores search instead of scanning
+every row. The index is trained, restored and saved during ``sync()``.
+
+The store also keeps a BM25 index of the chunk texts
+(``services.ai.lexical_index``) in step with its rows, for exact-term and
+hybrid search. It is restored on first load and saved during ``sync()``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Iterator
+
+import numpy as np
+
+from services.ai.ann_index import IVFIndex, _top, index_from_env
+from services.ai.lexical_index import BM25Index, lexical_from_env
+from services.ai.vector_codec import decode_vector
+
+logger = logging.getLogger(__name__)
+
+TABLE = "brand_voice_embeddings"
+_ROW_COLUMNS = "id,document_name,chunk_text,chunk_index,metadata,embedding"
+_MIN_CAPACITY = 256
+# Rows fetched per round trip; each page becomes float32 before the next is read
+PAGE_SIZE = 2000
+SYNC_INTERVAL = float(os.getenv("VECTOR_STORE_SYNC_SECONDS", "5"))
+
+_clock = time.monotonic
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    # Zero vectors stay zero, so they score 0 like _cosine_similarity
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class VectorStore:
+    """Normalised embedding matrix plus the chunk fields search results return."""
+
+    def __init__(
+        self,
+        sync_interval: float = SYNC_INTERVAL,
+        index: IVFIndex | None = None,
+        lexical: BM25Index | None = None,
+    ) -> None:
+        self.sync_interval = sync_interval
+        self.index = index
+        self._index_restored = False
+        self.lexical = lexical
+        self._lexical_restored = False
+        self._last_sync: float | None = None
+        self._lock = threading.Lock()
+        # Serialises syncs so concurrent searches don't fetch the same rows twice
+        self._sync_lock = threading.Lock()
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        self._rows: list[dict[str, Any]] = []
+        # Table rows seen, including ones without a usable vector
+        self._seen = 0
+        self._max_id: int | None = None
+        self._loaded = False
+        # Bumped on every change; derived data (centroids) is cached per version
+        self.version = 0
+        self._centroids: dict[str | None, np.ndarray | None] = {}
+        self._by_id: dict[int, dict[str, Any]] | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dim(self) -> int | None:
+        return self._matrix.shape[1] if self._size else None
+
+    # ------------------------------------------------------------------
+    # Sync with the table
+    # ------------------------------------------------------------------
+
+    def sync(self, db: Any, force: bool = False) -> None:
+        """Bring the store up to date with the table, incrementally when possible.
+
+        Skipped when the last sync was less than ``sync_interval`` seconds ago,
+        unless ``force`` is set or the store has not been loaded yet.
+        """
+        with self._sync_lock:
+            now = _clock()
+            fresh = self._last_sync is not None and now - self._last_sync < self.sync_interval
+            if fresh and self._loaded and not force:
+                return
+            self._sync(db)
+            self._last_sync = now
+            if self.index is not None:
+                self._maintain_index()
+            if self.lexical is not None:
+                with self._lock:
+                    self.lexical.save()
+
+    def _maintain_index(self) -> None:
+        """Restore, train or persist the ANN index; caller holds the sync lock."""
+        index = self.index
+        with self._lock:
+            matrix, size = self._matrix[: self._size], self._size
+        if not self._index_restored:
+            self._index_restored = True
+            if size and not index.trained:
+                with self._lock:
+                    # Hold the lock so no add() lands between restore and use
+                    index.restore(self._matrix[: self._size], self._ids())
+        if index.needs_training(size):
+            # The slow part runs on a snapshot without blocking searches
+            centroids = index.fit(matrix)
+            assign = index.nearest(matrix, centroids)
+            with self._lock:
+                tail = self._matrix[size : self._size]
+                if len(tail):
+                    assign = np.concatenate([assign, index.nearest(tail, centroids)])
+                index.install(centroids, assign, size)
+        elif index.trained and len(index) < size:
+            # The matrix was rebuilt: re-assign rows to the existing centroids
+            with self._lock:
+                index.reset()
+                index.add(self._matrix[: self._size])
+        with self._lock:
+            ids = self._ids()
+        index.save(ids)
+
+    def _ids(self) -> np.ndarray:
+        return np.fromiter((r["id"] for r in self._rows), dtype=np.int64, count=len(self._rows))
+
+    def _sync(self, db: Any) -> None:
+        probe = db.table(TABLE).select("rows:count(), last_id:id.max()").execute().data
+        total = probe[0]["rows"] if probe else 0
+        last_id = probe[0]["last_id"] if probe else None
+        with self._lock:
+            if self._loaded and total == self._seen and last_id == self._max_id:
+                return
+            appendable = self._loaded and total > self._seen and self._max_id is not None
+            after = self._max_id
+        if appendable:
+            for page in _pages(db, after):
+                with self._lock:
+                    self._append(page)
+            with self._lock:
+                if self._seen == total:
+                    return
+        self._reload(db)
+
+    def reload(self, db: Any) -> None:
+        """Rebuild the matrix from every row in the table."""
+        with self._sync_lock:
+            self._reload(db)
+
+    def _reload(self, db: Any) -> None:
+        # Build off to the side so searches keep using the old matrix meanwhile
+        staging = VectorStore()
+        for page in _pages(db, None):
+            staging._append(page)
+        with self._lock:
+            self._matrix, self._size, self._rows = staging._matrix, staging._size, staging._rows
+            self._seen, self._max_id = staging._seen, staging._max_id
+            self._loaded = True
+            self._changed()
+            if self.index is not None:
+                self.index.reset()
+            if self.lexical is not None:
+                self._rebuild_lexical()
+        logger.info("Loaded %d brand voice embeddings into the vector store", self._size)
+
+    def add(self, rows: list[dict[str, Any]]) -> None:
+        """Append freshly stored rows (with ``id`` and ``embedding``) without a round trip."""
+        with self._lock:
+            if not self._loaded:
+                return  # The first sync loads them anyway
+            known = self._max_id if self._max_id is not None else -1
+            fresh = [r for r in rows if r.get("id") is not None and r["id"] > known]
+            if len(fresh) != len(rows):
+                # Out of order or missing ids: let the next sync rebuild
+                self._loaded = False
+                return
+            self._append(sorted(fresh, key=lambda r: r["id"]))
+
+    def remove(self, ids: list[int]) -> None:
+        """Drop rows just deleted from the table without a reload."""
+        drop = set(ids)
+        with self._lock:
+            if not self._loaded or not drop:
+                return
+            self._seen -= len(drop)
+            keep = np.fromiter((r["id"] not in drop for r in self._rows), dtype=bool, count=len(self._rows))
+            if keep.all():
+                return
+            # A copy, not an in-place compaction: searches may hold the old matrix
+            self._matrix = self._matrix[: self._size][keep]
+            self._size = len(self._matrix)
+            self._rows = [r for r, k in zip(self._rows, keep) if k]
+            self._changed()
+            if self.index is not None:
+                self.index.keep(keep)
+            if self.lexical is not None:
+                self.lexical.remove(drop)
+
+    def update(self, rows: list[dict[str, Any]]) -> None:
+        """Apply in-place edits (``metadata``, ``chunk_index``...) to stored rows by id."""
+        changes = {r["id"]: r for r in rows if r.get("id") is not None}
+        with self._lock:
+            for i, row in enumerate(self._rows):
+                change = changes.get(row["id"])
+                if change is not None:
+                    # Copy so searches holding the old list never see half an edit
+                    self._rows[i] = {**row, **{k: v for k, v in change.items() if k in row}}
+                    if self.lexical is not None and "chunk_text" in change:
+                        self.lexical.add([self._rows[i]])
+            self._changed()
+
+    def clear(self) -> None:
+        """Forget everything; the next sync reloads from the table."""
+        with self._lock:
+            self._reset()
+            if self.index is not None:
+                self.index.reset()
+            if self.lexical is not None:
+                self.lexical.reset()
+
+    def _reset(self) -> None:
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        self._rows = []
+        self._seen = 0
+        self._max_id = None
+        self._loaded = False
+        self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._centroids = {}
+        self._by_id = None
+
+    def _rebuild_lexical(self) -> None:
+        """Bring the BM25 index in line with the rows after a reload; caller holds the lock."""
+        if not self._lexical_restored:
+            self._lexical_restored = True
+            if self.lexical.restore(self._rows):
+                return
+        present = {r["id"] for r in self._rows}
+        indexed = self.lexical.ids()
+        self.lexical.remove(indexed - present)
+        self.lexical.add(r for r in self._rows if r["id"] not in indexed)
+
+    def _append(self, rows: list[dict[str, Any]]) -> None:
+        """Add rows (sorted by id) to the matrix; caller holds the lock."""
+        if not rows:
+            return
+        self._seen += len(rows)
+        self._max_id = rows[-1]["id"]
+        dim = self.dim
+        vectors = []
+        kept = []
+        for row in rows:
+            emb = decode_vector(row.get("embedding"))
+            if emb is None:
+                continue
+            if dim is None:
+                dim = len(emb)
+            if len(emb) != dim:
+                logger.warning("Skipping embedding %s: %d dims, expected %d", row.get("id"), len(emb), dim)
+                continue
+            vectors.append(emb)
+            kept.append({
+                "id": row["id"],
+                "document_name": row.get("document_name"),
+                "chunk_text": row.get("chunk_text"),
+                "chunk_index": row.get("chunk_index"),
+                "metadata": row.get("metadata", {}),
+            })
+        if kept:
+            block = _normalize(np.stack(vectors))
+            needed = self._size + len(kept)
+            if self._matrix.shape[0] < needed or self._matrix.shape[1] != dim:
+                capacity = max(_MIN_CAPACITY, needed, 2 * self._matrix.shape[0])
+                grown = np.empty((capacity, dim), dtype=np.float32)
+                if self._size:
+                    grown[: self._size] = self._matrix[: self._size]
+                self._matrix = grown
+            self._matrix[self._size : needed] = block
+            self._size = needed
+            self._rows.extend(kept)
+            self._changed()
+            if self.index is not None:
+                self.index.add(block)
+            if self.lexical is not None:
+                self.lexical.add(kept)
+
+    # ------------------------------------------------------------------
+    # Centroids
+    # ------------------------------------------------------------------
+
+    def centroid(self, doc_type: str | None = None) -> np.ndarray | None:
+        """Mean of the normalised vectors, or of those whose ``metadata.doc_type`` matches.
+
+        A query's dot product with it is its mean cosine similarity to those
+        chunks. Computed once per store version; None when there are no rows.
+        """
+        with self._lock:
+            if doc_type in self._centroids:
+                return self._centroids[doc_type]
+            matrix = self._matrix[: self._size]
+            if doc_type is not None:
+                mask = np.fromiter(
+                    ((r.get("metadata") or {}).get("doc_type") == doc_type for r in self._rows),
+                    dtype=bool,
+                    count=len(self._rows),
+                )
+                matrix = matrix[mask]
+            centroid = matrix.mean(axis=0, dtype=np.float64).astype(np.float32) if len(matrix) else None
+            self._centroids[doc_type] = centroid
+            return centroid
+
+    def doc_types(self) -> list[str]:
+        """Distinct ``metadata.doc_type`` values of the stored chunks."""
+        with self._lock:
+            found = {(r.get("metadata") or {}).get("doc_type") for r in self._rows}
+        return sorted(t for t in found if t)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query_embedding: list[float],
+        top_k: int,
+        threshold: float,
+        exact: bool = False,
+        nprobe: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Top ``top_k`` chunks with cosine similarity >= ``threshold``, best first.
+
+        Uses the ANN index when one is trained and the store is large enough,
+        unless ``exact`` is set; ``nprobe`` overrides the index's default.
+        """
+        with self._lock:
+            matrix = self._matrix[: self._size]
+            rows = self._rows
+            index = self.index
+        if not len(rows) or top_k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (matrix.shape[1],):
+            logger.warning("Query has %d dims, store has %d", query.size, matrix.shape[1])
+            return []
+        query = _normalize(query)
+        if not exact and index is not None and index.trained and len(matrix) >= index.min_vectors:
+            positions, scores = index.search(matrix, query, top_k, nprobe)
+        else:
+            scores = matrix @ query
+            positions = _top(scores, min(top_k, len(scores)))
+            scores = scores[positions]
+        return [
+            {**rows[i], "similarity": float(score)}
+            for i, score in zip(positions, scores)
+            if score >= threshold
+        ]
+
+    def search_lexical(self, query: str, top_k: int) -> list[dict[str, Any]]:
+        """Top ``top_k`` chunks by BM25 score (as ``bm25``), best first.
+
+        Chunks containing ``query`` as a phrase come first and are flagged
+        with ``phrase``. Empty when the store has no lexical index.
+        """
+        with self._lock:
+            if self.lexical is None:
+                return []
+            hits = self.lexical.search(query, top_k)
+            if self._by_id is None:
+                self._by_id = {r["id"]: r for r in self._rows}
+            by_id = self._by_id
+        return [
+            {**by_id[row_id], "bm25": score, "phrase": phrase}
+            for row_id, score, phrase in hits
+            if row_id in by_id
+        ]
+
+
+def _pages(db: Any, after: int | None) -> Iterator[list[dict[str, Any]]]:
+    """Rows with ``id > after`` in id order, ``PAGE_SIZE`` at a time."""
+    while True:
+        query = db.table(TABLE).select(_ROW_COLUMNS)
+        if after is not None:
+            query = query.gt("id", after)
+        page = query.order("id").limit(PAGE_SIZE).execute().data or []
+        if page:
+            yield page
+        if len(page) < PAGE_SIZE:
+            return
+        after = page[-1]["id"]
+
+
+_store: VectorStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """Process-wide store shared by every ``EmbeddingsService``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = VectorStore(index=index_from_env(), lexical=lexical_from_env())
+        return _store
+
+
+def reset_vector_store() -> None:
+    global _store
+    with _store_lock:
+        _store = None
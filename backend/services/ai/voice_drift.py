@@ -2,7 +2,9 @@
 
 Tracks cosine similarity between generated comments and brand voice
 embeddings over time, detecting when the agent's output drifts away
-from the intended brand voice.
+from the intended brand voice. Comments are scored against the centroid of
+the brand voice vector store, which is recomputed only when the store
+changes (re-ingestion, or rows picked up by its sync).
 """
 
 from __future__ import annotations
@@ -12,9 +14,13 @@ import math
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+import numpy as np
+
 from db.connection import get_supabase_admin
 from services.ai.brand_voice import BrandVoiceService
-from services.ai.embeddings import EmbeddingsService, _cosine_similarity
+from services.ai.embeddings import EmbeddingsService
+from services.ai.vector_codec import decode_vector
+from services.ai.vector_store import VectorStore, _normalize, get_vector_store
 
 logger = logging.getLogger(__name__)
 
@@ -36,32 +42,53 @@ class VoiceDriftMonitor:
             embeddings_service=self.embeddings
         )
 
-    async def compute_drift_score(self, comment_text: str) -> float:
-        """Calculate cosine similarity between comment and brand voice embeddings.
+    async def compute_drift_score(self, comment_text: str, doc_type: str | None = None) -> float:
+        """Calculate mean cosine similarity between comment and brand voice embeddings.
 
+        Scored against the brand voice centroid, or the centroid of one
+        ``doc_type`` ("voice", "guardrails"...) when given.
         Returns 0.0-1.0 (1.0 = perfect alignment with brand voice).
         """
-        # Create embedding for the comment
         comment_embedding = await self.embeddings.create_embedding(comment_text)
+        return self.score_embeddings([comment_embedding], doc_type)[0]
 
-        # Get all brand voice embeddings
-        brand_embeddings = self._get_brand_voice_embeddings()
-        if not brand_embeddings:
-            logger.warning("No brand voice embeddings found for drift calculation")
-            return 1.0  # Assume aligned if no reference exists
+    async def compute_drift_scores(
+        self, comment_texts: list[str], doc_type: str | None = None
+    ) -> list[float]:
+        """``compute_drift_score`` for many comments: one batch embed, one matrix product."""
+        if not comment_texts:
+            return []
+        embeddings = await self.embeddings.batch_create_embeddings(comment_texts)
+        return self.score_embeddings(embeddings, doc_type)
 
-        # Compute average similarity against all brand voice chunks
-        similarities = []
-        for be in brand_embeddings:
-            emb = be.get("embedding")
-            if emb:
-                sim = _cosine_similarity(comment_embedding, emb)
-                similarities.append(sim)
+    async def compute_drift_breakdown(self, comment_text: str) -> dict[str, float]:
+        """Drift score of a comment against each document type's centroid."""
+        comment_embedding = await self.embeddings.create_embedding(comment_text)
+        return {
+            doc_type: self.score_embeddings([comment_embedding], doc_type)[0]
+            for doc_type in self._brand_voice_store().doc_types()
+        }
 
-        if not similarities:
-            return 1.0
+    def score_embeddings(self, embeddings: list[Any], doc_type: str | None = None) -> list[float]:
+        """Mean cosine similarity of each embedding to the brand voice chunks.
 
-        return sum(similarities) / len(similarities)
+        With normalised vectors the mean of the cosines is the dot product
+        with the mean vector, so this never touches the individual chunks.
+        Every score is 1.0 when there is no brand voice to compare against.
+        """
+        if not len(embeddings):
+            return []
+        centroid = self._centroid(doc_type)
+        if centroid is None:
+            logger.warning("No brand voice embeddings found for drift calculation")
+            return [1.0] * len(embeddings)
+        matrix = np.stack([np.asarray(e, dtype=np.float32) for e in embeddings])
+        if matrix.shape[1] != centroid.shape[0]:
+            logger.warning(
+                "Comment embeddings have %d dims, brand voice has %d", matrix.shape[1], centroid.shape[0]
+            )
+            return [1.0] * len(embeddings)
+        return (_normalize(matrix) @ centroid).astype(float).tolist()
 
     async def track_comment(self, comment_id: int, comment_text: str) -> float:
         """Track a generated comment's drift from brand voice.
@@ -73,19 +100,7 @@ class VoiceDriftMonitor:
         embedding = await self.embeddings.create_embedding(comment_text)
         self.embeddings.store_comment_embedding(comment_id, embedding)
 
-        # Compute drift score
-        brand_embeddings = self._get_brand_voice_embeddings()
-        if not brand_embeddings:
-            return 1.0
-
-        similarities = []
-        for be in brand_embeddings:
-            emb = be.get("embedding")
-            if emb:
-                sim = _cosine_similarity(embedding, emb)
-                similarities.append(sim)
-
-        drift_score = sum(similarities) / len(similarities) if similarities else 1.0
+        drift_score = self.score_embeddings([embedding])[0]
 
         # Store the drift score as metadata on the comment embedding
         try:
@@ -246,23 +261,21 @@ class VoiceDriftMonitor:
         if not result.data:
             return {"recalibrated": 0}
 
-        # Get fresh brand voice embeddings
-        brand_embeddings = self._get_brand_voice_embeddings()
-        if not brand_embeddings:
+        # Re-ingestion changed the vector store, so this is a fresh centroid
+        if self._centroid() is None:
             return {"recalibrated": 0}
 
-        brand_embs = [be["embedding"] for be in brand_embeddings if be.get("embedding")]
-
-        recalibrated = 0
+        rows = []
+        vectors = []
         for row in result.data:
-            comment_emb = row.get("embedding")
-            if not comment_emb:
-                continue
-
-            # Compute new drift score
-            similarities = [_cosine_similarity(comment_emb, be) for be in brand_embs]
-            new_score = sum(similarities) / len(similarities) if similarities else 1.0
+            vector = decode_vector(row.get("embedding"))
+            if vector is not None:
+                rows.append(row)
+                vectors.append(vector)
+        scores = self.score_embeddings(vectors) if vectors else []
 
+        recalibrated = 0
+        for row, new_score in zip(rows, scores):
             try:
                 db.table("comment_embeddings").update(
                     {"drift_score": round(new_score, 4)}
@@ -277,19 +290,18 @@ class VoiceDriftMonitor:
     # Helpers
     # ------------------------------------------------------------------
 
-    def _get_brand_voice_embeddings(self) -> list[dict[str, Any]]:
-        """Fetch all brand voice embeddings from the database."""
+    def _brand_voice_store(self) -> VectorStore:
+        """The shared brand voice vector store, synced with the table (throttled)."""
+        store = get_vector_store()
         try:
-            db = get_supabase_admin()
-            result = (
-                db.table("brand_voice_embeddings")
-                .select("id,embedding")
-                .execute()
-            )
-            return result.data if result.data else []
+            store.sync(get_supabase_admin())
         except Exception as e:
-            logger.warning("Failed to fetch brand voice embeddings: %s", e)
-            return []
+            logger.warning("Failed to sync brand voice embeddings: %s", e)
+        return store
+
+    def _centroid(self, doc_type: str | None = None) -> np.ndarray | None:
+        """Brand voice centroid; the store recomputes it only after its contents change."""
+        return self._brand_voice_store().centroid(doc_type)
 
     def _store_alert(self, alert: dict[str, str]) -> None:
         """Store a drift alert in system_config."""
@@ -12,6 +12,11 @@ import os
 import json
 from typing import Dict, Optional, List
 
+from services.ai.prompt_packer import fit_text
+
+# Estimated tokens of condensed context per prompt (cut at whole lines)
+RESPONSE_CONTEXT_TOKENS = int(os.getenv("RESPONSE_CONTEXT_TOKENS", "1500"))
+
 
 async def generate_suggested_response(
     post: Dict,
@@ -48,6 +53,11 @@ async def generate_suggested_response(
     # Extract Jen voice rules from context
     voice_rules = extract_voice_rules(condensed_context)
     persona_guidelines = extract_persona_guidelines(condensed_context, persona)
+
+    context = fit_text(condensed_context, RESPONSE_CONTEXT_TOKENS)
+    if context.dropped_tokens:
+        print(f"Condensed context trimmed: {context.dropped_tokens} of "
+              f"{context.tokens + context.dropped_tokens} tokens dropped")
     
     prompt = f"""You are Jen, a practitioner in late 20s to mid-30s working on AI agent security at Gen Digital.
 
@@ -57,7 +67,7 @@ Text: "{post.get('text')}"
 Engagement: {post.get('likes', 0)} likes, {post.get('retweets', 0)} RTs
 
 YOUR CONTEXT & KNOWLEDGE:
-{condensed_context[:6000]}
+{context.text}
 
 VOICE RULES:
 {voice_rules}
@@ -10,6 +10,8 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
+from db.async_client import as_async
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,11 +30,13 @@ class WorkerManager:
         if self._initialized:
             return
         self._supabase = supabase_client
+        self._db = as_async(supabase_client) if supabase_client else None
         self._tasks: dict[str, asyncio.Task] = {}
         self._initialized = True
 
     def set_supabase(self, client: Any) -> None:
         self._supabase = client
+        self._db = as_async(client) if client else None
 
     # -- kill switch --------------------------------------------------------
 
@@ -41,8 +45,8 @@ class WorkerManager:
         if not self._supabase:
             return False
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "kill_switch")
                 .single()
@@ -68,9 +72,9 @@ class WorkerManager:
         result: dict[str, str] = {}
 
         workers = {
-            f"{platform}_discovery": DiscoveryWorker(platform, self._supabase),
-            f"{platform}_execution": ExecutionWorker(platform, self._supabase),
-            f"{platform}_analytics": AnalyticsWorker(platform, self._supabase),
+            f"{platform}_discovery": DiscoveryWorker(platform, self._supabase, db=self._db),
+            f"{platform}_execution": ExecutionWorker(platform, self._supabase, db=self._db),
+            f"{platform}_analytics": AnalyticsWorker(platform, self._supabase, db=self._db),
         }
 
         for key, worker in workers.items():
@@ -85,7 +89,7 @@ class WorkerManager:
         # Update platform workers_status
         if self._supabase:
             try:
-                self._supabase.table("platforms").update({
+                await self._db.table("platforms").update({
                     "workers_status": result,
                     "updated_at": datetime.now(timezone.utc).isoformat(),
                 }).eq("name", platform).execute()
@@ -114,7 +118,7 @@ class WorkerManager:
 
         if self._supabase:
             try:
-                self._supabase.table("platforms").update({
+                await self._db.table("platforms").update({
                     "workers_status": result,
                     "updated_at": datetime.now(timezone.utc).isoformat(),
                 }).eq("name", platform).execute()
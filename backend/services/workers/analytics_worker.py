@@ -9,6 +9,8 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
+from db.async_client import as_async
+
 logger = logging.getLogger(__name__)
 
 CHECK_INTERVALS_HOURS = [1, 4, 24]
@@ -18,15 +20,16 @@ POLL_INTERVAL = 300  # 5 minutes
 class AnalyticsWorker:
     """Background worker that tracks post-engagement metrics."""
 
-    def __init__(self, platform: str, supabase_client: Any) -> None:
+    def __init__(self, platform: str, supabase_client: Any, db: Any | None = None) -> None:
         self._platform = platform
         self._supabase = supabase_client
+        self._db = db or as_async(supabase_client)
         self._running = True
 
     async def _check_kill_switch(self) -> bool:
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "kill_switch")
                 .single()
@@ -38,7 +41,7 @@ class AnalyticsWorker:
             pass
         return False
 
-    def _is_check_due(self, engagement: dict) -> str | None:
+    async def _is_check_due(self, engagement: dict) -> str | None:
         """Determine if a metrics check is due for this engagement.
 
         Returns the check interval label ("1h", "4h", "24h") if due,
@@ -62,8 +65,8 @@ class AnalyticsWorker:
         # Determine which snapshots already exist for this engagement
         existing_checks: set[str] = set()
         try:
-            result = (
-                self._supabase.table("engagement_metrics")
+            result = await (
+                self._db.table("engagement_metrics")
                 .select("checked_at")
                 .eq("engagement_id", engagement["id"])
                 .execute()
@@ -97,8 +100,8 @@ class AnalyticsWorker:
         return None
 
     async def _get_platform_service(self) -> Any:
-        row = (
-            self._supabase.table("platforms")
+        row = await (
+            self._db.table("platforms")
             .select("id")
             .eq("name", self._platform)
             .eq("status", "connected")
@@ -152,8 +155,8 @@ class AnalyticsWorker:
                     continue
 
                 # Fetch posted engagements for this platform
-                result = (
-                    self._supabase.table("engagements")
+                result = await (
+                    self._db.table("engagements")
                     .select("*")
                     .eq("platform", self._platform)
                     .eq("status", "posted")
@@ -164,7 +167,7 @@ class AnalyticsWorker:
                 # Find which ones need a metrics check
                 due: list[tuple[dict, str]] = []
                 for eng in engagements:
-                    label = self._is_check_due(eng)
+                    label = await self._is_check_due(eng)
                     if label:
                         due.append((eng, label))
 
@@ -189,7 +192,7 @@ class AnalyticsWorker:
                         impressions = metrics.get("impressions", 0) or metrics.get("impression_count")
 
                         try:
-                            self._supabase.table("engagement_metrics").insert({
+                            await self._db.table("engagement_metrics").insert({
                                 "engagement_id": eng["id"],
                                 "checked_at": datetime.now(timezone.utc).isoformat(),
                                 "likes": likes,
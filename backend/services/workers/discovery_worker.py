@@ -11,6 +11,8 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
+from db.async_client import as_async
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_INTERVALS: dict[str, int] = {
@@ -28,16 +30,18 @@ class DiscoveryWorker:
         platform: str,
         supabase_client: Any,
         interval_seconds: int | None = None,
+        db: Any | None = None,
     ) -> None:
         self._platform = platform
         self._supabase = supabase_client
+        self._db = db or as_async(supabase_client)
         self._interval = interval_seconds or DEFAULT_INTERVALS.get(platform, 600)
         self._running = True
 
     async def _check_kill_switch(self) -> bool:
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "kill_switch")
                 .single()
@@ -51,8 +55,8 @@ class DiscoveryWorker:
 
     async def _load_keywords(self) -> list[str]:
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "keyword_taxonomy")
                 .single()
@@ -71,8 +75,8 @@ class DiscoveryWorker:
 
     async def _load_discovery_config(self) -> dict:
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "discovery_config")
                 .single()
@@ -109,8 +113,9 @@ class DiscoveryWorker:
                     max_age_hours=config.get("max_age_hours", 24),
                 )
 
-                # Store each discovered item
-                stored = 0
+                # Store all discovered items in one statement; URLs we've
+                # already seen are skipped by the unique video_url index
+                rows = []
                 for item in results:
                     url = item.get("video_url") or item.get("permalink") or item.get("url")
                     if not url:
@@ -119,26 +124,32 @@ class DiscoveryWorker:
                     classification = discovery.classify_content(item)
                     score = discovery.score_opportunity(item)
 
+                    rows.append({
+                        "platform": self._platform,
+                        "video_url": url,
+                        "creator": item.get("creator") or item.get("username") or item.get("author_id"),
+                        "description": item.get("description") or item.get("caption") or item.get("text"),
+                        "hashtags": item.get("hashtags", []),
+                        "likes": item.get("likes", 0) or item.get("like_count", 0),
+                        "comments_count": item.get("comments", 0) or item.get("comments_count", 0),
+                        "shares": item.get("shares", 0),
+                        "classification": classification,
+                        "status": "new",
+                        "discovered_at": datetime.now(timezone.utc).isoformat(),
+                    })
+
+                stored = 0
+                if rows:
                     try:
-                        self._supabase.table("discovered_videos").insert({
-                            "platform": self._platform,
-                            "video_url": url,
-                            "creator": item.get("creator") or item.get("username") or item.get("author_id"),
-                            "description": item.get("description") or item.get("caption") or item.get("text"),
-                            "hashtags": item.get("hashtags", []),
-                            "likes": item.get("likes", 0) or item.get("like_count", 0),
-                            "comments_count": item.get("comments", 0) or item.get("comments_count", 0),
-                            "shares": item.get("shares", 0),
-                            "classification": classification,
-                            "status": "new",
-                            "discovered_at": datetime.now(timezone.utc).isoformat(),
-                        }).execute()
-                        stored += 1
+                        result = await self._db.table("discovered_videos").upsert(
+                            rows, on_conflict="video_url", ignore_duplicates=True
+                        ).execute()
+                        stored = len(result.data or [])
                     except Exception as exc:
-                        logger.debug("Duplicate or insert error for %s: %s", url, exc)
+                        logger.warning("Failed to store discovered items: %s", exc)
 
                 # Log cycle
-                self._supabase.table("audit_log").insert({
+                await self._db.table("audit_log").insert({
                     "action": "discovery_cycle",
                     "entity_type": self._platform,
                     "details": {
@@ -10,6 +10,8 @@ import random
 from datetime import datetime, timezone
 from typing import Any
 
+from db.async_client import as_async
+
 logger = logging.getLogger(__name__)
 
 # Default posting window: 8 AM – 11 PM EST (UTC-5 → 13:00–04:00 UTC)
@@ -22,15 +24,16 @@ class ExecutionWorker:
 
     MAX_RETRIES = 3
 
-    def __init__(self, platform: str, supabase_client: Any) -> None:
+    def __init__(self, platform: str, supabase_client: Any, db: Any | None = None) -> None:
         self._platform = platform
         self._supabase = supabase_client
+        self._db = db or as_async(supabase_client)
         self._running = True
 
     async def _check_kill_switch(self) -> bool:
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "kill_switch")
                 .single()
@@ -45,8 +48,8 @@ class ExecutionWorker:
     async def _check_posting_schedule(self) -> bool:
         """Return True if posting is allowed at the current hour (EST)."""
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "execution_config")
                 .single()
@@ -69,8 +72,8 @@ class ExecutionWorker:
     async def _apply_human_delay(self) -> None:
         """Sleep with configurable human-like jitter."""
         try:
-            row = (
-                self._supabase.table("system_config")
+            row = await (
+                self._db.table("system_config")
                 .select("value")
                 .eq("key", "execution_config")
                 .single()
@@ -91,8 +94,8 @@ class ExecutionWorker:
 
     async def _get_platform_service(self) -> Any:
         """Instantiate the correct platform service."""
-        row = (
-            self._supabase.table("platforms")
+        row = await (
+            self._db.table("platforms")
             .select("id")
             .eq("name", self._platform)
             .eq("status", "connected")
@@ -120,24 +123,22 @@ class ExecutionWorker:
 
         # Approved review queue items not yet posted
         try:
-            result = (
-                self._supabase.table("review_queue")
+            result = await (
+                self._db.table("review_queue")
                 .select("*, discovered_videos!inner(platform, video_url)")
                 .eq("decision", "approve")
                 .is_("decided_at", "not.null")
+                .eq("discovered_videos.platform", self._platform)
                 .execute()
             )
-            for row in result.data or []:
-                video = row.get("discovered_videos", {})
-                if video.get("platform") == self._platform:
-                    items.append(row)
+            items.extend(result.data or [])
         except Exception:
             pass
 
         # Also check engagements table for status=ready
         try:
-            result = (
-                self._supabase.table("engagements")
+            result = await (
+                self._db.table("engagements")
                 .select("*")
                 .eq("platform", self._platform)
                 .eq("status", "ready")
@@ -214,7 +215,7 @@ class ExecutionWorker:
                                     # Update engagement status
                                     engagement_id = item.get("id")
                                     if engagement_id:
-                                        self._supabase.table("engagements").update({
+                                        await self._db.table("engagements").update({
                                             "status": "posted",
                                             "posted_at": datetime.now(timezone.utc).isoformat(),
                                         }).eq("id", engagement_id).execute()
@@ -232,12 +233,12 @@ class ExecutionWorker:
                             )
                             engagement_id = item.get("id")
                             if engagement_id:
-                                self._supabase.table("engagements").update({
+                                await self._db.table("engagements").update({
                                     "status": "failed",
                                 }).eq("id", engagement_id).execute()
 
                         # Log attempt
-                        self._supabase.table("audit_log").insert({
+                        await self._db.table("audit_log").insert({
                             "action": "execution_attempt",
                             "entity_type": self._platform,
                             "details": {
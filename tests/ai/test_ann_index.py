@@ -0,0 +1,117 @@
+"""Tests for the IVF-flat ANN index behind the vector store."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from services.ai.ann_index import IVFIndex
+from services.ai.vector_store import VectorStore, _normalize
+
+
+def _clustered(n: int, dims: int = 32, clusters: int = 20, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dims))
+    points = centers[rng.integers(clusters, size=n)] + 0.3 * rng.standard_normal((n, dims))
+    return _normalize(points.astype(np.float32))
+
+
+def _recall(index: IVFIndex, matrix: np.ndarray, queries: np.ndarray, k: int, nprobe: int) -> float:
+    hits = 0
+    for q in queries:
+        exact = set(np.argsort(-(matrix @ q))[:k])
+        found, _ = index.search(matrix, q, k, nprobe)
+        hits += len(exact & set(found))
+    return hits / (k * len(queries))
+
+
+def _trained(matrix: np.ndarray, **kwargs) -> IVFIndex:
+    index = IVFIndex(min_vectors=0, **kwargs)
+    centroids = index.fit(matrix)
+    index.install(centroids, index.nearest(matrix, centroids), len(matrix))
+    return index
+
+
+def test_recall_grows_with_nprobe():
+    matrix = _clustered(3000)
+    queries = _clustered(30, seed=1)
+    index = _trained(matrix, nlist=40)
+    low = _recall(index, matrix, queries, 10, nprobe=1)
+    high = _recall(index, matrix, queries, 10, nprobe=8)
+    assert high >= 0.95
+    assert high >= low
+    assert _recall(index, matrix, queries, 10, nprobe=40) == 1.0
+
+
+def test_incremental_add_is_searchable():
+    matrix = _clustered(2000)
+    index = _trained(matrix, nlist=20)
+    new = _clustered(1, seed=5)
+    index.add(new)
+    grown = np.vstack([matrix, new])
+    positions, scores = index.search(grown, new[0], 1)
+    assert positions[0] == len(matrix)
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_rows_missing_from_the_index_are_still_scanned():
+    matrix = _clustered(500)
+    index = _trained(matrix[:400], nlist=10)
+    positions, _ = index.search(matrix, matrix[450], 1, nprobe=1)
+    assert positions[0] == 450
+
+
+def test_persistence_round_trip(tmp_path):
+    matrix = _clustered(1000)
+    ids = np.arange(10, 1010, dtype=np.int64)
+    index = _trained(matrix, nlist=16, path=tmp_path / "index.npz")
+    index.save(ids)
+
+    # Rows come back in a different order, one new row appended
+    order = np.random.default_rng(3).permutation(1000)
+    extra = _clustered(1, seed=9)
+    restored = IVFIndex(path=tmp_path / "index.npz", min_vectors=0)
+    assert restored.restore(np.vstack([matrix[order], extra]), np.append(ids[order], 5000))
+    np.testing.assert_array_equal(restored.centroids, index.centroids)
+    np.testing.assert_array_equal(restored._assign[:1000], index._assign[order])
+    assert restored._assign[1000] == index.nearest(extra)[0]
+
+
+def test_restore_ignores_other_dimensions(tmp_path):
+    index = _trained(_clustered(200, dims=8), nlist=4, path=tmp_path / "index.npz")
+    index.save(np.arange(200))
+    assert not IVFIndex(path=tmp_path / "index.npz").restore(_clustered(10), np.arange(10))
+
+
+@pytest.fixture
+def db(sqlite_db):
+    from db import sqlite_store
+
+    sqlite_store._get_conn().execute(
+        "CREATE TABLE brand_voice_embeddings (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " document_name TEXT, chunk_text TEXT, chunk_index INTEGER, embedding TEXT,"
+        " metadata TEXT DEFAULT '{}')"
+    )
+    return sqlite_db
+
+
+def test_store_trains_saves_and_searches_index(db, tmp_path, monkeypatch):
+    vectors = _clustered(600)
+    db.table("brand_voice_embeddings").insert([
+        {"document_name": "voice.md", "chunk_text": str(i), "chunk_index": i, "embedding": v.tolist()}
+        for i, v in enumerate(vectors)
+    ]).execute()
+    path = tmp_path / "index.npz"
+    store = VectorStore(sync_interval=0, index=IVFIndex(nlist=10, nprobe=10, min_vectors=500, path=path))
+    store.sync(db)
+    assert store.index.trained and path.exists()
+    approx = store.search(vectors[42].tolist(), top_k=5, threshold=0.0)
+    exact = store.search(vectors[42].tolist(), top_k=5, threshold=0.0, exact=True)
+    assert approx == exact
+    assert approx[0]["chunk_index"] == 42
+
+    # A new process restores instead of retraining
+    monkeypatch.setattr(IVFIndex, "fit", lambda self, matrix: pytest.fail("retrained"))
+    fresh = VectorStore(sync_interval=0, index=IVFIndex(nlist=10, min_vectors=500, path=path))
+    fresh.sync(db)
+    np.testing.assert_array_equal(fresh.index.centroids, store.index.centroids)
@@ -163,6 +163,7 @@ def mock_embeddings():
     svc.batch_create_embeddings = AsyncMock(return_value=[])
     svc.create_embedding = AsyncMock(return_value=[0.1] * 10)
     svc.store_embedding = MagicMock()
+    svc.store_embeddings = MagicMock()
     svc.search_similar = MagicMock(return_value=[])
     svc.delete_all_embeddings = MagicMock()
     return svc
@@ -360,7 +361,8 @@ class TestIngestDocument:
 
         count = await svc.ingest_document(json_file)
         assert count > 0
-        assert mock_embeddings.store_embedding.call_count == count
+        (rows,) = mock_embeddings.store_embeddings.call_args.args
+        assert len(rows) == count
 
     @pytest.mark.asyncio
     async def test_ingest_markdown_document(self, brand_voice_dir, mock_embeddings):
@@ -380,7 +382,8 @@ class TestIngestDocument:
 
         count = await svc.ingest_document(md_file)
         assert count > 0
-        assert mock_embeddings.store_embedding.call_count == count
+        (rows,) = mock_embeddings.store_embeddings.call_args.args
+        assert len(rows) == count
 
     @pytest.mark.asyncio
     async def test_ingest_all_documents(self, brand_voice_dir, mock_embeddings):
@@ -410,5 +413,135 @@ class TestIngestDocument:
             side_effect=lambda texts: [[0.1] * 10] * len(texts)
         )
 
-        await svc.refresh_embeddings()
+        await svc.refresh_embeddings(full=True)
         mock_embeddings.delete_all_embeddings.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_refresh_embeddings_is_incremental_by_default(
+        self, brand_voice_dir, mock_embeddings
+    ):
+        svc = BrandVoiceService(
+            embeddings_service=mock_embeddings, brand_voice_dir=brand_voice_dir
+        )
+        mock_embeddings.batch_create_embeddings = AsyncMock(
+            side_effect=lambda texts: [[0.1] * 10] * len(texts)
+        )
+
+        await svc.refresh_embeddings()
+        mock_embeddings.delete_all_embeddings.assert_not_called()
+
+
+_EMBEDDINGS_DDL = """
+    CREATE TABLE brand_voice_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_name TEXT,
+        chunk_text TEXT,
+        chunk_index INTEGER,
+        embedding TEXT,
+        metadata TEXT DEFAULT '{}'
+    )
+"""
+
+
+class TestIncrementalRefresh:
+    """Re-ingestion against a real table: only changed chunks are embedded."""
+
+    @pytest.fixture
+    def service(self, sqlite_db, brand_voice_dir):
+        from db import sqlite_store
+        from services.ai.embedding_cache import EmbeddingCache
+        from services.ai.embeddings import EmbeddingsService
+        from services.ai.vector_store import reset_vector_store
+
+        sqlite_store._get_conn().execute(_EMBEDDINGS_DDL)
+        reset_vector_store()
+        requested: list[str] = []
+
+        async def fake_request(texts):
+            requested.extend(texts)
+            return [[float(len(t)), 1.0] for t in texts]
+
+        with patch("services.ai.embeddings.get_supabase_admin", return_value=sqlite_db):
+            embeddings = EmbeddingsService(api_key="k", cache=EmbeddingCache(":memory:"))
+            embeddings._request_embeddings = fake_request
+            svc = BrandVoiceService(embeddings_service=embeddings, brand_voice_dir=brand_voice_dir)
+            yield svc, requested, sqlite_db
+        reset_vector_store()
+
+    def _rows(self, db, doc):
+        return (
+            db.table("brand_voice_embeddings")
+            .select("id,chunk_index,chunk_text")
+            .eq("document_name", doc)
+            .order("chunk_index")
+            .execute()
+            .data
+        )
+
+    @pytest.mark.asyncio
+    async def test_unchanged_corpus_embeds_nothing(self, service):
+        svc, requested, _ = service
+        first = await svc.refresh_embeddings()
+        assert requested and all(s["added"] == s["chunks"] for s in first.values())
+
+        # Fresh cache, so only the diff can avoid the API
+        svc.embeddings.cache = type(svc.embeddings.cache)(":memory:")
+        requested.clear()
+        second = await svc.refresh_embeddings()
+        assert requested == []
+        assert all(s["unchanged"] == s["chunks"] and s["added"] == s["removed"] == 0 for s in second.values())
+
+    @pytest.mark.asyncio
+    async def test_one_edited_section_costs_one_embedding(self, service, brand_voice_dir):
+        svc, requested, db = service
+        await svc.refresh_embeddings()
+        md = next(p for p in brand_voice_dir.iterdir() if p.name.endswith("brand_voice.md"))
+        before = self._rows(db, md.name)
+        sections = md.read_text(encoding="utf-8").split("\n## ")
+        assert len(sections) > 1
+        sections[1] = sections[1] + "\nOne more sentence."
+        md.write_text("\n## ".join(sections), encoding="utf-8")
+
+        svc.embeddings.cache = type(svc.embeddings.cache)(":memory:")
+        requested.clear()
+        summaries = await svc.refresh_embeddings()
+
+        assert len(requested) == 1 and "One more sentence." in requested[0]
+        summary = summaries["brand_voice"]
+        assert (summary["added"], summary["removed"]) == (1, 1)
+        after = self._rows(db, md.name)
+        assert len(after) == len(before)
+        assert {r["id"] for r in before} - {r["id"] for r in after} == {before[1]["id"]}
+
+    @pytest.mark.asyncio
+    async def test_removed_document_is_deleted(self, service, brand_voice_dir):
+        svc, _, db = service
+        await svc.refresh_embeddings()
+        readme = next(p for p in brand_voice_dir.iterdir() if p.name.endswith("README.md"))
+        assert self._rows(db, readme.name)
+        readme.unlink()
+
+        summaries = await svc.refresh_embeddings()
+        assert summaries[readme.name]["removed"] > 0
+        assert self._rows(db, readme.name) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_embedding_keeps_the_old_chunks(self, service, brand_voice_dir):
+        svc, _, db = service
+        await svc.refresh_embeddings()
+        md = next(p for p in brand_voice_dir.iterdir() if p.name.endswith("brand_voice.md"))
+        before = self._rows(db, md.name)
+        sections = md.read_text(encoding="utf-8").split("\n## ")
+        sections[1] = sections[1] + "\nOne more sentence."
+        md.write_text("\n## ".join(sections), encoding="utf-8")
+
+        async def failing(texts):
+            raise RuntimeError("provider down")
+
+        svc.embeddings.cache = type(svc.embeddings.cache)(":memory:")
+        svc.embeddings._request_embeddings = failing
+        with pytest.raises(RuntimeError, match="provider down"):
+            await svc.refresh_embeddings()
+        with pytest.raises(RuntimeError, match="provider down"):
+            await svc.sync_document(md)
+        assert self._rows(db, md.name) == before
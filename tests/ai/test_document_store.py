@@ -0,0 +1,73 @@
+"""Tests for the brand-voice document store."""
+
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import MagicMock
+
+from services.ai.brand_voice import BrandVoiceService
+from services.ai.document_store import DocumentStore, get_document_store
+
+
+def _touch(path, text):
+    """Rewrite ``path`` and push its mtime forward so the change is visible."""
+    mtime = path.stat().st_mtime_ns + 1_000_000_000 if path.exists() else None
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def test_parsed_artifact_is_cached_until_the_file_changes(tmp_path):
+    rails = tmp_path / "brand:compliance_rails.json"
+    _touch(rails, json.dumps({"banned_words": {"absolute": ["free"]}}))
+    store = DocumentStore(tmp_path)
+    parse = MagicMock(side_effect=json.loads)
+
+    assert store.load("compliance_rails.json", parse) == {"banned_words": {"absolute": ["free"]}}
+    assert store.load("compliance_rails.json", parse) is store.load("compliance_rails.json", parse)
+    assert parse.call_count == 1
+
+    _touch(rails, json.dumps({"banned_words": {"absolute": ["free", "loan"]}}))
+    assert store.load("compliance_rails.json", parse)["banned_words"]["absolute"] == ["free", "loan"]
+    assert parse.call_count == 2
+    assert store.load("missing.json", parse) is None
+
+
+def test_subscribers_hear_about_edits_additions_and_removals(tmp_path):
+    playbooks = tmp_path / "platform_playbooks.md"
+    _touch(playbooks, "## TikTok\nBe fast.\n")
+    store = DocumentStore(tmp_path)
+    changed = []
+    store.subscribe(changed.append)
+    store.subscribe(MagicMock(side_effect=RuntimeError("broken hook")))
+
+    store.refresh()
+    assert changed == []
+
+    _touch(playbooks, "## TikTok\nBe faster.\n")
+    (tmp_path / "copywriting_reference.md").write_text("# Ref", encoding="utf-8")
+    dir_mtime = os.stat(tmp_path).st_mtime_ns + 1_000_000_000
+    os.utime(tmp_path, ns=(dir_mtime, dir_mtime))
+    store.refresh()
+    assert sorted(changed) == ["copywriting_reference.md", "platform_playbooks.md"]
+    assert store.find("copywriting_reference.md") is not None
+
+    changed.clear()
+    playbooks.unlink()
+    os.utime(tmp_path, ns=(dir_mtime + 1_000_000_000,) * 2)
+    assert store.find("platform_playbooks.md") is None
+    assert changed == ["platform_playbooks.md"]
+
+
+def test_services_share_a_store_and_see_edits(tmp_path):
+    playbooks = tmp_path / "platform_playbooks.md"
+    _touch(playbooks, "## TikTok\nBe fast.\n\n## X (Twitter)\nBe sharp.\n")
+    a = BrandVoiceService(embeddings_service=MagicMock(), brand_voice_dir=tmp_path)
+    b = BrandVoiceService(embeddings_service=MagicMock(), brand_voice_dir=tmp_path)
+
+    assert a.documents is b.documents is get_document_store(tmp_path)
+    assert a.get_platform_playbook("x") == "## X (Twitter)\nBe sharp."
+
+    _touch(playbooks, "## TikTok\nBe fast.\n\n## X (Twitter)\nBe sharper.\n")
+    assert b.get_platform_playbook("x") == "## X (Twitter)\nBe sharper."
@@ -0,0 +1,104 @@
+"""Tests for request micro-batching and connection reuse in EmbeddingsService."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services.ai.embedding_cache import EmbeddingCache
+from services.ai.embeddings import EmbeddingsService
+from services.ai.micro_batcher import MicroBatcher
+
+
+class _StubEmbeddings(BaseHTTPRequestHandler):
+    """OpenAI-shaped embeddings endpoint: the vector for text t is [len(t), 1.0]."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        self.server.requests.append(inputs)
+        self.server.peers.add(self.client_address)
+        payload = json.dumps({
+            # Out of order on purpose: clients must sort by index
+            "data": [
+                {"index": i, "embedding": [float(len(t)), 1.0]}
+                for i, t in reversed(list(enumerate(inputs)))
+            ]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEmbeddings)
+    server.requests, server.peers = [], set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(stub_server):
+    with patch("services.ai.embeddings.get_settings", return_value=MagicMock(openai_api_key="k")):
+        svc = EmbeddingsService(
+            api_key="k",
+            cache=EmbeddingCache(":memory:"),
+            api_url=f"http://127.0.0.1:{stub_server.server_port}/v1/embeddings",
+            batch_max_size=8,
+            batch_max_wait_ms=20,
+        )
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request(service, stub_server):
+    texts = ["a", "bb", "ccc", "dddd", "bb"]
+    results = await asyncio.gather(*(service.create_embedding(t) for t in texts))
+    await service.aclose()
+    assert results == [[float(len(t)), 1.0] for t in texts]
+    assert stub_server.requests == [["a", "bb", "ccc", "dddd"]]
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_splits_requests(service, stub_server):
+    texts = [f"text-{i}" for i in range(20)]
+    results = await asyncio.gather(*(service.create_embedding(t) for t in texts))
+    await service.aclose()
+    assert results == [[float(len(t)), 1.0] for t in texts]
+    assert [len(r) for r in stub_server.requests] == [8, 8, 4]
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_reuse_the_connection(service, stub_server):
+    for text in ("one", "two", "three"):
+        await service.create_embedding(text)
+    await service.aclose()
+    assert len(stub_server.requests) == 3
+    assert len(stub_server.peers) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    async def failing(items):
+        raise RuntimeError("upstream down")
+
+    batcher = MicroBatcher(failing, max_batch=4, max_wait=0.01)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    assert [str(r) for r in results] == ["upstream down", "upstream down"]
+    assert batcher.batches == 1
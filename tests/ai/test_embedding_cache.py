@@ -0,0 +1,83 @@
+"""Tests for the two-tier embedding cache."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.ai.embedding_cache import EmbeddingCache
+from services.ai.embeddings import EmbeddingsService
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = EmbeddingCache(tmp_path / "cache.db", memory_items=2)
+    yield c
+    c.close()
+
+
+def test_memory_then_disk_hits(cache, tmp_path):
+    cache.put("m", "hello", [0.5, 0.25])
+    assert cache.get("m", "hello") == [0.5, 0.25]
+    assert cache.get("other-model", "hello") is None
+    # Push "hello" out of the 2-item memory tier
+    cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    assert cache.get("m", "hello") == [0.5, 0.25]
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3, abs=1e-4)
+
+    # A new process sees the disk tier
+    other = EmbeddingCache(tmp_path / "cache.db")
+    assert other.get("m", "b") == [2.0]
+    other.close()
+
+
+def test_get_many_keeps_order_and_duplicates(cache):
+    cache.put("m", "x", [1.0])
+    assert cache.get_many("m", ["y", "x", "x"]) == [None, [1.0], [1.0]]
+
+
+def test_size_based_eviction_drops_least_recently_used(tmp_path):
+    # Each vector is 4 floats = 16 bytes; room for 3
+    cache = EmbeddingCache(tmp_path / "cache.db", memory_items=0, max_bytes=48)
+    for i, text in enumerate(["a", "b", "c"]):
+        cache.put("m", text, [float(i)] * 4)
+    cache.get("m", "a")  # "b" is now the oldest
+    cache.put("m", "d", [3.0] * 4)
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") is not None
+    stats = cache.stats()
+    assert stats["evictions"] >= 1
+    assert stats["disk_bytes"] <= 48
+    cache.close()
+
+
+@pytest.fixture
+def service(cache):
+    with patch("services.ai.embeddings.get_settings", return_value=MagicMock(openai_api_key="k")):
+        return EmbeddingsService(api_key="k", cache=cache)
+
+
+@pytest.mark.asyncio
+async def test_batch_sends_only_distinct_misses(service):
+    service.cache.put(service.model, "known", [9.0])
+    service._request_embeddings = AsyncMock(return_value=[[1.0], [2.0]])
+    result = await service.batch_create_embeddings(["new1", "known", "new2", "new1"])
+    service._request_embeddings.assert_awaited_once_with(["new1", "new2"])
+    assert result == [[1.0], [9.0], [2.0], [1.0]]
+
+    service._request_embeddings.reset_mock()
+    assert await service.batch_create_embeddings(["new2", "known"]) == [[2.0], [9.0]]
+    service._request_embeddings.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_embedding_is_cached(service):
+    response = MagicMock()
+    response.json.return_value = {"data": [{"embedding": [0.5], "index": 0}]}
+    with patch("httpx.AsyncClient.post", AsyncMock(return_value=response)) as post:
+        assert await service.create_embedding("same text") == [0.5]
+        assert await service.create_embedding("same text") == [0.5]
+    assert post.await_count == 1
@@ -0,0 +1,65 @@
+"""Tests for the pluggable embedding providers."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from services.ai import embedding_providers
+from services.ai.embedding_cache import EmbeddingCache
+from services.ai.embedding_providers import HashingProvider, OpenAIProvider, provider_from_env
+from services.ai.embeddings import EmbeddingsService
+
+
+@pytest.mark.asyncio
+async def test_hashing_vectors_are_stable_and_normalised():
+    a = await HashingProvider(dim=256).embed(["Cash Kitty keeps it real"])
+    b = await HashingProvider(dim=256).embed(["Cash Kitty keeps it real"])
+    assert a == b
+    assert len(a[0]) == 256
+    assert np.linalg.norm(a[0]) == pytest.approx(1.0, abs=1e-5)
+    # A different seed is a different space
+    c = await HashingProvider(dim=256, seed=1).embed(["Cash Kitty keeps it real"])
+    assert c != a
+
+
+@pytest.mark.asyncio
+async def test_hashing_similarity_follows_shared_vocabulary():
+    provider = HashingProvider(dim=512)
+    query, near, far = (
+        np.array(v)
+        for v in await provider.embed([
+            "budgeting tips for saving money",
+            "smart saving tips and a simple budgeting plan",
+            "the cat sat on the windowsill in the sun",
+        ])
+    )
+    assert query @ near > query @ far
+    assert provider.embed_one("").tolist() == [0.0] * 512
+
+
+def test_provider_from_env(monkeypatch):
+    monkeypatch.setattr(embedding_providers, "PROVIDER", "local")
+    assert isinstance(provider_from_env(None, "m"), HashingProvider)
+    monkeypatch.setattr(embedding_providers, "PROVIDER", "openai")
+    assert isinstance(provider_from_env("k", "m"), OpenAIProvider)
+    monkeypatch.setattr(embedding_providers, "PROVIDER", "bogus")
+    with pytest.raises(ValueError):
+        provider_from_env(None, "m")
+
+
+@pytest.mark.asyncio
+async def test_service_uses_provider_and_keys_cache_by_its_name():
+    provider = HashingProvider(dim=32)
+    cache = EmbeddingCache(":memory:")
+    with patch("services.ai.embeddings.get_settings", return_value=MagicMock(spec=[])):
+        svc = EmbeddingsService(provider=provider, cache=cache)
+
+    vector = await svc.create_embedding("hello world")
+
+    assert vector == pytest.approx(provider.embed_one("hello world").tolist())
+    assert cache.get(provider.name, "hello world") == vector
+    assert cache.get("text-embedding-3-small", "hello world") is None
+    await svc.aclose()
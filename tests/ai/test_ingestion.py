@@ -0,0 +1,126 @@
+"""Tests for the pipelined brand voice ingestor."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from services.ai.brand_voice import BrandVoiceService
+from services.ai.ingestion import IngestionPipeline
+
+
+def _corpus(tmp_path, files=6, sections=10):
+    paths = []
+    for f in range(files):
+        path = tmp_path / f"doc{f}.md"
+        path.write_text(
+            "\n\n".join(f"## Section {f}.{s}\n\nBody of section {s} in file {f}." for s in range(sections)),
+            encoding="utf-8",
+        )
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def embeddings():
+    svc = MagicMock()
+    svc.get_document_chunks = MagicMock(return_value=[])
+    svc.in_flight = svc.max_in_flight = 0
+    svc.batches = []
+
+    async def batch_create(texts):
+        svc.in_flight += 1
+        svc.max_in_flight = max(svc.max_in_flight, svc.in_flight)
+        svc.batches.append(len(texts))
+        await asyncio.sleep(0.01)
+        svc.in_flight -= 1
+        return [[float(len(t)), 1.0] for t in texts]
+
+    svc.batch_create_embeddings = batch_create
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_batches_are_capped_and_bounded(tmp_path, embeddings):
+    paths = _corpus(tmp_path)
+    brand_voice = BrandVoiceService(embeddings_service=embeddings, brand_voice_dir=tmp_path)
+    pipeline = IngestionPipeline(brand_voice, batch_size=7, embed_concurrency=2, progress=lambda p: None)
+
+    report = await pipeline.run(paths)
+
+    assert report.chunks == report.embedded == 60
+    assert max(embeddings.batches) <= 7 and sum(embeddings.batches) == 60
+    assert embeddings.max_in_flight == 2
+    # One bulk insert per embedded batch, carrying the vectors
+    stored = [call.args[0] for call in embeddings.store_embeddings.call_args_list]
+    assert [len(rows) for rows in stored] == embeddings.batches
+    assert all("embedding" in row and row["document_name"].startswith("doc") for rows in stored for row in rows)
+    assert set(report.documents) == {p.name for p in paths}
+    assert report.chunks_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_progress_reaches_totals(tmp_path, embeddings):
+    paths = _corpus(tmp_path, files=3, sections=4)
+    brand_voice = BrandVoiceService(embeddings_service=embeddings, brand_voice_dir=tmp_path)
+    seen = []
+    pipeline = IngestionPipeline(
+        brand_voice, batch_size=5, progress=lambda p: seen.append((p.files_done, p.chunks_stored))
+    )
+
+    await pipeline.run(paths)
+
+    assert seen[-1] == (3, 12)
+    assert [s[1] for s in seen] == sorted(s[1] for s in seen)
+
+
+@pytest.mark.asyncio
+async def test_embedding_failure_propagates(tmp_path, embeddings):
+    async def failing(texts):
+        raise RuntimeError("quota exceeded")
+
+    embeddings.batch_create_embeddings = failing
+    brand_voice = BrandVoiceService(embeddings_service=embeddings, brand_voice_dir=tmp_path)
+    pipeline = IngestionPipeline(brand_voice, batch_size=4, progress=lambda p: None)
+
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        await pipeline.run(_corpus(tmp_path, files=2))
+    embeddings.store_embeddings.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_chunks_are_deleted_after_their_replacements_are_stored(tmp_path, embeddings):
+    paths = _corpus(tmp_path, files=2, sections=3)
+    embeddings.get_document_chunks = MagicMock(
+        side_effect=lambda name: [{"id": 100 + int(name[3]), "chunk_text": "gone", "chunk_index": 9}]
+    )
+    calls = []
+    embeddings.store_embeddings.side_effect = lambda rows: calls.append(("store", rows[0]["document_name"]))
+    embeddings.delete_embeddings.side_effect = lambda ids: calls.append(("delete", ids))
+    brand_voice = BrandVoiceService(embeddings_service=embeddings, brand_voice_dir=tmp_path)
+    pipeline = IngestionPipeline(brand_voice, batch_size=2, embed_concurrency=1, progress=lambda p: None)
+
+    report = await pipeline.run(paths)
+
+    assert {doc: s["removed"] for doc, s in report.documents.items()} == {"doc0.md": 1, "doc1.md": 1}
+    for doc, stale_id in (("doc0.md", 100), ("doc1.md", 101)):
+        deleted_at = calls.index(("delete", [stale_id]))
+        assert max(i for i, call in enumerate(calls) if call == ("store", doc)) < deleted_at
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_keeps_stale_chunks(tmp_path, embeddings):
+    embeddings.get_document_chunks = MagicMock(return_value=[{"id": 7, "chunk_text": "gone"}])
+
+    async def failing(texts):
+        raise RuntimeError("quota exceeded")
+
+    embeddings.batch_create_embeddings = failing
+    brand_voice = BrandVoiceService(embeddings_service=embeddings, brand_voice_dir=tmp_path)
+    pipeline = IngestionPipeline(brand_voice, batch_size=4, progress=lambda p: None)
+
+    with pytest.raises(RuntimeError):
+        await pipeline.run(_corpus(tmp_path, files=1))
+    embeddings.delete_embeddings.assert_not_called()
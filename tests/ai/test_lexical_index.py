@@ -0,0 +1,136 @@
+"""Tests for the BM25 index and hybrid search."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from db import sqlite_store
+from services.ai.embedding_cache import EmbeddingCache
+from services.ai.embedding_providers import HashingProvider
+from services.ai.embeddings import EmbeddingsService
+from services.ai.lexical_index import BM25Index, reciprocal_rank_fusion
+from services.ai.vector_store import VectorStore, reset_vector_store
+
+_DDL = """
+    CREATE TABLE brand_voice_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_name TEXT,
+        chunk_text TEXT,
+        chunk_index INTEGER,
+        embedding TEXT,
+        metadata TEXT DEFAULT '{}'
+    )
+"""
+
+CHUNKS = [
+    "## X (Twitter)\n\nKeep it sharp. Replies beat quote posts.",
+    "## TikTok\n\nBe funny and fast. Twitter energy works here too.",
+    "RoarMoney is a banking account, never a checking account.",
+    "Budget tips should feel like advice from a friend, not a bank.",
+    "Saving money is a habit: small budget wins add up.",
+]
+
+
+def _rows():
+    return [{"id": i + 1, "chunk_text": text} for i, text in enumerate(CHUNKS)]
+
+
+def test_bm25_ranks_phrases_first_and_tracks_removals():
+    index = BM25Index()
+    index.add(_rows())
+
+    hits = index.search("X (Twitter)", top_k=5)
+    assert [row_id for row_id, _, _ in hits] == [1, 2]
+    assert [phrase for _, _, phrase in hits] == [True, False]
+    assert index.search("roarmoney", 5)[0][:1] == (3,)
+    # Rarer terms weigh more: "budget" is in two chunks, "habit" in one
+    scores = index.scores("budget habit")
+    assert scores[5] > scores[4]
+
+    index.remove([1])
+    assert [(row_id, phrase) for row_id, _, phrase in index.search("X (Twitter)", 5)] == [(2, False)]
+    assert index.phrase_matches("x twitter") == set()
+    assert len(index) == 4
+
+
+def test_save_and_restore(tmp_path):
+    path = tmp_path / "bm25.npz"
+    index = BM25Index(path=path)
+    index.add(_rows())
+    index.save()
+
+    restored = BM25Index(path=path)
+    assert restored.restore(_rows())
+    assert restored.search("budget tips", 5) == index.search("budget tips", 5)
+
+    # Rows the file doesn't know are tokenised; vanished ones are dropped
+    partial = BM25Index(path=path)
+    assert partial.restore(_rows()[1:] + [{"id": 9, "chunk_text": "Cash Kitty says hi"}])
+    assert partial.ids() == {2, 3, 4, 5, 9}
+    assert partial.search("cash kitty", 1)[0][0] == 9
+    assert not BM25Index(path=tmp_path / "missing.npz").restore(_rows())
+
+
+def test_reciprocal_rank_fusion_merges_rankings():
+    vector = [{"id": 1, "similarity": 0.9}, {"id": 2, "similarity": 0.8}]
+    lexical = [{"id": 2, "bm25": 3.0}, {"id": 3, "bm25": 1.0}]
+
+    fused = reciprocal_rank_fusion([vector, lexical], k=60)
+
+    assert [r["id"] for r in fused] == [2, 1, 3]
+    assert fused[0] == {"id": 2, "similarity": 0.8, "bm25": 3.0, "score": pytest.approx(1 / 62 + 1 / 61)}
+
+
+@pytest.fixture
+def hybrid(sqlite_db):
+    sqlite_store._get_conn().execute(_DDL)
+    reset_vector_store()
+    provider = HashingProvider(dim=64)
+    with patch("services.ai.embeddings.get_supabase_admin", return_value=sqlite_db):
+        svc = EmbeddingsService(provider=provider, cache=EmbeddingCache(":memory:"))
+        svc.store_embeddings([
+            {"document_name": "voice.md", "chunk_text": text, "chunk_index": i,
+             "embedding": provider.embed_one(text).tolist(), "metadata": {}}
+            for i, text in enumerate(CHUNKS)
+        ])
+        yield svc
+    reset_vector_store()
+
+
+@pytest.mark.asyncio
+async def test_exact_terms_skip_the_embedding(hybrid):
+    with patch.object(hybrid, "create_embedding", wraps=hybrid.create_embedding) as create:
+        results = await hybrid.search_hybrid("X (Twitter)", top_k=2)
+        assert create.call_count == 0
+        assert results[0]["chunk_text"].startswith("## X (Twitter)")
+        assert "bm25" in results[0] and "similarity" not in results[0]
+
+        fused = await hybrid.search_hybrid("how do I keep a budget as a habit", top_k=3, threshold=0.0)
+        assert create.call_count == 1
+        assert "similarity" in fused[0] and "bm25" in fused[0]
+        assert fused[0]["chunk_text"].startswith("Saving money")
+
+
+def test_vector_store_keeps_the_index_in_step(sqlite_db, tmp_path):
+    sqlite_store._get_conn().execute(_DDL)
+    sqlite_db.table("brand_voice_embeddings").insert([
+        {"document_name": "voice.md", "chunk_text": text, "chunk_index": i, "embedding": [1.0, float(i)]}
+        for i, text in enumerate(CHUNKS)
+    ]).execute()
+    path = tmp_path / "bm25.npz"
+    store = VectorStore(sync_interval=0, lexical=BM25Index(path=path))
+    store.sync(sqlite_db)
+    assert len(store.lexical) == len(CHUNKS) and path.exists()
+
+    store.remove([3])
+    assert store.search_lexical("roarmoney", 5) == []
+    store.add([{"id": 10, "chunk_text": "RoarMoney, again", "embedding": [1.0, 0.0]}])
+    assert [r["id"] for r in store.search_lexical("roarmoney", 5)] == [10]
+
+    # A fresh process restores from the file
+    fresh = VectorStore(sync_interval=0, lexical=BM25Index(path=path))
+    with patch.object(BM25Index, "add", side_effect=AssertionError("re-tokenised")):
+        fresh.sync(sqlite_db)
+    assert len(fresh.lexical) == len(CHUNKS)
@@ -0,0 +1,72 @@
+"""Tests for the token-budgeted prompt packer."""
+
+from __future__ import annotations
+
+from services.ai.prompt_packer import (
+    PromptPacker,
+    PromptSection,
+    estimate_tokens,
+    fit_text,
+)
+
+
+def _words(n: int, tag: str) -> str:
+    return " ".join(f"{tag}{i}" for i in range(n))
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Keep it sharp.") == 4
+    # Long words count as several pieces
+    assert estimate_tokens("internationalization") == 3
+
+
+def test_packs_by_priority_then_score_and_keeps_section_order():
+    sections = [
+        PromptSection("Identity", ["You are the brand."], priority=0),
+        PromptSection("Examples", [_words(30, "ex")], priority=3),
+        PromptSection(
+            "Context",
+            [_words(20, "a"), _words(20, "b"), _words(20, "c")],
+            scores=[0.5, 0.9, 0.7],
+        ),
+    ]
+    packed = PromptPacker(60).pack(sections)
+
+    assert not packed.over_budget
+    assert packed.tokens <= 60
+    assert "b0" in packed.text and "c0" in packed.text
+    assert "a0" not in packed.text and "ex0" not in packed.text
+    # Sections and items come out in the order given
+    assert packed.text.startswith("# Identity\nYou are the brand.\n\n# Context\n")
+    assert packed.text.index("b0") < packed.text.index("c0")
+    assert packed.dropped == {"Examples": estimate_tokens(_words(30, "ex")), "Context": 20}
+
+
+def test_priority_zero_is_kept_over_budget():
+    packed = PromptPacker(5).pack([
+        PromptSection("Rules", [_words(10, "r")], priority=0),
+        PromptSection("Extra", ["nice to have"]),
+    ])
+    assert "r9" in packed.text
+    assert packed.over_budget
+    assert packed.dropped == {"Extra": 3}
+
+
+def test_truncates_at_whole_lines():
+    text = "\n".join(_words(5, f"l{n}_") for n in range(10))
+    packed = PromptPacker(20).pack([PromptSection("Playbook", [text], truncate=True)])
+
+    kept = packed.text.split("\n")[1:]
+    assert kept == text.split("\n")[: len(kept)]
+    assert 0 < len(kept) < 10
+    assert packed.tokens <= 20
+    assert packed.dropped["Playbook"] == estimate_tokens(text) - estimate_tokens("\n".join(kept))
+
+
+def test_fit_text():
+    assert fit_text("short", 10).text == "short"
+    assert fit_text("one two three four", 2).text == "one two"
+    result = fit_text("line one\nline two\nline three", 5)
+    assert result.text == "line one\nline two"
+    assert result.dropped_tokens == 2
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import os
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from services.ai.brand_voice import BrandVoiceService, invalidate_voice_config
+from services.ai.prompt_packer import PackedPrompt
 from services.ai.rag import RAGService, _build_query_from_context
 
 
@@ -81,7 +84,9 @@ class TestRAGService:
                 "tiktok": {"formality": 2, "humor": 8, "emoji_usage": "moderate", "slang_allowed": True}
             },
         }
-        svc.get_voice_context = AsyncMock(return_value="Brand voice context here")
+        svc.get_voice_chunks = AsyncMock(
+            return_value=[{"chunk_text": "Brand voice context here", "similarity": 0.8}]
+        )
         svc.get_platform_playbook.return_value = "## TikTok\nBe funny and fast."
         svc.get_compliance_rails.return_value = {
             "banned_words": {
@@ -202,3 +207,104 @@ class TestRAGService:
         }
         prompt_x = await rag.assemble_system_prompt("x", video_context)
         assert "280 characters" in prompt_x
+
+
+class TestCompiledPrefix:
+    @pytest.fixture
+    def brand_voice(self, tmp_path):
+        (tmp_path / "voice_config.json").write_text(
+            '{"personality": {"archetype": "The Irreverent Maverick"}}', encoding="utf-8"
+        )
+        (tmp_path / "platform_playbooks.md").write_text(
+            "## TikTok\nBe funny and fast.\n", encoding="utf-8"
+        )
+        svc = BrandVoiceService(embeddings_service=MagicMock(), brand_voice_dir=tmp_path)
+        svc.get_voice_chunks = AsyncMock(return_value=[])
+        return svc
+
+    @pytest.fixture
+    def cached_rag(self):
+        brand_voice = MagicMock()
+        brand_voice.source_fingerprint.return_value = (0, ())
+        brand_voice.get_personality_config.return_value = {"personality": {"archetype": "Maverick"}}
+        brand_voice.get_platform_playbook.return_value = "## TikTok\nBe funny."
+        brand_voice.get_compliance_rails.return_value = {}
+        brand_voice.get_banned_words.return_value = {"absolute": ["free"]}
+        brand_voice.get_copywriting_reference.return_value = ""
+        return RAGService(brand_voice_service=brand_voice, embeddings_service=MagicMock()), brand_voice
+
+    @pytest.mark.asyncio
+    async def test_prefix_is_compiled_once_and_per_video_sections_follow(
+        self, cached_rag
+    ):
+        rag, brand_voice = cached_rag
+        brand_voice.get_voice_chunks = AsyncMock(
+            side_effect=[
+                [{"chunk_text": "Context A", "similarity": 0.9}],
+                [{"chunk_text": "Context B", "similarity": 0.9}],
+            ]
+        )
+
+        with patch("services.ai.rag.FeedbackLoopService") as feedback:
+            feedback.return_value.get_feedback_context_for_prompt.return_value = ""
+            first = await rag.assemble_system_prompt("tiktok", {"description": "a"})
+            second = await rag.assemble_system_prompt("TikTok", {"description": "b"})
+
+        assert brand_voice.get_personality_config.call_count == 1
+        assert first.startswith(rag.compiled_prefix("tiktok"))
+        assert first.endswith("Context A") and second.endswith("Context B")
+
+    def test_prefix_recompiles_when_a_source_file_changes(self, brand_voice, tmp_path):
+        rag = RAGService(brand_voice_service=brand_voice, embeddings_service=MagicMock())
+        assert "Be funny and fast." in rag.compiled_prefix("tiktok")
+
+        playbooks = tmp_path / "platform_playbooks.md"
+        playbooks.write_text("## TikTok\nKeep it short.\n", encoding="utf-8")
+        mtime = playbooks.stat().st_mtime_ns + 1_000_000_000
+        os.utime(playbooks, ns=(mtime, mtime))
+
+        prefix = rag.compiled_prefix("tiktok")
+        assert "Keep it short." in prefix and "Be funny and fast." not in prefix
+
+    def test_prefix_recompiles_after_voice_config_update(self, brand_voice):
+        rag = RAGService(brand_voice_service=brand_voice, embeddings_service=MagicMock())
+        rag.compiled_prefix("tiktok")
+        recompiled = PackedPrompt(text="recompiled", tokens=1, budget=rag.token_budget)
+        with patch.object(rag, "_compile_prefix", return_value=recompiled) as compile_prefix:
+            rag.compiled_prefix("tiktok")
+            compile_prefix.assert_not_called()
+            invalidate_voice_config()
+            assert rag.compiled_prefix("tiktok") == "recompiled"
+
+
+class TestPromptBudget:
+    @pytest.mark.asyncio
+    async def test_least_similar_chunks_are_dropped_first(self):
+        brand_voice = MagicMock()
+        brand_voice.source_fingerprint.return_value = (0, ())
+        brand_voice.get_personality_config.return_value = {}
+        brand_voice.get_platform_playbook.return_value = ""
+        brand_voice.get_compliance_rails.return_value = {}
+        brand_voice.get_banned_words.return_value = {}
+        brand_voice.get_copywriting_reference.return_value = ""
+        brand_voice.get_voice_chunks = AsyncMock(
+            return_value=[
+                {"chunk_text": f"chunk {i} " + "word " * 40, "similarity": s}
+                for i, s in enumerate([0.6, 0.9, 0.7, 0.8])
+            ]
+        )
+        rag = RAGService(brand_voice_service=brand_voice, embeddings_service=MagicMock())
+        # Room for two of the four chunks after the (always kept) prefix
+        rag.token_budget = rag._compiled("tiktok").tokens + 100
+
+        with patch("services.ai.rag.FeedbackLoopService") as feedback:
+            feedback.return_value.get_feedback_context_for_prompt.return_value = ""
+            packed = await rag.assemble_packed_prompt("tiktok", {"description": "a"})
+
+        assert packed.text.startswith(rag.compiled_prefix("tiktok"))
+        assert not packed.over_budget
+        kept = [i for i in range(4) if f"chunk {i} " in packed.text]
+        assert kept == [1, 3]
+        assert packed.dropped["Relevant Brand Voice Context"] > 0
+        # Kept chunks stay in retrieval order
+        assert packed.text.index("chunk 1 ") < packed.text.index("chunk 3 ")
@@ -0,0 +1,74 @@
+"""Tests for retrieval sessions."""
+
+from __future__ import annotations
+
+import random
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.ai.prompt_packer import PackedPrompt
+from services.ai.rag import RAGService
+from services.ai.retrieval import RetrievalSession
+
+CHUNKS = [
+    {
+        "id": i,
+        "chunk_text": f"TikTok tip {i}" if i % 3 == 0 else f"General tip {i}",
+        "metadata": {"section_header": "Voice"},
+        "similarity": round(1.0 - i * 0.03, 2),
+    }
+    for i in range(30)
+]
+
+
+def _search(query_embedding, top_k=5, threshold=0.7):
+    """What a dedicated vector search returns: top_k best, then the threshold."""
+    ranked = sorted(CHUNKS, key=lambda r: r["similarity"], reverse=True)[:top_k]
+    return [dict(r) for r in ranked if r["similarity"] >= threshold]
+
+
+@pytest.fixture
+def embeddings():
+    svc = MagicMock()
+    svc.create_embedding = AsyncMock(return_value=[0.1] * 8)
+    svc.search_similar = MagicMock(side_effect=_search)
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_views_match_dedicated_searches(embeddings):
+    session = RetrievalSession(embeddings, "budget tips", fetch_k=20, min_threshold=0.4)
+    rng = random.Random(0)
+    for _ in range(20):
+        top_k, threshold = rng.randint(1, 20), rng.choice([0.4, 0.5, 0.7, 0.9])
+        assert await session.view(top_k, threshold) == _search(None, top_k, threshold)
+    embeddings.create_embedding.assert_awaited_once_with("budget tips")
+    assert embeddings.search_similar.call_count == 1
+
+    # Wider than the over-fetch: searched again, embedding reused
+    assert len(await session.view(25, 0.0)) == 25
+    assert embeddings.search_similar.call_count == 2
+    assert embeddings.create_embedding.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_generation_embeds_and_scans_once(embeddings):
+    rag = RAGService(embeddings_service=embeddings)
+    video_context = {"description": "Budget tips for 2026"}
+    session = rag.session_for(video_context)
+
+    prefix = PackedPrompt(text="# Prefix", tokens=2, budget=rag.token_budget)
+    with patch.object(rag, "_compile_prefix", return_value=prefix), patch(
+        "services.ai.rag.FeedbackLoopService"
+    ) as feedback:
+        feedback.return_value.get_feedback_context_for_prompt.return_value = ""
+        prompt = await rag.assemble_system_prompt("tiktok", video_context, session=session)
+    boosted = await rag.retrieve_context(session.query, "tiktok", top_k=5, session=session)
+
+    assert embeddings.create_embedding.await_count == 1
+    assert embeddings.search_similar.call_count == 1
+    assert "TikTok tip 0" in prompt
+    # The platform boost applies to this view only
+    assert boosted[0]["similarity"] == pytest.approx(1.2)
+    assert (await session.results())[0]["similarity"] == 1.0
@@ -0,0 +1,96 @@
+"""Tests for binary embedding storage and the in-place migration."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from db import sqlite_store
+from scripts.migrate_binary_embeddings import migrate_table
+from services.ai.vector_codec import decode_vector, encode_vector, is_binary
+from services.ai.vector_store import VectorStore
+
+_DDL = """
+    CREATE TABLE brand_voice_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_name TEXT,
+        chunk_text TEXT,
+        chunk_index INTEGER,
+        embedding TEXT,
+        metadata TEXT DEFAULT '{}'
+    )
+"""
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_store._get_conn().execute(_DDL)
+    return sqlite_db
+
+
+def test_float32_round_trip_is_exact_and_zero_copy():
+    vector = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+    blob = encode_vector(vector, "float32")
+    assert len(blob) == 4 + 1536 * 4
+    decoded = decode_vector(blob)
+    np.testing.assert_array_equal(decoded, vector)
+    assert not decoded.flags.owndata
+
+
+def test_int8_round_trip_within_one_step():
+    vector = np.random.default_rng(1).standard_normal(1536).astype(np.float32)
+    blob = encode_vector(vector, "int8")
+    assert len(blob) == 8 + 1536
+    decoded = decode_vector(blob)
+    step = np.abs(vector).max() / 127
+    assert np.abs(decoded - vector).max() <= step / 2 + 1e-6
+
+
+def test_decodes_legacy_forms():
+    assert decode_vector("[1.0, 2.0]").tolist() == [1.0, 2.0]
+    assert decode_vector([1.0, 2.0]).tolist() == [1.0, 2.0]
+    # pgvector text converted to bytea by 008_binary_embeddings.sql
+    assert decode_vector(memoryview(b"[1,2]")).tolist() == [1.0, 2.0]
+    assert decode_vector(None) is None
+    assert decode_vector("not a vector") is None
+    assert encode_vector([1, 2], "json") == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        encode_vector([1.0], "float16")
+
+
+@pytest.mark.parametrize("fmt", ["float32", "int8"])
+def test_store_loads_binary_rows(db, fmt):
+    rng = np.random.default_rng(2)
+    vectors = rng.standard_normal((50, 32)).astype(np.float32)
+    db.table("brand_voice_embeddings").insert([
+        {"document_name": "voice.md", "chunk_text": f"c{i}", "chunk_index": i, "embedding": encode_vector(v, fmt)}
+        for i, v in enumerate(vectors)
+    ]).execute()
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+
+    query = vectors[7]
+    results = store.search(query.tolist(), top_k=3, threshold=-1.0)
+
+    assert results[0]["chunk_index"] == 7
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_migration_rewrites_json_rows(db):
+    vectors = [[float(i), 1.0, -2.0] for i in range(5)]
+    db.table("brand_voice_embeddings").insert([
+        {"document_name": "voice.md", "chunk_text": "c", "chunk_index": i, "embedding": v}
+        for i, v in enumerate(vectors)
+    ]).execute()
+
+    counts = migrate_table(db, "brand_voice_embeddings", "float32", page_size=2)
+    assert counts["rows"] == 5 and counts["converted"] == 5
+    assert counts["bytes_after"] == 5 * (4 + 3 * 4)
+
+    raw = sqlite_store._get_conn().execute(
+        "SELECT embedding FROM brand_voice_embeddings ORDER BY id"
+    ).fetchall()
+    assert all(is_binary(r[0]) for r in raw)
+    assert [decode_vector(r[0]).tolist() for r in raw] == vectors
+    # Already binary: nothing left to do
+    assert migrate_table(db, "brand_voice_embeddings", "float32")["converted"] == 0
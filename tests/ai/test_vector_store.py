@@ -0,0 +1,149 @@
+"""Tests for the in-process brand voice vector store."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from db import sqlite_store
+from db.instrumentation import add_query_hook, remove_query_hook
+from services.ai.embeddings import _cosine_similarity
+from services.ai.vector_store import VectorStore
+
+_DDL = """
+    CREATE TABLE brand_voice_embeddings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_name TEXT,
+        chunk_text TEXT,
+        chunk_index INTEGER,
+        embedding TEXT,
+        metadata TEXT DEFAULT '{}'
+    )
+"""
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_store._get_conn().execute(_DDL)
+    return sqlite_db
+
+
+def _insert(db, vectors, doc="voice.md"):
+    return db.table("brand_voice_embeddings").insert([
+        {"document_name": doc, "chunk_text": f"chunk {i}", "chunk_index": i, "embedding": v}
+        for i, v in enumerate(vectors)
+    ]).execute().data
+
+
+def _queries(events, select):
+    return [e for e in events if e.shape.startswith(f"SELECT brand_voice_embeddings [{select}")]
+
+
+def test_matches_pure_python_ranking(db):
+    rng = random.Random(7)
+    vectors = [[rng.uniform(-1, 1) for _ in range(16)] for _ in range(200)]
+    _insert(db, vectors)
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+    query = [rng.uniform(-1, 1) for _ in range(16)]
+
+    results = store.search(query, top_k=5, threshold=-1.0)
+
+    expected = sorted(
+        ((_cosine_similarity(query, v), i) for i, v in enumerate(vectors)), reverse=True
+    )[:5]
+    assert [r["chunk_index"] for r in results] == [i for _, i in expected]
+    for r, (sim, _) in zip(results, expected):
+        assert r["similarity"] == pytest.approx(sim, abs=1e-5)
+    assert set(results[0]) == {"id", "document_name", "chunk_text", "chunk_index", "metadata", "similarity"}
+
+
+def test_threshold_and_zero_vectors(db):
+    _insert(db, [[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+    results = store.search([1.0, 0.0], top_k=10, threshold=0.5)
+    assert [(r["chunk_index"], r["similarity"]) for r in results] == [(0, pytest.approx(1.0))]
+    assert store.search([3.0, 4.0, 5.0], top_k=3, threshold=0.0) == []
+
+
+def test_sync_appends_only_new_rows(db):
+    _insert(db, [[1.0, 0.0]])
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+    events = []
+    add_query_hook(events.append)
+    try:
+        store.sync(db)
+        assert _queries(events, "id,") == []  # unchanged: probe only
+        _insert(db, [[0.0, 1.0]], doc="new.md")
+        store.sync(db)
+    finally:
+        remove_query_hook(events.append)
+    (fetch,) = _queries(events, "id,")
+    assert "WHERE" in fetch.shape
+    assert len(store) == 2
+    assert store.search([0.0, 1.0], top_k=1, threshold=0.0)[0]["document_name"] == "new.md"
+
+
+def test_sync_reloads_after_deletes(db):
+    rows = _insert(db, [[1.0, 0.0], [0.0, 1.0]])
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+    db.table("brand_voice_embeddings").delete().eq("id", rows[0]["id"]).execute()
+    store.sync(db)
+    assert len(store) == 1
+    assert store.search([1.0, 0.0], top_k=5, threshold=0.5) == []
+
+
+def test_add_skips_the_round_trip(db):
+    rows = _insert(db, [[1.0, 0.0]])
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+    (new,) = _insert(db, [[0.0, 1.0]])
+    store.add([{"id": new["id"], "chunk_text": "added", "embedding": [0.0, 1.0]}])
+    events = []
+    add_query_hook(events.append)
+    try:
+        store.sync(db)
+    finally:
+        remove_query_hook(events.append)
+    assert _queries(events, "id,") == []
+    assert store.search([0.0, 1.0], top_k=1, threshold=0.0)[0]["chunk_text"] == "added"
+    assert rows[0]["id"] < new["id"]
+
+
+def test_remove_and_update_skip_the_reload(db):
+    rows = _insert(db, [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+    store = VectorStore(sync_interval=0)
+    store.sync(db)
+    db.table("brand_voice_embeddings").delete().eq("id", rows[0]["id"]).execute()
+    store.remove([rows[0]["id"]])
+    db.table("brand_voice_embeddings").update({"chunk_index": 9}).eq("id", rows[2]["id"]).execute()
+    store.update([{"id": rows[2]["id"], "chunk_index": 9}])
+    events = []
+    add_query_hook(events.append)
+    try:
+        store.sync(db)
+    finally:
+        remove_query_hook(events.append)
+    assert _queries(events, "id,") == []
+    results = store.search([1.0, 0.0], top_k=5, threshold=-1.0)
+    assert [r["id"] for r in results] == [rows[2]["id"], rows[1]["id"]]
+    assert results[0]["chunk_index"] == 9
+
+
+def test_sync_is_throttled(db, monkeypatch):
+    from services.ai import vector_store
+
+    now = [100.0]
+    monkeypatch.setattr(vector_store, "_clock", lambda: now[0])
+    store = VectorStore(sync_interval=5)
+    store.sync(db)
+    _insert(db, [[1.0, 0.0]])
+    store.sync(db)
+    assert len(store) == 0
+    now[0] += 5
+    store.sync(db)
+    assert len(store) == 1
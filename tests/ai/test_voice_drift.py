@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 
 from services.ai.voice_drift import (
@@ -35,6 +36,11 @@ class TestComputeTrend:
         assert _compute_trend([]) == "stable"
 
 
+def _centroid(vectors):
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).mean(axis=0)
+
+
 @pytest.fixture
 def mock_embeddings():
     svc = MagicMock()
@@ -59,11 +65,9 @@ class TestVoiceDriftMonitor:
         )
 
         # Mock brand voice embeddings
-        with patch.object(monitor, "_get_brand_voice_embeddings") as mock_get:
-            mock_get.return_value = [
-                {"id": 1, "embedding": [0.5] * 10},
-                {"id": 2, "embedding": [0.5] * 10},
-            ]
+        # Centroid of two identical chunks of [0.5] * 10
+        with patch.object(monitor, "_centroid") as mock_get:
+            mock_get.return_value = _centroid([[0.5] * 10, [0.5] * 10])
             score = await monitor.compute_drift_score("Test comment")
             assert score == pytest.approx(1.0)  # Identical vectors
 
@@ -75,8 +79,8 @@ class TestVoiceDriftMonitor:
             embeddings_service=mock_embeddings,
             brand_voice_service=mock_brand_voice,
         )
-        with patch.object(monitor, "_get_brand_voice_embeddings") as mock_get:
-            mock_get.return_value = []
+        with patch.object(monitor, "_centroid") as mock_get:
+            mock_get.return_value = None
             score = await monitor.compute_drift_score("Test comment")
             assert score == 1.0  # Default to aligned
 
@@ -86,8 +90,8 @@ class TestVoiceDriftMonitor:
             embeddings_service=mock_embeddings,
             brand_voice_service=mock_brand_voice,
         )
-        with patch.object(monitor, "_get_brand_voice_embeddings") as mock_get:
-            mock_get.return_value = [{"id": 1, "embedding": [0.5] * 10}]
+        with patch.object(monitor, "_centroid") as mock_get:
+            mock_get.return_value = _centroid([[0.5] * 10])
             with patch("backend.services.ai.voice_drift.get_supabase_admin") as mock_db:
                 mock_table = MagicMock()
                 mock_table.update.return_value.eq.return_value.execute.return_value = None
@@ -235,9 +239,77 @@ class TestVoiceDriftMonitor:
             mock_table.update.return_value.eq.return_value.execute.return_value = None
             mock_db.return_value.table.return_value = mock_table
 
-            with patch.object(monitor, "_get_brand_voice_embeddings") as mock_get:
-                mock_get.return_value = [{"id": 1, "embedding": [0.5] * 10}]
+            with patch.object(monitor, "_centroid") as mock_get:
+                mock_get.return_value = _centroid([[0.5] * 10])
 
                 result = await monitor.recalibrate()
                 assert result["recalibrated"] == 2
                 mock_brand_voice.refresh_embeddings.assert_called_once()
+
+
+class TestCentroidScoring:
+    """Drift scores from the vector store centroid match the per-chunk mean."""
+
+    @pytest.fixture
+    def setup(self, sqlite_db):
+        import random
+
+        from db import sqlite_store
+        from services.ai.vector_codec import encode_vector
+        from services.ai.vector_store import VectorStore
+
+        sqlite_store._get_conn().execute(
+            "CREATE TABLE brand_voice_embeddings (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " document_name TEXT, chunk_text TEXT, chunk_index INTEGER, embedding TEXT,"
+            " metadata TEXT DEFAULT '{}')"
+        )
+        rng = random.Random(3)
+        chunks = [[rng.uniform(-1, 1) for _ in range(8)] for _ in range(30)]
+        sqlite_db.table("brand_voice_embeddings").insert([
+            {
+                "document_name": "voice.md",
+                "chunk_text": f"c{i}",
+                "chunk_index": i,
+                "embedding": encode_vector(v),
+                "metadata": {"doc_type": "voice" if i % 3 else "guardrails"},
+            }
+            for i, v in enumerate(chunks)
+        ]).execute()
+        store = VectorStore(sync_interval=60)
+        with patch("services.ai.voice_drift.get_supabase_admin", return_value=sqlite_db), patch(
+            "services.ai.voice_drift.get_vector_store", return_value=store
+        ):
+            yield chunks, store, rng
+
+    @pytest.mark.asyncio
+    async def test_batch_scores_match_mean_cosine(self, setup, mock_embeddings, mock_brand_voice):
+        from services.ai.embeddings import _cosine_similarity
+
+        chunks, store, rng = setup
+        comments = [[rng.uniform(-1, 1) for _ in range(8)] for _ in range(5)]
+        mock_embeddings.batch_create_embeddings = AsyncMock(return_value=comments)
+        monitor = VoiceDriftMonitor(
+            embeddings_service=mock_embeddings, brand_voice_service=mock_brand_voice
+        )
+
+        scores = await monitor.compute_drift_scores([f"comment {i}" for i in range(5)])
+        guardrail_scores = await monitor.compute_drift_scores(["x"] * 5, doc_type="guardrails")
+
+        for comment, score in zip(comments, scores):
+            expected = sum(_cosine_similarity(comment, c) for c in chunks) / len(chunks)
+            assert score == pytest.approx(expected, abs=1e-5)
+        guardrails = [c for i, c in enumerate(chunks) if i % 3 == 0]
+        expected = sum(_cosine_similarity(comments[0], c) for c in guardrails) / len(guardrails)
+        assert guardrail_scores[0] == pytest.approx(expected, abs=1e-5)
+
+    def test_centroid_is_cached_until_the_store_changes(self, setup, mock_embeddings, mock_brand_voice):
+        _, store, _ = setup
+        monitor = VoiceDriftMonitor(
+            embeddings_service=mock_embeddings, brand_voice_service=mock_brand_voice
+        )
+        first = monitor._centroid()
+        assert monitor._centroid() is first
+
+        store.remove([1])
+        assert monitor._centroid() is not first
+        assert store.doc_types() == ["guardrails", "voice"]
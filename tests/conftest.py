@@ -3,7 +3,38 @@
 import os
 import sys
 
+import pytest
+
 # Set required env vars before any backend imports
 os.environ.setdefault("SUPABASE_URL", "https://test.supabase.co")
 os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
 os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
+# Keep the embedding cache off disk and out of the source tree
+os.environ.setdefault("EMBEDDING_CACHE_PATH", ":memory:")
+
+from db import sqlite_store  # noqa: E402
+from services.ai.embedding_cache import reset_embedding_cache  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_embedding_cache():
+    """Embeddings cached by one test must not leak into the next."""
+    reset_embedding_cache()
+    yield
+    reset_embedding_cache()
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """Point the SQLite adapter at a fresh, initialised database file."""
+    monkeypatch.setattr(sqlite_store, "DB_PATH", tmp_path / "test.db")
+    if hasattr(sqlite_store._local, "conn"):
+        del sqlite_store._local.conn
+    sqlite_store._table_columns.clear()
+    sqlite_store._json_columns.clear()
+    sqlite_store.init_sqlite_db()
+    yield sqlite_store.SQLiteClient()
+    sqlite_store._local.conn.close()
+    del sqlite_store._local.conn
+    sqlite_store._table_columns.clear()
+    sqlite_store._json_columns.clear()
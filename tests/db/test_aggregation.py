@@ -0,0 +1,182 @@
+"""Tests for server-side aggregation in the query builders."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from db import sqlite_store
+from db.aggregation import SelectItem, parse_aggregate_select
+from db.postgres_store import QueryBuilder
+
+
+class TestParseAggregateSelect:
+    def test_plain_select_is_not_aggregate(self):
+        assert parse_aggregate_select("id, platform") is None
+        assert parse_aggregate_select("*") is None
+
+    def test_group_keys_and_aliases(self):
+        items = parse_aggregate_select('platform, count(), total:likes.sum(), "risk_score".avg()')
+        assert items == [
+            SelectItem(alias="platform", column="platform"),
+            SelectItem(alias="count", function="count"),
+            SelectItem(alias="total", column="likes", function="sum"),
+            SelectItem(alias="avg", column="risk_score", function="avg"),
+        ]
+
+    def test_embedded_resources_are_skipped(self):
+        items = parse_aggregate_select("count(), discovered_videos(platform)")
+        assert items == [SelectItem(alias="count", function="count")]
+
+
+@pytest.fixture
+def videos(sqlite_db):
+    rows = [
+        {"platform": "x", "video_url": "a", "likes": 10, "hashtags": ["#money", "#tips"],
+         "discovered_at": "2024-05-01T10:15:00"},
+        {"platform": "x", "video_url": "b", "likes": 30, "hashtags": ["#money"],
+         "discovered_at": "2024-05-01T10:45:00"},
+        {"platform": "tiktok", "video_url": "c", "likes": 5, "hashtags": "not json",
+         "discovered_at": "2024-05-02T08:00:00"},
+    ]
+    sqlite_db.table("discovered_videos").insert(rows).execute()
+    return sqlite_db
+
+
+class TestSQLiteAggregation:
+    def test_totals(self, videos):
+        result = videos.table("discovered_videos").select(
+            "count(), total:likes.sum(), likes.avg(), likes.min(), likes.max()"
+        ).execute()
+        assert result.data == [{"count": 3, "total": 45, "avg": 15.0, "min": 5, "max": 30}]
+
+    def test_empty_filter_still_returns_one_row(self, videos):
+        result = videos.table("discovered_videos").select("count(), likes.sum()").eq(
+            "platform", "instagram"
+        ).execute()
+        assert result.data == [{"count": 0, "sum": None}]
+
+    def test_group_by_with_order(self, videos):
+        result = (
+            videos.table("discovered_videos")
+            .select("platform, count(), likes.sum()")
+            .order("platform")
+            .execute()
+        )
+        assert result.data == [
+            {"platform": "tiktok", "count": 1, "sum": 5},
+            {"platform": "x", "count": 2, "sum": 40},
+        ]
+
+    def test_unknown_columns_aggregate_as_null(self, videos):
+        result = videos.table("discovered_videos").select("views.sum(), count()").execute()
+        assert result.data == [{"sum": None, "count": 3}]
+
+    def test_gt_filter(self, videos):
+        result = videos.table("discovered_videos").select("count()").gt("likes", 10).execute()
+        assert result.data == [{"count": 1}]
+
+    def test_hour_and_day_buckets(self, videos):
+        hourly = (
+            videos.table("discovered_videos")
+            .select("count()")
+            .bucket("discovered_at", "hour")
+            .order("bucket")
+            .execute()
+        )
+        assert hourly.data == [
+            {"bucket": "2024-05-01T10:00:00", "count": 2},
+            {"bucket": "2024-05-02T08:00:00", "count": 1},
+        ]
+        daily = (
+            videos.table("discovered_videos")
+            .select("platform, count()")
+            .bucket("discovered_at", "day", alias="day")
+            .order("day")
+            .execute()
+        )
+        assert [(r["day"], r["platform"], r["count"]) for r in daily.data] == [
+            ("2024-05-01T00:00:00", "x", 2),
+            ("2024-05-02T00:00:00", "tiktok", 1),
+        ]
+
+    def test_invalid_bucket_unit(self, sqlite_db):
+        with pytest.raises(ValueError):
+            sqlite_db.table("engagements").bucket("posted_at", "fortnight")
+
+    def test_unnest_json_array(self, videos):
+        result = (
+            videos.table("discovered_videos")
+            .select("tag, count(), volume:likes.sum()", count="exact")
+            .unnest("hashtags", "tag")
+            .order("tag")
+            .execute()
+        )
+        # Malformed JSON contributes no elements instead of failing the query
+        assert result.data == [
+            {"tag": "#money", "count": 2, "volume": 40},
+            {"tag": "#tips", "count": 1, "volume": 10},
+        ]
+        assert result.count == 2
+
+    def test_latest_per(self, sqlite_db):
+        e1, e2 = sqlite_db.table("engagements").insert(
+            [{"platform": "x"}, {"platform": "x"}]
+        ).execute().data
+        sqlite_db.table("engagement_metrics").insert([
+            {"engagement_id": e1["id"], "likes": 1, "checked_at": "2024-01-01"},
+            {"engagement_id": e1["id"], "likes": 4, "checked_at": "2024-01-02"},
+            {"engagement_id": e2["id"], "likes": 2, "checked_at": "2024-01-01"},
+            # Same timestamp: the later row wins
+            {"engagement_id": e2["id"], "likes": 3, "checked_at": "2024-01-01"},
+        ]).execute()
+        result = (
+            sqlite_db.table("engagement_metrics")
+            .select("likes.sum()")
+            .latest_per("engagement_id", "checked_at")
+            .execute()
+        )
+        assert result.data == [{"sum": 7}]
+
+    def test_latest_per_uses_metrics_index(self, sqlite_db):
+        qb = sqlite_db.table("engagement_metrics").latest_per("engagement_id", "checked_at")
+        sql = f'EXPLAIN QUERY PLAN SELECT * FROM "engagement_metrics" WHERE {qb._wheres[0]}'
+        plan = " | ".join(r["detail"] for r in sqlite_store._get_conn().execute(sql))
+        assert "idx_engagement_metrics_engagement_checked" in plan
+
+
+class TestPostgresAggregation:
+    def _run(self, qb, rows):
+        qb.client.get_table_columns.return_value = {"id", "platform", "likes", "posted_at", "hashtags"}
+        cursor = MagicMock()
+        cursor.fetchall.return_value = rows
+        result = qb._do_select(cursor)
+        return cursor.execute.call_args.args[0], result
+
+    def test_group_by_sql_and_decimal_results(self):
+        qb = QueryBuilder(MagicMock(), "engagements").select("platform, count(), likes.avg()")
+        sql, result = self._run(qb, [{"platform": "x", "count": 2, "avg": Decimal("2.5")}])
+        assert sql == (
+            'SELECT "platform" AS "platform", COUNT(*) AS "count", AVG("likes") AS "avg"'
+            ' FROM "engagements" GROUP BY 1'
+        )
+        assert result.data == [{"platform": "x", "count": 2, "avg": 2.5}]
+
+    def test_bucket_sql(self):
+        qb = (
+            QueryBuilder(MagicMock(), "engagements")
+            .select("count()")
+            .bucket("posted_at", "hour")
+            .gte("posted_at", "2024-01-01")
+        )
+        sql, _ = self._run(qb, [])
+        assert "date_trunc('hour', (\"posted_at\")::timestamp)" in sql
+        assert sql.endswith('WHERE "posted_at" >= %s GROUP BY 1')
+
+    def test_unnest_sql(self):
+        qb = QueryBuilder(MagicMock(), "engagements").select("tag, count()").unnest("hashtags", "tag")
+        sql, _ = self._run(qb, [])
+        assert "CROSS JOIN LATERAL json_array_elements_text(" in sql
+        assert ') AS "engagements" GROUP BY 1' in sql
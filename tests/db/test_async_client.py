@@ -0,0 +1,123 @@
+"""Tests for the awaitable database client."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+import db.connection as connection
+from db.async_client import AsyncClient, AsyncQueryBuilder, as_async
+from db.pagination import paginate, paginate_async
+
+
+@pytest.fixture
+def adb(sqlite_db):
+    client = AsyncClient(sqlite_db, max_workers=2)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def videos(sqlite_db):
+    sqlite_db.table("discovered_videos").insert([
+        {"platform": "x" if i % 2 else "tiktok", "video_url": f"u{i}", "likes": i}
+        for i in range(6)
+    ]).execute()
+    return sqlite_db
+
+
+def test_chain_keeps_async_wrapper(adb):
+    query = adb.table("discovered_videos").select("id").eq("platform", "x").order("id").limit(2)
+    assert isinstance(query, AsyncQueryBuilder)
+    assert isinstance(query.not_.is_("likes", "null"), AsyncQueryBuilder)
+
+
+def test_execute_matches_sync_client(adb, videos):
+    async def fetch():
+        return await (
+            adb.table("discovered_videos")
+            .select("video_url")
+            .eq("platform", "x")
+            .order("likes", desc=True)
+            .execute()
+        )
+
+    result = asyncio.run(fetch())
+    expected = (
+        videos.table("discovered_videos").select("video_url")
+        .eq("platform", "x").order("likes", desc=True).execute()
+    )
+    assert result.data == expected.data == [{"video_url": u} for u in ("u5", "u3", "u1")]
+
+
+def test_writes_are_visible_to_sync_client(adb, videos):
+    async def write():
+        await adb.table("discovered_videos").update({"likes": 99}).eq("video_url", "u0").execute()
+        await adb.table("discovered_videos").delete().eq("video_url", "u1").execute()
+
+    asyncio.run(write())
+    rows = videos.table("discovered_videos").select("video_url, likes").order("id").execute().data
+    assert rows[0] == {"video_url": "u0", "likes": 99}
+    assert "u1" not in {r["video_url"] for r in rows}
+
+
+def test_paginate_async_matches_paginate(adb, videos):
+    sync_page = paginate(videos.table("discovered_videos").select("*"), "likes", limit=4, desc=True)
+    async_page = asyncio.run(
+        paginate_async(adb.table("discovered_videos").select("*"), "likes", limit=4, desc=True)
+    )
+    assert async_page == sync_page
+
+
+def test_execute_does_not_block_event_loop():
+    class SlowBuilder:
+        def execute(self):
+            time.sleep(0.2)
+            return "done"
+
+    class SlowClient:
+        def table(self, name):
+            return SlowBuilder()
+
+    client = AsyncClient(SlowClient(), max_workers=4)
+
+    async def main():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(client.table("t").execute() for _ in range(4)))
+        elapsed = time.perf_counter() - started
+        beat.cancel()
+        return results, elapsed, ticks
+
+    try:
+        results, elapsed, ticks = asyncio.run(main())
+    finally:
+        client.close()
+    assert results == ["done"] * 4
+    assert elapsed < 0.6  # the four queries overlapped
+    assert ticks >= 5  # the loop kept running while they waited
+
+
+def test_admin_hands_out_shared_async_client(sqlite_db, monkeypatch):
+    monkeypatch.setattr(connection, "_initialized", True)
+    monkeypatch.setattr(connection, "_admin", sqlite_db)
+    monkeypatch.setattr(connection, "_async_admin", None)
+    adb = connection.get_supabase_admin(asynchronous=True)
+    try:
+        assert isinstance(adb, AsyncClient)
+        assert adb.sync is sqlite_db
+        assert connection.get_supabase_admin(asynchronous=True) is adb
+        assert connection.get_supabase_admin() is sqlite_db
+        assert as_async(adb) is adb
+    finally:
+        adb.close()
@@ -0,0 +1,147 @@
+"""Tests for list-aware insert/upsert in the database adapters."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db import sqlite_store
+from db.postgres_store import QueryBuilder
+
+
+class TestSQLiteBulkInsert:
+    def test_returns_correct_ids(self, sqlite_db):
+        sqlite_db.table("engagements").insert({"platform": "x"}).execute()
+        rows = [{"platform": "x", "comment_text": f"c{i}"} for i in range(5)]
+        result = sqlite_db.table("engagements").insert(rows).execute()
+
+        stored = sqlite_db.table("engagements").select("id, comment_text").execute().data
+        by_text = {r["comment_text"]: r["id"] for r in stored}
+        assert [r["id"] for r in result.data] == [by_text[f"c{i}"] for i in range(5)]
+
+    def test_mixed_column_sets(self, sqlite_db):
+        rows = [
+            {"platform": "x", "comment_text": "a"},
+            {"platform": "tiktok"},
+            {"platform": "x", "comment_text": "b"},
+        ]
+        result = sqlite_db.table("engagements").insert(rows).execute()
+        ids = {r["id"] for r in result.data}
+        assert len(ids) == 3
+        stored = sqlite_db.table("engagements").select("id, platform").execute().data
+        assert {r["id"] for r in stored} == ids
+
+    def test_single_commit(self, sqlite_db):
+        conn = MagicMock(wraps=sqlite_store._get_conn())
+        qb = sqlite_db.table("engagements").insert([{"platform": "x"}] * 10)
+        qb._do_insert(conn)
+        assert conn.commit.call_count == 1
+        assert conn.executemany.call_count == 1
+
+    def test_failure_rolls_back_whole_batch(self, sqlite_db):
+        rows = [{"platform": "x"}, {"platform": None}]  # second violates NOT NULL
+        with pytest.raises(Exception):
+            sqlite_db.table("engagements").insert(rows).execute()
+        assert sqlite_db.table("engagements").select("id").execute().data == []
+
+
+class TestSQLiteBulkUpsert:
+    def test_default_conflict_target_for_system_config(self, sqlite_db):
+        sqlite_db.table("system_config").upsert(
+            [{"key": "kill_switch", "value": {"active": True}}, {"key": "new_key", "value": {}}]
+        ).execute()
+        rows = sqlite_db.table("system_config").select("key, value").execute().data
+        values = {r["key"]: r["value"] for r in rows}
+        assert values["kill_switch"] == {"active": True}
+        assert "new_key" in values
+
+    def test_custom_conflict_target(self, sqlite_db):
+        sqlite_db.table("review_posts").insert({"post_id": "p1", "text": "old"}).execute()
+        sqlite_db.table("review_posts").upsert(
+            [{"post_id": "p1", "text": "new"}, {"post_id": "p2", "text": "other"}],
+            on_conflict="post_id",
+        ).execute()
+        rows = sqlite_db.table("review_posts").select("post_id, text").order("post_id").execute().data
+        assert rows == [{"post_id": "p1", "text": "new"}, {"post_id": "p2", "text": "other"}]
+
+    def test_ignore_duplicates(self, sqlite_db):
+        sqlite_db.table("review_posts").insert({"post_id": "p1", "text": "old"}).execute()
+        sqlite_db.table("review_posts").upsert(
+            {"post_id": "p1", "text": "new"}, on_conflict="post_id", ignore_duplicates=True
+        ).execute()
+        rows = sqlite_db.table("review_posts").select("text").execute().data
+        assert rows == [{"text": "old"}]
+
+    def test_ignore_duplicates_returns_only_inserted_rows(self, sqlite_db):
+        first = sqlite_db.table("review_posts").insert({"post_id": "p1", "text": "old"}).execute()
+        result = sqlite_db.table("review_posts").upsert(
+            [{"post_id": "p1", "text": "new"}, {"post_id": "p2", "text": "other"}],
+            on_conflict="post_id",
+            ignore_duplicates=True,
+        ).execute()
+        assert [r["post_id"] for r in result.data] == ["p2"]
+        assert result.data[0]["id"] != first.data[0]["id"]
+        again = sqlite_db.table("review_posts").upsert(
+            {"post_id": "p2", "text": "again"}, on_conflict="post_id", ignore_duplicates=True
+        ).execute()
+        assert again.data == []
+
+
+class TestPostgresBulkWrites:
+    def _builder(self, table):
+        return QueryBuilder(MagicMock(), table)
+
+    def test_insert_uses_execute_values_once(self):
+        cursor, conn = MagicMock(), MagicMock()
+        qb = self._builder("engagements").insert([{"platform": "x"}, {"platform": "tiktok"}])
+        with patch("db.postgres_store.execute_values") as ev:
+            ev.return_value = [{"id": 1, "platform": "x"}, {"id": 2, "platform": "tiktok"}]
+            result = qb._do_insert(cursor, conn)
+        sql = ev.call_args.args[1]
+        assert sql == 'INSERT INTO "engagements" ("platform") VALUES %s RETURNING *'
+        assert ev.call_args.args[2] == [["x"], ["tiktok"]]
+        assert [r["id"] for r in result.data] == [1, 2]
+        conn.commit.assert_called_once()
+
+    def test_insert_mixed_column_sets_keeps_input_order(self):
+        cursor, conn = MagicMock(), MagicMock()
+        rows = [
+            {"platform": "x", "comment_text": "a"},
+            {"platform": "tiktok"},
+            {"platform": "x", "comment_text": "b"},
+        ]
+        qb = self._builder("engagements").insert(rows)
+        with patch("db.postgres_store.execute_values") as ev:
+            ev.side_effect = [
+                [{"id": 1, "platform": "x", "comment_text": "a"}, {"id": 2, "platform": "x", "comment_text": "b"}],
+                [{"id": 3, "platform": "tiktok", "comment_text": None}],
+            ]
+            result = qb._do_insert(cursor, conn)
+        assert ev.call_count == 2
+        assert [r["id"] for r in result.data] == [1, 3, 2]
+        assert [r["platform"] for r in result.data] == ["x", "tiktok", "x"]
+
+    def test_upsert_conflict_target_and_dedupe(self):
+        cursor, conn = MagicMock(), MagicMock()
+        qb = self._builder("review_posts").upsert(
+            [{"post_id": "p1", "text": "a"}, {"post_id": "p1", "text": "b"}],
+            on_conflict="post_id",
+        )
+        with patch("db.postgres_store.execute_values") as ev:
+            ev.return_value = [{"id": 1, "post_id": "p1", "text": "b"}]
+            qb._do_upsert(cursor, conn)
+        sql = ev.call_args.args[1]
+        assert 'ON CONFLICT ("post_id") DO UPDATE SET "text" = EXCLUDED."text"' in sql
+        assert ev.call_args.args[2] == [["p1", "b"]]
+
+    def test_ignore_duplicates_returns_only_inserted_rows(self):
+        cursor, conn = MagicMock(), MagicMock()
+        qb = self._builder("discovered_videos").upsert(
+            [{"video_url": "u"}, {"video_url": "v"}], on_conflict="video_url", ignore_duplicates=True
+        )
+        with patch("db.postgres_store.execute_values") as ev:
+            ev.return_value = []
+            assert qb._do_upsert(cursor, conn).data == []
+            ev.return_value = [{"id": 2, "video_url": "v"}]
+            assert qb._do_upsert(cursor, conn).data == [{"id": 2, "video_url": "v"}]
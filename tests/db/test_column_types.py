@@ -0,0 +1,105 @@
+"""Tests for schema-derived JSON columns and lazy row decoding."""
+
+from __future__ import annotations
+
+import copy
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from db import sqlite_store
+from db.column_types import LazyRow, is_json_default, json_columns
+from db.postgres_store import PostgresClient, QueryBuilder
+
+
+@pytest.mark.parametrize(
+    "default, expected",
+    [("'[]'", True), ("'{}'", True), ("'{}'::text", True), ("'new'", False), (None, False)],
+)
+def test_is_json_default(default, expected):
+    assert is_json_default(default) is expected
+
+
+class TestRegistry:
+    def test_derived_from_sqlite_schema(self, sqlite_db):
+        conn = sqlite_store._get_conn()
+        assert sqlite_store._get_json_columns(conn, "discovered_videos") == {"hashtags"}
+        assert sqlite_store._get_json_columns(conn, "system_config") == {"value"}
+        # result defaults to NULL, so it comes from the explicit list
+        assert {"payload", "metadata", "result"} <= sqlite_store._get_json_columns(conn, "neoclaw_tasks")
+
+    def test_extra_columns_apply_without_schema(self):
+        assert json_columns("comment_embeddings", []) == {"embedding"}
+
+
+@pytest.fixture
+def posts(sqlite_db):
+    sqlite_db.table("review_posts").insert({
+        "post_id": "p1", "text": "[thread] not json", "reasoning": '{"looks": "like json"}',
+    }).execute()
+    sqlite_db.table("discovered_videos").insert({
+        "platform": "x", "video_url": "u", "description": "[1, 2]", "hashtags": ["#a", "#b"],
+    }).execute()
+    return sqlite_db
+
+
+class TestSQLiteDecoding:
+    def test_free_text_is_left_alone(self, posts):
+        row = posts.table("review_posts").select("*").single().execute().data
+        assert row["text"] == "[thread] not json"
+        assert row["reasoning"] == '{"looks": "like json"}'
+        video = posts.table("discovered_videos").select("*").single().execute().data
+        assert video["description"] == "[1, 2]"
+        assert video["hashtags"] == ["#a", "#b"]
+
+    def test_decodes_lazily_and_once(self, posts):
+        row = posts.table("discovered_videos").select("*").single().execute().data
+        assert isinstance(row, LazyRow)
+        assert dict.__getitem__(row, "hashtags") == '["#a", "#b"]'
+        tags = row["hashtags"]
+        assert tags == ["#a", "#b"]
+        assert row.get("hashtags") is tags
+
+    def test_alias_follows_column(self, posts):
+        row = posts.table("discovered_videos").select("tags:hashtags").single().execute().data
+        assert row == {"tags": ["#a", "#b"]}
+
+    def test_projection_without_json_is_plain_dict(self, posts):
+        row = posts.table("discovered_videos").select("id, description").single().execute().data
+        assert type(row) is dict
+
+    def test_whole_row_views_are_decoded(self, posts):
+        row = posts.table("discovered_videos").select("hashtags, platform").single().execute().data
+        assert json.loads(json.dumps(row)) == {"hashtags": ["#a", "#b"], "platform": "x"}
+        for view in (dict(row), {**row}, row.copy(), copy.deepcopy(row)):
+            assert view == {"hashtags": ["#a", "#b"], "platform": "x"}
+            assert type(view) is dict
+
+    def test_unnest_rows_are_not_decoded(self, posts):
+        rows = (
+            posts.table("discovered_videos").select("term, count()")
+            .unnest("hashtags", "term").order("term").execute().data
+        )
+        assert rows == [{"term": "#a", "count": 1}, {"term": "#b", "count": 1}]
+
+
+def test_postgres_decodes_text_json_columns():
+    client = MagicMock()
+    client.get_table_columns.return_value = {"id", "key", "value"}
+    client.get_json_columns.return_value = frozenset({"value"})
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [{"id": 1, "key": "kill_switch", "value": '{"active": true}'}]
+    qb = QueryBuilder(client, "system_config").select("value").eq("key", "kill_switch").single()
+    assert qb._do_select(cursor).data["value"] == {"active": True}
+
+
+def test_postgres_registry_reads_column_defaults():
+    client = PostgresClient.__new__(PostgresClient)
+    client._table_columns, client._json_columns = {}, {}
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [
+        {"column_name": "hashtags", "column_default": "'[]'::text"},
+        {"column_name": "description", "column_default": None},
+    ]
+    assert client.get_json_columns(cursor, "discovered_videos") == {"hashtags"}
@@ -0,0 +1,130 @@
+"""Tests for the config-table read-through cache."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from db import config_cache, sqlite_store
+from db.config_cache import get_cache_stats, invalidate, read_through, reset_cache_stats
+from db.postgres_store import QueryBuilder
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(config_cache, "_clock", clock)
+    monkeypatch.setattr(config_cache, "CONFIG_CACHE_TTL", 60.0)
+    monkeypatch.setattr(config_cache, "KILL_SWITCH_MAX_STALENESS", 5.0)
+    invalidate()
+    reset_cache_stats()
+    return clock
+
+
+def _kill_switch(db) -> bool:
+    row = db.table("system_config").select("value").eq("key", "kill_switch").single().execute()
+    return row.data["value"]["active"]
+
+
+def _set_kill_switch_externally(active: bool) -> None:
+    """Write without going through the builders, like another process would."""
+    conn = sqlite_store._get_conn()
+    conn.execute(
+        "UPDATE system_config SET value = ? WHERE key = 'kill_switch'",
+        (json.dumps({"active": active}),),
+    )
+    conn.commit()
+
+
+class TestReadThrough:
+    def test_repeat_reads_hit(self, sqlite_db, clock):
+        first = sqlite_db.table("risk_config").select("auto_approve_max, review_max").limit(1).execute()
+        second = sqlite_db.table("risk_config").select("auto_approve_max, review_max").limit(1).execute()
+        assert first.data == second.data == [{"auto_approve_max": 30, "review_max": 65}]
+        stats = get_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_different_queries_are_separate_entries(self, sqlite_db, clock):
+        sqlite_db.table("system_config").select("value").eq("key", "rate_limits").execute()
+        sqlite_db.table("system_config").select("value").eq("key", "posting_schedule").execute()
+        assert get_cache_stats()["misses"] == 2
+
+    def test_returned_rows_are_copies(self, sqlite_db, clock):
+        rows = sqlite_db.table("system_config").select("value").eq("key", "rate_limits").execute().data
+        rows[0]["value"]["x"] = 999
+        again = sqlite_db.table("system_config").select("value").eq("key", "rate_limits").execute().data
+        assert again[0]["value"]["x"] == 15
+
+    def test_other_tables_are_not_cached(self, sqlite_db, clock):
+        sqlite_db.table("platforms").select("name").execute()
+        sqlite_db.table("platforms").select("name").execute()
+        assert get_cache_stats()["misses"] == 0
+
+
+class TestInvalidation:
+    @pytest.mark.parametrize("write", ["update", "upsert"])
+    def test_builder_writes_are_visible_immediately(self, sqlite_db, clock, write):
+        assert _kill_switch(sqlite_db) is False
+        if write == "update":
+            sqlite_db.table("system_config").update({"value": {"active": True}}).eq("key", "kill_switch").execute()
+        else:
+            sqlite_db.table("system_config").upsert({"key": "kill_switch", "value": {"active": True}}).execute()
+        assert _kill_switch(sqlite_db) is True
+
+    def test_external_kill_switch_flip_is_bounded(self, sqlite_db, clock):
+        assert _kill_switch(sqlite_db) is False
+        _set_kill_switch_externally(True)
+        clock.now += 4.9
+        assert _kill_switch(sqlite_db) is False
+        clock.now += 0.2
+        assert _kill_switch(sqlite_db) is True
+
+    def test_other_config_uses_full_ttl(self, sqlite_db, clock):
+        def review_max():
+            return sqlite_db.table("risk_config").select("review_max").limit(1).execute().data[0]["review_max"]
+
+        assert review_max() == 65
+        conn = sqlite_store._get_conn()
+        conn.execute("UPDATE risk_config SET review_max = 70")
+        conn.commit()
+        clock.now += 30
+        assert review_max() == 65
+        clock.now += 31
+        assert review_max() == 70
+
+    def test_load_racing_a_write_is_not_stored(self, clock):
+        def loader():
+            invalidate("system_config")
+            return "stale"
+
+        assert read_through("system_config", "k", ["kill_switch"], loader) == "stale"
+        assert read_through("system_config", "k", ["kill_switch"], lambda: "fresh") == "fresh"
+
+
+def test_postgres_hits_skip_the_pool(monkeypatch, clock):
+    calls = []
+
+    def fake_execute(self):
+        calls.append(self._table)
+        return "rows"
+
+    monkeypatch.setattr(QueryBuilder, "_execute", fake_execute)
+    client = MagicMock()
+    for _ in range(3):
+        assert QueryBuilder(client, "voice_config").select("*").limit(1).execute() == "rows"
+    assert calls == ["voice_config"]
+    client.connection.assert_not_called()
+
+    QueryBuilder(client, "voice_config").update({"tone": "warm"}).eq("id", 1).execute()
+    QueryBuilder(client, "voice_config").select("*").limit(1).execute()
+    assert calls == ["voice_config"] * 3
@@ -0,0 +1,108 @@
+"""Tests for query instrumentation, the slow-query log and N+1 detection."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from db import instrumentation
+from db.async_client import AsyncClient
+from db.instrumentation import (
+    add_query_hook,
+    get_query_stats,
+    remove_query_hook,
+    reset_query_stats,
+    track_request,
+)
+from middleware.query_tracking import QueryTrackingMiddleware
+
+
+@pytest.fixture
+def events(sqlite_db):
+    reset_query_stats()
+    seen = []
+    add_query_hook(seen.append)
+    yield seen
+    remove_query_hook(seen.append)
+    reset_query_stats()
+
+
+def test_records_shape_rows_and_duration(sqlite_db, events):
+    sqlite_db.table("platforms").select("name").eq("status", "connected").order("name").limit(5).execute()
+    (event,) = events
+    assert event.table == "platforms"
+    assert event.operation == "select"
+    assert event.shape == 'SELECT platforms [name] WHERE "status" = ? ORDER BY name LIMIT ?'
+    assert event.rows == 3
+    assert event.duration_ms >= 0
+    assert event.route is None
+
+
+def test_same_shape_with_different_values_aggregates(sqlite_db, events):
+    for name in ("x", "tiktok", "instagram"):
+        sqlite_db.table("platforms").select("id").eq("name", name).execute()
+    sqlite_db.table("audit_log").insert({"action": "test"}).execute()
+    shapes = {s["shape"]: s for s in get_query_stats()["shapes"]}
+    assert shapes['SELECT platforms [id] WHERE "name" = ?']["queries"] == 3
+    assert shapes["INSERT audit_log"]["rows"] == 1
+
+
+def test_failed_queries_are_recorded(sqlite_db, events):
+    with pytest.raises(Exception):
+        sqlite_db.table("no_such_table").select("*").execute()
+    assert events[0].error == "OperationalError"
+
+
+def test_config_cache_hits_are_not_round_trips(sqlite_db, events):
+    for _ in range(3):
+        sqlite_db.table("system_config").select("value").eq("key", "rate_limits").execute()
+    assert len(events) == 1
+
+
+def test_slow_query_log(sqlite_db, events, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0.0)
+    with caplog.at_level(logging.WARNING, logger="db.instrumentation"):
+        sqlite_db.table("platforms").select("name").execute()
+    assert get_query_stats()["slow_queries"][0]["table"] == "platforms"
+    record = next(r for r in caplog.records if r.getMessage().startswith("Slow query"))
+    assert record.query["shape"] == "SELECT platforms [name]"
+
+
+def test_n_plus_one_detection(sqlite_db, events, caplog):
+    ids = [r["id"] for r in sqlite_db.table("platforms").select("id").execute().data]
+    with caplog.at_level(logging.WARNING, logger="db.instrumentation"):
+        with track_request("GET", "/loop") as request:
+            for _ in range(2):
+                for platform_id in ids:
+                    sqlite_db.table("platforms").select("name").eq("id", platform_id).execute()
+    assert request.count == 6
+    (report,) = get_query_stats()["n_plus_one"]
+    assert report == {
+        "route": "GET /loop",
+        "table": "platforms",
+        "shape": 'SELECT platforms [name] WHERE "id" = ?',
+        "times": 6,
+    }
+    assert any(r.getMessage().startswith("Possible N+1 in GET /loop") for r in caplog.records)
+
+
+def test_middleware_attributes_async_queries_to_route(sqlite_db, events):
+    adb = AsyncClient(sqlite_db, max_workers=2)
+    app = FastAPI()
+    app.add_middleware(QueryTrackingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        for _ in range(5):
+            await adb.table("platforms").select("name").eq("id", item_id).execute()
+        return {}
+
+    try:
+        TestClient(app).get("/items/1")
+    finally:
+        adb.close()
+    assert {e.route for e in events} == {"GET /items/{item_id}"}
+    assert get_query_stats()["n_plus_one"][0]["route"] == "GET /items/{item_id}"
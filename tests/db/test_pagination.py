@@ -0,0 +1,87 @@
+"""Tests for keyset pagination and cursor tokens."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from db import sqlite_store
+from db.pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+from db.postgres_store import QueryBuilder
+
+
+@pytest.fixture
+def posts(sqlite_db):
+    # Several rows share a timestamp so the id tie-breaker matters
+    rows = [
+        {"post_id": f"p{i}", "status": "pending" if i % 2 else "draft",
+         "created_at": f"2024-01-{1 + i // 3:02d}T00:00:00"}
+        for i in range(10)
+    ]
+    sqlite_db.table("review_posts").insert(rows).execute()
+    return sqlite_db
+
+
+def _walk(db, limit, desc, status=None):
+    seen, cursor, pages = [], None, 0
+    while True:
+        query = db.table("review_posts").select("*")
+        if status:
+            query = query.eq("status", status)
+        rows, cursor = paginate(query, "created_at", limit=limit, cursor=cursor, desc=desc)
+        seen.extend(r["post_id"] for r in rows)
+        pages += 1
+        if cursor is None:
+            return seen, pages
+
+
+class TestPaginate:
+    @pytest.mark.parametrize("desc", [False, True])
+    def test_pages_cover_every_row_once(self, posts, desc):
+        seen, pages = _walk(posts, limit=3, desc=desc)
+        expected = [f"p{i}" for i in range(10)]
+        assert seen == (expected[::-1] if desc else expected)
+        assert pages == 4
+
+    def test_filters_apply_to_every_page(self, posts):
+        seen, _ = _walk(posts, limit=2, desc=True, status="pending")
+        assert seen == ["p9", "p7", "p5", "p3", "p1"]
+
+    def test_exact_fit_has_no_next_page(self, posts):
+        rows, cursor = paginate(posts.table("review_posts").select("*"), "created_at", limit=10)
+        assert len(rows) == 10
+        assert cursor is None
+
+    def test_rejects_foreign_cursors(self, posts):
+        query = posts.table("review_posts").select("*")
+        with pytest.raises(InvalidCursor):
+            paginate(query, "created_at", limit=3, cursor="not-a-cursor!")
+        with pytest.raises(InvalidCursor):
+            paginate(query, "created_at", limit=3, cursor=encode_cursor({"queued_at": "x", "id": 1}))
+
+    def test_cursor_round_trip(self):
+        values = {"created_at": "2024-01-01T00:00:00", "id": 42}
+        assert decode_cursor(encode_cursor(values)) == values
+
+    def test_deep_page_uses_index(self, posts):
+        qb = posts.table("review_posts").after(
+            "created_at", "2024-01-02", desc=True, tie_column="id", tie_value=5
+        )
+        sql = (
+            f'EXPLAIN QUERY PLAN SELECT * FROM "review_posts" WHERE {qb._wheres[0]}'
+            ' ORDER BY "created_at" DESC, "id" DESC LIMIT 3'
+        )
+        plan = " | ".join(
+            r["detail"] for r in sqlite_store._get_conn().execute(sql, qb._params)
+        )
+        assert "idx_review_posts_created_at_id" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_postgres_after_sql():
+    qb = QueryBuilder(MagicMock(), "review_queue").after(
+        "decided_at", "2024-01-01", desc=True, tie_column="id", tie_value=7
+    )
+    assert qb._wheres == ['("decided_at", "id") < (%s, %s)']
+    assert qb._params == ["2024-01-01", 7]
@@ -0,0 +1,132 @@
+"""Tests for the PostgreSQL connection pool."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from psycopg2 import extensions
+
+from db.postgres_store import ConnectionPool, PoolTimeout, PostgresClient
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.fail_ping = False
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        cur = MagicMock()
+        if self.fail_ping:
+            cur.execute.side_effect = Exception("server closed the connection")
+        return cur
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def get_transaction_status(self):
+        return self.status
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def fake_connect():
+    with patch("db.postgres_store.psycopg2.connect") as mock_connect:
+        mock_connect.side_effect = lambda **kw: FakeConnection()
+        yield mock_connect
+
+
+class TestConnectionPool:
+    def test_opens_min_size_eagerly(self, fake_connect):
+        pool = ConnectionPool({}, min_size=2, max_size=4)
+        assert fake_connect.call_count == 2
+        assert pool.stats()["idle"] == 2
+
+    def test_reuses_connections(self, fake_connect):
+        pool = ConnectionPool({}, min_size=0, max_size=2)
+        for _ in range(10):
+            with pool.connection():
+                pass
+        assert fake_connect.call_count == 1
+        stats = pool.stats()
+        assert stats["checkouts"] == 10
+        assert stats["size"] == 1
+
+    def test_rejects_invalid_sizes(self, fake_connect):
+        with pytest.raises(ValueError):
+            ConnectionPool({}, min_size=0, max_size=0)
+        with pytest.raises(ValueError):
+            ConnectionPool({}, min_size=3, max_size=2)
+
+    def test_timeout_when_exhausted(self, fake_connect):
+        pool = ConnectionPool({}, min_size=0, max_size=1, timeout=0.05)
+        conn = pool.getconn()
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+        pool.putconn(conn)
+        assert pool.stats()["timeouts"] == 1
+
+    def test_waiter_gets_released_connection(self, fake_connect):
+        pool = ConnectionPool({}, min_size=0, max_size=1, timeout=2)
+        conn = pool.getconn()
+        got = []
+
+        def worker():
+            got.append(pool.getconn())
+
+        t = threading.Thread(target=worker)
+        t.start()
+        time.sleep(0.05)
+        assert pool.stats()["waiters"] == 1
+        pool.putconn(conn)
+        t.join(timeout=2)
+        assert got == [conn]
+        assert pool.stats()["max_waiters"] == 1
+
+    def test_replaces_unhealthy_connection(self, fake_connect):
+        pool = ConnectionPool({}, min_size=1, max_size=1, health_check_interval=0)
+        first = pool.getconn()
+        first.fail_ping = True
+        pool.putconn(first)
+
+        second = pool.getconn()
+        assert second is not first
+        assert first.closed
+        stats = pool.stats()
+        assert stats["failed_health_checks"] == 1
+        assert stats["connections_discarded"] == 1
+
+    def test_closed_connection_is_discarded(self, fake_connect):
+        pool = ConnectionPool({}, min_size=0, max_size=1)
+        conn = pool.getconn()
+        conn.close()
+        pool.putconn(conn)
+        assert pool.stats()["size"] == 0
+
+    def test_open_transaction_rolled_back_on_return(self, fake_connect):
+        pool = ConnectionPool({}, min_size=0, max_size=1)
+        conn = pool.getconn()
+        conn.status = extensions.TRANSACTION_STATUS_INTRANS
+        pool.putconn(conn)
+        assert conn.rollbacks == 1
+        assert pool.stats()["idle"] == 1
+
+
+class TestPostgresClientPooling:
+    def test_query_builder_uses_pool(self, fake_connect):
+        client = PostgresClient(
+            "postgresql://user:pw@localhost:5432/app", pool_min_size=1, pool_max_size=2
+        )
+        with patch.object(client.pool, "getconn", wraps=client.pool.getconn) as getconn:
+            client.table("platforms").select("*").execute()
+            client.table("platforms").select("*").execute()
+        assert getconn.call_count == 2
+        assert fake_connect.call_count == 1
+        assert client.pool_stats()["in_use"] == 0
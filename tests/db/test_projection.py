@@ -0,0 +1,69 @@
+"""Tests for select-list projection in the query builders."""
+
+from __future__ import annotations
+
+from db.io_stats import get_io_stats, reset_io_stats
+from db.projection import compile_projection, parse_select, split_top_level
+
+
+class TestParseSelect:
+    def test_star(self):
+        assert parse_select("*") is None
+        assert parse_select("") is None
+        assert parse_select("id, *") is None
+
+    def test_whitespace_and_quotes(self):
+        assert parse_select('"likes", replies') == [("likes", None), ("replies", None)]
+        assert parse_select("  id ,name  ") == [("id", None), ("name", None)]
+
+    def test_alias_and_cast(self):
+        assert parse_select("total:likes, id::text") == [("likes", "total"), ("id", None)]
+
+    def test_embedded_resources_skipped(self):
+        assert parse_select("id, discovered_videos!inner(platform, video_url)") == [("id", None)]
+
+    def test_split_top_level(self):
+        assert split_top_level("a, b(c, d), e") == ["a", "b(c, d)", "e"]
+
+
+class TestCompileProjection:
+    def test_quotes_columns(self):
+        assert compile_projection("likes, replies") == '"likes", "replies"'
+
+    def test_drops_unknown_columns(self):
+        assert compile_projection("id, views", {"id", "likes"}) == '"id"'
+
+    def test_all_unknown_falls_back_to_star(self):
+        assert compile_projection("views", {"id"}) == "*"
+
+    def test_alias(self):
+        assert compile_projection("n:likes") == '"likes" AS "n"'
+
+
+class TestSQLiteProjection:
+    def test_select_returns_only_requested_columns(self, sqlite_db):
+        sqlite_db.table("discovered_videos").insert(
+            {"platform": "x", "description": "d" * 1000, "likes": 3}
+        ).execute()
+        rows = sqlite_db.table("discovered_videos").select("id").execute().data
+        assert list(rows[0].keys()) == ["id"]
+
+        rows = sqlite_db.table("discovered_videos").select('"likes", platform').execute().data
+        assert rows == [{"likes": 3, "platform": "x"}]
+
+    def test_unknown_columns_ignored(self, sqlite_db):
+        sqlite_db.table("discovered_videos").insert({"platform": "x"}).execute()
+        rows = sqlite_db.table("discovered_videos").select("id, views").execute().data
+        assert list(rows[0].keys()) == ["id"]
+
+    def test_io_accounting(self, sqlite_db):
+        sqlite_db.table("discovered_videos").insert(
+            {"platform": "x", "description": "d" * 1000}
+        ).execute()
+        reset_io_stats()
+        sqlite_db.table("discovered_videos").select("id").execute()
+        sqlite_db.table("discovered_videos").select("*").execute()
+        stats = {s["columns"]: s for s in get_io_stats()}
+        assert stats['"id"']["rows"] == 1
+        assert stats['"id"']["bytes"] < 100
+        assert stats["*"]["bytes"] > 1000
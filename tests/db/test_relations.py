@@ -0,0 +1,150 @@
+"""Tests for embedded-resource joins."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from db.instrumentation import add_query_hook, remove_query_hook
+from db.postgres_store import QueryBuilder
+from db.relations import parse_embeds
+
+
+class TestParseEmbeds:
+    def test_many_to_one_with_alias_and_hint(self):
+        (embed,) = parse_embeds("review_queue", "*, video:discovered_videos!inner(platform, url:video_url)")
+        assert embed.relation == "discovered_videos"
+        assert embed.alias == "video"
+        assert embed.columns == (("platform", None), ("video_url", "url"))
+        assert embed.inner and not embed.to_many
+        assert (embed.local_column, embed.remote_column) == ("video_id", "id")
+
+    def test_one_to_many(self):
+        (embed,) = parse_embeds("discovered_videos", "id, review_queue(*)")
+        assert embed.to_many
+        assert embed.columns is None
+        assert (embed.local_column, embed.remote_column) == ("id", "video_id")
+
+    def test_aggregates_are_not_embeds(self):
+        assert parse_embeds("discovered_videos", "platform, count(), likes.sum()") == []
+
+    def test_unknown_relation(self):
+        with pytest.raises(ValueError, match="No relationship"):
+            parse_embeds("platforms", "*, review_queue(id)")
+
+    def test_nested_embeds_rejected(self):
+        with pytest.raises(ValueError, match="Nested"):
+            parse_embeds("engagements", "*, generated_comments(id, discovered_videos(id))")
+
+
+@pytest.fixture
+def queue(sqlite_db):
+    x = sqlite_db.table("discovered_videos").insert(
+        {"platform": "x", "video_url": "https://x/1", "hashtags": ["#a"]}
+    ).execute().data[0]
+    tiktok = sqlite_db.table("discovered_videos").insert(
+        {"platform": "tiktok", "video_url": "https://tiktok/1"}
+    ).execute().data[0]
+    for text, video_id in (("on x", x["id"]), ("on tiktok", tiktok["id"]), ("orphan", None)):
+        sqlite_db.table("review_queue").insert({"video_id": video_id, "proposed_text": text}).execute()
+    return sqlite_db
+
+
+class TestSQLiteJoins:
+    def test_left_join_nests_parent_or_none(self, queue):
+        rows = (
+            queue.table("review_queue")
+            .select("proposed_text, video:discovered_videos(platform, hashtags)")
+            .order("id")
+            .execute()
+            .data
+        )
+        assert rows == [
+            {"proposed_text": "on x", "video": {"platform": "x", "hashtags": ["#a"]}},
+            {"proposed_text": "on tiktok", "video": {"platform": "tiktok", "hashtags": []}},
+            {"proposed_text": "orphan", "video": None},
+        ]
+
+    def test_inner_join_drops_rows_without_parent(self, queue):
+        rows = queue.table("review_queue").select("*, discovered_videos!inner(platform)").execute().data
+        assert sorted(r["proposed_text"] for r in rows) == ["on tiktok", "on x"]
+        assert "video_id" in rows[0]
+
+    def test_filters_and_orders_on_embedded_columns(self, queue):
+        events = []
+        add_query_hook(events.append)
+        try:
+            rows = (
+                queue.table("review_queue")
+                .select("id, proposed_text, discovered_videos!inner(video_url)")
+                .eq("discovered_videos.platform", "x")
+                .order("discovered_videos.video_url", desc=True)
+                .execute()
+                .data
+            )
+        finally:
+            remove_query_hook(events.append)
+        assert [(r["proposed_text"], r["discovered_videos"]) for r in rows] == [
+            ("on x", {"video_url": "https://x/1"})
+        ]
+        assert len(events) == 1
+
+    def test_count_with_join(self, queue):
+        result = (
+            queue.table("review_queue")
+            .select("id, discovered_videos!inner(platform)", count="exact")
+            .eq("discovered_videos.platform", "tiktok")
+            .execute()
+        )
+        assert result.count == 1
+
+    def test_one_to_many_returns_arrays(self, queue):
+        rows = (
+            queue.table("discovered_videos")
+            .select("platform, review_queue(proposed_text)")
+            .order("platform")
+            .execute()
+            .data
+        )
+        assert rows == [
+            {"platform": "tiktok", "review_queue": [{"proposed_text": "on tiktok"}]},
+            {"platform": "x", "review_queue": [{"proposed_text": "on x"}]},
+        ]
+
+    def test_one_to_many_inner_requires_children(self, queue):
+        queue.table("discovered_videos").insert({"platform": "x", "video_url": "https://x/2"}).execute()
+        rows = queue.table("discovered_videos").select("video_url, review_queue!inner(id)").execute().data
+        assert sorted(r["video_url"] for r in rows) == ["https://tiktok/1", "https://x/1"]
+
+    def test_embeds_with_aggregates_rejected(self, queue):
+        with pytest.raises(ValueError, match="aggregates"):
+            queue.table("review_queue").select("count(), discovered_videos(platform)").execute()
+
+
+def test_postgres_compiles_join_and_nests_rows():
+    columns = {"review_queue": {"id", "video_id"}, "discovered_videos": {"id", "platform", "hashtags"}}
+    client = MagicMock()
+    client.get_table_columns.side_effect = lambda cursor, table, refresh=False: columns[table]
+    client.get_json_columns.side_effect = lambda cursor, table: (
+        frozenset({"hashtags"}) if table == "discovered_videos" else frozenset()
+    )
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [
+        {"id": 1, "_e0__key": 7, "_e0__out__platform": "x", "_e0__out__hashtags": '["#a"]'},
+        {"id": 2, "_e0__key": None, "_e0__out__platform": None, "_e0__out__hashtags": None},
+    ]
+    qb = (
+        QueryBuilder(client, "review_queue")
+        .select("id, discovered_videos(platform, hashtags)")
+        .eq("discovered_videos.platform", "x")
+    )
+    result = qb._do_select(cursor)
+    sql = cursor.execute.call_args[0][0]
+    assert 'LEFT JOIN (SELECT' in sql
+    assert 'ON "_e0"."_e0__id" = "review_queue"."video_id"' in sql
+    assert 'WHERE "_e0"."_e0__platform" = %s' in sql
+    assert result.data == [
+        {"id": 1, "discovered_videos": {"platform": "x", "hashtags": ["#a"]}},
+        {"id": 2, "discovered_videos": None},
+    ]
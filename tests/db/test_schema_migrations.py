@@ -0,0 +1,141 @@
+"""Tests for versioned schema migrations and the hot-column indexes."""
+
+from __future__ import annotations
+
+import logging
+import os
+
+import pytest
+
+from db import sqlite_store
+from db.schema_migrations import LATEST_VERSION, MIGRATIONS, apply_migrations, get_schema_version
+
+
+def _plan(conn, sql: str, params: tuple = ()) -> str:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return " | ".join(row["detail"] for row in rows)
+
+
+class TestSQLiteMigrations:
+    def test_records_latest_version(self, sqlite_db):
+        conn = sqlite_store._get_conn()
+        assert get_schema_version(conn) == LATEST_VERSION
+        names = [r["name"] for r in conn.execute("SELECT name FROM schema_migrations ORDER BY version")]
+        assert names == [m.name for m in MIGRATIONS]
+
+    def test_rerun_is_noop(self, sqlite_db):
+        conn = sqlite_store._get_conn()
+        assert apply_migrations(conn) == []
+        sqlite_store.init_sqlite_db()
+        assert get_schema_version(conn) == LATEST_VERSION
+
+    def test_dedupes_video_urls_before_unique_index(self, sqlite_db, caplog):
+        conn = sqlite_store._get_conn()
+        conn.execute("DROP INDEX uq_discovered_videos_video_url")
+        conn.execute("DELETE FROM schema_migrations WHERE version >= 2")
+        for _ in range(3):
+            conn.execute(
+                "INSERT INTO discovered_videos (platform, video_url) VALUES ('x', 'https://x.com/a/1')"
+            )
+        ids = [r["id"] for r in conn.execute("SELECT id FROM discovered_videos ORDER BY id")]
+        conn.execute("INSERT INTO engagements (platform, video_id) VALUES ('x', ?)", (ids[2],))
+        conn.execute("INSERT INTO review_queue (video_id) VALUES (?)", (ids[1],))
+        conn.execute("INSERT INTO discovered_videos (platform, video_url) VALUES ('x', 'https://x.com/a/2')")
+        conn.commit()
+
+        with caplog.at_level(logging.WARNING, logger="db.schema_migrations"):
+            assert apply_migrations(conn) == list(range(2, LATEST_VERSION + 1))
+
+        remaining = [r["id"] for r in conn.execute("SELECT id FROM discovered_videos ORDER BY id")]
+        assert remaining == [ids[0], ids[2] + 1]
+        assert conn.execute("SELECT video_id FROM engagements").fetchone()[0] == ids[0]
+        assert conn.execute("SELECT video_id FROM review_queue").fetchone()[0] == ids[0]
+        [record] = [r for r in caplog.records if r.levelno == logging.WARNING]
+        message = record.getMessage()
+        assert "deleting 2 duplicate discovered_videos rows" in message
+        assert f"{{{ids[0]}: [{ids[1]}, {ids[2]}]}}" in message
+        assert "'engagements': 1" in message and "'review_queue': 1" in message
+
+    def test_no_duplicates_logs_nothing(self, sqlite_db, caplog):
+        conn = sqlite_store._get_conn()
+        conn.execute("DROP INDEX uq_discovered_videos_video_url")
+        conn.execute("DELETE FROM schema_migrations WHERE version >= 2")
+        conn.commit()
+        with caplog.at_level(logging.WARNING, logger="db.schema_migrations"):
+            apply_migrations(conn)
+        assert not [r for r in caplog.records if r.levelno == logging.WARNING]
+
+    def test_video_url_is_unique(self, sqlite_db):
+        sqlite_db.table("discovered_videos").insert({"platform": "x", "video_url": "u"}).execute()
+        with pytest.raises(Exception):
+            sqlite_db.table("discovered_videos").insert({"platform": "x", "video_url": "u"}).execute()
+        sqlite_db.table("discovered_videos").upsert(
+            [{"platform": "x", "video_url": "u"}, {"platform": "x", "video_url": "v"}],
+            on_conflict="video_url",
+            ignore_duplicates=True,
+        ).execute()
+        rows = sqlite_db.table("discovered_videos").select("video_url").execute().data
+        assert sorted(r["video_url"] for r in rows) == ["u", "v"]
+
+
+HOT_QUERIES = [
+    (
+        "SELECT * FROM engagement_metrics WHERE engagement_id = ? ORDER BY checked_at DESC LIMIT 1",
+        (1,),
+        "idx_engagement_metrics_engagement_checked",
+    ),
+    ("SELECT * FROM discovered_videos WHERE platform = ?", ("x",), "idx_discovered_videos_platform"),
+    ("SELECT * FROM discovered_videos WHERE status = ?", ("new",), "idx_discovered_videos_status"),
+    ("SELECT id FROM discovered_videos WHERE video_url = ?", ("u",), "uq_discovered_videos_video_url"),
+    ("SELECT * FROM engagements WHERE platform = ?", ("x",), "idx_engagements_platform"),
+    (
+        "SELECT platform FROM engagements WHERE posted_at >= ?",
+        ("2024-01-01",),
+        "idx_engagements_posted_at_platform",
+    ),
+    ("SELECT * FROM review_queue WHERE decision IS NULL", (), "idx_review_queue_decision"),
+    (
+        "SELECT * FROM neoclaw_tasks WHERE status = ? ORDER BY priority, created_at LIMIT 1",
+        ("pending",),
+        "idx_neoclaw_tasks_status_priority_created",
+    ),
+    (
+        "SELECT * FROM comment_feedback WHERE decision = ? ORDER BY decided_at DESC",
+        ("approved",),
+        "idx_comment_feedback_decision_decided",
+    ),
+    (
+        "SELECT routing_decision, COUNT(*), SUM(total_score) FROM risk_scores"
+        " WHERE scored_at >= ? GROUP BY routing_decision",
+        ("2024-01-01",),
+        "idx_risk_scores_scored_routing_total",
+    ),
+]
+
+
+@pytest.mark.parametrize("sql, params, index", HOT_QUERIES, ids=[q[2] for q in HOT_QUERIES])
+def test_sqlite_hot_queries_use_index(sqlite_db, sql, params, index):
+    plan = _plan(sqlite_store._get_conn(), sql, params)
+    assert index in plan, plan
+
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL not set")
+@pytest.mark.parametrize("sql, params, index", HOT_QUERIES, ids=[q[2] for q in HOT_QUERIES])
+def test_postgres_hot_queries_use_index(sql, params, index):
+    from db.postgres_store import PostgresClient, init_postgres_db
+
+    url = os.environ["TEST_DATABASE_URL"]
+    client = PostgresClient(url, pool_min_size=0, pool_max_size=1)
+    try:
+        init_postgres_db(url, client=client)
+        with client.connection() as conn:
+            cursor = conn.cursor()
+            # Tables are near-empty in tests; make the planner prefer indexes
+            cursor.execute("SET enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql.replace("?", "%s"), params)
+            plan = " ".join(next(iter(row.values())) for row in cursor.fetchall())
+            cursor.close()
+            conn.rollback()
+        assert index in plan, plan
+    finally:
+        client.close()
@@ -0,0 +1,47 @@
+"""Tests for the discovery worker."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.workers.discovery_worker import DiscoveryWorker
+
+ITEMS = [
+    {"video_url": "https://x.com/a/1", "text": "budget tips", "likes": 900},
+    {"video_url": "https://x.com/a/2", "text": "saving money", "likes": 700},
+]
+
+
+async def _run_cycle(worker: DiscoveryWorker, items: list[dict]) -> None:
+    discovery = MagicMock()
+    discovery.discover_content = AsyncMock(return_value=items)
+    discovery.classify_content.return_value = "finance-relevant"
+    discovery.score_opportunity.return_value = 50
+
+    async def stop(_seconds):
+        worker._running = False
+
+    worker._running = True
+    with patch("services.social.discovery.DiscoveryService", return_value=discovery), patch(
+        "services.workers.discovery_worker.asyncio.sleep", side_effect=stop
+    ):
+        await worker.run()
+
+
+@pytest.mark.asyncio
+async def test_seen_urls_are_not_counted_as_stored(sqlite_db):
+    worker = DiscoveryWorker("twitter", sqlite_db, interval_seconds=1)
+
+    await _run_cycle(worker, ITEMS)
+    await _run_cycle(worker, ITEMS + [{"video_url": "https://x.com/a/3", "text": "new"}])
+    await _run_cycle(worker, ITEMS)
+
+    cycles = (
+        sqlite_db.table("audit_log").select("details").eq("action", "discovery_cycle")
+        .order("id").execute().data
+    )
+    assert [(c["details"]["found"], c["details"]["stored"]) for c in cycles] == [(2, 2), (3, 1), (2, 0)]
+    videos = sqlite_db.table("discovered_videos").select("video_url").execute().data
+    assert len(videos) == 3